@@ -0,0 +1,3 @@
+"""
+Benchmarki wydajnościowe - skrypty mierzące skalowanie repozytoriów i logiki biznesowej.
+"""
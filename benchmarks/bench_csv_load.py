@@ -0,0 +1,68 @@
+"""
+Benchmark odczytu dużego notes.csv: sekwencyjnie (csv.reader) vs równolegle (mmap + pula procesów)
+dla rosnącej liczby procesów. Treści notatek zawierają nowe linie i cudzysłowy w polach.
+
+Uruchomienie:
+    python -m benchmarks.bench_csv_load [liczba_notatek]
+"""
+import csv
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+from company_lib.domain.models import NoteModel
+from company_lib.infrastructure.csv_reader import read_csv, read_csv_parallel
+
+CONTENTS = [
+    'Klient potwierdził otrzymanie próbek.',
+    'Rozmowa telefoniczna:\nklient prosi o "pilny" kontakt; oferta w załączniku',
+    'Próbka dotarła uszkodzona.\r\nProśba o ponowną wysyłkę.',
+]
+
+def generate_notes(path: Path, count: int, seed: int = 42) -> None:
+    """Generuje notes.csv w formacie repozytoriów (';', utf-8-sig)."""
+    rng = random.Random(seed)
+    with open(path, mode='w', encoding='utf-8-sig', newline='') as f:
+        writer = csv.writer(f, delimiter=';')
+        writer.writerow(['id', 'customer_id', 'content', 'created_at', 'is_processed'])
+        writer.writerows(
+            (i, f"CUST_{rng.randrange(50_000):06d}", rng.choice(CONTENTS), '2025-11-20 10:00:00', 'False')
+            for i in range(count)
+        )
+
+def main():
+    """Uruchamia benchmark i wypisuje wyniki."""
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 2_000_000
+    cores = os.cpu_count() or 1
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "notes.csv"
+        generate_notes(path, count)
+        size_mb = path.stat().st_size / 2**20
+        
+        start = time.perf_counter()
+        expected = read_csv(path, NoteModel)
+        sequential_time = time.perf_counter() - start
+        
+        results = []
+        workers = 2
+        while workers <= cores:
+            start = time.perf_counter()
+            loaded = read_csv_parallel(path, NoteModel, workers=workers)
+            results.append((workers, time.perf_counter() - start))
+            assert loaded == expected, "Wynik równoległy różni się od sekwencyjnego"
+            workers *= 2
+    
+    print("=" * 60)
+    print(f"Notatki: {count}, plik: {size_mb:.0f} MiB, rdzenie: {cores}")
+    print("=" * 60)
+    print(f"sekwencyjnie:          {sequential_time:7.2f} s")
+    for workers, elapsed in results:
+        print(f"równolegle ({workers:2d} proc.):  {elapsed:7.2f} s  (x{sequential_time / elapsed:.1f})")
+    if not results:
+        print("Jeden rdzeń - pomiar równoległy pominięty")
+
+if __name__ == "__main__":
+    main()
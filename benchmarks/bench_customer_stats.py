@@ -0,0 +1,94 @@
+"""
+Benchmark statystyk klientów: get_customer_stats w pętli vs get_all_customer_stats.
+Generuje syntetyczne pliki CSV (domyślnie 50 000 klientów) w katalogu tymczasowym.
+
+Uruchomienie:
+    python -m benchmarks.bench_customer_stats [liczba_klientów]
+"""
+import csv
+import sys
+import random
+import tempfile
+import time
+from pathlib import Path
+from company_lib.infrastructure.repo_csv import (
+    CsvCustomerRepository,
+    CsvNoteRepository,
+    CsvSampleRepository
+)
+
+NOTES_PER_CUSTOMER = 4
+SAMPLES_PER_CUSTOMER = 2
+LOOP_SUBSET = 200  # Pętla per klient jest kwadratowa - mierzymy podzbiór i ekstrapolujemy
+
+def write_csv(path: Path, header: list, rows) -> None:
+    """Zapisuje wiersze do CSV w formacie repozytoriów (';', utf-8-sig)."""
+    with open(path, mode='w', encoding='utf-8-sig', newline='') as f:
+        writer = csv.writer(f, delimiter=';')
+        writer.writerow(header)
+        writer.writerows(rows)
+
+def generate_data(directory: Path, customers_count: int, seed: int = 42) -> None:
+    """Generuje customers.csv, notes.csv i samples.csv."""
+    rng = random.Random(seed)
+    customer_ids = [f"CUST_{i:06d}" for i in range(customers_count)]
+    
+    write_csv(
+        directory / "customers.csv",
+        ['id', 'name', 'email', 'phone', 'salesperson_email', 'created_at'],
+        ((cid, f"Klient {cid}", f"{cid.lower()}@example.com", '', 'sprzedawca@firma.pl', '2024-01-01')
+         for cid in customer_ids)
+    )
+    write_csv(
+        directory / "notes.csv",
+        ['id', 'customer_id', 'content', 'created_at', 'is_processed'],
+        ((i, rng.choice(customer_ids), 'Klient potwierdził otrzymanie próbek.', '2025-11-20', 'False')
+         for i in range(customers_count * NOTES_PER_CUSTOMER))
+    )
+    write_csv(
+        directory / "samples.csv",
+        ['id', 'customer_id', 'status', 'date_sent', 'notes'],
+        ((i, rng.choice(customer_ids), 'Sent', '2025-11-19', '')
+         for i in range(customers_count * SAMPLES_PER_CUSTOMER))
+    )
+
+def main():
+    """Uruchamia benchmark i wypisuje wyniki."""
+    customers_count = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        directory = Path(tmp)
+        generate_data(directory, customers_count)
+        
+        note_repo = CsvNoteRepository(directory / "notes.csv")
+        sample_repo = CsvSampleRepository(directory / "samples.csv")
+        customer_repo = CsvCustomerRepository(
+            directory / "customers.csv",
+            note_repo=note_repo,
+            sample_repo=sample_repo
+        )
+        customer_ids = list(customer_repo.get_all_customer_stats().keys())
+        
+        subset = customer_ids[:LOOP_SUBSET]
+        start = time.perf_counter()
+        loop_stats = {cid: customer_repo.get_customer_stats(cid) for cid in subset}
+        loop_time = time.perf_counter() - start
+        loop_extrapolated = loop_time / len(subset) * len(customer_ids)
+        
+        start = time.perf_counter()
+        all_stats = customer_repo.get_all_customer_stats()
+        one_pass_time = time.perf_counter() - start
+        
+        assert all(all_stats[cid] == stats for cid, stats in loop_stats.items()), "Niezgodne statystyki"
+    
+    print("=" * 60)
+    print(f"Klienci: {customers_count}, notatki: {customers_count * NOTES_PER_CUSTOMER}, "
+          f"próbki: {customers_count * SAMPLES_PER_CUSTOMER}")
+    print("=" * 60)
+    print(f"get_customer_stats w pętli ({len(subset)} klientów): {loop_time:.3f} s")
+    print(f"  ekstrapolacja na wszystkich klientów:        {loop_extrapolated:.1f} s")
+    print(f"get_all_customer_stats (jeden przebieg):       {one_pass_time:.3f} s")
+    print(f"Przyspieszenie:                                x{loop_extrapolated / one_pass_time:.0f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+Benchmark czasu importu skryptów (python -X importtime) z budżetem regresji.
+Każdy skrypt importowany jest w świeżym interpreterze kilka razy; wynikiem jest mediana
+skumulowanego czasu importu modułu skryptu (bez site/.pth środowiska).
+Dodatkowo sprawdzane jest, czy skrypt nie ładuje ciężkich bibliotek, których nie potrzebuje
+(SDK dostawców LLM, pyodbc, NumPy, pyarrow, multiprocessing).
+
+Uruchomienie:
+    python -m benchmarks.bench_import_time [liczba_powtórzeń]
+
+Kod wyjścia 1 oznacza przekroczony budżet lub niepotrzebny ciężki import.
+"""
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List, Set, Tuple
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+# Moduły, których import jest kosztowny i powinien następować dopiero przy użyciu
+HEAVY_MODULES = (
+    "google.generativeai",
+    "openai",
+    "requests",
+    "pyodbc",
+    "numpy",
+    "pyarrow",
+    "multiprocessing",
+)
+
+# Skrypt -> (budżet w ms, dozwolone ciężkie moduły)
+# Budżety z zapasem ok. 2x względem pomiaru referencyjnego (ciepły cache dysku)
+SCRIPTS: Dict[str, Tuple[float, Set[str]]] = {
+    "scripts.customer_monitor": (100.0, set()),
+    "scripts.note_categorizer": (100.0, set()),
+    "scripts.sample_followup": (200.0, set()),
+    "scripts.import_csv_to_sqlite": (60.0, set()),
+    "scripts.convert_csv_to_parquet": (400.0, {"numpy", "pyarrow"}),
+}
+
+
+def measure_import(module: str) -> Tuple[float, Set[str]]:
+    """
+    Importuje moduł w nowym procesie z -X importtime.
+    
+    Returns:
+        (skumulowany czas importu modułu w ms, zbiór zaimportowanych modułów)
+    """
+    env = dict(os.environ, PYTHONPATH=str(BASE_DIR))
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=BASE_DIR, env=env, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Import {module} nie powiódł się:\n{result.stderr[-2000:]}")
+    
+    cumulative_us = None
+    imported = set()
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        name = name.strip()
+        imported.add(name)
+        if name == module:
+            cumulative_us = int(cumulative)
+    if cumulative_us is None:
+        raise RuntimeError(f"Brak pomiaru dla {module} w wyjściu -X importtime")
+    return cumulative_us / 1000, imported
+
+
+def heavy_imports(imported: Set[str]) -> List[str]:
+    """Zwraca ciężkie moduły (pakiety najwyższego poziomu z HEAVY_MODULES) obecne w imporcie."""
+    return [name for name in HEAVY_MODULES if name in imported]
+
+
+def main():
+    """Uruchamia benchmark, wypisuje wyniki i kończy z kodem 1 przy regresji."""
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    failures = []
+    
+    print("=" * 78)
+    print(f"{'Skrypt':<34} {'mediana':>9} {'budżet':>9}  ciężkie importy")
+    print("=" * 78)
+    for module, (budget_ms, allowed) in SCRIPTS.items():
+        timings = []
+        imported: Set[str] = set()
+        for _ in range(repeats):
+            elapsed_ms, imported = measure_import(module)
+            timings.append(elapsed_ms)
+        median_ms = statistics.median(timings)
+        heavy = heavy_imports(imported)
+        unexpected = [name for name in heavy if name not in allowed]
+        
+        status = "OK"
+        if median_ms > budget_ms:
+            status = "BUDŻET"
+            failures.append(f"{module}: {median_ms:.1f} ms > {budget_ms:.0f} ms")
+        if unexpected:
+            status = "CIĘŻKIE"
+            failures.append(f"{module}: niepotrzebny import {', '.join(unexpected)}")
+        print(f"{module:<34} {median_ms:7.1f}ms {budget_ms:7.0f}ms  {', '.join(heavy) or '-'}  [{status}]")
+    
+    if failures:
+        print("\nRegresje:")
+        for failure in failures:
+            print(f"  - {failure}")
+        sys.exit(1)
+    print("\nWszystkie skrypty mieszczą się w budżecie.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Benchmark narzutu logowania w pętli po notatkach (jak w note_categorizer / sample_followup):
+na każdą notatkę jeden wpis INFO i jeden DEBUG (wyłączony przy LOG_LEVEL=INFO).
+Porównuje dotychczasowy układ (f-stringi, synchroniczny FileHandler + StreamHandler)
+z kolejką (QueueHandler + jeden wątek zapisujący) i formatowaniem %-style.
+Konsola jest przekierowana do os.devnull, plik logów trafia do katalogu tymczasowego.
+
+Uruchomienie:
+    python -m benchmarks.bench_logging [liczba_notatek]
+"""
+import logging
+import os
+import sys
+import tempfile
+import time
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from pathlib import Path
+from queue import SimpleQueue
+from company_lib.domain.models import NoteModel
+
+FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+
+def make_notes(count: int) -> list:
+    """Tworzy notatki z treścią długości typowej notatki handlowca."""
+    content = "Klient potwierdził otrzymanie próbek, prosi o ofertę na większą partię. " * 3
+    return [NoteModel(id=i, customer_id=f"CUST_{i % 5000}", content=content) for i in range(count)]
+
+
+def sync_logger(log_file: Path, console) -> logging.Logger:
+    """Dotychczasowa konfiguracja: handlery synchroniczne podpięte bezpośrednio do loggera."""
+    logger = logging.getLogger("BenchSync")
+    logger.handlers.clear()
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    for handler in (logging.FileHandler(log_file, encoding='utf-8'), logging.StreamHandler(console)):
+        handler.setFormatter(logging.Formatter(FORMAT))
+        logger.addHandler(handler)
+    return logger
+
+
+def queued_logger(log_file: Path, console):
+    """Konfiguracja z company_lib.logger: kolejka i jeden wątek zapisujący z rotacją."""
+    logger = logging.getLogger("BenchQueued")
+    logger.handlers.clear()
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    log_queue = SimpleQueue()
+    handlers = (
+        RotatingFileHandler(log_file, maxBytes=10 * 1024 * 1024, backupCount=5, encoding='utf-8'),
+        logging.StreamHandler(console)
+    )
+    for handler in handlers:
+        handler.setFormatter(logging.Formatter(FORMAT))
+    listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    listener.start()
+    logger.addHandler(QueueHandler(log_queue))
+    return logger, listener
+
+
+def run_sync(notes: list, logger: logging.Logger) -> float:
+    """Pętla w dotychczasowym stylu (f-stringi formatowane zawsze)."""
+    started = time.perf_counter()
+    for note in notes:
+        logger.info(f"Przetwarzanie notatki ID: {note.id}, Klient: {note.customer_id}")
+        logger.debug(f"Analizuję notatkę ID {note.id}: {note.content[:50]}...")
+    return time.perf_counter() - started
+
+
+def run_queued(notes: list, logger: logging.Logger) -> float:
+    """Pętla z formatowaniem %-style (DEBUG odrzucany przed składaniem wiadomości)."""
+    started = time.perf_counter()
+    for note in notes:
+        logger.info("Przetwarzanie notatki ID: %s, Klient: %s", note.id, note.customer_id)
+        logger.debug("Analizuję notatkę ID %s: %.50s...", note.id, note.content)
+    return time.perf_counter() - started
+
+
+def main():
+    """Uruchamia benchmark i wypisuje wyniki."""
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    notes = make_notes(count)
+    
+    with tempfile.TemporaryDirectory() as tmp, open(os.devnull, 'w', encoding='utf-8') as console:
+        sync_time = run_sync(notes, sync_logger(Path(tmp) / "sync.log", console))
+        
+        logger, listener = queued_logger(Path(tmp) / "queued.log", console)
+        queued_time = run_queued(notes, logger)
+        started = time.perf_counter()
+        listener.stop()
+        drain_time = time.perf_counter() - started
+    
+    print("=" * 60)
+    print(f"Notatki: {count} (INFO + DEBUG na notatkę, poziom INFO)")
+    print("=" * 60)
+    print(f"Synchronicznie, f-stringi:        {sync_time:7.2f} s  ({sync_time / count * 1e6:5.1f} µs/notatkę)")
+    print(f"Kolejka, %-style (wątek główny):  {queued_time:7.2f} s  ({queued_time / count * 1e6:5.1f} µs/notatkę)")
+    print(f"Dopisanie kolejki przy wyjściu:   {drain_time:7.2f} s")
+    print(f"Przyspieszenie pętli:             {sync_time / queued_time:7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
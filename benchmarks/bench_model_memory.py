@@ -0,0 +1,58 @@
+"""
+Benchmark pamięci modeli: bajty na wiersz dla NoteModel (__slots__ + internowanie)
+w porównaniu z klasycznym dataclass z __dict__ i osobnym str customer_id w każdym wierszu.
+Wiersze budowane są jak w parserze CSV - każdy customer_id to nowy obiekt str.
+
+Uruchomienie:
+    python -m benchmarks.bench_model_memory [liczba_notatek]
+"""
+import gc
+import sys
+import tracemalloc
+from dataclasses import dataclass, field
+from datetime import datetime
+from company_lib.domain.models import NoteModel
+
+CUSTOMERS = 5_000
+CONTENT = 'Klient potwierdził otrzymanie próbek.'
+
+@dataclass
+class DictNoteModel:
+    """Dotychczasowa postać NoteModel (z __dict__, bez internowania) - punkt odniesienia."""
+    id: int
+    customer_id: str
+    content: str
+    created_at: datetime = field(default_factory=datetime.now)
+    is_processed: bool = False
+
+def measure(model_cls, count: int) -> float:
+    """Zwraca średnią liczbę bajtów na wiersz (tracemalloc, wraz z listą wynikową)."""
+    created_at = datetime(2025, 11, 20)
+    gc.collect()
+    tracemalloc.start()
+    rows = [
+        # ''.join tworzy nowy obiekt str, tak jak csv.reader dla każdej komórki
+        model_cls(i, ''.join(('CUST_', str(i % CUSTOMERS))), CONTENT, created_at, False)
+        for i in range(count)
+    ]
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del rows
+    return current / count
+
+def main():
+    """Uruchamia benchmark i wypisuje wyniki."""
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    
+    dict_bytes = measure(DictNoteModel, count)
+    slots_bytes = measure(NoteModel, count)
+    
+    print("=" * 60)
+    print(f"Notatki: {count}, klienci: {CUSTOMERS}")
+    print("=" * 60)
+    print(f"dataclass z __dict__:             {dict_bytes:7.1f} B/wiersz  ({dict_bytes * count / 2**20:.0f} MiB)")
+    print(f"__slots__ + internowanie:         {slots_bytes:7.1f} B/wiersz  ({slots_bytes * count / 2**20:.0f} MiB)")
+    print(f"Oszczędność:                      {(1 - slots_bytes / dict_bytes) * 100:5.1f} %")
+
+if __name__ == "__main__":
+    main()
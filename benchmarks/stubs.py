@@ -0,0 +1,152 @@
+"""
+Zaślepki usług zewnętrznych dla benchmarków: klient LLM o zadanym opóźnieniu
+i lokalny serwer SMTP (bez TLS, akceptujący dowolne logowanie).
+Pozwalają mierzyć koszt po stronie aplikacji bez kluczy API i prawdziwego serwera pocztowego.
+"""
+import socketserver
+import threading
+import time
+from typing import Any, Dict, List
+from company_lib.core.llm_service import ILLMClient
+
+# Frazy rozstrzygające status próbki w StubLLMClient (kolejność = priorytet)
+STATUS_KEYWORDS = (
+    ("nie otrzymał", "delayed"),
+    ("spóźnia", "delayed"),
+    ("utknęła", "delayed"),
+    ("dotarł", "received"),
+    ("otrzymał", "received"),
+)
+
+
+class StubLLMClient(ILLMClient):
+    """
+    Klient LLM zwracający deterministyczną analizę na podstawie słów kluczowych.
+    Opóźnienie symuluje czas odpowiedzi API (time.sleep zwalnia GIL jak prawdziwe I/O).
+    """
+    
+    def __init__(self, latency_ms: float = 0.0):
+        """
+        Args:
+            latency_ms: Opóźnienie każdego wywołania w milisekundach
+        """
+        self.latency = latency_ms / 1000
+        self.calls = 0
+        self._lock = threading.Lock()
+    
+    def analyze_note_for_sample(self, note_content: str, sample_date: str) -> Dict[str, Any]:
+        with self._lock:
+            self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+        return self._analyze(note_content)
+    
+    def analyze_note_for_samples(self, note_content: str, sample_dates: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Jedno wywołanie (i jedno opóźnienie) dla wszystkich dat - jak zbiorcze zapytanie dostawcy."""
+        self._before_request(note_content, len(dict.fromkeys(sample_dates)))
+        with self._lock:
+            self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+        result = self._analyze(note_content)
+        return {sample_date: dict(result) for sample_date in dict.fromkeys(sample_dates)}
+    
+    @staticmethod
+    def _analyze(note_content: str) -> Dict[str, Any]:
+        text = note_content.lower()
+        mentions = "próbk" in text or "przesyłk" in text
+        status = "unknown"
+        if mentions:
+            status = next((value for keyword, value in STATUS_KEYWORDS if keyword in text), "unknown")
+        satisfaction = "unknown"
+        if "zadowolony" in text or "smakują" in text:
+            satisfaction = "satisfied"
+        elif "uszkodzone" in text or "nie do końca" in text:
+            satisfaction = "unsatisfied"
+        return {
+            "mentions_sample": mentions,
+            "sample_status": status,
+            "customer_satisfaction": satisfaction,
+            "confidence": 0.9 if status != "unknown" else 0.3,
+            "summary": note_content[:60]
+        }
+
+
+class _SMTPHandler(socketserver.StreamRequestHandler):
+    """Minimalny dialog SMTP: EHLO/AUTH/MAIL/RCPT/DATA/RSET/NOOP/QUIT."""
+    
+    # Odpowiedzi są krótkie - bez TCP_NODELAY opóźnione ACK dokładałyby ~40 ms do każdej komendy
+    disable_nagle_algorithm = True
+    
+    def _reply(self, line: str) -> None:
+        self.wfile.write(line.encode('ascii') + b"\r\n")
+    
+    def handle(self) -> None:
+        server: "StubSMTPServer" = self.server
+        with server.lock:
+            server.connections += 1
+        self._reply("220 stub ESMTP")
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            command = line.decode('ascii', errors='replace').strip()
+            verb = command.split(" ", 1)[0].upper()
+            if verb == "EHLO":
+                self._reply("250-stub")
+                self._reply("250-AUTH PLAIN LOGIN")
+                self._reply("250 8BITMIME")
+            elif verb == "AUTH":
+                if command.upper().startswith("AUTH LOGIN"):
+                    for _ in range(1 if len(command.split()) > 2 else 2):
+                        self._reply("334 VXNlcm5hbWU6")
+                        self.rfile.readline()
+                self._reply("235 2.7.0 Authentication successful")
+            elif verb == "DATA":
+                self._reply("354 End data with <CR><LF>.<CR><LF>")
+                while self.rfile.readline() not in (b".\r\n", b".\n", b""):
+                    pass
+                if server.latency:
+                    time.sleep(server.latency)
+                with server.lock:
+                    server.messages += 1
+                self._reply("250 OK")
+            elif verb == "QUIT":
+                self._reply("221 Bye")
+                return
+            elif verb in ("HELO", "MAIL", "RCPT", "RSET", "NOOP"):
+                self._reply("250 OK")
+            else:
+                self._reply("502 Command not implemented")
+
+
+class StubSMTPServer(socketserver.ThreadingTCPServer):
+    """
+    Lokalny serwer SMTP w wątku tła, liczący połączenia i przyjęte wiadomości.
+    Użycie jako context manager; adres (host, port) w atrybucie server_address.
+    """
+    
+    daemon_threads = True
+    allow_reuse_address = True
+    
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, latency_ms: float = 0.0):
+        """
+        Args:
+            host: Adres nasłuchu
+            port: Port (0 = dowolny wolny)
+            latency_ms: Opóźnienie potwierdzenia każdej wiadomości w milisekundach
+        """
+        super().__init__((host, port), _SMTPHandler)
+        self.latency = latency_ms / 1000
+        self.lock = threading.Lock()
+        self.connections = 0
+        self.messages = 0
+        self._thread = threading.Thread(target=self.serve_forever, name="stub-smtp", daemon=True)
+    
+    def __enter__(self) -> "StubSMTPServer":
+        self._thread.start()
+        return self
+    
+    def __exit__(self, *exc_info) -> None:
+        self.shutdown()
+        self.server_close()
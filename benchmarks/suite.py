@@ -0,0 +1,356 @@
+"""
+Zestaw benchmarków end-to-end na syntetycznych danych (benchmarks.synthetic) ze wszystkich warstw:
+repozytoria CSV, analiza notatek (zaślepka LLM), zadania i logi maili, mailer (lokalny serwer SMTP)
+oraz pełny cykl sample_followup. Każdy scenariusz działa na świeżej kopii danych,
+mierzona jest tylko jego właściwa część (mediana z powtórzeń).
+Logi poniżej ERROR są na czas pomiaru wyłączone, żeby nie mierzyć zapisu na konsolę.
+
+Wyniki dopisywane są do benchmarks/results/history.jsonl i porównywane z poprzednim
+uruchomieniem o tym samym rozmiarze danych.
+
+Uruchomienie:
+    python -m benchmarks.suite [liczba_notatek] [scenariusze,po,przecinku] [powtórzenia]
+"""
+import json
+import logging
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Callable, Dict, Optional, Tuple
+from company_lib.config import Config
+from company_lib.core.mailer import Mailer
+from company_lib.domain.models import MailLogModel, TaskModel
+from company_lib.infrastructure.repo_csv import (
+    CsvCustomerRepository,
+    CsvMailLogRepository,
+    CsvNoteRepository,
+    CsvSampleRepository,
+    CsvTaskRepository
+)
+from benchmarks.stubs import StubLLMClient, StubSMTPServer
+from benchmarks.synthetic import generate_dataset
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+RESULTS_FILE = Path(__file__).resolve().parent / "results" / "history.jsonl"
+
+WRITE_OPS = 2_000   # Liczba zadań / logów maili tworzonych w scenariuszach zapisu
+MAILS = 50          # Liczba maili w scenariuszach mailera
+SHARDS = 4          # Liczba shardów w scenariuszu followup_cycle_sharded
+SMTP_LATENCY_MS = 20  # Czas potwierdzenia wiadomości przez zaślepkę SMTP (jak serwer w sieci lokalnej)
+LLM_LATENCY_MS = 5   # Czas odpowiedzi zaślepki LLM w scenariuszu followup_llm
+REGRESSION_PCT = 20  # Zmiana czasu powyżej tego progu jest oznaczana w porównaniu
+
+
+def _repositories(data_dir: Path) -> Tuple[CsvCustomerRepository, CsvSampleRepository, CsvTaskRepository]:
+    """Tworzy powiązane repozytoria CSV jak get_all_repositories() w trybie CSV."""
+    note_repo = CsvNoteRepository(data_dir / "notes.csv")
+    task_repo = CsvTaskRepository(data_dir / "tasks.csv")
+    sample_repo = CsvSampleRepository(data_dir / "samples.csv", note_repo=note_repo, task_repo=task_repo)
+    customer_repo = CsvCustomerRepository(data_dir / "customers.csv", note_repo=note_repo, sample_repo=sample_repo)
+    return customer_repo, sample_repo, task_repo
+
+
+def _candidates(sample_repo: CsvSampleRepository) -> list:
+    now = datetime.now()
+    return list(sample_repo.get_followup_candidates(now - timedelta(days=14), now, status='Sent'))
+
+
+def bench_csv_load(data_dir: Path) -> Tuple[float, int]:
+    """Zimny odczyt notatek, próbek i klientów (CsvGenericRepository.load_all)."""
+    started = time.perf_counter()
+    rows = len(CsvNoteRepository(data_dir / "notes.csv").load_all())
+    rows += len(CsvSampleRepository(data_dir / "samples.csv").load_all())
+    rows += len(CsvCustomerRepository(data_dir / "customers.csv").load_all())
+    return time.perf_counter() - started, rows
+
+
+def bench_customer_stats(data_dir: Path) -> Tuple[float, int]:
+    """Statystyki wszystkich klientów jednym przebiegiem (dane już wczytane)."""
+    customer_repo, sample_repo, _ = _repositories(data_dir)
+    customer_repo.load_all()
+    customer_repo._note_repo.load_all()
+    sample_repo.load_all()
+    started = time.perf_counter()
+    stats = customer_repo.get_all_customer_stats()
+    return time.perf_counter() - started, len(stats)
+
+
+def bench_followup_candidates(data_dir: Path) -> Tuple[float, int]:
+    """Wyszukanie próbek bez zadania z notatkami kandydującymi (z wczytaniem plików)."""
+    _, sample_repo, _ = _repositories(data_dir)
+    started = time.perf_counter()
+    candidates = _candidates(sample_repo)
+    return time.perf_counter() - started, len(candidates)
+
+
+def bench_analyze_notes(data_dir: Path) -> Tuple[float, int]:
+    """analyze_notes_with_llm dla wszystkich kandydatów z zaślepką LLM bez opóźnienia (narzut aplikacji)."""
+    from scripts.sample_followup import analyze_notes_with_llm
+    _, sample_repo, _ = _repositories(data_dir)
+    candidates = _candidates(sample_repo)
+    client = StubLLMClient()
+    started = time.perf_counter()
+    for candidate in candidates:
+        sample = candidate.sample
+        analyze_notes_with_llm(candidate.notes, sample.customer_id, sample.date_sent, llm_client=client)
+    return time.perf_counter() - started, client.calls
+
+
+def bench_task_create(data_dir: Path) -> Tuple[float, int]:
+    """Utworzenie WRITE_OPS zadań jednym wsadem (jedno atomowe przepisanie tasks.csv)."""
+    task_repo = CsvTaskRepository(data_dir / "tasks.csv")
+    task_repo.get_tasks_by_customer_and_sample("", 0)
+    started = time.perf_counter()
+    with task_repo.batch():
+        for i in range(WRITE_OPS):
+            task_repo.create_task(TaskModel(
+                id=None,
+                customer_id=f"CUST_{i:07d}",
+                sample_id=i,
+                task_type="SAMPLE_FOLLOWUP",
+                description="Benchmark",
+                status="PENDING",
+                assigned_to="sprzedawca1@firma.pl"
+            ))
+    return time.perf_counter() - started, WRITE_OPS
+
+
+def bench_mail_log(data_dir: Path) -> Tuple[float, int]:
+    """Utworzenie WRITE_OPS logów maili i zmiana ich statusu na SENT w jednym wsadzie."""
+    mail_log_repo = CsvMailLogRepository(data_dir / "mail_logs.csv")
+    mail_log_repo.get_last_failed_or_pending()
+    started = time.perf_counter()
+    with mail_log_repo.batch():
+        for i in range(WRITE_OPS):
+            log = mail_log_repo.create_log(MailLogModel(
+                id=None,
+                to_email="sprzedawca1@firma.pl",
+                subject="Benchmark",
+                status="PENDING",
+                batch_id="batch_benchmark",
+                task_ids=str(i)
+            ))
+            mail_log_repo.update_log_status(log.id, "SENT")
+    return time.perf_counter() - started, WRITE_OPS
+
+
+def _configure_mail(server: StubSMTPServer) -> None:
+    """Kieruje Mailer na lokalny serwer SMTP (bez TLS)."""
+    Config.MAIL_SERVER, Config.MAIL_PORT = server.server_address
+    Config.MAIL_USE_TLS = False
+    Config.MAIL_USER = "benchmark@firma.pl"
+    Config.MAIL_PASSWORD = "benchmark"
+
+
+def _send_mails(data_dir: Path, keep_alive: bool, pipeline: bool = False) -> Tuple[float, int]:
+    context = {
+        'salesperson_email': "sprzedawca1@firma.pl",
+        'tasks': [{'task_id': i, 'customer_name': f"Klient {i}", 'customer_id': f"CUST_{i:07d}",
+                   'sample_id': i, 'sample_date': '2025-01-01', 'description': 'Benchmark'} for i in range(5)],
+        'tasks_count': 5
+    }
+    with StubSMTPServer(latency_ms=SMTP_LATENCY_MS) as server:
+        _configure_mail(server)
+        mailer = Mailer(mail_log_repo=CsvMailLogRepository(data_dir / "mail_logs.csv"), keep_alive=keep_alive)
+        notifications = [{
+            'to_email': f"sprzedawca{i}@firma.pl",
+            'subject': "Benchmark",
+            'template_name': "email/tasks_notification.html",
+            'context': context
+        } for i in range(MAILS)]
+        started = time.perf_counter()
+        if pipeline:
+            mailer.send_notifications(notifications, workers=Config.MAIL_WORKERS)
+        else:
+            for notification in notifications:
+                mailer.send_notification(**notification)
+        mailer.close()
+        elapsed = time.perf_counter() - started
+        if server.messages != MAILS:
+            raise RuntimeError(f"Serwer SMTP przyjął {server.messages} z {MAILS} wiadomości")
+    return elapsed, MAILS
+
+
+def bench_mailer(data_dir: Path) -> Tuple[float, int]:
+    """MAILS powiadomień (szablon + log maila + SMTP), nowe połączenie na każdą wiadomość."""
+    return _send_mails(data_dir, keep_alive=False)
+
+
+def bench_mailer_keep_alive(data_dir: Path) -> Tuple[float, int]:
+    """MAILS powiadomień przez jedno utrzymywane połączenie SMTP (tryb usługi)."""
+    return _send_mails(data_dir, keep_alive=True)
+
+
+def bench_mailer_pipeline(data_dir: Path) -> Tuple[float, int]:
+    """MAILS powiadomień przez send_notifications(): Config.MAIL_WORKERS równoległych sesji SMTP."""
+    return _send_mails(data_dir, keep_alive=False, pipeline=True)
+
+
+def bench_followup_cycle(data_dir: Path, shards: int = 1) -> Tuple[float, int]:
+    """Pełny cykl SampleFollowupJob.run_cycle(): kandydaci, analiza (zaślepka LLM), zadania, maile."""
+    elapsed, summary, _ = _followup_cycle(data_dir, shards, 0.0)
+    return elapsed, summary["candidates"]
+
+
+def _followup_cycle(data_dir: Path, shards: int, llm_latency_ms: float) -> Tuple[float, dict, StubLLMClient]:
+    """Uruchamia jeden cykl na danych z katalogu i zwraca czas, podsumowanie i zaślepkę LLM."""
+    from scripts.sample_followup import SampleFollowupJob
+    Config.MOCK_DIR = data_dir
+    Config.DATA_BACKEND = "csv"
+    Config.FOLLOWUP_SHARDS = shards
+    Config.CHECKPOINT_DIR = str(data_dir / "checkpoints")
+    llm_client = StubLLMClient(latency_ms=llm_latency_ms)
+    with StubSMTPServer(latency_ms=SMTP_LATENCY_MS) as server:
+        _configure_mail(server)
+        job = SampleFollowupJob()
+        job.llm_client = llm_client
+        started = time.perf_counter()
+        summary = job.run_cycle()
+        elapsed = time.perf_counter() - started
+        job.close()
+    return elapsed, summary, llm_client
+
+
+def bench_followup_cycle_sharded(data_dir: Path) -> Tuple[float, int]:
+    """Pełny cykl w SHARDS shardach (pula procesów, Config.FOLLOWUP_WORKERS)."""
+    return bench_followup_cycle(data_dir, shards=SHARDS)
+
+
+def bench_followup_llm(data_dir: Path) -> Tuple[float, int]:
+    """Pełny cykl z opóźnieniem LLM_LATENCY_MS na zapytanie; operacje = liczba zapytań do LLM."""
+    elapsed, _, llm_client = _followup_cycle(data_dir, 1, LLM_LATENCY_MS)
+    return elapsed, llm_client.calls
+
+
+SCENARIOS: Dict[str, Callable[[Path], Tuple[float, int]]] = {
+    "csv_load": bench_csv_load,
+    "customer_stats": bench_customer_stats,
+    "followup_candidates": bench_followup_candidates,
+    "analyze_notes": bench_analyze_notes,
+    "task_create": bench_task_create,
+    "mail_log": bench_mail_log,
+    "mailer": bench_mailer,
+    "mailer_keep_alive": bench_mailer_keep_alive,
+    "mailer_pipeline": bench_mailer_pipeline,
+    "followup_cycle": bench_followup_cycle,
+    "followup_cycle_sharded": bench_followup_cycle_sharded,
+    "followup_llm": bench_followup_llm,
+}
+
+
+def run_scenario(scenario: Callable[[Path], Tuple[float, int]], source: Path, repeats: int) -> Dict[str, float]:
+    """
+    Uruchamia scenariusz na świeżych kopiach danych i zwraca medianę czasu.
+    
+    Returns:
+        Słownik z medianą, minimum (ms), liczbą operacji i przepustowością
+    """
+    timings = []
+    ops = 0
+    for _ in range(repeats):
+        with tempfile.TemporaryDirectory() as tmp:
+            work_dir = Path(tmp) / "data"
+            shutil.copytree(source, work_dir)
+            elapsed, ops = scenario(work_dir)
+            timings.append(elapsed)
+    median = statistics.median(timings)
+    return {
+        'median_ms': round(median * 1000, 3),
+        'min_ms': round(min(timings) * 1000, 3),
+        'ops': ops,
+        'ops_per_s': round(ops / median, 1) if median > 0 else 0.0
+    }
+
+
+def _git_revision() -> Optional[str]:
+    try:
+        result = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=BASE_DIR, capture_output=True, text=True, timeout=10
+        )
+        return result.stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def load_previous(size: int, path: Path = RESULTS_FILE) -> Optional[dict]:
+    """Zwraca ostatni zapisany wynik dla tego samego rozmiaru danych."""
+    if not path.exists():
+        return None
+    previous = None
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if record.get("size") == size:
+                previous = record
+    return previous
+
+
+def save_record(record: dict, path: Path = RESULTS_FILE) -> None:
+    """Dopisuje wynik uruchomienia do historii (JSON Lines)."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, mode='a', encoding='utf-8') as f:
+        f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+
+def main():
+    """Generuje dane, uruchamia scenariusze, wypisuje wyniki z porównaniem i zapisuje historię."""
+    size = int(float(sys.argv[1])) if len(sys.argv) > 1 else 10_000
+    selected = sys.argv[2].split(",") if len(sys.argv) > 2 and sys.argv[2] else list(SCENARIOS)
+    repeats = int(sys.argv[3]) if len(sys.argv) > 3 else 3
+    unknown = [name for name in selected if name not in SCENARIOS]
+    if unknown:
+        print(f"Nieznane scenariusze: {', '.join(unknown)}. Dostępne: {', '.join(SCENARIOS)}")
+        sys.exit(2)
+    
+    logging.disable(logging.WARNING)
+    previous = load_previous(size)
+    results: Dict[str, Dict[str, float]] = {}
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        source = Path(tmp) / "source"
+        started = time.perf_counter()
+        counts = generate_dataset(source, size)
+        print(f"Dane: {counts} (wygenerowane w {time.perf_counter() - started:.1f} s)")
+        print("=" * 84)
+        print(f"{'Scenariusz':<22} {'mediana':>11} {'min':>11} {'operacje':>10} {'op/s':>12} {'zmiana':>10}")
+        print("=" * 84)
+        for name in selected:
+            result = run_scenario(SCENARIOS[name], source, repeats)
+            results[name] = result
+            change = ""
+            before = (previous or {}).get("results", {}).get(name)
+            if before and before.get("median_ms"):
+                pct = (result['median_ms'] - before['median_ms']) / before['median_ms'] * 100
+                change = f"{pct:+.0f}%" + (" !" if pct > REGRESSION_PCT else "")
+            print(
+                f"{name:<22} {result['median_ms']:9.1f}ms {result['min_ms']:9.1f}ms "
+                f"{result['ops']:>10} {result['ops_per_s']:>12,.0f} {change:>10}"
+            )
+    
+    record = {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'revision': _git_revision(),
+        'python': platform.python_version(),
+        'size': size,
+        'repeats': repeats,
+        'rows': counts,
+        'results': results
+    }
+    save_record(record)
+    if previous:
+        print(f"\nPorównanie z uruchomieniem {previous['timestamp']} (rewizja {previous.get('revision')})")
+    print(f"Wynik zapisany w {RESULTS_FILE}")
+
+
+if __name__ == "__main__":
+    main()
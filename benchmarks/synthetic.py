@@ -0,0 +1,252 @@
+"""
+Generator syntetycznych danych w formacie repozytoriów CSV (';', utf-8-sig):
+customers.csv, notes.csv, samples.csv, tasks.csv, mail_logs.csv.
+Dane są deterministyczne dla danego ziarna i daty odniesienia, a wiersze zapisywane strumieniowo,
+więc generator obsługuje zakres od 10^3 do 10^7 notatek bez trzymania danych w pamięci.
+Treści notatek składane są z polskich fraz handlowców (w tym wieloliniowe i z cudzysłowami),
+a część z nich wspomina o próbkach, żeby analiza LLM miała co rozstrzygać.
+
+Uruchomienie:
+    python -m benchmarks.synthetic <katalog> [liczba_notatek] [ziarno]
+"""
+import csv
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, Iterator, Optional
+
+NOTES_PER_CUSTOMER = 4
+SAMPLES_PER_CUSTOMER = 2
+SALESPERSONS = 50
+TASK_RATIO = 0.3        # Odsetek próbek, które mają już zadanie
+TASKS_PER_MAIL = 5      # Zadania zgrupowane w jednym mailu do sprzedawcy
+MAIL_FAILED_RATIO = 0.02
+SAMPLE_WINDOW_DAYS = 28  # Próbki wysyłane w ostatnich 4 tygodniach (połowa w oknie follow-up 14 dni)
+
+FIRST_NAMES = ["Jan", "Anna", "Piotr", "Katarzyna", "Tomasz", "Małgorzata", "Paweł", "Agnieszka",
+               "Michał", "Ewa", "Krzysztof", "Magdalena", "Łukasz", "Joanna", "Grzegorz", "Zofia"]
+LAST_NAMES = ["Kowalski", "Nowak", "Wiśniewski", "Wójcik", "Kowalczyk", "Kamiński", "Lewandowski",
+              "Zieliński", "Szymański", "Woźniak", "Dąbrowski", "Kozłowski", "Jankowski", "Mazur"]
+COMPANIES = ["Kawiarnia", "Palarnia", "Restauracja", "Hotel", "Bistro", "Cukiernia", "Delikatesy"]
+CITIES = ["Kraków", "Gdańsk", "Poznań", "Wrocław", "Łódź", "Lublin", "Szczecin", "Toruń", "Rzeszów"]
+PRODUCTS = ["kawy arabica", "kawy robusta", "herbaty zielonej", "syropów smakowych", "czekolady pitnej",
+            "kawy bezkofeinowej", "mieszanki espresso", "herbaty owocowej"]
+
+OPENINGS = [
+    "Rozmowa telefoniczna z klientem.",
+    "Spotkanie w siedzibie klienta.",
+    "Klient zadzwonił z pytaniem o ofertę.",
+    "Mail od klienta:",
+    "Wizyta handlowa,",
+    "Notatka po rozmowie z właścicielem.",
+]
+SAMPLE_PHRASES = [
+    "Klient potwierdził, że próbki {product} dotarły i bardzo mu smakują.",
+    "Próbka {product} dotarła wczoraj, klient jest zadowolony z jakości.",
+    "Klient jeszcze nie otrzymał próbek {product}, kurier się spóźnia.",
+    "Przesyłka z próbką {product} utknęła w sortowni, klient czeka.",
+    "Próbki {product} dotarły uszkodzone.\nKlient prosi o ponowną wysyłkę.",
+    "Klient otrzymał próbkę {product}, ale smak \"nie do końca\" mu odpowiada.",
+    "Pytał, kiedy wyślemy obiecane próbki {product}.",
+]
+OTHER_PHRASES = [
+    "Prosi o ofertę na {product} w większej ilości.",
+    "Rozmawialiśmy o warunkach płatności i rabacie za wolumen.",
+    "Klient planuje otwarcie drugiego lokalu w {city}.",
+    "Zgłosił reklamację faktury z zeszłego miesiąca.",
+    "Umówiony kolejny kontakt za dwa tygodnie.",
+    "Interesuje go ekspres w leasingu razem z dostawami {product}.",
+    "Poprosił o cennik na \"sezon letni\"; przesłałem w załączniku.",
+]
+CLOSINGS = ["", " Pilne.", " Do weryfikacji przez opiekuna.", "\r\nPozdrawiam, dział handlowy.", " Kontakt w piątek."]
+SAMPLE_NOTES = ["Próbki {product}", "Zestaw degustacyjny {product}", "", "Próbka na targi"]
+SAMPLE_STATUSES = ["Sent"] * 8 + ["Draft", "Cancelled"]
+
+
+def customer_id(index: int) -> str:
+    """Identyfikator klienta w formacie mocków (CUST_0000001)."""
+    return f"CUST_{index:07d}"
+
+
+def salesperson_email(index: int) -> str:
+    """Adres sprzedawcy przypisanego do klienta."""
+    return f"sprzedawca{index % SALESPERSONS + 1}@firma.pl"
+
+
+def note_content(rng: random.Random) -> str:
+    """Składa treść notatki z 1-3 fraz; co druga notatka dotyczy próbek."""
+    parts = [rng.choice(OPENINGS)]
+    if rng.random() < 0.5:
+        parts.append(rng.choice(SAMPLE_PHRASES))
+    for _ in range(rng.randint(0, 2)):
+        parts.append(rng.choice(OTHER_PHRASES))
+    text = " ".join(parts) + rng.choice(CLOSINGS)
+    return text.format(product=rng.choice(PRODUCTS), city=rng.choice(CITIES))
+
+
+def _write(path: Path, header: list, rows: Iterator[list]) -> int:
+    """Zapisuje wiersze strumieniowo do CSV w formacie repozytoriów i zwraca ich liczbę."""
+    count = 0
+    with open(path, mode='w', encoding='utf-8-sig', newline='') as f:
+        writer = csv.writer(f, delimiter=';')
+        writer.writerow(header)
+        for row in rows:
+            writer.writerow(row)
+            count += 1
+    return count
+
+
+def generate_dataset(
+    directory: Path,
+    notes: int,
+    seed: int = 42,
+    now: Optional[datetime] = None
+) -> Dict[str, int]:
+    """
+    Generuje komplet plików CSV w katalogu.
+    
+    Args:
+        directory: Katalog docelowy (tworzony, istniejące pliki są nadpisywane)
+        notes: Liczba notatek (największa tabela); klientów jest notes / NOTES_PER_CUSTOMER
+        seed: Ziarno generatora
+        now: Data odniesienia dla dat próbek i notatek (domyślnie bieżąca, bez części czasu)
+    
+    Returns:
+        Liczba wierszy w każdym pliku
+    """
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    now = now or datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    customers = max(1, notes // NOTES_PER_CUSTOMER)
+    counts: Dict[str, int] = {}
+    
+    rng = random.Random(seed)
+    counts["customers"] = _write(
+        directory / "customers.csv",
+        ["id", "name", "email", "phone", "salesperson_email", "created_at"],
+        (
+            [
+                customer_id(i),
+                f"{rng.choice(COMPANIES)} {rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+                f"klient{i}@example.com",
+                f"+48{rng.randint(500000000, 899999999)}",
+                salesperson_email(i),
+                (now - timedelta(days=rng.randint(30, 1500))).strftime('%Y-%m-%d')
+            ]
+            for i in range(1, customers + 1)
+        )
+    )
+    
+    rng = random.Random(seed + 1)
+    counts["notes"] = _write(
+        directory / "notes.csv",
+        ["id", "customer_id", "content", "created_at", "is_processed"],
+        (
+            [
+                i,
+                customer_id(rng.randint(1, customers)),
+                note_content(rng),
+                (now - timedelta(days=rng.randint(0, 2 * SAMPLE_WINDOW_DAYS))).strftime('%Y-%m-%d'),
+                "True" if rng.random() < 0.7 else "False"
+            ]
+            for i in range(1, notes + 1)
+        )
+    )
+    
+    # Próbki: po SAMPLES_PER_CUSTOMER na klienta, numerowane kolejno (klient wynika z ID próbki)
+    samples = customers * SAMPLES_PER_CUSTOMER
+    rng = random.Random(seed + 2)
+    
+    def sample_iter():
+        for i in range(1, samples + 1):
+            cust = (i - 1) // SAMPLES_PER_CUSTOMER + 1
+            yield [
+                i,
+                customer_id(cust),
+                rng.choice(SAMPLE_STATUSES),
+                (now - timedelta(days=rng.randint(0, SAMPLE_WINDOW_DAYS))).strftime('%Y-%m-%d'),
+                rng.choice(SAMPLE_NOTES).format(product=rng.choice(PRODUCTS))
+            ]
+    counts["samples"] = _write(
+        directory / "samples.csv",
+        ["id", "customer_id", "status", "date_sent", "notes"],
+        sample_iter()
+    )
+    
+    # Zadania dla części próbek (wyznaczone z osobnego ziarna - bez trzymania próbek w pamięci)
+    rng = random.Random(seed + 3)
+    created = (now - timedelta(days=1)).strftime('%Y-%m-%d %H:%M:%S')
+    
+    def task_iter():
+        task_id = 0
+        for sample_id in range(1, samples + 1):
+            if rng.random() >= TASK_RATIO:
+                continue
+            task_id += 1
+            cust = (sample_id - 1) // SAMPLES_PER_CUSTOMER + 1
+            yield [
+                task_id,
+                customer_id(cust),
+                sample_id,
+                "SAMPLE_FOLLOWUP",
+                f"Sprawdź czy klient {customer_id(cust)} otrzymał próbkę. Próbka ID: {sample_id}",
+                "PENDING" if rng.random() < 0.8 else "DONE",
+                created,
+                salesperson_email(cust)
+            ]
+    counts["tasks"] = _write(
+        directory / "tasks.csv",
+        ["id", "customer_id", "sample_id", "task_type", "description", "status", "created_at", "assigned_to"],
+        task_iter()
+    )
+    
+    # Logi maili: jeden mail na TASKS_PER_MAIL zadań, wszystkie z poprzedniego dnia
+    rng = random.Random(seed + 4)
+    mails = max(1, counts["tasks"] // TASKS_PER_MAIL)
+    batch_id = f"batch_{(now - timedelta(days=1)).strftime('%Y%m%d')}_000000_synthetic"
+    
+    def mail_iter():
+        for i in range(1, mails + 1):
+            failed = rng.random() < MAIL_FAILED_RATIO
+            first_task = (i - 1) * TASKS_PER_MAIL + 1
+            yield [
+                i,
+                salesperson_email(i),
+                f"Nowe zadania do wykonania - {TASKS_PER_MAIL} próbek wymaga weryfikacji",
+                "FAILED" if failed else "SENT",
+                "Connection unexpectedly closed" if failed else "",
+                "" if failed else created,
+                created,
+                batch_id,
+                ",".join(str(task_id) for task_id in range(first_task, first_task + TASKS_PER_MAIL))
+            ]
+    counts["mail_logs"] = _write(
+        directory / "mail_logs.csv",
+        ["id", "to_email", "subject", "status", "error_message", "sent_at", "created_at", "batch_id", "task_ids"],
+        mail_iter()
+    )
+    return counts
+
+
+def main():
+    """Generuje dane do wskazanego katalogu i wypisuje liczby wierszy."""
+    if len(sys.argv) < 2:
+        print("Użycie: python -m benchmarks.synthetic <katalog> [liczba_notatek] [ziarno]")
+        sys.exit(2)
+    directory = Path(sys.argv[1])
+    notes = int(float(sys.argv[2])) if len(sys.argv) > 2 else 10_000
+    seed = int(sys.argv[3]) if len(sys.argv) > 3 else 42
+    
+    started = time.perf_counter()
+    counts = generate_dataset(directory, notes, seed)
+    elapsed = time.perf_counter() - started
+    for name, count in counts.items():
+        size_mb = (directory / f"{name}.csv").stat().st_size / 1024 / 1024
+        print(f"{name + '.csv':<16} {count:>12,} wierszy  {size_mb:9.1f} MB")
+    print(f"Wygenerowano w {elapsed:.1f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -33,16 +33,40 @@ class Config:
             f"PWD={self.DB_PASSWORD}"
         )
     
+    # Rozmiar paczki dla operacji wsadowych (executemany) - commit co tyle wierszy
+    DB_BATCH_SIZE = int(os.getenv("DB_BATCH_SIZE", "1000"))
+    
+    # Plik JSON ze statystykami zapytań SQL zapisywany na końcu uruchomienia (puste = tylko log)
+    DB_QUERY_STATS_FILE = os.getenv("DB_QUERY_STATS_FILE")
+    
+    # Metryki uruchomienia (czasy etapów, liczniki, histogramy): plik JSON Lines z historią
+    # uruchomień i plik .prom dla textfile collectora Prometheusa (puste = tylko log)
+    RUN_METRICS_FILE = os.getenv("RUN_METRICS_FILE")
+    RUN_METRICS_PROM_FILE = os.getenv("RUN_METRICS_PROM_FILE")
+    
     # Konfiguracja Mail
     MAIL_SERVER = os.getenv("MAIL_SERVER", "smtp.office365.com")
     MAIL_PORT = int(os.getenv("MAIL_PORT", "587"))
     MAIL_USER = os.getenv("MAIL_USER")
     MAIL_PASSWORD = os.getenv("MAIL_PASSWORD")
     MAIL_USE_TLS = os.getenv("MAIL_USE_TLS", "True").lower() == "true"
+    # Liczba równoległych wysyłek (każda na własnej sesji SMTP) przy mailach do wielu sprzedawców
+    MAIL_WORKERS = int(os.getenv("MAIL_WORKERS", "4"))
     
     # Logowanie
     LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
     LOG_FILE = BASE_DIR / "app.log"
+    # Rotacja pliku logów: rozmiar w bajtach i liczba archiwalnych plików (app.log.1 ... app.log.N)
+    LOG_MAX_BYTES = int(os.getenv("LOG_MAX_BYTES", str(10 * 1024 * 1024)))
+    LOG_BACKUP_COUNT = int(os.getenv("LOG_BACKUP_COUNT", "5"))
+    
+    # Profilowanie skryptów: "cpu" (cProfile), "memory" (tracemalloc), "spans" (czasy wywołań
+    # repozytoriów i LLM) - oddzielone przecinkami lub "all"; puste = wyłączone
+    PROFILE = os.getenv("PROFILE", "")
+    PROFILE_DIR = Path(os.getenv("PROFILE_DIR", str(LOG_FILE.parent / "profiles")))
+    PROFILE_TOP_N = int(os.getenv("PROFILE_TOP_N", "30"))
+    # Odsetek wywołań mierzonych w trybie "spans" (1.0 = wszystkie)
+    PROFILE_SPAN_SAMPLE_RATE = float(os.getenv("PROFILE_SPAN_SAMPLE_RATE", "1.0"))
     
     # Ścieżki do katalogów
     TEMPLATE_DIR = BASE_DIR / "templates"
@@ -53,23 +77,87 @@ class Config:
     USE_MOCK_DATA = True
     MOCK_DIR = DATA_DIR / "mocks" if DATA_DIR.exists() else None
     
+    # Backend repozytoriów: "csv", "sql" (MSSQL) lub "sqlite" (lokalna baza)
+    DATA_BACKEND = os.getenv("DATA_BACKEND", "csv" if USE_MOCK_DATA else "sql").lower()
+    SQLITE_PATH = Path(os.getenv("SQLITE_PATH", str(DATA_DIR / "local.db")))
+    # Ile sekund czekać na blokadę zapisu trzymaną przez inny proces (np. równoległe shardy)
+    SQLITE_BUSY_TIMEOUT = float(os.getenv("SQLITE_BUSY_TIMEOUT", "30"))
+    
+    # Równoległy odczyt dużych CSV (mmap + pula procesów) od tego rozmiaru pliku w MB
+    CSV_PARALLEL_MIN_MB = int(os.getenv("CSV_PARALLEL_MIN_MB", "64"))
+    CSV_WORKERS = int(os.getenv("CSV_WORKERS", "0"))  # 0 = liczba rdzeni, 1 = zawsze sekwencyjnie
+    
+    # fsync przy atomowym zapisie CSV (False = szybciej, ale bez gwarancji po utracie zasilania)
+    CSV_FSYNC = os.getenv("CSV_FSYNC", "True").lower() == "true"
+    
+    # Katalog z plikami Parquet dla raportów analitycznych (notes.parquet, samples.parquet)
+    PARQUET_DIR = Path(os.getenv("PARQUET_DIR", str(DATA_DIR / "parquet")))
+    
+    # Tryb usługi (scripts/sample_followup.py --daemon): odstęp między cyklami i wymuszony pełny cykl
+    DAEMON_INTERVAL_SECONDS = float(os.getenv("DAEMON_INTERVAL_SECONDS", "60"))
+    DAEMON_FULL_CYCLE_SECONDS = float(os.getenv("DAEMON_FULL_CYCLE_SECONDS", "3600"))
+    # Cykl trwający dłużej oznacza /health jako "degraded" (0 = trzy odstępy DAEMON_INTERVAL_SECONDS)
+    DAEMON_MAX_CYCLE_SECONDS = float(os.getenv("DAEMON_MAX_CYCLE_SECONDS", "0"))
+    # Endpoint /health i /metrics (port 0 = wyłączony)
+    DAEMON_HEALTH_HOST = os.getenv("DAEMON_HEALTH_HOST", "127.0.0.1")
+    DAEMON_HEALTH_PORT = int(os.getenv("DAEMON_HEALTH_PORT", "8085"))
+    # Liczba zapamiętanych wyników analizy LLM (klucz: treść notatki + data próbki)
+    LLM_CACHE_SIZE = int(os.getenv("LLM_CACHE_SIZE", "10000"))
+    # Jedno zapytanie LLM na notatkę dla wszystkich dat próbek klienta w uruchomieniu
+    # (False = osobne zapytanie dla każdej pary notatka-próbka)
+    LLM_COALESCE_NOTES = os.getenv("LLM_COALESCE_NOTES", "True").lower() == "true"
+    
+    # Shardy sample_followup: próbki dzielone po kliencie (CRC32 ID) między procesy robocze,
+    # które same analizują notatki i tworzą zadania; maile do sprzedawców wysyła proces główny
+    FOLLOWUP_SHARDS = int(os.getenv("FOLLOWUP_SHARDS", "1"))  # 1 = bez shardów (jeden proces)
+    FOLLOWUP_WORKERS = int(os.getenv("FOLLOWUP_WORKERS", "0"))  # 0 = liczba rdzeni (najwyżej liczba shardów)
+    # Punkty kontrolne sample_followup (werdykty analizy per próbka) do wznowienia przerwanego
+    # uruchomienia, np. data/checkpoints; puste = wyłączone
+    CHECKPOINT_DIR = os.getenv("CHECKPOINT_DIR", "")
+    # Po ilu godzinach werdykty bez zadania są analizowane ponownie, a porzucony punkt kontrolny
+    # usuwany (najwyżej okno follow-up - 14 dni)
+    CHECKPOINT_MAX_AGE_HOURS = float(os.getenv("CHECKPOINT_MAX_AGE_HOURS", "24"))
+    
     # Konfiguracja LLM (wybór dostawcy)
-    LLM_PROVIDER = os.getenv("LLM_PROVIDER", "gemini")  # "gemini", "openai", "qwen"
+    LLM_PROVIDER = os.getenv("LLM_PROVIDER", "gemini")  # "gemini", "openai", "qwen", "ollama"
+    # Budżet tokenów (limity i ceny per dostawca poniżej): plik z dziennym zużyciem wspólny dla procesów
+    LLM_BUDGET_FILE = Path(os.getenv("LLM_BUDGET_FILE", str(DATA_DIR / "llm_budget.json")))
+    # Część dziennego budżetu, poniżej której notatki bez wzmianki o próbce klasyfikowane są lokalnie
+    LLM_BUDGET_RESERVE = float(os.getenv("LLM_BUDGET_RESERVE", "0.2"))
     
     # Konfiguracja Gemini AI
     GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
     GEMINI_MODEL = os.getenv("GEMINI_MODEL", "gemini-1.5-flash")
     GEMINI_TEMPERATURE = float(os.getenv("GEMINI_TEMPERATURE", "0.3"))
+    GEMINI_TOKENS_PER_MINUTE = int(os.getenv("GEMINI_TOKENS_PER_MINUTE", "0"))  # 0 = bez limitu
+    GEMINI_TOKENS_PER_DAY = int(os.getenv("GEMINI_TOKENS_PER_DAY", "0"))  # 0 = bez limitu
+    GEMINI_USD_PER_1M_TOKENS = float(os.getenv("GEMINI_USD_PER_1M_TOKENS", "0"))  # Koszt w raportach zużycia
     
     # Konfiguracja OpenAI
     OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
     OPENAI_MODEL = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
     OPENAI_TEMPERATURE = float(os.getenv("OPENAI_TEMPERATURE", "0.3"))
+    OPENAI_TOKENS_PER_MINUTE = int(os.getenv("OPENAI_TOKENS_PER_MINUTE", "0"))  # 0 = bez limitu
+    OPENAI_TOKENS_PER_DAY = int(os.getenv("OPENAI_TOKENS_PER_DAY", "0"))  # 0 = bez limitu
+    OPENAI_USD_PER_1M_TOKENS = float(os.getenv("OPENAI_USD_PER_1M_TOKENS", "0"))  # Koszt w raportach zużycia
     
     # Konfiguracja Qwen (Alibaba Cloud)
     QWEN_API_KEY = os.getenv("QWEN_API_KEY")
     QWEN_API_URL = os.getenv("QWEN_API_URL")  # URL do API Qwen
     QWEN_MODEL = os.getenv("QWEN_MODEL", "qwen-turbo")
     QWEN_TEMPERATURE = float(os.getenv("QWEN_TEMPERATURE", "0.3"))
+    QWEN_TOKENS_PER_MINUTE = int(os.getenv("QWEN_TOKENS_PER_MINUTE", "0"))  # 0 = bez limitu
+    QWEN_TOKENS_PER_DAY = int(os.getenv("QWEN_TOKENS_PER_DAY", "0"))  # 0 = bez limitu
+    QWEN_USD_PER_1M_TOKENS = float(os.getenv("QWEN_USD_PER_1M_TOKENS", "0"))  # Koszt w raportach zużycia
+    
+    # Konfiguracja Ollama (lokalny model, bez kluczy API)
+    OLLAMA_URL = os.getenv("OLLAMA_URL", "http://localhost:11434")
+    OLLAMA_MODEL = os.getenv("OLLAMA_MODEL", "qwen2.5:7b")
+    OLLAMA_TEMPERATURE = float(os.getenv("OLLAMA_TEMPERATURE", "0.0"))
+    OLLAMA_NUM_CTX = int(os.getenv("OLLAMA_NUM_CTX", "4096"))  # Okno kontekstu (mniejsze = mniej pamięci na slot)
+    OLLAMA_KEEP_ALIVE = os.getenv("OLLAMA_KEEP_ALIVE", "30m")  # Jak długo serwer trzyma model w pamięci ("-1" = zawsze)
+    # Równoległe zapytania (sloty OLLAMA_NUM_PARALLEL serwera); 0 = liczba rdzeni, najwyżej 4
+    OLLAMA_WORKERS = int(os.getenv("OLLAMA_WORKERS", "0"))
+    OLLAMA_TIMEOUT = float(os.getenv("OLLAMA_TIMEOUT", "120"))
     
     # Konfiguracja wysyłania emaili
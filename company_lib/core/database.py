@@ -1,32 +1,190 @@
 """
 Połączenie z bazą danych MSSQL z obsługą context manager.
+Zawiera rejestr nazwanych zapytań (przygotowywanych raz na połączenie) z licznikami czasu.
+Sterownik pyodbc importowany jest dopiero przy otwarciu połączenia, więc skrypty
+działające na CSV/SQLite nie potrzebują bibliotek ODBC i nie płacą za ich ładowanie.
 """
-import pyodbc
-from typing import List, Tuple, Optional, Any
+import json
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import List, Tuple, Optional, Any, Sequence, Iterator, Dict
 from company_lib.logger import setup_logger
 
 logger = setup_logger("Database")
 
+# Typy parametrów dla setinputsizes: (typ SQL, rozmiar, cyfry dziesiętne)
+# Kody typów ze specyfikacji ODBC (te same wartości co pyodbc.SQL_*)
+SQL_WVARCHAR = -9
+SQL_INTEGER = 4
+SQL_BIT = -7
+SQL_TYPE_TIMESTAMP = 93
+PARAM_STR = (SQL_WVARCHAR, 255, 0)
+PARAM_INT = (SQL_INTEGER, 0, 0)
+PARAM_BIT = (SQL_BIT, 0, 0)
+PARAM_DATETIME = (SQL_TYPE_TIMESTAMP, 23, 3)
+
+class PartialBatchError(Exception):
+    """
+    Błąd zapytania wsadowego. Paczki zatwierdzone przed błędem zostają w bazie -
+    committed to liczba wierszy zmienionych przez te paczki.
+    """
+    
+    def __init__(self, message: str, committed: int):
+        super().__init__(message)
+        self.committed = committed
+
+@dataclass
+class SqlStatement:
+    """Nazwane zapytanie SQL z opcjonalnymi typami parametrów."""
+    name: str
+    sql: str
+    input_sizes: Optional[List[Tuple[int, int, int]]] = None
+
+@dataclass
+class StatementStats:
+    """Liczniki wykonania nazwanego zapytania."""
+    calls: int = 0
+    errors: int = 0
+    rows: int = 0
+    total_time: float = 0.0
+    max_time: float = 0.0
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Zwraca liczniki jako słownik (czasy w milisekundach)."""
+        return {
+            'calls': self.calls,
+            'errors': self.errors,
+            'rows': self.rows,
+            'total_ms': round(self.total_time * 1000, 3),
+            'avg_ms': round(self.total_time * 1000 / self.calls, 3) if self.calls else 0.0,
+            'max_ms': round(self.max_time * 1000, 3)
+        }
+
+class QueryRegistry:
+    """
+    Rejestr nazwanych zapytań SQL.
+    Przechowuje treść zapytań i typy parametrów oraz zbiera liczniki
+    (liczba wywołań, wierszy, czas) dla każdego zapytania.
+    """
+    
+    def __init__(self):
+        self._statements: Dict[str, SqlStatement] = {}
+        self._stats: Dict[str, StatementStats] = {}
+        self._lock = threading.Lock()
+    
+    def register(
+        self,
+        name: str,
+        sql: str,
+        input_sizes: Optional[List[Tuple[int, int, int]]] = None
+    ) -> SqlStatement:
+        """
+        Rejestruje nazwane zapytanie (ponowna rejestracja nadpisuje poprzednią).
+        
+        Args:
+            name: Unikalna nazwa zapytania (np. 'customers.by_id')
+            sql: Treść zapytania z parametrami (?)
+            input_sizes: Typy parametrów dla setinputsizes (np. [PARAM_STR])
+        
+        Returns:
+            Zarejestrowane zapytanie
+        """
+        statement = SqlStatement(name=name, sql=sql, input_sizes=input_sizes)
+        self._statements[name] = statement
+        return statement
+    
+    def get(self, name: str) -> SqlStatement:
+        """Zwraca zapytanie po nazwie (KeyError jeśli nie zarejestrowano)."""
+        try:
+            return self._statements[name]
+        except KeyError:
+            raise KeyError(f"Nie zarejestrowano zapytania: {name}") from None
+    
+    def record(self, name: str, elapsed: float, rows: int = 0, error: bool = False) -> None:
+        """Rejestruje pojedyncze wykonanie zapytania."""
+        with self._lock:
+            stats = self._stats.setdefault(name, StatementStats())
+            stats.calls += 1
+            stats.rows += max(rows, 0)
+            stats.total_time += elapsed
+            stats.max_time = max(stats.max_time, elapsed)
+            if error:
+                stats.errors += 1
+    
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Zwraca liczniki wszystkich wykonanych zapytań (posortowane po łącznym czasie)."""
+        with self._lock:
+            items = sorted(self._stats.items(), key=lambda item: item[1].total_time, reverse=True)
+            return {name: stats.to_dict() for name, stats in items}
+    
+    def reset_stats(self) -> None:
+        """Zeruje liczniki."""
+        with self._lock:
+            self._stats.clear()
+    
+    def export_stats(self, path: Optional[Path] = None) -> Dict[str, Dict[str, Any]]:
+        """
+        Loguje podsumowanie liczników i opcjonalnie zapisuje je do pliku JSON.
+        Wywoływane na końcu uruchomienia skryptu.
+        
+        Args:
+            path: Ścieżka do pliku JSON (None = tylko logowanie)
+        
+        Returns:
+            Liczniki jako słownik
+        """
+        stats = self.get_stats()
+        if not stats:
+            return stats
+        
+        logger.info("Statystyki zapytań SQL:")
+        for name, values in stats.items():
+            logger.info(
+                f"  {name}: {values['calls']} wywołań, {values['rows']} wierszy, "
+                f"łącznie {values['total_ms']} ms, śr. {values['avg_ms']} ms, max {values['max_ms']} ms"
+            )
+        
+        if path:
+            try:
+                Path(path).parent.mkdir(parents=True, exist_ok=True)
+                with open(path, mode='w', encoding='utf-8') as f:
+                    json.dump(stats, f, ensure_ascii=False, indent=2)
+                logger.info(f"Zapisano statystyki zapytań do {path}")
+            except Exception as e:
+                logger.error(f"Błąd zapisu statystyk zapytań do {path}: {e}")
+        return stats
+
+# Domyślny rejestr współdzielony przez repozytoria
+query_registry = QueryRegistry()
+
 class MSSQLConnection:
     """
     Klasa do zarządzania połączeniem z bazą danych MSSQL.
     Wspiera context manager (with statement) dla automatycznego zamykania połączenia.
     """
     
-    def __init__(self, connection_string: str):
+    def __init__(self, connection_string: str, registry: Optional[QueryRegistry] = None):
         """
         Inicjalizuje połączenie z bazą danych.
         
         Args:
             connection_string: String połączenia do bazy MSSQL
+            registry: Rejestr nazwanych zapytań (domyślnie współdzielony query_registry)
         """
         self.connection_string = connection_string
-        self.connection: Optional[pyodbc.Connection] = None
-        self.cursor: Optional[pyodbc.Cursor] = None
+        self.connection: Optional["pyodbc.Connection"] = None
+        self.cursor: Optional["pyodbc.Cursor"] = None
+        self.registry = registry or query_registry
+        # Kursor per nazwane zapytanie - pyodbc przygotowuje zapytanie raz
+        # i używa ponownie, dopóki na kursorze wykonywany jest ten sam SQL
+        self._statement_cursors: Dict[str, "pyodbc.Cursor"] = {}
     
     def __enter__(self):
         """Otwiera połączenie przy wejściu do context managera."""
         try:
+            import pyodbc
             self.connection = pyodbc.connect(self.connection_string)
             self.cursor = self.connection.cursor()
             logger.debug("Połączenie z bazą danych otwarte")
@@ -37,6 +195,9 @@ class MSSQLConnection:
     
     def __exit__(self, exc_type, exc_val, exc_tb):
         """Zamyka połączenie przy wyjściu z context managera."""
+        for statement_cursor in self._statement_cursors.values():
+            statement_cursor.close()
+        self._statement_cursors.clear()
         if self.cursor:
             self.cursor.close()
         if self.connection:
@@ -65,6 +226,36 @@ class MSSQLConnection:
             logger.error(f"Błąd wykonania zapytania: {e}\nQuery: {query}")
             raise
     
+    def iter_query(self, query: str, params: Tuple = None, batch_size: int = 1000) -> Iterator[Tuple]:
+        """
+        Wykonuje zapytanie SELECT i zwraca wyniki strumieniowo (fetchmany).
+        Używa osobnego kursora, więc w trakcie iteracji można wykonywać inne zapytania.
+        
+        Args:
+            query: Zapytanie SQL
+            params: Parametry do zapytania (opcjonalne)
+            batch_size: Liczba wierszy pobieranych z serwera na raz
+        
+        Yields:
+            Kolejne wiersze wyniku
+        """
+        cursor = self.connection.cursor()
+        try:
+            if params:
+                cursor.execute(query, params)
+            else:
+                cursor.execute(query)
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                yield from rows
+        except Exception as e:
+            logger.error(f"Błąd wykonania zapytania: {e}\nQuery: {query}")
+            raise
+        finally:
+            cursor.close()
+    
     def execute_non_query(self, query: str, params: Tuple = None) -> int:
         """
         Wykonuje zapytanie INSERT/UPDATE/DELETE.
@@ -88,6 +279,62 @@ class MSSQLConnection:
             logger.error(f"Błąd wykonania zapytania: {e}\nQuery: {query}")
             raise
     
+    def execute_many(self, query: str, params_seq: Sequence[Tuple], chunk_size: int = 1000) -> int:
+        """
+        Wykonuje to samo zapytanie INSERT/UPDATE/DELETE dla wielu zestawów parametrów.
+        Używa fast_executemany (parametry wysyłane do serwera paczkami)
+        i zatwierdza transakcję co chunk_size wierszy.
+        
+        Args:
+            query: Zapytanie SQL z parametrami (?)
+            params_seq: Sekwencja krotek z parametrami
+            chunk_size: Liczba wierszy na jeden commit
+        
+        Returns:
+            Liczba zmienionych wierszy (suma rowcount paczek)
+        
+        Raises:
+            PartialBatchError: Błąd w trakcie - paczki zatwierdzone wcześniej zostają w bazie
+        """
+        return self._execute_chunks(self.cursor, query, params_seq, chunk_size)
+    
+    def _execute_chunks(
+        self,
+        cursor: "pyodbc.Cursor",
+        query: str,
+        params_seq: Sequence[Tuple],
+        chunk_size: int
+    ) -> int:
+        """
+        Wykonuje executemany na podanym kursorze paczkami po chunk_size, z commitem po każdej paczce.
+        Zwraca sumę rowcount zatwierdzonych paczek (liczbę wierszy paczki, gdy sterownik zwraca -1).
+        
+        Raises:
+            PartialBatchError: Błąd paczki - wycofana jest tylko ona, committed mówi, ile wierszy zapisano wcześniej
+        """
+        if not params_seq:
+            return 0
+        
+        chunk_size = max(1, chunk_size)
+        committed = 0
+        cursor.fast_executemany = True
+        try:
+            for start in range(0, len(params_seq), chunk_size):
+                chunk = list(params_seq[start:start + chunk_size])
+                cursor.executemany(query, chunk)
+                rowcount = cursor.rowcount
+                self.connection.commit()
+                committed += rowcount if rowcount >= 0 else len(chunk)
+            return committed
+        except Exception as e:
+            self.connection.rollback()
+            logger.error(
+                f"Błąd wykonania zapytania wsadowego po {committed} zatwierdzonych wierszach: {e}\nQuery: {query}"
+            )
+            raise PartialBatchError(str(e), committed) from e
+        finally:
+            cursor.fast_executemany = False
+    
     def execute_scalar(self, query: str, params: Tuple = None) -> Any:
         """
         Wykonuje zapytanie i zwraca pojedynczą wartość.
@@ -109,4 +356,135 @@ class MSSQLConnection:
         except Exception as e:
             logger.error(f"Błąd wykonania zapytania: {e}\nQuery: {query}")
             raise
-
+    
+    def _statement_cursor(self, statement: SqlStatement) -> "pyodbc.Cursor":
+        """Zwraca kursor przypisany do nazwanego zapytania (tworzy go przy pierwszym użyciu)."""
+        cursor = self._statement_cursors.get(statement.name)
+        if cursor is None:
+            cursor = self.connection.cursor()
+            if statement.input_sizes:
+                cursor.setinputsizes(statement.input_sizes)
+            self._statement_cursors[statement.name] = cursor
+        return cursor
+    
+    def execute_named(self, name: str, params: Tuple = None) -> List[Tuple]:
+        """
+        Wykonuje nazwane zapytanie SELECT z rejestru i zwraca wyniki.
+        
+        Args:
+            name: Nazwa zarejestrowanego zapytania
+            params: Parametry do zapytania (opcjonalne)
+        
+        Returns:
+            Lista krotek z wynikami
+        """
+        statement = self.registry.get(name)
+        start = time.perf_counter()
+        try:
+            cursor = self._statement_cursor(statement)
+            if params:
+                cursor.execute(statement.sql, params)
+            else:
+                cursor.execute(statement.sql)
+            rows = cursor.fetchall()
+            self.registry.record(name, time.perf_counter() - start, len(rows))
+            return rows
+        except Exception as e:
+            self.registry.record(name, time.perf_counter() - start, error=True)
+            logger.error(f"Błąd wykonania zapytania {name}: {e}")
+            raise
+    
+    def execute_named_non_query(self, name: str, params: Tuple = None) -> int:
+        """
+        Wykonuje nazwane zapytanie INSERT/UPDATE/DELETE z rejestru.
+        
+        Args:
+            name: Nazwa zarejestrowanego zapytania
+            params: Parametry do zapytania (opcjonalne)
+        
+        Returns:
+            Liczba zmienionych wierszy
+        """
+        statement = self.registry.get(name)
+        start = time.perf_counter()
+        try:
+            cursor = self._statement_cursor(statement)
+            if params:
+                cursor.execute(statement.sql, params)
+            else:
+                cursor.execute(statement.sql)
+            self.connection.commit()
+            self.registry.record(name, time.perf_counter() - start, cursor.rowcount)
+            return cursor.rowcount
+        except Exception as e:
+            self.connection.rollback()
+            self.registry.record(name, time.perf_counter() - start, error=True)
+            logger.error(f"Błąd wykonania zapytania {name}: {e}")
+            raise
+    
+    def execute_named_many(self, name: str, params_seq: Sequence[Tuple], chunk_size: int = 1000) -> int:
+        """
+        Wykonuje nazwane zapytanie wsadowo (jak execute_many) na kursorze zapytania
+        (z typami parametrów z rejestru), zliczając czas i wiersze.
+        
+        Args:
+            name: Nazwa zarejestrowanego zapytania
+            params_seq: Sekwencja krotek z parametrami
+            chunk_size: Liczba wierszy na jeden commit
+        
+        Returns:
+            Liczba zmienionych wierszy (suma rowcount paczek)
+        
+        Raises:
+            PartialBatchError: Błąd w trakcie - paczki zatwierdzone wcześniej zostają w bazie
+        """
+        statement = self.registry.get(name)
+        start = time.perf_counter()
+        try:
+            processed = self._execute_chunks(
+                self._statement_cursor(statement), statement.sql, params_seq, chunk_size
+            )
+            self.registry.record(name, time.perf_counter() - start, processed)
+            return processed
+        except PartialBatchError as e:
+            self.registry.record(name, time.perf_counter() - start, e.committed, error=True)
+            raise
+        except Exception:
+            self.registry.record(name, time.perf_counter() - start, error=True)
+            raise
+    
+    def iter_named(self, name: str, params: Tuple = None, batch_size: int = 1000) -> Iterator[Tuple]:
+        """
+        Wykonuje nazwane zapytanie SELECT i zwraca wyniki strumieniowo (fetchmany) z kursora
+        zapytania (z typami parametrów z rejestru). Inne zapytania można wykonywać w trakcie
+        iteracji, ale nie to samo nazwane zapytanie - współdzieliłoby kursor.
+        Czas liczony jest do momentu odczytania ostatniego wiersza.
+        
+        Args:
+            name: Nazwa zarejestrowanego zapytania
+            params: Parametry do zapytania (opcjonalne)
+            batch_size: Liczba wierszy pobieranych z serwera na raz
+        
+        Yields:
+            Kolejne wiersze wyniku
+        """
+        statement = self.registry.get(name)
+        start = time.perf_counter()
+        rows = 0
+        try:
+            cursor = self._statement_cursor(statement)
+            if params:
+                cursor.execute(statement.sql, params)
+            else:
+                cursor.execute(statement.sql)
+            while True:
+                batch = cursor.fetchmany(batch_size)
+                if not batch:
+                    break
+                rows += len(batch)
+                yield from batch
+            self.registry.record(name, time.perf_counter() - start, rows)
+        except Exception as e:
+            self.registry.record(name, time.perf_counter() - start, rows, error=True)
+            logger.error(f"Błąd wykonania zapytania {name}: {e}")
+            raise
@@ -85,25 +85,14 @@ Zasady:
 Odpowiedz TYLKO JSON, bez dodatkowych komentarzy."""
 
         try:
-            response = self.model.generate_content(prompt)
+            response_text = self._complete(prompt)
             
             # Parsowanie odpowiedzi JSON
-            response_text = response.text.strip()
-            
-            # Usuń markdown code blocks jeśli są
-            if response_text.startswith("```json"):
-                response_text = response_text[7:]
-            if response_text.startswith("```"):
-                response_text = response_text[3:]
-            if response_text.endswith("```"):
-                response_text = response_text[:-3]
-            response_text = response_text.strip()
-            
             result = json.loads(response_text)
             
-            logger.debug(f"Analiza notatki: {result}")
+            logger.debug("Analiza notatki: %s", result)
             return result
-            
+        
         except json.JSONDecodeError as e:
             logger.error(f"Błąd parsowania odpowiedzi JSON z Gemini: {e}")
             logger.debug(f"Odpowiedź: {response_text if 'response_text' in locals() else 'brak'}")
@@ -127,6 +116,20 @@ Odpowiedz TYLKO JSON, bez dodatkowych komentarzy."""
                 "reasoning": f"Błąd: {str(e)}"
             }
     
+    def _complete(self, prompt: str) -> str:
+        """Wysyła prompt do Gemini i zwraca tekst odpowiedzi bez bloków markdown."""
+        response = self.model.generate_content(prompt)
+        response_text = response.text.strip()
+        
+        # Usuń markdown code blocks jeśli są
+        if response_text.startswith("```json"):
+            response_text = response_text[7:]
+        if response_text.startswith("```"):
+            response_text = response_text[3:]
+        if response_text.endswith("```"):
+            response_text = response_text[:-3]
+        return response_text.strip()
+    
     def analyze_notes_batch(self, notes: list, sample_date: str) -> list:
         """
         Analizuje wiele notatek jednocześnie (opcjonalnie, dla wydajności).
@@ -0,0 +1,370 @@
+"""
+Budżet tokenów i koszt zapytań LLM per dostawca.
+- limit na minutę (<DOSTAWCA>_TOKENS_PER_MINUTE): zapytanie czeka, aż zmieści się w oknie 60 s
+- limit dzienny (<DOSTAWCA>_TOKENS_PER_DAY): przy niskim budżecie notatki bez wzmianki o próbce
+  klasyfikowane są lokalnie, po wyczerpaniu - wszystkie (KeywordNoteClassifier)
+- koszt: <DOSTAWCA>_USD_PER_1M_TOKENS
+Zużycie dzienne zapisywane jest w Config.LLM_BUDGET_FILE (wspólnym dla procesów shardów
+i kolejnych uruchomień). Klienci dostawców nie zwracają liczby zużytych tokenów, więc zużycie
+szacowane jest z długości promptu (CHARS_PER_TOKEN) i oczekiwanej odpowiedzi.
+"""
+import json
+import math
+import threading
+import time
+from collections import deque
+from datetime import date
+from pathlib import Path
+from typing import Any, Deque, Dict, List, Optional, Tuple
+from company_lib.config import Config
+from company_lib.core.llm_service import ILLMClient, LLMService, MULTI_SAMPLE_MAX_DATES
+from company_lib.core.local_classifier import KeywordNoteClassifier
+from company_lib.infrastructure.atomic_file import atomic_write
+from company_lib.infrastructure.file_lock import FileLock
+from company_lib.logger import setup_logger
+
+logger = setup_logger("LLMBudget")
+
+CHARS_PER_TOKEN = 4             # Przybliżenie dla tekstu polskiego
+PROMPT_TOKENS = 450             # Stała część promptu analizy (instrukcje i format JSON)
+OUTPUT_TOKENS_PER_DATE = 120    # Odpowiedź JSON dla jednej daty próbki
+WINDOW_SECONDS = 60.0
+# Zapis zużycia do pliku budżetu paczkami: co taką część limitu dziennego albo co tyle sekund
+# (przy niskim budżecie - po każdym zapytaniu)
+FLUSH_FRACTION = 0.01
+FLUSH_SECONDS = 5.0
+
+# Stany budżetu dziennego
+OK = "ok"
+LOW = "low"
+EXHAUSTED = "exhausted"
+
+# Część limitu minutowego dostawcy przypadająca na ten proces (procesy robocze shardów dzielą limit)
+_rate_share = 1.0
+
+
+def estimate_tokens(note_content: str, dates: int = 1) -> int:
+    """
+    Szacuje liczbę tokenów analizy notatki (prompt + odpowiedź).
+    
+    Args:
+        note_content: Treść notatki
+        dates: Liczba dat próbek (zapytania zbiorcze po MULTI_SAMPLE_MAX_DATES dat)
+    """
+    requests = math.ceil(dates / MULTI_SAMPLE_MAX_DATES) if dates > 1 else 1
+    note_tokens = math.ceil(len(note_content) / CHARS_PER_TOKEN)
+    return requests * (PROMPT_TOKENS + note_tokens) + dates * OUTPUT_TOKENS_PER_DATE
+
+
+class LLMBudget:
+    """
+    Budżet tokenów jednego dostawcy w procesie: okno minutowe, zużycie dzienne i liczniki wydatków.
+    Bezpieczny wątkowo; zużycie dzienne synchronizowane z plikiem przez flush().
+    """
+    
+    def __init__(
+        self,
+        provider: str,
+        tokens_per_minute: Optional[int] = None,
+        tokens_per_day: Optional[int] = None,
+        usd_per_1m_tokens: Optional[float] = None,
+        path: Optional[Path] = None
+    ):
+        """
+        Args:
+            provider: Nazwa dostawcy ("gemini", "openai", "qwen", "ollama")
+            tokens_per_minute: Limit na minutę (None = Config.<DOSTAWCA>_TOKENS_PER_MINUTE, 0 = bez limitu)
+            tokens_per_day: Limit dzienny (None = Config.<DOSTAWCA>_TOKENS_PER_DAY, 0 = bez limitu)
+            usd_per_1m_tokens: Cena miliona tokenów (None = Config.<DOSTAWCA>_USD_PER_1M_TOKENS)
+            path: Plik zużycia dziennego (None = Config.LLM_BUDGET_FILE)
+        """
+        prefix = provider.upper()
+        self.provider = provider
+        self.provider_tokens_per_minute = (
+            getattr(Config, f"{prefix}_TOKENS_PER_MINUTE", 0) if tokens_per_minute is None else tokens_per_minute
+        )
+        self.tokens_per_minute = self._share_of_rate_limit()
+        self.tokens_per_day = (
+            getattr(Config, f"{prefix}_TOKENS_PER_DAY", 0) if tokens_per_day is None else tokens_per_day
+        )
+        self.usd_per_1m_tokens = (
+            getattr(Config, f"{prefix}_USD_PER_1M_TOKENS", 0.0) if usd_per_1m_tokens is None else usd_per_1m_tokens
+        )
+        self.path = Path(Config.LLM_BUDGET_FILE if path is None else path)
+        self._file_lock = FileLock(self.path)
+        self._lock = threading.Lock()
+        self._window: Deque[Tuple[float, int]] = deque()
+        self._window_tokens = 0
+        self._day = date.today()
+        self._spent_today = 0     # Zużycie dzienne wszystkich procesów (stan z ostatniego flush) + własne
+        self._unflushed = 0       # Własne zużycie jeszcze niezapisane w pliku
+        self._last_flush = time.monotonic()
+        self._state = OK
+        # Liczniki procesu (różnice między uruchomieniami raportowane w metrykach)
+        self.requests = 0
+        self.tokens = 0
+        self.local = 0
+        self.wait_seconds = 0.0
+        if self.tokens_per_day:
+            self.flush()
+    
+    @property
+    def limited(self) -> bool:
+        """Czy dostawca ma jakikolwiek limit tokenów."""
+        return bool(self.tokens_per_minute or self.tokens_per_day)
+    
+    @property
+    def cost_usd(self) -> float:
+        """Szacowany koszt tokenów zużytych w procesie."""
+        return self.tokens * self.usd_per_1m_tokens / 1_000_000
+    
+    def remaining_today(self) -> Optional[int]:
+        """Pozostały budżet dzienny w tokenach (None = bez limitu)."""
+        if not self.tokens_per_day:
+            return None
+        with self._lock:
+            self._roll_day()
+            return max(0, self.tokens_per_day - self._spent_today)
+    
+    def state(self, tokens: int) -> str:
+        """
+        Stan budżetu dziennego dla zapytania o podanym koszcie.
+        
+        Returns:
+            OK, LOW (pozostało mniej niż Config.LLM_BUDGET_RESERVE budżetu) albo EXHAUSTED
+        """
+        if not self.tokens_per_day:
+            return OK
+        with self._lock:
+            self._roll_day()
+            remaining = max(0, self.tokens_per_day - self._spent_today)
+            if tokens > remaining:
+                state = EXHAUSTED
+            elif remaining - tokens < self.tokens_per_day * Config.LLM_BUDGET_RESERVE:
+                state = LOW
+            else:
+                state = OK
+            changed = state != self._state
+            self._state = state
+        if changed and state != OK:
+            logger.warning(
+                f"Budżet {self.provider}: {'niski' if state == LOW else 'wyczerpany'} "
+                f"(pozostało {remaining} z {self.tokens_per_day} tokenów dziennie) - "
+                f"{'notatki bez wzmianki o próbce' if state == LOW else 'wszystkie notatki'} klasyfikowane lokalnie"
+            )
+        return state
+    
+    def acquire(self, tokens: int) -> None:
+        """
+        Rezerwuje tokeny zapytania; przy limicie na minutę czeka, aż zapytanie zmieści się w oknie.
+        Zapytanie większe niż cały limit minutowy czeka tylko na puste okno.
+        Przy limicie dziennym zużycie trafia do pliku budżetu paczkami (_flush_due), więc procesy
+        shardów i równoległe uruchomienia widzą wspólne zużycie z opóźnieniem najwyżej jednej paczki.
+        """
+        self._reserve(tokens)
+        if self.tokens_per_day and self._flush_due():
+            self.flush()
+    
+    def _flush_due(self) -> bool:
+        """Czy zapisać zużycie: paczka FLUSH_FRACTION limitu, FLUSH_SECONDS od zapisu albo niski budżet."""
+        with self._lock:
+            return (
+                self._state != OK
+                or self._unflushed >= self.tokens_per_day * FLUSH_FRACTION
+                or time.monotonic() - self._last_flush >= FLUSH_SECONDS
+            )
+    
+    def _reserve(self, tokens: int) -> None:
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                while self._window and self._window[0][0] <= now - WINDOW_SECONDS:
+                    self._window_tokens -= self._window.popleft()[1]
+                fits = (
+                    not self.tokens_per_minute
+                    or not self._window
+                    or self._window_tokens + tokens <= self.tokens_per_minute
+                )
+                if fits:
+                    if self.tokens_per_minute:
+                        self._window.append((now, tokens))
+                        self._window_tokens += tokens
+                    self._roll_day()
+                    self._spent_today += tokens
+                    self._unflushed += tokens
+                    self.requests += 1
+                    self.tokens += tokens
+                    return
+                wait = self._window[0][0] + WINDOW_SECONDS - now
+            logger.debug("Budżet %s: limit na minutę, czekam %.1f s", self.provider, wait)
+            time.sleep(wait)
+            with self._lock:
+                self.wait_seconds += wait
+    
+    def record_local(self, count: int = 1) -> None:
+        """Zlicza analizy wykonane lokalnie zamiast zapytania do LLM."""
+        with self._lock:
+            self.local += count
+    
+    def flush(self) -> None:
+        """
+        Zapisuje własne zużycie do pliku budżetu (pod blokadą, sumując z innymi procesami)
+        i odczytuje łączne zużycie dnia.
+        """
+        with self._lock:
+            self._roll_day()
+            if not self._unflushed and not self.tokens_per_day:
+                return
+            today = self._day.isoformat()
+            unflushed = self._unflushed
+            try:
+                with self._file_lock.exclusive():
+                    usage = self._read_usage()
+                    if usage.get("day") != today:
+                        usage = {"day": today, "tokens": {}}
+                    total = usage["tokens"].get(self.provider, 0) + unflushed
+                    if unflushed:
+                        usage["tokens"][self.provider] = total
+                        with atomic_write(self.path, encoding='utf-8', newline=None) as f:
+                            json.dump(usage, f, ensure_ascii=False, indent=2)
+            except OSError as e:
+                logger.error(f"Nie można zapisać budżetu LLM {self.path}: {e}")
+                return
+            self._unflushed -= unflushed
+            self._spent_today = total + self._unflushed
+            self._last_flush = time.monotonic()
+    
+    def reset_after_fork(self) -> None:
+        """
+        W procesie potomnym: niezapisane zużycie zapisze rodzic, okno minutowe zaczyna się od nowa,
+        a limit minutowy przeliczany jest na część procesu.
+        """
+        self._lock = threading.Lock()
+        self._unflushed = 0
+        self._window.clear()
+        self._window_tokens = 0
+        self.tokens_per_minute = self._share_of_rate_limit()
+    
+    def _share_of_rate_limit(self) -> int:
+        if not self.provider_tokens_per_minute:
+            return 0
+        return max(1, int(self.provider_tokens_per_minute * _rate_share))
+    
+    def _read_usage(self) -> Dict[str, Any]:
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                usage = json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            logger.warning(f"Nieczytelny plik budżetu LLM {self.path} ({e}), zaczynam od zera")
+            return {}
+        return usage if isinstance(usage, dict) and isinstance(usage.get("tokens"), dict) else {}
+    
+    def _roll_day(self) -> None:
+        """Nowy dzień zeruje zużycie dzienne (wywoływane pod self._lock)."""
+        today = date.today()
+        if today != self._day:
+            self._day = today
+            self._spent_today = 0
+            self._unflushed = 0
+            self._state = OK
+
+
+class BudgetedLLMClient(ILLMClient):
+    """
+    Klient LLM pilnujący budżetu dostawcy: czeka na limit minutowy, a przy niskim
+    lub wyczerpanym budżecie dziennym przekazuje notatki do klasyfikacji lokalnej.
+    """
+    
+    def __init__(self, client: ILLMClient, budget: LLMBudget, local: Optional[KeywordNoteClassifier] = None):
+        """
+        Args:
+            client: Klient dostawcy
+            budget: Budżet dostawcy (LLMService.get_budget)
+            local: Klasyfikator lokalny (None = KeywordNoteClassifier)
+        """
+        self.client = client
+        self.budget = budget
+        self.local = local or KeywordNoteClassifier()
+        # Tokeny rezerwowane przed każdym faktycznym zapytaniem klienta (także zapasowym po dacie)
+        self.client.on_request = self._charge
+    
+    @property
+    def max_concurrency(self) -> int:
+        return self.client.max_concurrency
+    
+    def analyze_note_for_sample(self, note_content: str, sample_date: str) -> Dict[str, Any]:
+        return self.analyze_note_for_samples(note_content, [sample_date])[sample_date]
+    
+    def analyze_note_for_samples(self, note_content: str, sample_dates: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Analizuje notatkę dostawcą w ramach budżetu albo lokalnie, gdy budżet nie wystarcza."""
+        dates = list(dict.fromkeys(sample_dates))
+        local = self._within_budget(note_content, dates)
+        if local is not None:
+            return local
+        return self.client.analyze_note_for_samples(note_content, dates)
+    
+    def analyze_many(self, requests: List[Tuple[str, List[str]]]) -> List[Dict[str, Dict[str, Any]]]:
+        """Jak analyze_note_for_samples dla wielu notatek; zapytania w budżecie idą do dostawcy razem."""
+        results: List[Optional[Dict[str, Dict[str, Any]]]] = []
+        forwarded: List[Tuple[int, str, List[str]]] = []
+        for note_content, sample_dates in requests:
+            dates = list(dict.fromkeys(sample_dates))
+            local = self._within_budget(note_content, dates)
+            if local is None:
+                forwarded.append((len(results), note_content, dates))
+            results.append(local)
+        if forwarded:
+            fetched = self.client.analyze_many([(note_content, dates) for _, note_content, dates in forwarded])
+            for (index, _, _), note_results in zip(forwarded, fetched):
+                results[index] = note_results
+        return results
+    
+    def _within_budget(self, note_content: str, dates: List[str]) -> Optional[Dict[str, Dict[str, Any]]]:
+        """
+        Zwraca wynik klasyfikacji lokalnej, gdy budżet jest wyczerpany lub niski, a notatka nie wspomina
+        o próbce; None = notatka idzie do dostawcy (tokeny rezerwuje _charge przed każdym zapytaniem).
+        """
+        state = self.budget.state(estimate_tokens(note_content, len(dates)))
+        if state == EXHAUSTED or (state == LOW and not self.local.mentions_sample(note_content)):
+            self.budget.record_local()
+            result = self.local.analyze_note_for_sample(note_content, dates[0])
+            return {sample_date: dict(result) for sample_date in dates}
+        return None
+    
+    def _charge(self, note_content: str, dates: int) -> None:
+        """Słuchacz on_request klienta: rezerwuje tokeny jednego zapytania (czeka na limit minutowy)."""
+        self.budget.acquire(estimate_tokens(note_content, dates))
+
+
+def prepare_worker(workers: int) -> None:
+    """
+    Inicjalizacja procesu roboczego shardów: limit minutowy każdego dostawcy dzielony jest
+    po równo między procesy, a budżety odziedziczone po rodzicu (fork) zaczynają od zera.
+    
+    Args:
+        workers: Liczba procesów roboczych
+    """
+    global _rate_share
+    _rate_share = 1 / max(1, workers)
+    for budget in LLMService.get_budgets():
+        budget.reset_after_fork()
+
+
+def flush_all() -> None:
+    """Zapisuje zużycie dzienne wszystkich budżetów procesu (koniec uruchomienia lub shardu)."""
+    for budget in LLMService.get_budgets():
+        budget.flush()
+
+
+def spend_snapshot(budgets: Optional[List[LLMBudget]] = None) -> Dict[str, float]:
+    """Sumuje liczniki budżetów (None = wszystkie budżety procesu) do różnic przed i po uruchomieniu."""
+    budgets = LLMService.get_budgets() if budgets is None else budgets
+    return {
+        'requests': sum(budget.requests for budget in budgets),
+        'tokens': sum(budget.tokens for budget in budgets),
+        'local': sum(budget.local for budget in budgets),
+        'wait_seconds': sum(budget.wait_seconds for budget in budgets),
+        'cost_usd': sum(budget.cost_usd for budget in budgets),
+    }
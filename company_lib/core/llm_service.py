@@ -1,10 +1,17 @@
 """
-Uniwersalny serwis LLM z obsługą różnych dostawców (Gemini, OpenAI, Qwen).
+Uniwersalny serwis LLM z obsługą różnych dostawców (Gemini, OpenAI, Qwen, lokalna Ollama).
 Używa wzorca Strategy - każdy dostawca implementuje wspólny interfejs.
+Moduły dostawców (i ich SDK: google.generativeai, openai, requests) importowane są
+dopiero przy pierwszym get_client, więc import tego modułu jest tani.
 """
+import importlib
+import json
+import threading
 from abc import ABC, abstractmethod
-from typing import Dict, Any, Optional
+from collections import OrderedDict
+from typing import Callable, Dict, Any, Iterable, List, Optional, Set, Tuple
 from company_lib.config import Config
+from company_lib.core.profiling import traced
 from company_lib.logger import setup_logger
 
 logger = setup_logger("LLMService")
@@ -15,6 +22,13 @@ class ILLMClient(ABC):
     Definiuje wspólny interfejs dla analizy notatek.
     """
     
+    # Liczba zapytań, które klient wykonuje równolegle w analyze_many (1 = po kolei)
+    max_concurrency = 1
+    
+    # Wywoływane przed każdym zapytaniem do dostawcy w analyze_note_for_samples (także zapasowym
+    # po nieudanym zapytaniu zbiorczym) z treścią notatki i liczbą dat w zapytaniu - budżet tokenów
+    on_request: Optional[Callable[[str, int], None]] = None
+    
     @abstractmethod
     def analyze_note_for_sample(self, note_content: str, sample_date: str) -> Dict[str, Any]:
         """
@@ -36,6 +50,347 @@ class ILLMClient(ABC):
             }
         """
         pass
+    
+    def analyze_note_for_samples(self, note_content: str, sample_dates: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Analizuje notatkę dla kilku dat wysłania próbek (kolejne próbki tego samego klienta).
+        Klienci implementujący _complete wysyłają jedno zapytanie dla wszystkich dat;
+        pozostali (oraz daty pominięte w odpowiedzi) analizowani są osobno dla każdej daty.
+        Każde zapytanie zgłaszane jest wcześniej do on_request.
+        
+        Args:
+            note_content: Treść notatki
+            sample_dates: Daty wysłania próbek (format: YYYY-MM-DD)
+        
+        Returns:
+            Mapa data próbki -> wynik analizy jak w analyze_note_for_sample
+        """
+        dates = list(dict.fromkeys(sample_dates))
+        results: Dict[str, Dict[str, Any]] = {}
+        if len(dates) > 1 and type(self)._complete is not ILLMClient._complete:
+            # Porcje po MULTI_SAMPLE_MAX_DATES - odpowiedź musi zmieścić się w limicie tokenów wyjścia
+            for start in range(0, len(dates), MULTI_SAMPLE_MAX_DATES):
+                chunk = dates[start:start + MULTI_SAMPLE_MAX_DATES]
+                if len(chunk) < 2:
+                    break
+                self._before_request(note_content, len(chunk))
+                try:
+                    results.update(parse_multi_sample_response(
+                        self._complete(build_multi_sample_prompt(note_content, chunk)), chunk
+                    ))
+                except Exception as e:
+                    logger.warning(f"Zbiorcza analiza notatki dla {len(chunk)} dat nie powiodła się ({e}), analizuję osobno")
+        for sample_date in dates:
+            if sample_date not in results:
+                self._before_request(note_content, 1)
+                results[sample_date] = self.analyze_note_for_sample(note_content, sample_date)
+        return results
+    
+    def analyze_many(self, requests: List[Tuple[str, List[str]]]) -> List[Dict[str, Dict[str, Any]]]:
+        """
+        Analizuje wiele notatek, każdą dla jej dat próbek. Domyślnie po kolei;
+        klienci z max_concurrency > 1 wysyłają zapytania równolegle.
+        
+        Args:
+            requests: Pary (treść notatki, daty próbek)
+        
+        Returns:
+            Wyniki analyze_note_for_samples w kolejności zapytań
+        """
+        return [self.analyze_note_for_samples(note_content, dates) for note_content, dates in requests]
+    
+    def _before_request(self, note_content: str, dates: int) -> None:
+        """Zgłasza zapytanie do dostawcy (o notatkę dla podanej liczby dat) słuchaczowi on_request."""
+        if self.on_request is not None:
+            self.on_request(note_content, dates)
+    
+    def _complete(self, prompt: str) -> str:
+        """
+        Wysyła prompt do API dostawcy i zwraca tekst odpowiedzi (bez bloków markdown).
+        Opcjonalne - bez tej metody analyze_note_for_samples pyta o każdą datę osobno.
+        """
+        raise NotImplementedError
+
+
+# Najwięcej dat próbek w jednym zapytaniu analyze_note_for_samples
+MULTI_SAMPLE_MAX_DATES = 5
+
+MULTI_SAMPLE_PROMPT = """Jesteś ekspertem w analizie notatek biznesowych. Przeanalizuj poniższą notatkę pod kątem informacji o próbkach produktu wysłanych klientowi.
+
+Daty wysłania próbek: {dates}
+
+Treść notatki:
+"{note_content}"
+
+Dla KAŻDEJ daty wysłania oceń osobno, czy notatka dotyczy próbki wysłanej tego dnia.
+Odpowiedz TYLKO w formacie JSON (bez dodatkowego tekstu) - obiekt, którego kluczami są daty wysłania:
+{{
+    "{example_date}": {{
+        "mentions_sample": true/false,  // Czy notatka wspomina o tej próbce?
+        "sample_status": "received" | "delayed" | "not_received" | "unknown",  // Status próbki
+        "customer_satisfaction": "satisfied" | "unsatisfied" | "neutral" | "unknown",  // Zadowolenie klienta
+        "category": "sample_confirmation" | "sample_delay" | "sample_complaint" | "sample_inquiry" | "other",  // Kategoria notatki
+        "confidence": 0.0-1.0,  // Poziom pewności analizy
+        "reasoning": "krótkie uzasadnienie w języku polskim"  // Dlaczego tak skategoryzowano
+    }}
+}}
+
+Zasady:
+- "mentions_sample": true tylko jeśli notatka wyraźnie wspomina o próbce/próbkach
+- "sample_status": 
+  * "received" - klient potwierdził otrzymanie próbki
+  * "delayed" - jest mowa o opóźnieniu w dostawie
+  * "not_received" - klient zgłasza, że nie otrzymał próbki
+  * "unknown" - nie można określić statusu
+- "customer_satisfaction":
+  * "satisfied" - klient jest zadowolony z próbki
+  * "unsatisfied" - klient jest niezadowolony
+  * "neutral" - brak informacji o zadowoleniu
+  * "unknown" - nie można określić
+- "category": wybierz najbardziej pasującą kategorię
+- "confidence": 0.0-1.0, gdzie 1.0 to całkowita pewność
+
+Odpowiedz TYLKO JSON, bez dodatkowych komentarzy."""
+
+
+def build_multi_sample_prompt(note_content: str, sample_dates: List[str]) -> str:
+    """Buduje prompt analizy jednej notatki dla wielu dat wysłania próbek."""
+    return MULTI_SAMPLE_PROMPT.format(
+        dates=", ".join(sample_dates),
+        note_content=note_content,
+        example_date=sample_dates[0]
+    )
+
+
+def parse_multi_sample_response(response_text: str, sample_dates: List[str]) -> Dict[str, Dict[str, Any]]:
+    """
+    Odczytuje odpowiedź na prompt build_multi_sample_prompt.
+    
+    Args:
+        response_text: Tekst odpowiedzi modelu (JSON)
+        sample_dates: Daty, o które pytano
+    
+    Returns:
+        Mapa data -> wynik analizy (tylko daty obecne w odpowiedzi)
+    
+    Raises:
+        ValueError: Jeśli odpowiedź nie jest obiektem JSON (json.JSONDecodeError dziedziczy po ValueError)
+    """
+    data = json.loads(response_text)
+    if not isinstance(data, dict):
+        raise ValueError("odpowiedź nie jest obiektem JSON")
+    return {
+        sample_date: data[sample_date]
+        for sample_date in sample_dates
+        if isinstance(data.get(sample_date), dict)
+    }
+
+
+class CachedLLMClient(ILLMClient):
+    """
+    Dekorator klienta LLM zapamiętujący wyniki analizy (LRU).
+    Kluczem jest treść notatki i data próbki, więc ta sama notatka analizowana
+    w kolejnych cyklach usługi nie generuje ponownego zapytania do API.
+    """
+    
+    def __init__(self, client: ILLMClient, max_entries: Optional[int] = None):
+        """
+        Args:
+            client: Właściwy klient LLM
+            max_entries: Limit zapamiętanych wyników (None = Config.LLM_CACHE_SIZE)
+        """
+        self.client = client
+        self.max_entries = Config.LLM_CACHE_SIZE if max_entries is None else max_entries
+        self._results: "OrderedDict[Tuple[str, str], Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+    
+    @property
+    def max_concurrency(self) -> int:
+        return self.client.max_concurrency
+    
+    def analyze_note_for_sample(self, note_content: str, sample_date: str) -> Dict[str, Any]:
+        """Zwraca zapamiętany wynik lub analizuje notatkę właściwym klientem (zwraca kopię słownika)."""
+        key = (note_content, sample_date)
+        with self._lock:
+            if key in self._results:
+                self._results.move_to_end(key)
+                self.hits += 1
+                return dict(self._results[key])
+            self.misses += 1
+        
+        result = self.client.analyze_note_for_sample(note_content, sample_date)
+        
+        with self._lock:
+            self._results[key] = dict(result)
+            while len(self._results) > self.max_entries:
+                self._results.popitem(last=False)
+        return dict(result)
+    
+    def analyze_note_for_samples(self, note_content: str, sample_dates: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Zwraca zapamiętane wyniki; właściwy klient dostaje jedno zapytanie o brakujące daty."""
+        results: Dict[str, Dict[str, Any]] = {}
+        missing: List[str] = []
+        with self._lock:
+            for sample_date in dict.fromkeys(sample_dates):
+                key = (note_content, sample_date)
+                if key in self._results:
+                    self._results.move_to_end(key)
+                    self.hits += 1
+                    results[sample_date] = dict(self._results[key])
+                else:
+                    self.misses += 1
+                    missing.append(sample_date)
+        if not missing:
+            return results
+        
+        fetched = self.client.analyze_note_for_samples(note_content, missing)
+        
+        with self._lock:
+            for sample_date, result in fetched.items():
+                self._results[(note_content, sample_date)] = dict(result)
+                results[sample_date] = dict(result)
+            while len(self._results) > self.max_entries:
+                self._results.popitem(last=False)
+        return results
+    
+    def analyze_many(self, requests: List[Tuple[str, List[str]]]) -> List[Dict[str, Dict[str, Any]]]:
+        """Zwraca zapamiętane wyniki; notatki z brakującymi datami trafiają do klienta jednym analyze_many."""
+        results: List[Dict[str, Dict[str, Any]]] = []
+        missing: List[Tuple[int, str, List[str]]] = []
+        with self._lock:
+            for index, (note_content, sample_dates) in enumerate(requests):
+                found: Dict[str, Dict[str, Any]] = {}
+                missing_dates: List[str] = []
+                for sample_date in dict.fromkeys(sample_dates):
+                    key = (note_content, sample_date)
+                    if key in self._results:
+                        self._results.move_to_end(key)
+                        self.hits += 1
+                        found[sample_date] = dict(self._results[key])
+                    else:
+                        self.misses += 1
+                        missing_dates.append(sample_date)
+                results.append(found)
+                if missing_dates:
+                    missing.append((index, note_content, missing_dates))
+        if not missing:
+            return results
+        
+        fetched = self.client.analyze_many([(note_content, dates) for _, note_content, dates in missing])
+        
+        with self._lock:
+            for (index, note_content, _), note_results in zip(missing, fetched):
+                for sample_date, result in note_results.items():
+                    self._results[(note_content, sample_date)] = dict(result)
+                    results[index][sample_date] = dict(result)
+            while len(self._results) > self.max_entries:
+                self._results.popitem(last=False)
+        return results
+    
+    def __len__(self) -> int:
+        return len(self._results)
+
+
+class CoalescingLLMClient(ILLMClient):
+    """
+    Klient LLM jednego uruchomienia, łączący analizy tej samej notatki dla różnych próbek.
+    Notatka klienta trafia do analizy raz na każdą jego próbkę wysłaną przed notatką, a zapytania
+    różnią się tylko datą próbki. Przy pierwszym zapytaniu o notatkę klient pyta od razu
+    o wszystkie zapowiedziane daty (analyze_note_for_samples), kolejne próbki dostają wynik z pamięci.
+    Klient obsługujący zapytania równoległe (max_concurrency > 1) dostaje przy tym od razu
+    kolejne zaplanowane notatki (analyze_many), żeby wykorzystać wszystkie sloty serwera.
+    Pamięć żyje tylko w obrębie uruchomienia - między cyklami wyniki trzyma CachedLLMClient.
+    """
+    
+    def __init__(self, client: ILLMClient, planned: Dict[str, Set[str]]):
+        """
+        Args:
+            client: Właściwy klient LLM (również CachedLLMClient)
+            planned: Treść notatki -> daty próbek, dla których notatka będzie analizowana
+        """
+        self.client = client
+        self.planned = planned
+        self._results: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._order = list(planned)  # Kolejność planu = kolejność kandydatów
+        self._cursor = 0
+        self._requested: Set[str] = set()
+        self.requests = 0
+        self.coalesced = 0
+    
+    @staticmethod
+    def plan(pairs: Iterable[Tuple[str, str]]) -> Dict[str, Set[str]]:
+        """
+        Buduje mapę planned z par (treść notatki, data próbki) przewidzianych do analizy.
+        
+        Args:
+            pairs: Pary (note_content, sample_date) w formacie YYYY-MM-DD
+        """
+        planned: Dict[str, Set[str]] = {}
+        for note_content, sample_date in pairs:
+            planned.setdefault(note_content, set()).add(sample_date)
+        return planned
+    
+    def analyze_note_for_sample(self, note_content: str, sample_date: str) -> Dict[str, Any]:
+        """Zwraca wynik z pamięci uruchomienia albo analizuje notatkę dla wszystkich zaplanowanych dat."""
+        key = (note_content, sample_date)
+        with self._lock:
+            if key in self._results:
+                self.coalesced += 1
+                return dict(self._results[key])
+            dates = self._pending_dates(note_content)
+            if sample_date not in dates:
+                dates.append(sample_date)
+            batch = [(note_content, dates)] + self._prefetch(note_content, self.client.max_concurrency - 1)
+            for note, _ in batch:
+                self._requested.add(note)
+            self.requests += len(batch)
+        
+        if len(batch) == 1:
+            results = [self.client.analyze_note_for_samples(note_content, dates)]
+        else:
+            results = self.client.analyze_many(batch)
+        
+        with self._lock:
+            for (note, _), note_results in zip(batch, results):
+                for date, result in note_results.items():
+                    self._results[(note, date)] = dict(result)
+        return dict(results[0][sample_date])
+    
+    def _pending_dates(self, note_content: str) -> List[str]:
+        """Zaplanowane daty notatki bez wyniku (wywoływane pod self._lock)."""
+        return sorted(
+            date for date in self.planned.get(note_content, ())
+            if (note_content, date) not in self._results
+        )
+    
+    def _prefetch(self, current: str, limit: int) -> List[Tuple[str, List[str]]]:
+        """Kolejne zaplanowane, jeszcze nieanalizowane notatki (wywoływane pod self._lock)."""
+        batch: List[Tuple[str, List[str]]] = []
+        if limit <= 0:
+            return batch
+        while self._cursor < len(self._order) and self._order[self._cursor] in self._requested:
+            self._cursor += 1
+        for note in self._order[self._cursor:]:
+            if len(batch) >= limit:
+                break
+            if note == current or note in self._requested:
+                continue
+            dates = self._pending_dates(note)
+            if dates:
+                batch.append((note, dates))
+        return batch
+
+
+# Dostawca -> (moduł, klasa klienta); moduł importowany przy pierwszym użyciu dostawcy
+PROVIDERS: Dict[str, Tuple[str, str]] = {
+    "gemini": ("company_lib.core.gemini_client", "GeminiClient"),
+    "openai": ("company_lib.core.openai_client", "OpenAIClient"),
+    "qwen": ("company_lib.core.qwen_client", "QwenClient"),
+    "ollama": ("company_lib.core.ollama_client", "OllamaClient"),
+}
 
 
 class LLMService:
@@ -49,11 +404,11 @@ class LLMService:
         Tworzy i zwraca odpowiedni klient LLM.
         
         Args:
-            model_provider: Nazwa dostawcy ("gemini", "openai", "qwen")
+            model_provider: Nazwa dostawcy ("gemini", "openai", "qwen", "ollama")
                           Jeśli None, używa wartości z Config.LLM_PROVIDER
         
         Returns:
-            Instancja klienta LLM implementująca ILLMClient
+            Instancja klienta LLM implementująca ILLMClient (w budżecie tokenów dostawcy)
         
         Raises:
             ValueError: Jeśli dostawca nie jest obsługiwany lub brak konfiguracji
@@ -63,24 +418,67 @@ class LLMService:
         
         model_provider = model_provider.lower()
         
-        if model_provider == "gemini":
-            from company_lib.core.gemini_client import GeminiClient
-            logger.info("Tworzenie klienta Gemini")
-            return GeminiClient()
-        
-        elif model_provider == "openai":
-            from company_lib.core.openai_client import OpenAIClient
-            logger.info("Tworzenie klienta OpenAI")
-            return OpenAIClient()
-        
-        elif model_provider == "qwen":
-            from company_lib.core.qwen_client import QwenClient
-            logger.info("Tworzenie klienta Qwen")
-            return QwenClient()
-        
-        else:
+        if model_provider not in PROVIDERS:
+            available = ", ".join(f"'{name}'" for name in PROVIDERS)
             raise ValueError(
                 f"Nieobsługiwany dostawca LLM: {model_provider}. "
-                f"Dostępne: 'gemini', 'openai', 'qwen'"
+                f"Dostępne: {available}"
             )
+        
+        module_name, class_name = PROVIDERS[model_provider]
+        client_cls = getattr(importlib.import_module(module_name), class_name)
+        logger.info(f"Tworzenie klienta {class_name.removesuffix('Client')}")
+        from company_lib.core.llm_budget import BudgetedLLMClient
+        return BudgetedLLMClient(
+            traced(client_cls(), f"llm.{model_provider}"),
+            LLMService.get_budget(model_provider)
+        )
+    
+    @staticmethod
+    def get_budget(model_provider: Optional[str] = None) -> "LLMBudget":
+        """
+        Zwraca budżet tokenów dostawcy współdzielony przez klientów w procesie (tworzony raz na dostawcę).
+        
+        Args:
+            model_provider: Nazwa dostawcy lub None dla Config.LLM_PROVIDER
+        
+        Returns:
+            LLMBudget z limitami i ceną z Config.<DOSTAWCA>_TOKENS_PER_MINUTE / _TOKENS_PER_DAY / _USD_PER_1M_TOKENS
+        """
+        from company_lib.core.llm_budget import LLMBudget
+        provider = (model_provider or Config.LLM_PROVIDER).lower()
+        with _budgets_lock:
+            if provider not in _budgets:
+                _budgets[provider] = LLMBudget(provider)
+            return _budgets[provider]
+    
+    @staticmethod
+    def get_budgets() -> List["LLMBudget"]:
+        """Zwraca budżety dostawców utworzone w procesie."""
+        with _budgets_lock:
+            return list(_budgets.values())
+    
+    @staticmethod
+    def get_cached_client(model_provider: Optional[str] = None) -> CachedLLMClient:
+        """
+        Zwraca współdzielony w procesie klient z pamięcią wyników (tworzony raz na dostawcę).
+        Przeznaczony dla procesów długo działających (tryb usługi), w których klient
+        i jego połączenia HTTP mają przetrwać między cyklami.
+        
+        Args:
+            model_provider: Nazwa dostawcy lub None dla Config.LLM_PROVIDER
+        
+        Returns:
+            CachedLLMClient opakowujący klienta dostawcy
+        """
+        provider = (model_provider or Config.LLM_PROVIDER).lower()
+        with _cached_clients_lock:
+            if provider not in _cached_clients:
+                _cached_clients[provider] = CachedLLMClient(LLMService.get_client(provider))
+            return _cached_clients[provider]
+
 
+_cached_clients: Dict[str, CachedLLMClient] = {}
+_cached_clients_lock = threading.Lock()
+_budgets: Dict[str, "LLMBudget"] = {}
+_budgets_lock = threading.Lock()
@@ -0,0 +1,70 @@
+"""
+Lokalna (bez API) klasyfikacja notatek na podstawie słów kluczowych.
+Używana przez budżet tokenów LLM: przy niskim budżecie odsiewa notatki bez wzmianki o próbce,
+a po jego wyczerpaniu zastępuje analizę LLM, zamiast zwracać odpowiedź błędu dla każdej notatki.
+Wyniki mają niską pewność (LOCAL_CONFIDENCE) - analiza LLM tej samej próbki ma pierwszeństwo.
+"""
+import re
+from typing import Any, Dict
+from company_lib.core.llm_service import ILLMClient
+
+# Pewność wyniku lokalnego (analizy LLM zwykle zwracają 0.7-1.0)
+LOCAL_CONFIDENCE = 0.5
+
+# Rdzenie słów oznaczające wzmiankę o próbce
+SAMPLE_STEMS = ("próbk", "próbek", "przesyłk", "degustac")
+
+# Frazy statusu próbki (kolejność = priorytet; zaprzeczenia przed formami twierdzącymi)
+STATUS_PATTERNS = (
+    (r"nie\s+(otrzymał|dotarł|doszł)", "not_received"),
+    (r"(spóźni|opóźni|utknęł|czeka)", "delayed"),
+    (r"(otrzymał|dotarł|doszł|odebrał)", "received"),
+)
+
+# Frazy zadowolenia klienta (kolejność = priorytet)
+SATISFACTION_PATTERNS = (
+    (r"(niezadowol|nie\s+do\s+końca|uszkodz|reklamac|nie\s+smakuj)", "unsatisfied"),
+    (r"(zadowol|smakuj|poleci)", "satisfied"),
+)
+
+
+class KeywordNoteClassifier(ILLMClient):
+    """Klasyfikator notatek zgodny z ILLMClient, działający na wyrażeniach regularnych."""
+    
+    def mentions_sample(self, note_content: str) -> bool:
+        """Czy notatka wspomina o próbce (wstępna klasyfikacja przed zapytaniem do LLM)."""
+        text = note_content.lower()
+        return any(stem in text for stem in SAMPLE_STEMS)
+    
+    def analyze_note_for_sample(self, note_content: str, sample_date: str) -> Dict[str, Any]:
+        """Analiza notatki w formacie ILLMClient (data próbki nie jest brana pod uwagę)."""
+        text = note_content.lower()
+        if not self.mentions_sample(text):
+            return {
+                "mentions_sample": False,
+                "sample_status": "unknown",
+                "customer_satisfaction": "unknown",
+                "category": "other",
+                "confidence": LOCAL_CONFIDENCE,
+                "reasoning": "Klasyfikacja lokalna: brak wzmianki o próbce"
+            }
+        
+        status = next((value for pattern, value in STATUS_PATTERNS if re.search(pattern, text)), "unknown")
+        satisfaction = next(
+            (value for pattern, value in SATISFACTION_PATTERNS if re.search(pattern, text)), "neutral"
+        )
+        category = {
+            "received": "sample_confirmation",
+            "delayed": "sample_delay",
+            "not_received": "sample_delay",
+        }.get(status, "sample_inquiry")
+        if satisfaction == "unsatisfied":
+            category = "sample_complaint"
+        return {
+            "mentions_sample": True,
+            "sample_status": status,
+            "customer_satisfaction": satisfaction,
+            "category": category,
+            "confidence": LOCAL_CONFIDENCE,
+            "reasoning": "Klasyfikacja lokalna (słowa kluczowe) - budżet LLM wyczerpany lub niski"
+        }
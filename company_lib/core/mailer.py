@@ -2,12 +2,16 @@
 Moduł do wysyłania emaili z użyciem szablonów Jinja2.
 """
 import smtplib
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextlib import nullcontext
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from pathlib import Path
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, Tuple
 from jinja2 import Environment, FileSystemLoader, Template
 from company_lib.config import Config
+from company_lib.core.metrics import RunMetrics
 from company_lib.domain.interfaces import IMailLogRepository
 from company_lib.domain.models import MailLogModel
 from company_lib.logger import setup_logger
@@ -20,12 +24,21 @@ class Mailer:
     Obsługuje logowanie do repozytorium.
     """
     
-    def __init__(self, mail_log_repo: Optional[IMailLogRepository] = None):
+    def __init__(
+        self,
+        mail_log_repo: Optional[IMailLogRepository] = None,
+        keep_alive: bool = False,
+        metrics: Optional[RunMetrics] = None
+    ):
         """
         Inicjalizuje mailer z konfiguracją z Config.
         
         Args:
             mail_log_repo: Opcjonalne repozytorium do logowania wysyłek
+            keep_alive: Czy utrzymywać sesje SMTP między wysyłkami
+                        (tryb usługi; sesje zamyka close())
+            metrics: Metryki uruchomienia - czasy etapów 'rendering' i 'smtp'
+                     (można podmienić atrybut metrics przed każdym cyklem)
         """
         self.server = Config.MAIL_SERVER
         self.port = Config.MAIL_PORT
@@ -33,6 +46,11 @@ class Mailer:
         self.password = Config.MAIL_PASSWORD
         self.use_tls = Config.MAIL_USE_TLS
         self.mail_log_repo = mail_log_repo
+        self.keep_alive = keep_alive
+        # Pula wolnych sesji SMTP (keep_alive i send_notifications)
+        self._idle: List[smtplib.SMTP] = []
+        self._pool_lock = threading.Lock()
+        self.metrics = metrics or RunMetrics("mailer")
         
         # Konfiguracja Jinja2 do ładowania szablonów
         template_dir = Config.TEMPLATE_DIR
@@ -93,68 +111,153 @@ class Mailer:
         Returns:
             Tuple (success: bool, log_id: Optional[int])
         """
-        if not from_email:
-            from_email = self.user
-        
         # Utwórz log przed wysyłką (jeśli nie ma istniejącego)
-        mail_log = None
-        if self.mail_log_repo:
-            if log_id:
-                # Aktualizujemy istniejący log
-                mail_log = next((l for l in self.mail_log_repo.logs if l.id == log_id), None)
-                if mail_log:
-                    mail_log.status = "PENDING"  # Reset statusu dla ponownej próby
-            else:
-                # Tworzymy nowy log
-                mail_log = MailLogModel(
-                    id=None,
-                    to_email=to_email,
-                    subject=subject,
-                    status="PENDING",
-                    batch_id=batch_id,
-                    task_ids=task_ids
-                )
-                mail_log = self.mail_log_repo.create_log(mail_log)
+        mail_log = self._start_log(to_email, subject, batch_id, task_ids, log_id)
         
         try:
-            # Tworzenie wiadomości
-            msg = MIMEMultipart('alternative')
-            msg['From'] = from_email
-            msg['To'] = to_email
-            msg['Subject'] = subject
-            
-            # Dodanie treści tekstowej (jeśli podana)
-            if body_text:
-                part_text = MIMEText(body_text, 'plain', 'utf-8')
-                msg.attach(part_text)
-            
-            # Dodanie treści HTML
-            part_html = MIMEText(body_html, 'html', 'utf-8')
-            msg.attach(part_html)
-            
-            # Wysyłka
-            with smtplib.SMTP(self.server, self.port) as server:
-                if self.use_tls:
-                    server.starttls()
-                server.login(self.user, self.password)
-                server.send_message(msg)
-            
-            # Aktualizuj log na SENT
-            if self.mail_log_repo and mail_log:
-                self.mail_log_repo.update_log_status(mail_log.id, "SENT")
-            
-            logger.info(f"Email wysłany pomyślnie do: {to_email}")
-            return True, mail_log.id if mail_log else None
-            
+            self._deliver(to_email, subject, body_html, body_text, from_email, pooled=self.keep_alive)
         except Exception as e:
             error_msg = str(e)
             logger.error(f"Błąd wysyłania emaila do {to_email}: {error_msg}")
-            
-            # Aktualizuj log na FAILED
-            if self.mail_log_repo and mail_log:
-                self.mail_log_repo.update_log_status(mail_log.id, "FAILED", error_msg)
-            
+            self._finish_log(mail_log, error_msg)
             return False, mail_log.id if mail_log else None
+        
+        # Aktualizuj log na SENT
+        self._finish_log(mail_log, None)
+        logger.info(f"Email wysłany pomyślnie do: {to_email}")
+        return True, mail_log.id if mail_log else None
+    
+    def _start_log(
+        self,
+        to_email: str,
+        subject: str,
+        batch_id: Optional[str],
+        task_ids: Optional[str],
+        log_id: Optional[int]
+    ) -> Optional[MailLogModel]:
+        """Tworzy log PENDING albo resetuje istniejący log do ponownej próby."""
+        if not self.mail_log_repo:
+            return None
+        if log_id:
+            # Aktualizujemy istniejący log
+            mail_log = self.mail_log_repo.get_log_by_id(log_id)
+            if mail_log:
+                mail_log.status = "PENDING"  # Reset statusu dla ponownej próby
+                if task_ids:
+                    # Ponowienie może obejmować inne zadania niż pierwotna wysyłka
+                    mail_log.task_ids = task_ids
+            return mail_log
+        # Tworzymy nowy log
+        mail_log = MailLogModel(
+            id=None,
+            to_email=to_email,
+            subject=subject,
+            status="PENDING",
+            batch_id=batch_id,
+            task_ids=task_ids
+        )
+        return self.mail_log_repo.create_log(mail_log)
+    
+    def _finish_log(self, mail_log: Optional[MailLogModel], error_msg: Optional[str]) -> None:
+        """Ustawia status logu na SENT albo FAILED (z komunikatem błędu)."""
+        if not self.mail_log_repo or not mail_log:
+            return
+        if error_msg is None:
+            self.mail_log_repo.update_log_status(mail_log.id, "SENT", task_ids=mail_log.task_ids)
+        else:
+            self.mail_log_repo.update_log_status(mail_log.id, "FAILED", error_msg, task_ids=mail_log.task_ids)
+    
+    def _deliver(
+        self,
+        to_email: str,
+        subject: str,
+        body_html: str,
+        body_text: Optional[str] = None,
+        from_email: Optional[str] = None,
+        pooled: bool = False
+    ) -> None:
+        """
+        Buduje wiadomość i wysyła ją przez SMTP (wyjątek przy błędzie wysyłki).
+        
+        Args:
+            pooled: Wysyłka sesją z puli (ponownie używane połączenia) zamiast nowego połączenia
+        """
+        if not from_email:
+            from_email = self.user
+        
+        # Tworzenie wiadomości
+        msg = MIMEMultipart('alternative')
+        msg['From'] = from_email
+        msg['To'] = to_email
+        msg['Subject'] = subject
+        
+        # Dodanie treści tekstowej (jeśli podana)
+        if body_text:
+            part_text = MIMEText(body_text, 'plain', 'utf-8')
+            msg.attach(part_text)
+        
+        # Dodanie treści HTML
+        part_html = MIMEText(body_html, 'html', 'utf-8')
+        msg.attach(part_html)
+        
+        # Wysyłka
+        with self.metrics.stage("smtp", observe=True):
+            if pooled:
+                self._send_over_connection(msg)
+            else:
+                with self._connect() as server:
+                    server.send_message(msg)
+    
+    def _connect(self) -> smtplib.SMTP:
+        """Otwiera i uwierzytelnia nowe połączenie SMTP."""
+        server = smtplib.SMTP(self.server, self.port)
+        try:
+            if self.use_tls:
+                server.starttls()
+            server.login(self.user, self.password)
+        except Exception:
+            server.close()
+            raise
+        return server
+    
+    def _send_over_connection(self, msg: MIMEMultipart) -> None:
+        """
+        Wysyła wiadomość sesją SMTP z puli (wolna sesja albo nowe połączenie).
+        Każdy wątek wysyłający używa osobnej sesji; po wysyłce sesja wraca do puli.
+        Po zerwaniu połączenia przez serwer (timeout bezczynności) łączy się ponownie i ponawia raz.
+        """
+        with self._pool_lock:
+            connection = self._idle.pop() if self._idle else None
+        if connection is None:
+            connection = self._connect()
+        try:
+            try:
+                connection.send_message(msg)
+            except smtplib.SMTPServerDisconnected:
+                logger.info("Połączenie SMTP zostało zamknięte przez serwer, łączę ponownie")
+                connection.close()
+                connection = self._connect()
+                connection.send_message(msg)
+        except Exception:
+            # Sesja w nieznanym stanie (np. po odrzuceniu odbiorcy) nie wraca do puli
+            self._close_connection(connection)
+            raise
+        with self._pool_lock:
+            self._idle.append(connection)
+    
+    @staticmethod
+    def _close_connection(connection: smtplib.SMTP) -> None:
+        try:
+            connection.quit()
+        except (smtplib.SMTPException, OSError):
+            connection.close()
+    
+    def close(self) -> None:
+        """Zamyka sesje SMTP utrzymywane w puli."""
+        with self._pool_lock:
+            connections, self._idle = self._idle, []
+        for connection in connections:
+            self._close_connection(connection)
     
     def send_notification(
         self,
@@ -185,7 +288,8 @@ class Mailer:
             context = {}
         
         try:
-            body_html = self.render_template(template_name, context)
+            with self.metrics.stage("rendering"):
+                body_html = self.render_template(template_name, context)
             return self.send_email(
                 to_email, subject, body_html,
                 batch_id=batch_id, task_ids=task_ids, log_id=log_id
@@ -193,4 +297,82 @@ class Mailer:
         except Exception as e:
             logger.error(f"Błąd wysyłania powiadomienia: {e}")
             return False, None
-
+    
+    def send_notifications(
+        self,
+        notifications: List[Dict[str, Any]],
+        workers: Optional[int] = None
+    ) -> List[Tuple[bool, Optional[int]]]:
+        """
+        Wysyła wiele powiadomień równolegle: renderowanie szablonów i wysyłka SMTP działają
+        w puli wątków, każdy wątek na własnej sesji SMTP z puli.
+        Logi maili zapisywane są w wątku wywołującym: PENDING przed wysyłką (jednym wsadem, w kolejności
+        powiadomień), SENT/FAILED wsadami w miarę kończenia wysyłek; wpisy w logu aplikacji - w kolejności powiadomień.
+        
+        Args:
+            notifications: Lista słowników z argumentami send_notification()
+                           (to_email, subject, template_name, context, batch_id, task_ids, log_id)
+            workers: Liczba równoległych wysyłek (domyślnie Config.MAIL_WORKERS)
+        
+        Returns:
+            Lista (success, log_id) w kolejności powiadomień
+        """
+        if not notifications:
+            return []
+        workers = max(1, min(workers or Config.MAIL_WORKERS, len(notifications)))
+        
+        logs: List[Optional[MailLogModel]] = []
+        with self._log_batch():
+            for notification in notifications:
+                logs.append(self._start_log(
+                    notification['to_email'],
+                    notification['subject'],
+                    notification.get('batch_id'),
+                    notification.get('task_ids'),
+                    notification.get('log_id')
+                ))
+        
+        def render_and_send(notification: Dict[str, Any]) -> Optional[str]:
+            """Zwraca None po udanej wysyłce albo komunikat błędu."""
+            try:
+                with self.metrics.stage("rendering"):
+                    body_html = self.render_template(
+                        notification.get('template_name', "email/notification.html"),
+                        notification.get('context') or {}
+                    )
+                self._deliver(notification['to_email'], notification['subject'], body_html, pooled=True)
+                return None
+            except Exception as e:
+                return str(e) or type(e).__name__
+        
+        # Status SENT/FAILED zapisywany zaraz po wysyłce (wsadem wszystkich zakończonych od ostatniego zapisu),
+        # żeby przerwanie w trakcie nie zostawiło wysłanych maili jako PENDING do ponownej wysyłki
+        errors: List[Optional[str]] = [None] * len(notifications)
+        try:
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="mailer") as executor:
+                pending = {executor.submit(render_and_send, notification): i for i, notification in enumerate(notifications)}
+                while pending:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    with self._log_batch():
+                        for future in done:
+                            i = pending.pop(future)
+                            errors[i] = future.result()
+                            self._finish_log(logs[i], errors[i])
+        finally:
+            if not self.keep_alive:
+                self.close()
+        
+        results = []
+        for notification, mail_log, error_msg in zip(notifications, logs, errors):
+            if error_msg is None:
+                logger.info(f"Email wysłany pomyślnie do: {notification['to_email']}")
+            else:
+                logger.error(f"Błąd wysyłania emaila do {notification['to_email']}: {error_msg}")
+            results.append((error_msg is None, mail_log.id if mail_log else None))
+        return results
+    
+    def _log_batch(self):
+        """Wsad repozytorium logów maili (albo pusty kontekst bez repozytorium)."""
+        if self.mail_log_repo:
+            return self.mail_log_repo.batch()
+        return nullcontext()
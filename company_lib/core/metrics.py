@@ -0,0 +1,260 @@
+"""
+Metryki pojedynczego uruchomienia skryptu: czasy etapów, liczniki i histogramy opóźnień.
+Na końcu uruchomienia metryki są logowane jako jeden rekord JSON, opcjonalnie dopisywane
+do pliku JSON Lines (historia uruchomień) i zapisywane w formacie tekstowym Prometheusa
+(katalog textfile collectora node_exportera).
+"""
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from company_lib.logger import setup_logger
+
+logger = setup_logger("Metrics")
+
+# Granice kubełków histogramów w milisekundach (ostatni kubełek +Inf dodawany automatycznie)
+DEFAULT_BUCKETS_MS: Tuple[float, ...] = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000)
+
+@dataclass
+class StageStats:
+    """Łączny czas i liczba wejść w etap."""
+    calls: int = 0
+    total_time: float = 0.0
+    max_time: float = 0.0
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Zwraca liczniki jako słownik (czasy w milisekundach)."""
+        return {
+            'calls': self.calls,
+            'total_ms': round(self.total_time * 1000, 3),
+            'avg_ms': round(self.total_time * 1000 / self.calls, 3) if self.calls else 0.0,
+            'max_ms': round(self.max_time * 1000, 3)
+        }
+
+@dataclass
+class Histogram:
+    """Histogram opóźnień o stałych kubełkach (w milisekundach)."""
+    buckets_ms: Tuple[float, ...] = DEFAULT_BUCKETS_MS
+    counts: List[int] = field(default_factory=list)
+    count: int = 0
+    total_time: float = 0.0
+    
+    def __post_init__(self):
+        if not self.counts:
+            self.counts = [0] * (len(self.buckets_ms) + 1)
+    
+    def observe(self, elapsed: float) -> None:
+        """Dodaje pomiar w sekundach."""
+        self.counts[bisect_left(self.buckets_ms, elapsed * 1000)] += 1
+        self.count += 1
+        self.total_time += elapsed
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Zwraca liczność kubełków (nieskumulowaną, klucz = górna granica w ms)."""
+        labels = [_format_bound(bound) for bound in self.buckets_ms] + ["+Inf"]
+        return {
+            'count': self.count,
+            'sum_ms': round(self.total_time * 1000, 3),
+            'buckets_ms': dict(zip(labels, self.counts))
+        }
+
+def _format_bound(value: float) -> str:
+    """Formatuje granicę kubełka bez zbędnego '.0'."""
+    return f"{value:g}"
+
+class RunMetrics:
+    """
+    Zbiera metryki jednego uruchomienia (w trybie usługi - jednego cyklu).
+    Bezpieczne wątkowo; obiekt jest tani, więc funkcje przyjmujące opcjonalne metryki
+    mogą tworzyć własny, nieeksportowany egzemplarz.
+    """
+    
+    def __init__(self, name: str):
+        """
+        Args:
+            name: Nazwa skryptu (pole "run" w rekordzie JSON i prefiks metryk Prometheusa)
+        """
+        self.name = name
+        self.started_at = datetime.now()
+        self._start = time.perf_counter()
+        self.stages: Dict[str, StageStats] = {}
+        self.counters: Dict[str, int] = {}
+        self.histograms: Dict[str, Histogram] = {}
+        # Pola opisowe rekordu ustawiane w trakcie uruchomienia (np. batch_id)
+        self.info: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+    
+    @contextmanager
+    def stage(self, name: str, observe: bool = False) -> Iterator[None]:
+        """
+        Mierzy czas bloku jako etap uruchomienia (czas jest liczony także przy wyjątku).
+        
+        Args:
+            name: Nazwa etapu (np. 'repo_load', 'llm', 'smtp')
+            observe: Czy dodać pomiar także do histogramu o tej samej nazwie
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            self.record(name, elapsed)
+            if observe:
+                self.observe(name, elapsed)
+    
+    def record(self, name: str, elapsed: float) -> None:
+        """Dolicza czas (w sekundach) do etapu - dla pomiarów, których nie da się objąć blokiem with."""
+        with self._lock:
+            stats = self.stages.setdefault(name, StageStats())
+            stats.calls += 1
+            stats.total_time += elapsed
+            stats.max_time = max(stats.max_time, elapsed)
+    
+    def incr(self, name: str, value: int = 1) -> None:
+        """Zwiększa licznik."""
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+    
+    def observe(self, name: str, elapsed: float) -> None:
+        """Dodaje pomiar (w sekundach) do histogramu opóźnień."""
+        with self._lock:
+            self.histograms.setdefault(name, Histogram()).observe(elapsed)
+    
+    def merge(self, other: "RunMetrics") -> None:
+        """
+        Dolicza metryki innego egzemplarza (np. zwróconego przez proces roboczy shardu):
+        sumuje czasy etapów, liczniki i histogramy. Pola info nie są przenoszone.
+        """
+        with self._lock:
+            for name, stats in other.stages.items():
+                own = self.stages.setdefault(name, StageStats())
+                own.calls += stats.calls
+                own.total_time += stats.total_time
+                own.max_time = max(own.max_time, stats.max_time)
+            for name, value in other.counters.items():
+                self.counters[name] = self.counters.get(name, 0) + value
+            for name, hist in other.histograms.items():
+                own_hist = self.histograms.setdefault(name, Histogram(buckets_ms=hist.buckets_ms))
+                if own_hist.buckets_ms != hist.buckets_ms:
+                    raise ValueError(f"Histogram {name} ma inne granice kubełków - nie można scalić")
+                own_hist.counts = [a + b for a, b in zip(own_hist.counts, hist.counts)]
+                own_hist.count += hist.count
+                own_hist.total_time += hist.total_time
+    
+    def __getstate__(self) -> Dict[str, Any]:
+        # Blokada nie przechodzi przez pickle (wynik z procesu roboczego)
+        state = self.__dict__.copy()
+        del state['_lock']
+        return state
+    
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+    
+    def to_dict(self, **extra: Any) -> Dict[str, Any]:
+        """
+        Zwraca rekord uruchomienia.
+        
+        Args:
+            **extra: Dodatkowe pola rekordu (np. batch_id, status)
+        
+        Returns:
+            Słownik gotowy do serializacji JSON
+        """
+        with self._lock:
+            return {
+                'run': self.name,
+                'started_at': self.started_at.isoformat(timespec='seconds'),
+                'duration_ms': round((time.perf_counter() - self._start) * 1000, 3),
+                **self.info,
+                **extra,
+                'stages': {name: stats.to_dict() for name, stats in self.stages.items()},
+                'counters': dict(self.counters),
+                'histograms': {name: hist.to_dict() for name, hist in self.histograms.items()}
+            }
+    
+    def to_prometheus(self) -> str:
+        """Zwraca metryki w formacie tekstowym Prometheusa (czasy w sekundach)."""
+        prefix = self.name
+        duration = time.perf_counter() - self._start
+        lines = [
+            f"# HELP {prefix}_run_duration_seconds Czas ostatniego uruchomienia",
+            f"# TYPE {prefix}_run_duration_seconds gauge",
+            f"{prefix}_run_duration_seconds {duration:.6f}",
+            f"# HELP {prefix}_last_run_timestamp_seconds Początek ostatniego uruchomienia (unix time)",
+            f"# TYPE {prefix}_last_run_timestamp_seconds gauge",
+            f"{prefix}_last_run_timestamp_seconds {self.started_at.timestamp():.0f}",
+        ]
+        with self._lock:
+            if self.stages:
+                lines.append(f"# HELP {prefix}_stage_seconds Łączny czas etapu w ostatnim uruchomieniu")
+                lines.append(f"# TYPE {prefix}_stage_seconds gauge")
+                for name, stats in self.stages.items():
+                    lines.append(f'{prefix}_stage_seconds{{stage="{name}"}} {stats.total_time:.6f}')
+                lines.append(f"# HELP {prefix}_stage_calls Liczba wejść w etap w ostatnim uruchomieniu")
+                lines.append(f"# TYPE {prefix}_stage_calls gauge")
+                for name, stats in self.stages.items():
+                    lines.append(f'{prefix}_stage_calls{{stage="{name}"}} {stats.calls}')
+            for name, value in self.counters.items():
+                lines.append(f"# TYPE {prefix}_{name} gauge")
+                lines.append(f"{prefix}_{name} {value}")
+            for name, hist in self.histograms.items():
+                metric = f"{prefix}_{name}_seconds"
+                lines.append(f"# TYPE {metric} histogram")
+                cumulative = 0
+                for bound, count in zip(hist.buckets_ms, hist.counts):
+                    cumulative += count
+                    lines.append(f'{metric}_bucket{{le="{_format_bound(bound / 1000)}"}} {cumulative}')
+                lines.append(f'{metric}_bucket{{le="+Inf"}} {hist.count}')
+                lines.append(f"{metric}_sum {hist.total_time:.6f}")
+                lines.append(f"{metric}_count {hist.count}")
+        return "\n".join(lines) + "\n"
+    
+    def export(
+        self,
+        json_path: Optional[Path] = None,
+        prom_path: Optional[Path] = None,
+        **extra: Any
+    ) -> Dict[str, Any]:
+        """
+        Loguje rekord uruchomienia jako jedną linię JSON i opcjonalnie zapisuje go do plików.
+        Błąd zapisu jest logowany i nie przerywa skryptu.
+        
+        Args:
+            json_path: Plik JSON Lines, do którego dopisywany jest rekord (None = tylko log)
+            prom_path: Plik tekstowy Prometheusa podmieniany atomowo (None = brak)
+            **extra: Dodatkowe pola rekordu (np. batch_id, status)
+        
+        Returns:
+            Rekord uruchomienia
+        """
+        record = self.to_dict(**extra)
+        line = json.dumps(record, ensure_ascii=False)
+        logger.info("Metryki uruchomienia: %s", line)
+        
+        if json_path:
+            try:
+                Path(json_path).parent.mkdir(parents=True, exist_ok=True)
+                with open(json_path, mode='a', encoding='utf-8') as f:
+                    f.write(line + "\n")
+            except Exception as e:
+                logger.error(f"Błąd zapisu metryk do {json_path}: {e}")
+        
+        if prom_path:
+            # textfile collector czyta katalog w dowolnej chwili - plik musi być podmieniany, nie nadpisywany
+            prom_path = Path(prom_path)
+            tmp_path = prom_path.with_name(f".{prom_path.name}.{os.getpid()}.tmp")
+            try:
+                prom_path.parent.mkdir(parents=True, exist_ok=True)
+                tmp_path.write_text(self.to_prometheus(), encoding='utf-8')
+                os.replace(tmp_path, prom_path)
+            except Exception as e:
+                logger.error(f"Błąd zapisu metryk Prometheusa do {prom_path}: {e}")
+                tmp_path.unlink(missing_ok=True)
+        return record
@@ -0,0 +1,176 @@
+"""
+Klient do komunikacji z lokalnym serwerem Ollama (model uruchamiany on-prem, bez kluczy API).
+Używany do analizy i kategoryzacji notatek bez wysyłania ich poza firmę.
+
+Odpowiedź modelu ograniczona jest schematem JSON (pole "format" API Ollama - dekodowanie
+gramatyką), więc nie wymaga czyszczenia z markdown ani dodatkowego tekstu. Zapytania idą
+przez jedną sesję HTTP z pulą połączeń keep-alive; analyze_many wysyła je równolegle
+(max_concurrency), a serwer łączy je w paczki generowania (OLLAMA_NUM_PARALLEL).
+"""
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+import requests
+from requests.adapters import HTTPAdapter
+from company_lib.config import Config
+from company_lib.core.llm_service import ILLMClient
+from company_lib.logger import setup_logger
+
+logger = setup_logger("OllamaClient")
+
+# Najwięcej równoległych zapytań przy OLLAMA_WORKERS = 0 (domyślne OLLAMA_NUM_PARALLEL serwera to 4)
+DEFAULT_MAX_WORKERS = 4
+
+# Schemat odpowiedzi analyze_note_for_sample - model nie może zwrócić innych wartości pól
+ANALYSIS_SCHEMA: Dict[str, Any] = {
+    "type": "object",
+    "properties": {
+        "mentions_sample": {"type": "boolean"},
+        "sample_status": {"type": "string", "enum": ["received", "delayed", "not_received", "unknown"]},
+        "customer_satisfaction": {"type": "string", "enum": ["satisfied", "unsatisfied", "neutral", "unknown"]},
+        "category": {
+            "type": "string",
+            "enum": ["sample_confirmation", "sample_delay", "sample_complaint", "sample_inquiry", "other"]
+        },
+        "confidence": {"type": "number", "minimum": 0.0, "maximum": 1.0},
+        "reasoning": {"type": "string"}
+    },
+    "required": ["mentions_sample", "sample_status", "customer_satisfaction", "category", "confidence", "reasoning"]
+}
+
+SYSTEM_PROMPT = "Jesteś ekspertem w analizie notatek biznesowych. Zawsze odpowiadasz TYLKO w formacie JSON."
+
+
+class OllamaClient(ILLMClient):
+    """
+    Klient do komunikacji z API Ollama (/api/chat).
+    """
+    
+    def __init__(self):
+        """Inicjalizuje klienta Ollama."""
+        if not Config.OLLAMA_URL:
+            raise ValueError("OLLAMA_URL nie jest skonfigurowany w .env")
+        
+        self.api_url = f"{Config.OLLAMA_URL.rstrip('/')}/api/chat"
+        self.model = Config.OLLAMA_MODEL
+        self.temperature = Config.OLLAMA_TEMPERATURE
+        self.max_concurrency = Config.OLLAMA_WORKERS or min(DEFAULT_MAX_WORKERS, os.cpu_count() or 1)
+        self._session: Optional[requests.Session] = None
+        self._session_pid: Optional[int] = None
+        logger.info(
+            f"Zainicjalizowano Ollama klienta z modelem: {self.model} "
+            f"({self.api_url}, równoległe zapytania: {self.max_concurrency})"
+        )
+    
+    def analyze_note_for_sample(self, note_content: str, sample_date: str) -> Dict[str, Any]:
+        """
+        Analizuje notatkę pod kątem informacji o próbce.
+        
+        Args:
+            note_content: Treść notatki
+            sample_date: Data wysłania próbki (format: YYYY-MM-DD)
+        
+        Returns:
+            Słownik z wynikami analizy
+        """
+        # Dozwolone wartości pól wymusza schemat - prompt opisuje tylko ich znaczenie
+        prompt = f"""Przeanalizuj poniższą notatkę pod kątem informacji o próbce produktu.
+
+Data wysłania próbki: {sample_date}
+
+Treść notatki:
+"{note_content}"
+
+Zasady:
+- "mentions_sample": true tylko jeśli notatka wyraźnie wspomina o próbce/próbkach
+- "sample_status": "received" - klient potwierdził otrzymanie, "delayed" - opóźnienie w dostawie,
+  "not_received" - klient nie otrzymał próbki, "unknown" - nie można określić
+- "customer_satisfaction": "satisfied" / "unsatisfied" - zadowolenie z próbki, "neutral" - brak informacji
+- "category": najbardziej pasująca kategoria notatki
+- "confidence": 0.0-1.0, gdzie 1.0 to całkowita pewność
+- "reasoning": krótkie uzasadnienie w języku polskim"""
+
+        try:
+            response_text = self._chat(prompt, ANALYSIS_SCHEMA)
+            
+            result = json.loads(response_text)
+            
+            logger.debug("Analiza notatki (Ollama): %s", result)
+            return result
+        
+        except json.JSONDecodeError as e:
+            logger.error(f"Błąd parsowania odpowiedzi JSON z Ollama: {e}")
+            logger.debug(f"Odpowiedź: {response_text if 'response_text' in locals() else 'brak'}")
+            return self._default_response(f"Błąd parsowania odpowiedzi: {str(e)}")
+        except Exception as e:
+            logger.error(f"Błąd komunikacji z Ollama: {e}", exc_info=True)
+            return self._default_response(f"Błąd: {str(e)}")
+    
+    def analyze_many(self, requests: List[Tuple[str, List[str]]]) -> List[Dict[str, Dict[str, Any]]]:
+        """Analizuje notatki równolegle (najwyżej max_concurrency zapytań naraz)."""
+        workers = min(self.max_concurrency, len(requests))
+        if workers <= 1:
+            return super().analyze_many(requests)
+        self._get_session()  # Sesja tworzona przed startem wątków, które ją współdzielą
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ollama") as executor:
+            return list(executor.map(lambda request: self.analyze_note_for_samples(*request), requests))
+    
+    def _complete(self, prompt: str) -> str:
+        """Wysyła prompt do Ollama w trybie JSON (dowolny obiekt) i zwraca tekst odpowiedzi."""
+        return self._chat(prompt, "json")
+    
+    def _chat(self, prompt: str, response_format: Any) -> str:
+        """
+        Wysyła zapytanie /api/chat bez strumieniowania.
+        
+        Args:
+            prompt: Treść wiadomości użytkownika
+            response_format: Schemat JSON odpowiedzi albo "json" (dowolny obiekt JSON)
+        
+        Returns:
+            Tekst odpowiedzi modelu
+        """
+        payload = {
+            "model": self.model,
+            "messages": [
+                {"role": "system", "content": SYSTEM_PROMPT},
+                {"role": "user", "content": prompt}
+            ],
+            "format": response_format,
+            "stream": False,
+            "keep_alive": Config.OLLAMA_KEEP_ALIVE,
+            "options": {
+                "temperature": self.temperature,
+                "num_ctx": Config.OLLAMA_NUM_CTX
+            }
+        }
+        
+        response = self._get_session().post(self.api_url, json=payload, timeout=Config.OLLAMA_TIMEOUT)
+        response.raise_for_status()
+        return response.json()["message"]["content"].strip()
+    
+    def _get_session(self) -> requests.Session:
+        """
+        Sesja HTTP z pulą połączeń na wszystkie równoległe zapytania.
+        Tworzona od nowa w procesie potomnym (shardy sample_followup) - gniazd nie dzieli się po fork.
+        """
+        if self._session is None or self._session_pid != os.getpid():
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.max_concurrency)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            self._session = session
+            self._session_pid = os.getpid()
+        return self._session
+    
+    def _default_response(self, error_msg: str) -> Dict[str, Any]:
+        """Zwraca domyślną odpowiedź w przypadku błędu."""
+        return {
+            "mentions_sample": False,
+            "sample_status": "unknown",
+            "customer_satisfaction": "unknown",
+            "category": "other",
+            "confidence": 0.0,
+            "reasoning": error_msg
+        }
@@ -72,22 +72,12 @@ Zasady:
 Odpowiedz TYLKO JSON, bez dodatkowych komentarzy."""
 
         try:
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": "Jesteś ekspertem w analizie notatek biznesowych. Zawsze odpowiadasz TYLKO w formacie JSON."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=self.temperature,
-                response_format={"type": "json_object"}
-            )
-            
-            response_text = response.choices[0].message.content.strip()
+            response_text = self._complete(prompt)
             result = json.loads(response_text)
             
-            logger.debug(f"Analiza notatki (OpenAI): {result}")
+            logger.debug("Analiza notatki (OpenAI): %s", result)
             return result
-            
+        
         except json.JSONDecodeError as e:
             logger.error(f"Błąd parsowania odpowiedzi JSON z OpenAI: {e}")
             logger.debug(f"Odpowiedź: {response_text if 'response_text' in locals() else 'brak'}")
@@ -96,6 +86,19 @@ Odpowiedz TYLKO JSON, bez dodatkowych komentarzy."""
             logger.error(f"Błąd komunikacji z OpenAI: {e}", exc_info=True)
             return self._default_response(f"Błąd: {str(e)}")
     
+    def _complete(self, prompt: str) -> str:
+        """Wysyła prompt do OpenAI (tryb odpowiedzi JSON) i zwraca tekst odpowiedzi."""
+        response = self.client.chat.completions.create(
+            model=self.model,
+            messages=[
+                {"role": "system", "content": "Jesteś ekspertem w analizie notatek biznesowych. Zawsze odpowiadasz TYLKO w formacie JSON."},
+                {"role": "user", "content": prompt}
+            ],
+            temperature=self.temperature,
+            response_format={"type": "json_object"}
+        )
+        return response.choices[0].message.content.strip()
+    
     def _default_response(self, error_msg: str) -> Dict[str, Any]:
         """Zwraca domyślną odpowiedź w przypadku błędu."""
         return {
@@ -0,0 +1,288 @@
+"""
+Profilowanie uruchomień skryptów włączane konfiguracją (Config.PROFILE), bez edycji kodu.
+Tryby:
+- "cpu": cProfile całego main() - plik .prof (pstats/snakeviz) i raport top-N po czasie skumulowanym
+- "memory": tracemalloc - top-N miejsc alokacji i szczyt zużycia pamięci
+- "spans": czasy wywołań repozytoriów i klientów LLM (opcjonalnie próbkowane)
+Wyniki zapisywane są w Config.PROFILE_DIR (domyślnie katalog logów/profiles).
+"""
+import cProfile
+import functools
+import inspect
+import io
+import json
+import pstats
+import random
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, Optional, Set
+from company_lib.config import Config
+from company_lib.logger import setup_logger
+
+logger = setup_logger("Profiling")
+
+MODES = ("cpu", "memory", "spans")
+
+@dataclass
+class SpanStats:
+    """Liczniki wywołań jednego miejsca (np. 'repo.notes.get_pending_notes')."""
+    calls: int = 0
+    sampled: int = 0
+    errors: int = 0
+    total_time: float = 0.0
+    max_time: float = 0.0
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Zwraca liczniki jako słownik (czasy w milisekundach, łączny czas szacowany z próbki)."""
+        avg = self.total_time / self.sampled if self.sampled else 0.0
+        return {
+            'calls': self.calls,
+            'sampled': self.sampled,
+            'errors': self.errors,
+            'avg_ms': round(avg * 1000, 3),
+            'max_ms': round(self.max_time * 1000, 3),
+            'est_total_ms': round(avg * self.calls * 1000, 3)
+        }
+
+_spans: Dict[str, SpanStats] = {}
+_spans_lock = threading.Lock()
+_active = False
+
+def enabled_modes() -> Set[str]:
+    """
+    Zwraca włączone tryby profilowania z Config.PROFILE.
+    
+    Raises:
+        ValueError: Jeśli PROFILE zawiera nieznany tryb
+    """
+    value = (Config.PROFILE or "").strip().lower()
+    if value in ("", "0", "false", "off"):
+        return set()
+    if value in ("1", "true", "on", "all"):
+        return set(MODES)
+    modes = {mode.strip() for mode in value.split(",") if mode.strip()}
+    unknown = modes - set(MODES)
+    if unknown:
+        raise ValueError(
+            f"Nieznany tryb profilowania: {', '.join(sorted(unknown))}. "
+            f"Dostępne: {', '.join(MODES)}, all"
+        )
+    return modes
+
+def spans_enabled() -> bool:
+    """Czy mierzyć czasy wywołań repozytoriów i klientów LLM."""
+    return "spans" in enabled_modes()
+
+@contextmanager
+def span(name: str) -> Iterator[None]:
+    """
+    Mierzy czas bloku jako miejsce 'name' (próbkowanie: Config.PROFILE_SPAN_SAMPLE_RATE).
+    Liczba wywołań jest liczona zawsze, czas tylko dla próbkowanych wywołań.
+    """
+    sampled = random.random() < Config.PROFILE_SPAN_SAMPLE_RATE
+    start = time.perf_counter() if sampled else 0.0
+    error = False
+    try:
+        yield
+    except Exception:
+        error = True
+        raise
+    finally:
+        elapsed = time.perf_counter() - start if sampled else 0.0
+        with _spans_lock:
+            stats = _spans.setdefault(name, SpanStats())
+            stats.calls += 1
+            stats.errors += error
+            if sampled:
+                stats.sampled += 1
+                stats.total_time += elapsed
+                stats.max_time = max(stats.max_time, elapsed)
+
+def _iterate_in_span(name: str, iterator: Iterator) -> Iterator:
+    """Przenosi pomiar na iterację - metody iter_* zwracają generator, a praca dzieje się przy next()."""
+    with span(name):
+        yield from iterator
+
+class _TracedProxy:
+    """Pośrednik mierzący czas każdego wywołania publicznej metody obiektu."""
+    
+    def __init__(self, target: Any, prefix: str):
+        object.__setattr__(self, "_target", target)
+        object.__setattr__(self, "_prefix", prefix)
+    
+    def __getattr__(self, name: str) -> Any:
+        attr = getattr(self._target, name)
+        if name.startswith("_") or not callable(attr):
+            return attr
+        span_name = f"{self._prefix}.{name}"
+        
+        @functools.wraps(attr)
+        def wrapper(*args, **kwargs):
+            with span(span_name):
+                result = attr(*args, **kwargs)
+            if inspect.isgenerator(result):
+                return _iterate_in_span(span_name, result)
+            return result
+        return wrapper
+    
+    def __setattr__(self, name: str, value: Any) -> None:
+        setattr(self._target, name, value)
+    
+    # Metody specjalne są wyszukiwane w klasie, nie przez __getattr__ - len()/bool()/in/for
+    # muszą dawać ten sam wynik co na obiekcie bez pośrednika (np. pusta pamięć wyników jest fałszywa)
+    def __len__(self) -> int:
+        return len(self._target)
+    
+    def __bool__(self) -> bool:
+        return bool(self._target)
+    
+    def __iter__(self) -> Iterator:
+        return iter(self._target)
+    
+    def __contains__(self, item: Any) -> bool:
+        return item in self._target
+    
+    def __repr__(self) -> str:
+        return f"<traced {self._prefix}: {self._target!r}>"
+
+def traced(target: Any, prefix: str) -> Any:
+    """
+    Zwraca obiekt z pomiarem czasu wywołań metod (tryb "spans") albo obiekt bez zmian.
+    Używane przez fabryki repozytoriów i klientów LLM.
+    
+    Args:
+        target: Repozytorium lub klient
+        prefix: Prefiks nazw pomiarów (np. 'repo.notes', 'llm.gemini')
+    """
+    if not spans_enabled():
+        return target
+    return _TracedProxy(target, prefix)
+
+def get_span_stats() -> Dict[str, Dict[str, Any]]:
+    """Zwraca liczniki pomiarów (posortowane po szacowanym łącznym czasie)."""
+    with _spans_lock:
+        items = [(name, stats.to_dict()) for name, stats in _spans.items()]
+    return dict(sorted(items, key=lambda item: item[1]['est_total_ms'], reverse=True))
+
+def reset_span_stats() -> None:
+    """Zeruje liczniki pomiarów."""
+    with _spans_lock:
+        _spans.clear()
+
+def take_span_stats() -> Dict[str, SpanStats]:
+    """Zwraca surowe liczniki pomiarów i je zeruje (proces roboczy przekazuje je rodzicowi)."""
+    global _spans
+    with _spans_lock:
+        stats, _spans = _spans, {}
+    return stats
+
+def merge_span_stats(other: Dict[str, SpanStats]) -> None:
+    """Dolicza liczniki pomiarów z innego procesu (take_span_stats() w procesie roboczym shardu)."""
+    with _spans_lock:
+        for name, stats in other.items():
+            own = _spans.setdefault(name, SpanStats())
+            own.calls += stats.calls
+            own.sampled += stats.sampled
+            own.errors += stats.errors
+            own.total_time += stats.total_time
+            own.max_time = max(own.max_time, stats.max_time)
+
+def _write_reports(
+    base: Path,
+    profiler: Optional[cProfile.Profile],
+    snapshot: Optional[tracemalloc.Snapshot],
+    peak: int,
+    modes: Set[str]
+) -> None:
+    """Zapisuje raporty profilowania (pliki base*.prof/.txt/.json)."""
+    top_n = Config.PROFILE_TOP_N
+    base.parent.mkdir(parents=True, exist_ok=True)
+    
+    if profiler is not None:
+        profiler.dump_stats(f"{base}.prof")
+        report = io.StringIO()
+        pstats.Stats(profiler, stream=report).sort_stats("cumulative").print_stats(top_n)
+        Path(f"{base}_cpu.txt").write_text(report.getvalue(), encoding='utf-8')
+        logger.info(f"Profil CPU zapisany: {base}.prof")
+    
+    if snapshot is not None:
+        lines = [f"Szczyt pamięci: {peak / 1024 / 1024:.1f} MB", f"Top {top_n} miejsc alokacji:"]
+        for stat in snapshot.statistics("lineno")[:top_n]:
+            lines.append(f"  {stat}")
+        Path(f"{base}_memory.txt").write_text("\n".join(lines) + "\n", encoding='utf-8')
+        logger.info(f"Profil pamięci zapisany: {base}_memory.txt (szczyt {peak / 1024 / 1024:.1f} MB)")
+    
+    if "spans" in modes:
+        stats = get_span_stats()
+        with open(f"{base}_spans.json", mode='w', encoding='utf-8') as f:
+            json.dump(stats, f, ensure_ascii=False, indent=2)
+        logger.info(f"Czasy wywołań zapisane: {base}_spans.json")
+        for name, values in list(stats.items())[:top_n]:
+            logger.info(
+                f"  {name}: {values['calls']} wywołań, śr. {values['avg_ms']} ms, "
+                f"max {values['max_ms']} ms, łącznie ~{values['est_total_ms']} ms"
+            )
+
+@contextmanager
+def profile_run(name: str) -> Iterator[None]:
+    """
+    Profiluje blok zgodnie z Config.PROFILE; bez włączonego trybu nie robi nic.
+    Zagnieżdżone wywołania (np. main() wywołane z innego profilowanego kodu) nie profilują ponownie.
+    
+    Args:
+        name: Nazwa uruchomienia (prefiks plików w Config.PROFILE_DIR)
+    """
+    global _active
+    modes = enabled_modes()
+    if not modes or _active:
+        yield
+        return
+    
+    _active = True
+    base = Path(Config.PROFILE_DIR) / f"{name}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+    profiler = cProfile.Profile() if "cpu" in modes else None
+    own_tracemalloc = "memory" in modes and not tracemalloc.is_tracing()
+    if own_tracemalloc:
+        tracemalloc.start()
+    if "spans" in modes:
+        reset_span_stats()
+    logger.info(f"Profilowanie {name}: {', '.join(sorted(modes))}")
+    if profiler is not None:
+        profiler.enable()
+    try:
+        yield
+    finally:
+        if profiler is not None:
+            profiler.disable()
+        snapshot = None
+        peak = 0
+        if "memory" in modes and tracemalloc.is_tracing():
+            snapshot = tracemalloc.take_snapshot()
+            peak = tracemalloc.get_traced_memory()[1]
+            if own_tracemalloc:
+                tracemalloc.stop()
+        _active = False
+        try:
+            _write_reports(base, profiler, snapshot, peak, modes)
+        except Exception as e:
+            logger.error(f"Błąd zapisu profilu {base}: {e}")
+
+def profiled(name: str) -> Callable:
+    """
+    Dekorator funkcji main() skryptu - profiluje całe uruchomienie, gdy Config.PROFILE jest ustawione.
+    
+    Args:
+        name: Nazwa uruchomienia (prefiks plików w Config.PROFILE_DIR)
+    """
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with profile_run(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
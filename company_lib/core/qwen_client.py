@@ -75,52 +75,13 @@ Zasady:
 Odpowiedz TYLKO JSON, bez dodatkowych komentarzy."""
 
         try:
-            headers = {
-                "Authorization": f"Bearer {self.api_key}",
-                "Content-Type": "application/json"
-            }
-            
-            payload = {
-                "model": self.model,
-                "messages": [
-                    {"role": "system", "content": "Jesteś ekspertem w analizie notatek biznesowych. Zawsze odpowiadasz TYLKO w formacie JSON."},
-                    {"role": "user", "content": prompt}
-                ],
-                "temperature": self.temperature
-            }
-            
-            response = requests.post(
-                self.api_url,
-                headers=headers,
-                json=payload,
-                timeout=30
-            )
-            response.raise_for_status()
-            
-            response_data = response.json()
-            # Qwen zwraca odpowiedź w różnych formatach, dostosuj do swojego API
-            if "choices" in response_data:
-                response_text = response_data["choices"][0]["message"]["content"].strip()
-            elif "output" in response_data:
-                response_text = response_data["output"]["text"].strip()
-            else:
-                # Próba wyciągnięcia tekstu z odpowiedzi
-                response_text = str(response_data).strip()
-            
-            # Usuń markdown code blocks jeśli są
-            if response_text.startswith("```json"):
-                response_text = response_text[7:]
-            if response_text.startswith("```"):
-                response_text = response_text[3:]
-            if response_text.endswith("```"):
-                response_text = response_text[:-3]
-            response_text = response_text.strip()
+            response_text = self._complete(prompt)
             
             result = json.loads(response_text)
             
-            logger.debug(f"Analiza notatki (Qwen): {result}")
+            logger.debug("Analiza notatki (Qwen): %s", result)
             return result
-            
+        
         except json.JSONDecodeError as e:
             logger.error(f"Błąd parsowania odpowiedzi JSON z Qwen: {e}")
             logger.debug(f"Odpowiedź: {response_text if 'response_text' in locals() else 'brak'}")
@@ -129,6 +90,49 @@ Odpowiedz TYLKO JSON, bez dodatkowych komentarzy."""
             logger.error(f"Błąd komunikacji z Qwen: {e}", exc_info=True)
             return self._default_response(f"Błąd: {str(e)}")
     
+    def _complete(self, prompt: str) -> str:
+        """Wysyła prompt do API Qwen i zwraca tekst odpowiedzi bez bloków markdown."""
+        headers = {
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json"
+        }
+        
+        payload = {
+            "model": self.model,
+            "messages": [
+                {"role": "system", "content": "Jesteś ekspertem w analizie notatek biznesowych. Zawsze odpowiadasz TYLKO w formacie JSON."},
+                {"role": "user", "content": prompt}
+            ],
+            "temperature": self.temperature
+        }
+        
+        response = requests.post(
+            self.api_url,
+            headers=headers,
+            json=payload,
+            timeout=30
+        )
+        response.raise_for_status()
+        
+        response_data = response.json()
+        # Qwen zwraca odpowiedź w różnych formatach, dostosuj do swojego API
+        if "choices" in response_data:
+            response_text = response_data["choices"][0]["message"]["content"].strip()
+        elif "output" in response_data:
+            response_text = response_data["output"]["text"].strip()
+        else:
+            # Próba wyciągnięcia tekstu z odpowiedzi
+            response_text = str(response_data).strip()
+        
+        # Usuń markdown code blocks jeśli są
+        if response_text.startswith("```json"):
+            response_text = response_text[7:]
+        if response_text.startswith("```"):
+            response_text = response_text[3:]
+        if response_text.endswith("```"):
+            response_text = response_text[:-3]
+        return response_text.strip()
+    
     def _default_response(self, error_msg: str) -> Dict[str, Any]:
         """Zwraca domyślną odpowiedź w przypadku błędu."""
         return {
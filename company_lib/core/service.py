@@ -0,0 +1,206 @@
+"""
+Pętla usługi dla skryptów uruchamianych cyklicznie (tryb daemon zamiast crona).
+Stan (repozytoria, klienci LLM, połączenia SMTP/DB) żyje między cyklami,
+a wbudowany serwer HTTP udostępnia /health i /metrics do monitoringu.
+"""
+import json
+import signal
+import threading
+import time
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, Optional
+from company_lib.logger import setup_logger
+
+logger = setup_logger("Service")
+
+# Po ilu odstępach bez zakończonego cyklu usługa zgłasza "degraded" (pętla stoi lub cykl wisi)
+STALL_INTERVALS = 3
+
+
+class ServiceLoop:
+    """
+    Uruchamia funkcję cyklu co zadany odstęp czasu aż do zatrzymania (SIGTERM/SIGINT lub stop()).
+    Wyjątek w cyklu jest logowany i liczony, ale nie przerywa usługi.
+    Funkcja cyklu może zwrócić słownik z podsumowaniem; klucz "skipped": True oznacza
+    cykl pominięty (brak zmian w danych).
+    """
+    
+    def __init__(
+        self,
+        name: str,
+        cycle: Callable[[], Optional[Dict[str, Any]]],
+        interval: float,
+        health_host: str = "127.0.0.1",
+        health_port: int = 0,
+        max_cycle_seconds: float = 0
+    ):
+        """
+        Args:
+            name: Nazwa usługi (w logach i odpowiedziach HTTP)
+            cycle: Funkcja wykonująca jeden cykl pracy
+            interval: Odstęp między początkami kolejnych cykli w sekundach
+            health_host: Adres serwera /health i /metrics
+            health_port: Port serwera (0 = serwer wyłączony)
+            max_cycle_seconds: Najdłuższy czas trwania cyklu, po którym /health zgłasza "degraded"
+                               (0 = STALL_INTERVALS odstępów)
+        """
+        self.name = name
+        self.cycle = cycle
+        self.interval = interval
+        self.health_host = health_host
+        self.health_port = health_port
+        self.max_cycle_seconds = max_cycle_seconds or STALL_INTERVALS * interval
+        self.stop_event = threading.Event()
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._last_cycle_end: Optional[float] = None
+        self._cycle_start: Optional[float] = None
+        self._stats_lock = threading.Lock()
+        self.stats: Dict[str, Any] = {
+            "started_at": None,
+            "cycles": 0,
+            "skipped_cycles": 0,
+            "failed_cycles": 0,
+            "in_cycle": False,
+            "last_cycle_at": None,
+            "last_cycle_ms": None,
+            "last_cycle_ok": None,
+            "last_error": None,
+            "last_result": None
+        }
+    
+    def run(self) -> None:
+        """Wykonuje cykle do zatrzymania usługi (blokuje wątek wywołujący)."""
+        self._install_signal_handlers()
+        self._start_health_server()
+        self.stats["started_at"] = datetime.now().isoformat(timespec='seconds')
+        logger.info(f"Usługa {self.name} uruchomiona, cykl co {self.interval:g} s")
+        
+        try:
+            while not self.stop_event.is_set():
+                started = time.perf_counter()
+                self._run_cycle()
+                elapsed = time.perf_counter() - started
+                self.stop_event.wait(max(0.0, self.interval - elapsed))
+        finally:
+            self._stop_health_server()
+            logger.info(f"Usługa {self.name} zatrzymana po {self.stats['cycles']} cyklach")
+    
+    def stop(self) -> None:
+        """Kończy pętlę po bieżącym cyklu."""
+        self.stop_event.set()
+    
+    def _run_cycle(self) -> None:
+        started_at = datetime.now()
+        started = time.perf_counter()
+        result, error = None, None
+        with self._stats_lock:
+            self.stats["in_cycle"] = True
+            self._cycle_start = time.monotonic()
+        try:
+            result = self.cycle()
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+            logger.error(f"Błąd w cyklu usługi {self.name}: {e}", exc_info=True)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        
+        with self._stats_lock:
+            self.stats["cycles"] += 1
+            self.stats["in_cycle"] = False
+            self._cycle_start = None
+            self._last_cycle_end = time.monotonic()
+            self.stats["last_cycle_at"] = started_at.isoformat(timespec='seconds')
+            self.stats["last_cycle_ms"] = round(elapsed_ms, 3)
+            self.stats["last_result"] = result
+            self.stats["last_cycle_ok"] = error is None
+            if error:
+                self.stats["failed_cycles"] += 1
+                self.stats["last_error"] = error
+            elif result and result.get("skipped"):
+                self.stats["skipped_cycles"] += 1
+        
+        if result and result.get("skipped"):
+            logger.debug(f"Cykl pominięty (brak zmian), {elapsed_ms:.1f} ms")
+        else:
+            logger.info(f"Cykl zakończony w {elapsed_ms:.1f} ms")
+    
+    def health(self) -> Dict[str, Any]:
+        """
+        Stan usługi dla /health: "ok" albo "degraded", gdy ostatni cykl zakończył się błędem,
+        bieżący cykl trwa dłużej niż max_cycle_seconds (wisi np. na zapytaniu LLM lub SMTP)
+        albo od końca ostatniego cyklu minęło więcej niż STALL_INTERVALS odstępów, a nowy nie trwa (pętla stoi).
+        """
+        with self._stats_lock:
+            stats = dict(self.stats)
+            last_cycle_end = self._last_cycle_end
+            cycle_start = self._cycle_start
+        now = time.monotonic()
+        status = "ok"
+        if stats["last_cycle_ok"] is False:
+            status = "degraded"
+        if cycle_start is not None:
+            if now - cycle_start > self.max_cycle_seconds:
+                status = "degraded"
+        elif last_cycle_end is not None and now - last_cycle_end > STALL_INTERVALS * self.interval:
+            status = "degraded"
+        body = {"service": self.name, "status": status, "last_cycle_at": stats["last_cycle_at"]}
+        if cycle_start is not None:
+            body["cycle_running_s"] = round(now - cycle_start, 1)
+        return body
+    
+    def metrics(self) -> Dict[str, Any]:
+        """Liczniki usługi dla /metrics."""
+        with self._stats_lock:
+            return {"service": self.name, **self.stats}
+    
+    def _install_signal_handlers(self) -> None:
+        """SIGTERM/SIGINT kończą pętlę po bieżącym cyklu (tylko z głównego wątku)."""
+        if threading.current_thread() is not threading.main_thread():
+            return
+        
+        def _handle(signum, frame):
+            logger.info(f"Otrzymano sygnał {signal.Signals(signum).name}, kończę po bieżącym cyklu")
+            self.stop()
+        
+        signal.signal(signal.SIGTERM, _handle)
+        signal.signal(signal.SIGINT, _handle)
+    
+    def _start_health_server(self) -> None:
+        if not self.health_port:
+            return
+        
+        service = self
+        
+        class _Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path == "/health":
+                    body = service.health()
+                    code = 200 if body["status"] == "ok" else 503
+                elif self.path == "/metrics":
+                    body, code = service.metrics(), 200
+                else:
+                    body, code = {"error": "not found"}, 404
+                payload = json.dumps(body, default=str).encode("utf-8")
+                self.send_response(code)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+            
+            def log_message(self, format, *args):
+                logger.debug(f"HTTP {self.address_string()} {format % args}")
+        
+        try:
+            self._server = ThreadingHTTPServer((self.health_host, self.health_port), _Handler)
+        except OSError as e:
+            logger.error(f"Nie można uruchomić serwera /health na {self.health_host}:{self.health_port}: {e}")
+            return
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, name=f"{self.name}-health", daemon=True).start()
+        logger.info(f"Endpoint /health i /metrics: http://{self.health_host}:{self._server.server_port}")
+    
+    def _stop_health_server(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
@@ -0,0 +1,325 @@
+"""
+Kolumnowe kontenery partii notatek i próbek oparte na tablicach NumPy.
+Zamiast listy obiektów dataclass każde pole jest osobną tablicą:
+- daty jako datetime64[s] (NaT dla braku daty),
+- pola o małej liczbie wartości (customer_id, status) jako kody kategorii int32 + słownik,
+- treści jako bufor bajtów UTF-8 + tablica offsetów (układ jak w Apache Arrow).
+Filtrowanie po oknie czasowym i grupowanie po kliencie to operacje na tablicach.
+"""
+from dataclasses import dataclass, field, fields
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+import numpy as np
+from company_lib.domain.models import NoteModel, SampleModel
+
+DATETIME_DTYPE = "datetime64[s]"
+
+_EPOCH = datetime(1970, 1, 1)
+_SECOND = timedelta(seconds=1)
+_NAT = np.iinfo(np.int64).min
+
+
+def to_datetime64(value: Optional[datetime]) -> np.datetime64:
+    """Konwertuje datetime na datetime64[s] (None -> NaT)."""
+    return np.datetime64(value, "s") if value is not None else np.datetime64("NaT", "s")
+
+
+def datetimes_to_array(values: Sequence[Optional[datetime]]) -> np.ndarray:
+    """
+    Konwertuje listę datetime na tablicę datetime64[s] (None -> NaT).
+    Liczy sekundy od epoki arytmetyką timedelta - kilkukrotnie szybciej niż np.array(..., dtype=datetime64).
+    """
+    seconds = np.fromiter(
+        ((value - _EPOCH) // _SECOND if value is not None else _NAT for value in values),
+        dtype=np.int64,
+        count=len(values)
+    )
+    return seconds.view(DATETIME_DTYPE)
+
+
+@dataclass
+class CategoricalColumn:
+    """Kolumna kategoryczna: kody int32 wskazujące na listę unikalnych wartości."""
+    codes: np.ndarray
+    categories: List[Optional[str]]
+    _index: Dict[Optional[str], int] = field(init=False, repr=False, compare=False)
+    
+    def __post_init__(self):
+        self._index = {value: code for code, value in enumerate(self.categories)}
+    
+    @classmethod
+    def from_values(cls, values: Iterable[Optional[str]]) -> "CategoricalColumn":
+        """Buduje kolumnę z wartości (kody nadawane w kolejności pierwszego wystąpienia)."""
+        index: Dict[Optional[str], int] = {}
+        codes = np.fromiter((index.setdefault(v, len(index)) for v in values), dtype=np.int32)
+        return cls(codes, list(index))
+    
+    def __len__(self) -> int:
+        return len(self.codes)
+    
+    def __getitem__(self, position: int) -> Optional[str]:
+        return self.categories[self.codes[position]]
+    
+    def code_of(self, value: Optional[str]) -> int:
+        """Zwraca kod wartości lub -1, jeśli wartość nie występuje w kolumnie."""
+        return self._index.get(value, -1)
+    
+    def codes_of(self, values: Sequence[Optional[str]]) -> np.ndarray:
+        """Zwraca kody dla listy wartości (-1 dla nieznanych)."""
+        return np.fromiter((self._index.get(v, -1) for v in values), dtype=np.int32, count=len(values))
+    
+    def equals(self, value: Optional[str]) -> np.ndarray:
+        """Maska wierszy o danej wartości (porównanie pojedynczego kodu zamiast stringów)."""
+        code = self.code_of(value)
+        if code < 0:
+            return np.zeros(len(self.codes), dtype=bool)
+        return self.codes == code
+    
+    def isin(self, values: Iterable[Optional[str]]) -> np.ndarray:
+        """Maska wierszy, których wartość należy do zbioru."""
+        codes = [self._index[v] for v in set(values) if v in self._index]
+        return np.isin(self.codes, np.asarray(codes, dtype=np.int32))
+    
+    def take(self, indices: np.ndarray) -> "CategoricalColumn":
+        """Wybiera wiersze (słownik kategorii jest współdzielony, bez kopiowania)."""
+        return CategoricalColumn(self.codes[indices], self.categories)
+    
+    def to_list(self) -> List[Optional[str]]:
+        """Zwraca wartości jako listę (stringi są współdzielone ze słownikiem)."""
+        categories = self.categories
+        return [categories[code] for code in self.codes.tolist()]
+
+
+@dataclass
+class StringColumn:
+    """
+    Kolumna tekstowa w układzie offsets + bufor: wartość i to buffer[offsets[i]:offsets[i+1]]
+    zdekodowane z UTF-8. Opcjonalna maska nulls oznacza brakujące wartości (None).
+    """
+    offsets: np.ndarray
+    buffer: np.ndarray
+    nulls: Optional[np.ndarray] = None
+    
+    @classmethod
+    def from_values(cls, values: Iterable[Optional[str]]) -> "StringColumn":
+        """Buduje kolumnę z wartości (None zapisywane jako pusty ciąg z flagą w nulls)."""
+        encoded = []
+        nulls = []
+        for value in values:
+            nulls.append(value is None)
+            encoded.append(value.encode("utf-8") if value is not None else b"")
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum(np.fromiter(map(len, encoded), dtype=np.int64, count=len(encoded)), out=offsets[1:])
+        buffer = np.frombuffer(b"".join(encoded), dtype=np.uint8)
+        null_mask = np.array(nulls, dtype=bool)
+        return cls(offsets, buffer, null_mask if null_mask.any() else None)
+    
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+    
+    def __getitem__(self, position: int) -> Optional[str]:
+        if self.nulls is not None and self.nulls[position]:
+            return None
+        start, end = self.offsets[position], self.offsets[position + 1]
+        return self.buffer[start:end].tobytes().decode("utf-8")
+    
+    def lengths(self) -> np.ndarray:
+        """Długości wartości w bajtach."""
+        return np.diff(self.offsets)
+    
+    def take(self, indices: np.ndarray) -> "StringColumn":
+        """Wybiera wiersze, składając nowy bufor jedną operacją gather (bez pętli w Pythonie)."""
+        indices = np.asarray(indices)
+        if indices.dtype == bool:
+            indices = np.flatnonzero(indices)
+        starts = self.offsets[:-1].astype(np.int64)[indices]
+        lengths = self.lengths().astype(np.int64)[indices]
+        offsets = np.zeros(len(indices) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=offsets[1:])
+        positions = np.repeat(starts - offsets[:-1], lengths) + np.arange(offsets[-1], dtype=np.int64)
+        nulls = self.nulls[indices] if self.nulls is not None else None
+        return StringColumn(offsets, self.buffer[positions], nulls)
+    
+    def to_list(self) -> List[Optional[str]]:
+        """Dekoduje wszystkie wartości do listy stringów."""
+        return [self[i] for i in range(len(self))]
+
+
+class ColumnarBatch:
+    """
+    Wspólna logika partii kolumnowych. Podklasy są dataclassami, których pola
+    to kolumny o tej samej długości; DATE_FIELD wskazuje kolumnę daty dla filtrów okna.
+    """
+    
+    DATE_FIELD: str = ""
+    
+    def __len__(self) -> int:
+        return len(self.ids)
+    
+    def take(self, indices: np.ndarray):
+        """Zwraca nową partię z wybranymi wierszami (indeksy lub maska logiczna)."""
+        if isinstance(indices, np.ndarray) and indices.dtype == bool:
+            indices = np.flatnonzero(indices)
+        columns = {}
+        for column in fields(self):
+            value = getattr(self, column.name)
+            columns[column.name] = value[indices] if isinstance(value, np.ndarray) else value.take(indices)
+        return type(self)(**columns)
+    
+    def between(self, date_from: Optional[datetime] = None, date_to: Optional[datetime] = None) -> np.ndarray:
+        """Maska wierszy z datą w przedziale [date_from, date_to] (NaT nigdy nie pasuje)."""
+        dates = getattr(self, self.DATE_FIELD)
+        mask = ~np.isnat(dates)
+        if date_from is not None:
+            mask &= dates >= to_datetime64(date_from)
+        if date_to is not None:
+            mask &= dates <= to_datetime64(date_to)
+        return mask
+    
+    def group_by_customer(self) -> Dict[Optional[str], np.ndarray]:
+        """
+        Grupuje wiersze po kliencie jednym sortowaniem kodów.
+        
+        Returns:
+            Słownik customer_id -> indeksy wierszy (w kolejności wystąpienia w partii)
+        """
+        codes = self.customer_id.codes
+        if not len(codes):
+            return {}
+        order = np.argsort(codes, kind="stable")
+        sorted_codes = codes[order]
+        bounds = np.flatnonzero(np.diff(sorted_codes)) + 1
+        starts = np.concatenate(([0], bounds))
+        categories = self.customer_id.categories
+        return {
+            categories[sorted_codes[start]]: group
+            for start, group in zip(starts.tolist(), np.split(order, bounds))
+        }
+
+
+@dataclass
+class NoteBatch(ColumnarBatch):
+    """Partia notatek w układzie kolumnowym."""
+    ids: np.ndarray
+    customer_id: CategoricalColumn
+    content: StringColumn
+    created_at: np.ndarray
+    is_processed: np.ndarray
+    
+    DATE_FIELD = "created_at"
+    
+    @classmethod
+    def from_models(cls, notes: Sequence[NoteModel]) -> "NoteBatch":
+        """Buduje partię z listy NoteModel (wiersz i partii odpowiada notes[i])."""
+        return cls(
+            ids=np.fromiter((n.id for n in notes), dtype=np.int64, count=len(notes)),
+            customer_id=CategoricalColumn.from_values(n.customer_id for n in notes),
+            content=StringColumn.from_values([n.content for n in notes]),
+            created_at=datetimes_to_array([n.created_at for n in notes]),
+            is_processed=np.fromiter((bool(n.is_processed) for n in notes), dtype=bool, count=len(notes))
+        )
+    
+    def to_models(self) -> List[NoteModel]:
+        """Materializuje partię z powrotem do listy NoteModel."""
+        return [
+            NoteModel(
+                id=note_id,
+                customer_id=customer_id,
+                content=content,
+                created_at=created_at,
+                is_processed=is_processed
+            )
+            for note_id, customer_id, content, created_at, is_processed in zip(
+                self.ids.tolist(),
+                self.customer_id.to_list(),
+                self.content.to_list(),
+                self.created_at.tolist(),  # datetime64[s] -> datetime (NaT -> None)
+                self.is_processed.tolist()
+            )
+        ]
+    
+    def ranges_after(
+        self,
+        customer_ids: Sequence[str],
+        dates: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Dla każdej pary (klient, data) wyznacza notatki klienta utworzone w tej dacie lub później.
+        Notatki są sortowane raz po (klient, data), a granice zakresów wyznacza searchsorted
+        na złożonym kluczu int64 - bez pętli po klientach. Wiersze z NaT należy odfiltrować wcześniej.
+        
+        Args:
+            customer_ids: ID klientów (jedno na zapytanie)
+            dates: Daty początkowe (datetime64[s]), ta sama długość co customer_ids
+        
+        Returns:
+            Krotka (order, starts, ends): notatki dla zapytania j to order[starts[j]:ends[j]],
+            posortowane rosnąco po dacie utworzenia
+        """
+        query_codes = self.customer_id.codes_of(customer_ids).astype(np.int64)
+        note_codes = self.customer_id.codes.astype(np.int64)
+        
+        # Rangi dat zamiast sekund - klucz (kod << 32 | ranga) mieści się w int64 dla dowolnych dat
+        all_dates = np.concatenate((self.created_at, np.asarray(dates, dtype=DATETIME_DTYPE))).astype(np.int64)
+        ranks = np.unique(all_dates, return_inverse=True)[1].astype(np.int64).ravel()
+        note_keys = (note_codes << 32) | ranks[:len(note_codes)]
+        query_keys = (query_codes << 32) | ranks[len(note_codes):]
+        
+        order = np.argsort(note_keys, kind="stable")
+        sorted_keys = note_keys[order]
+        starts = np.searchsorted(sorted_keys, query_keys, side="left")
+        ends = np.searchsorted(sorted_keys, (query_codes + 1) << 32, side="left")
+        
+        unknown = query_codes < 0
+        starts[unknown] = 0
+        ends[unknown] = 0
+        return order, starts, ends
+
+
+@dataclass
+class SampleBatch(ColumnarBatch):
+    """Partia próbek w układzie kolumnowym."""
+    ids: np.ndarray
+    customer_id: CategoricalColumn
+    status: CategoricalColumn
+    date_sent: np.ndarray
+    notes: StringColumn
+    
+    DATE_FIELD = "date_sent"
+    
+    @classmethod
+    def from_models(cls, samples: Sequence[SampleModel]) -> "SampleBatch":
+        """Buduje partię z listy SampleModel (wiersz i partii odpowiada samples[i])."""
+        return cls(
+            ids=np.fromiter((s.id for s in samples), dtype=np.int64, count=len(samples)),
+            customer_id=CategoricalColumn.from_values(s.customer_id for s in samples),
+            status=CategoricalColumn.from_values(s.status for s in samples),
+            date_sent=datetimes_to_array([s.date_sent for s in samples]),
+            notes=StringColumn.from_values([s.notes for s in samples])
+        )
+    
+    def to_models(self) -> List[SampleModel]:
+        """Materializuje partię z powrotem do listy SampleModel."""
+        return [
+            SampleModel(
+                id=sample_id,
+                customer_id=customer_id,
+                status=status,
+                date_sent=date_sent,
+                notes=notes
+            )
+            for sample_id, customer_id, status, date_sent, notes in zip(
+                self.ids.tolist(),
+                self.customer_id.to_list(),
+                self.status.to_list(),
+                self.date_sent.tolist(),
+                self.notes.to_list()
+            )
+        ]
+    
+    def window(self, date_from: datetime, date_to: datetime, status: Optional[str] = None) -> np.ndarray:
+        """Maska próbek o danym statusie wysłanych w oknie [date_from, date_to]."""
+        mask = self.between(date_from, date_to)
+        if status is not None:
+            mask &= self.status.equals(status)
+        return mask
@@ -2,7 +2,7 @@
 Serwis ERP - logika biznesowa operująca na repozytoriach.
 Używa interfejsów, więc działa zarówno z SQL jak i CSV repozytoriami.
 """
-from typing import List, Optional
+from typing import List, Optional, Dict
 from company_lib.domain.models import NoteModel, CustomerModel
 from company_lib.domain.interfaces import (
     ICustomerRepository,
@@ -58,6 +58,15 @@ class ERPService:
             'stats': stats
         }
     
+    def get_all_customer_stats(self) -> Dict[str, dict]:
+        """
+        Pobiera statystyki wszystkich klientów w jednym przebiegu.
+        
+        Returns:
+            Słownik id klienta -> statystyki
+        """
+        return self.customer_repo.get_all_customer_stats()
+    
     def get_pending_notes(self) -> List[NoteModel]:
         """
         Pobiera nieprzetworzone notatki.
@@ -79,4 +88,16 @@ class ERPService:
             True jeśli przetworzono pomyślnie
         """
         return self.note_repo.mark_as_processed(note_id, category)
-
+    
+    def process_notes(self, note_ids: List[int], categories: Optional[Dict[int, str]] = None) -> int:
+        """
+        Przetwarza wiele notatek jednocześnie (operacja wsadowa).
+        
+        Args:
+            note_ids: Lista ID notatek
+            categories: Opcjonalna mapa note_id -> kategoria
+        
+        Returns:
+            Liczba przetworzonych notatek
+        """
+        return self.note_repo.mark_many_as_processed(note_ids, categories)
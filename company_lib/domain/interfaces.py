@@ -3,8 +3,12 @@ Interfejsy (ABC) dla repozytoriów.
 Definiują kontrakt, który musi być spełniony przez wszystkie implementacje.
 """
 from abc import ABC, abstractmethod
-from typing import List, Optional
-from company_lib.domain.models import NoteModel, SampleModel, CustomerModel, TaskModel, MailLogModel
+from contextlib import nullcontext
+from datetime import datetime
+from typing import List, Optional, Dict, Iterator, Set, Tuple
+from company_lib.domain.models import (
+    NoteModel, SampleModel, CustomerModel, TaskModel, MailLogModel, SampleFollowupCandidate
+)
 
 class ICustomerRepository(ABC):
     """Interfejs repozytorium klientów."""
@@ -14,10 +18,20 @@ class ICustomerRepository(ABC):
         """Pobiera klienta po ID."""
         pass
     
+    @abstractmethod
+    def get_customers_by_ids(self, customer_ids: List[str]) -> Dict[str, CustomerModel]:
+        """Pobiera wielu klientów naraz. Zwraca mapę id -> klient (tylko znalezieni)."""
+        pass
+    
     @abstractmethod
     def get_customer_stats(self, customer_id: str) -> dict:
         """Pobiera statystyki klienta."""
         pass
+    
+    @abstractmethod
+    def get_all_customer_stats(self) -> Dict[str, dict]:
+        """Pobiera statystyki wszystkich klientów w jednym przebiegu. Zwraca mapę id -> statystyki."""
+        pass
 
 class INoteRepository(ABC):
     """Interfejs repozytorium notatek."""
@@ -31,6 +45,15 @@ class INoteRepository(ABC):
     def mark_as_processed(self, note_id: int, category: Optional[str] = None) -> bool:
         """Oznacza notatkę jako przetworzoną."""
         pass
+    
+    @abstractmethod
+    def mark_many_as_processed(
+        self,
+        note_ids: List[int],
+        categories: Optional[Dict[int, str]] = None
+    ) -> int:
+        """Oznacza wiele notatek jako przetworzone (operacja wsadowa). Zwraca liczbę oznaczonych."""
+        pass
 
 class ISampleRepository(ABC):
     """Interfejs repozytorium próbek."""
@@ -39,6 +62,19 @@ class ISampleRepository(ABC):
     def get_samples_by_status(self, status: str) -> List[SampleModel]:
         """Pobiera próbki po statusie."""
         pass
+    
+    @abstractmethod
+    def get_followup_candidates(
+        self,
+        date_from: datetime,
+        date_to: datetime,
+        status: str = "Sent"
+    ) -> Iterator[SampleFollowupCandidate]:
+        """
+        Zwraca (strumieniowo) próbki wysłane w zadanym oknie, dla których nie ma jeszcze zadania,
+        razem z notatkami klienta utworzonymi po dacie wysłania próbki.
+        """
+        pass
 
 class ITaskRepository(ABC):
     """Interfejs repozytorium zadań."""
@@ -48,6 +84,11 @@ class ITaskRepository(ABC):
         """Pobiera zadania dla konkretnego klienta i próbki."""
         pass
     
+    @abstractmethod
+    def get_sample_task_keys(self) -> Set[Tuple[str, int]]:
+        """Zwraca pary (customer_id, sample_id) próbek, które mają już zadanie."""
+        pass
+    
     @abstractmethod
     def create_task(self, task: TaskModel) -> TaskModel:
         """Tworzy nowe zadanie."""
@@ -57,18 +98,40 @@ class ITaskRepository(ABC):
     def get_pending_tasks_by_salesperson(self, salesperson_email: str) -> List[TaskModel]:
         """Pobiera wszystkie oczekujące zadania dla sprzedawcy."""
         pass
+    
+    def batch(self):
+        """
+        Kontekst grupujący wiele zmian w jeden zapis (plik CSV / transakcja).
+        Domyślnie brak grupowania - każda zmiana zapisywana jest od razu.
+        """
+        return nullcontext()
 
 class IMailLogRepository(ABC):
     """Interfejs repozytorium logów maili."""
     
+    def batch(self):
+        """Kontekst grupujący wiele zmian w jeden zapis (domyślnie brak grupowania)."""
+        return nullcontext()
+    
     @abstractmethod
     def create_log(self, mail_log: MailLogModel) -> MailLogModel:
         """Tworzy nowy log wysyłki maila."""
         pass
     
     @abstractmethod
-    def update_log_status(self, log_id: int, status: str, error_message: Optional[str] = None) -> bool:
-        """Aktualizuje status logu."""
+    def get_log_by_id(self, log_id: int) -> Optional[MailLogModel]:
+        """Pobiera log po ID."""
+        pass
+    
+    @abstractmethod
+    def update_log_status(
+        self,
+        log_id: int,
+        status: str,
+        error_message: Optional[str] = None,
+        task_ids: Optional[str] = None
+    ) -> bool:
+        """Aktualizuje status logu (i listę ID zadań, gdy ponowiona wysyłka dotyczy innych zadań)."""
         pass
     
     @abstractmethod
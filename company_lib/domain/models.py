@@ -1,12 +1,21 @@
 """
 Modele danych używane w aplikacji.
 Używamy dataclasses dla prostoty i wydajności.
+
+Modele są zdefiniowane ze __slots__ (bez __dict__ na instancję), a pola o małej
+liczbie różnych wartości (customer_id, status, task_type, assigned_to) są internowane
+przy tworzeniu obiektu - tysiące wierszy tego samego klienta współdzielą jeden obiekt str.
 """
+import sys
 from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Optional
+from typing import Optional, List
+
+def intern_str(value):
+    """Internuje string (wspólna instancja dla powtarzających się wartości); inne typy bez zmian."""
+    return sys.intern(value) if type(value) is str else value
 
-@dataclass
+@dataclass(slots=True)
 class NoteModel:
     """Model notatki z systemu ERP."""
     id: int
@@ -15,6 +24,9 @@ class NoteModel:
     created_at: datetime = field(default_factory=datetime.now)
     is_processed: bool = False
     
+    def __post_init__(self):
+        self.customer_id = intern_str(self.customer_id)
+    
     def safe_content(self) -> str:
         """
         Zwraca content z zamienionymi znakami specjalnymi na bezpieczne odpowiedniki ASCII.
@@ -22,7 +34,7 @@ class NoteModel:
         """
         return self.content.encode('ascii', 'replace').decode('ascii')
 
-@dataclass
+@dataclass(slots=True)
 class SampleModel:
     """Model próbki wysłanej do klienta."""
     id: int
@@ -30,8 +42,18 @@ class SampleModel:
     status: str
     date_sent: datetime
     notes: Optional[str] = None
+    
+    def __post_init__(self):
+        self.customer_id = intern_str(self.customer_id)
+        self.status = intern_str(self.status)
 
-@dataclass
+@dataclass(slots=True)
+class SampleFollowupCandidate:
+    """Próbka bez zadania wraz z notatkami klienta powstałymi po jej wysłaniu."""
+    sample: SampleModel
+    notes: List[NoteModel] = field(default_factory=list)
+
+@dataclass(slots=True)
 class CustomerModel:
     """Model klienta z systemu ERP."""
     id: str
@@ -40,8 +62,11 @@ class CustomerModel:
     phone: Optional[str] = None
     salesperson_email: Optional[str] = None  # Email sprzedawcy przypisanego do klienta
     created_at: datetime = field(default_factory=datetime.now)
+    
+    def __post_init__(self):
+        self.salesperson_email = intern_str(self.salesperson_email)
 
-@dataclass
+@dataclass(slots=True)
 class TaskModel:
     """Model zadania dla sprzedawcy."""
     id: Optional[int] = None  # None dla nowych zadań
@@ -52,8 +77,14 @@ class TaskModel:
     status: str = "PENDING"  # PENDING, COMPLETED, CANCELLED
     created_at: datetime = field(default_factory=datetime.now)
     assigned_to: Optional[str] = None  # Email sprzedawcy
+    
+    def __post_init__(self):
+        self.customer_id = intern_str(self.customer_id)
+        self.task_type = intern_str(self.task_type)
+        self.status = intern_str(self.status)
+        self.assigned_to = intern_str(self.assigned_to)
 
-@dataclass
+@dataclass(slots=True)
 class MailLogModel:
     """Model logu wysyłki maila."""
     id: Optional[int] = None  # None dla nowych logów
@@ -65,4 +96,8 @@ class MailLogModel:
     created_at: datetime = field(default_factory=datetime.now)
     batch_id: Optional[str] = None  # ID partii wysyłki (np. dla grupowania)
     task_ids: Optional[str] = None  # Lista ID zadań (oddzielone przecinkami)
+    
+    def __post_init__(self):
+        self.status = intern_str(self.status)
+        self.batch_id = intern_str(self.batch_id)
 
@@ -3,18 +3,100 @@ Repozytoria do dostępu do danych (implementacja SQL).
 Używają dependency injection - połączenie do bazy przekazywane jest w konstruktorze.
 Implementują interfejsy z domain.interfaces.
 """
-from typing import List, Optional
+from datetime import datetime
+from typing import List, Optional, Dict, Iterator
 from company_lib.domain.interfaces import (
     ICustomerRepository,
     INoteRepository,
-    ISampleRepository
+    ISampleRepository,
+    ITaskRepository
 )
-from company_lib.domain.models import NoteModel, SampleModel, CustomerModel
-from company_lib.core.database import MSSQLConnection
+from company_lib.domain.models import NoteModel, SampleModel, CustomerModel, SampleFollowupCandidate
+from company_lib.core.database import (
+    MSSQLConnection,
+    PartialBatchError,
+    query_registry,
+    PARAM_STR,
+    PARAM_INT,
+    PARAM_BIT,
+    PARAM_DATETIME
+)
+from company_lib.config import Config
 from company_lib.logger import setup_logger
 
 logger = setup_logger("Repositories")
 
+# Nazwane zapytania - przygotowywane raz na połączenie, z typami parametrów i licznikami czasu
+query_registry.register("customers.by_id", """
+    SELECT Id, Name, Email, Phone, CreatedAt
+    FROM ERP.dbo.Customers
+    WHERE Id = ?
+""", [PARAM_STR])
+
+# Podzapytania skalarne zamiast podwójnego LEFT JOIN (który mnoży notatki x próbki)
+query_registry.register("customers.stats", """
+    SELECT 
+        (SELECT COUNT(*) FROM ERP.dbo.Notes n WHERE n.CustomerId = c.Id) as NotesCount,
+        (SELECT COUNT(*) FROM ERP.dbo.Samples s WHERE s.CustomerId = c.Id) as SamplesCount
+    FROM ERP.dbo.Customers c
+    WHERE c.Id = ?
+""", [PARAM_STR])
+
+query_registry.register("customers.all_stats", """
+    SELECT
+        c.Id,
+        ISNULL(n.NotesCount, 0) as NotesCount,
+        ISNULL(s.SamplesCount, 0) as SamplesCount
+    FROM ERP.dbo.Customers c
+    LEFT JOIN (
+        SELECT CustomerId, COUNT(*) as NotesCount
+        FROM ERP.dbo.Notes
+        GROUP BY CustomerId
+    ) n ON n.CustomerId = c.Id
+    LEFT JOIN (
+        SELECT CustomerId, COUNT(*) as SamplesCount
+        FROM ERP.dbo.Samples
+        GROUP BY CustomerId
+    ) s ON s.CustomerId = c.Id
+""")
+
+query_registry.register(
+    "notes.all",
+    "SELECT Id, CustomerId, NoteContent, CreatedAt, Processed FROM ERP.dbo.Notes"
+)
+
+query_registry.register(
+    "notes.by_processed",
+    "SELECT Id, CustomerId, NoteContent, CreatedAt, Processed FROM ERP.dbo.Notes WHERE Processed = ?",
+    [PARAM_BIT]
+)
+
+query_registry.register(
+    "notes.mark_processed",
+    "UPDATE ERP.dbo.Notes SET Processed = 1 WHERE Id = ?",
+    [PARAM_INT]
+)
+
+query_registry.register("samples.by_status", """
+    SELECT Id, CustomerId, Status, DateSent, Notes
+    FROM ERP.dbo.Samples
+    WHERE Status = ?
+""", [PARAM_STR])
+
+query_registry.register("samples.followup_candidates", """
+    SELECT s.Id, s.CustomerId, s.Status, s.DateSent, s.Notes,
+           n.Id, n.NoteContent, n.CreatedAt, n.Processed
+    FROM ERP.dbo.Samples s
+    LEFT JOIN ERP.dbo.Notes n
+        ON n.CustomerId = s.CustomerId
+        AND n.CreatedAt >= s.DateSent
+        AND LEN(LTRIM(RTRIM(n.NoteContent))) > 0
+    WHERE s.Status = ?
+        AND s.DateSent >= ?
+        AND s.DateSent <= ?
+    ORDER BY s.Id, s.CustomerId, s.DateSent, n.CreatedAt
+""", [PARAM_STR, PARAM_DATETIME, PARAM_DATETIME])
+
 class CustomerRepository(ICustomerRepository):
     """
     Repozytorium do operacji na klientach.
@@ -39,13 +121,8 @@ class CustomerRepository(ICustomerRepository):
         Returns:
             CustomerModel lub None jeśli nie znaleziono
         """
-        query = """
-            SELECT Id, Name, Email, Phone, CreatedAt
-            FROM ERP.dbo.Customers
-            WHERE Id = ?
-        """
         try:
-            result = self.db.execute_query(query, (customer_id,))
+            result = self.db.execute_named("customers.by_id", (customer_id,))
             if result:
                 row = result[0]
                 return CustomerModel(
@@ -60,6 +137,47 @@ class CustomerRepository(ICustomerRepository):
             logger.error(f"Błąd pobierania klienta {customer_id}: {e}")
             return None
     
+    def get_customers_by_ids(
+        self,
+        customer_ids: List[str],
+        chunk_size: int = 1000
+    ) -> Dict[str, CustomerModel]:
+        """
+        Pobiera wielu klientów naraz zapytaniami WHERE Id IN (...).
+        Lista ID dzielona jest na paczki (SQL Server przyjmuje max 2100 parametrów na zapytanie).
+        
+        Args:
+            customer_ids: Lista ID klientów
+            chunk_size: Liczba ID w jednym zapytaniu
+        
+        Returns:
+            Słownik id -> CustomerModel (tylko znalezieni klienci)
+        """
+        unique_ids = [cid for cid in dict.fromkeys(customer_ids) if cid]
+        customers: Dict[str, CustomerModel] = {}
+        
+        for start in range(0, len(unique_ids), chunk_size):
+            chunk = unique_ids[start:start + chunk_size]
+            placeholders = ", ".join("?" for _ in chunk)
+            query = f"""
+                SELECT Id, Name, Email, Phone, CreatedAt
+                FROM ERP.dbo.Customers
+                WHERE Id IN ({placeholders})
+            """
+            try:
+                for row in self.db.execute_query(query, tuple(chunk)):
+                    customers[row[0]] = CustomerModel(
+                        id=row[0],
+                        name=row[1],
+                        email=row[2],
+                        phone=row[3],
+                        created_at=row[4] if len(row) > 4 else None
+                    )
+            except Exception as e:
+                logger.error(f"Błąd pobierania {len(chunk)} klientów: {e}")
+        
+        return customers
+    
     def get_customer_stats(self, customer_id: str) -> dict:
         """
         Pobiera statystyki klienta.
@@ -70,17 +188,8 @@ class CustomerRepository(ICustomerRepository):
         Returns:
             Słownik ze statystykami
         """
-        query = """
-            SELECT 
-                COUNT(DISTINCT n.Id) as NotesCount,
-                COUNT(DISTINCT s.Id) as SamplesCount
-            FROM ERP.dbo.Customers c
-            LEFT JOIN ERP.dbo.Notes n ON n.CustomerId = c.Id
-            LEFT JOIN ERP.dbo.Samples s ON s.CustomerId = c.Id
-            WHERE c.Id = ?
-        """
         try:
-            result = self.db.execute_query(query, (customer_id,))
+            result = self.db.execute_named("customers.stats", (customer_id,))
             if result:
                 row = result[0]
                 return {
@@ -91,6 +200,24 @@ class CustomerRepository(ICustomerRepository):
         except Exception as e:
             logger.error(f"Błąd pobierania statystyk klienta {customer_id}: {e}")
             return {'notes_count': 0, 'samples_count': 0}
+    
+    def get_all_customer_stats(self) -> Dict[str, dict]:
+        """
+        Pobiera statystyki wszystkich klientów jednym zapytaniem.
+        Notatki i próbki są najpierw agregowane (GROUP BY CustomerId),
+        a dopiero potem łączone z klientami - bez mnożenia wierszy.
+        
+        Returns:
+            Słownik id klienta -> statystyki
+        """
+        try:
+            return {
+                row[0]: {'notes_count': row[1] or 0, 'samples_count': row[2] or 0}
+                for row in self.db.iter_named("customers.all_stats")
+            }
+        except Exception as e:
+            logger.error(f"Błąd pobierania statystyk klientów: {e}")
+            return {}
 
 class NoteRepository(INoteRepository):
     """
@@ -117,14 +244,14 @@ class NoteRepository(INoteRepository):
             Lista NoteModel
         """
         if processed is None:
-            query = "SELECT Id, CustomerId, NoteContent, CreatedAt, Processed FROM ERP.dbo.Notes"
+            statement = "notes.all"
             params = None
         else:
-            query = "SELECT Id, CustomerId, NoteContent, CreatedAt, Processed FROM ERP.dbo.Notes WHERE Processed = ?"
+            statement = "notes.by_processed"
             params = (1 if processed else 0,)
         
         try:
-            results = self.db.execute_query(query, params)
+            results = self.db.execute_named(statement, params)
             notes = []
             for row in results:
                 notes.append(NoteModel(
@@ -150,28 +277,72 @@ class NoteRepository(INoteRepository):
         Returns:
             True jeśli zaktualizowano pomyślnie
         """
-        query = "UPDATE ERP.dbo.Notes SET Processed = 1 WHERE Id = ?"
         try:
-            self.db.execute_non_query(query, (note_id,))
-            logger.info(f"Notatka {note_id} oznaczona jako przetworzona")
+            self.db.execute_named_non_query("notes.mark_processed", (note_id,))
+            logger.info("Notatka %s oznaczona jako przetworzona", note_id)
             return True
         except Exception as e:
             logger.error(f"Błąd aktualizacji notatki {note_id}: {e}")
             return False
+    
+    def mark_many_as_processed(
+        self,
+        note_ids: List[int],
+        categories: Optional[Dict[int, str]] = None,
+        chunk_size: Optional[int] = None
+    ) -> int:
+        """
+        Oznacza wiele notatek jako przetworzone jednym wsadem (fast_executemany).
+        Zamiast osobnego UPDATE + commit dla każdej notatki, parametry wysyłane są
+        paczkami, a commit wykonywany jest co chunk_size wierszy.
+        
+        Args:
+            note_ids: Lista ID notatek
+            categories: Opcjonalna mapa note_id -> kategoria
+            chunk_size: Liczba wierszy na commit (domyślnie Config.DB_BATCH_SIZE)
+        
+        Returns:
+            Liczba oznaczonych notatek (przy błędzie - oznaczonych w paczkach zatwierdzonych przed nim)
+        """
+        # Usuń duplikaty zachowując kolejność
+        unique_ids = list(dict.fromkeys(note_ids))
+        if not unique_ids:
+            return 0
+        
+        try:
+            count = self.db.execute_named_many(
+                "notes.mark_processed",
+                [(note_id,) for note_id in unique_ids],
+                chunk_size=chunk_size or Config.DB_BATCH_SIZE
+            )
+            logger.info(f"Oznaczono {count} notatek jako przetworzone (wsadowo)")
+            return count
+        except PartialBatchError as e:
+            logger.error(
+                f"Błąd wsadowej aktualizacji {len(unique_ids)} notatek - "
+                f"zatwierdzono {e.committed} przed błędem: {e}"
+            )
+            return e.committed
+        except Exception as e:
+            logger.error(f"Błąd wsadowej aktualizacji {len(unique_ids)} notatek: {e}")
+            return 0
 
 class SampleRepository(ISampleRepository):
     """
     Repozytorium do operacji na próbkach.
     """
     
-    def __init__(self, db_connection: MSSQLConnection):
+    def __init__(self, db_connection: MSSQLConnection, task_repo: Optional[ITaskRepository] = None):
         """
         Inicjalizuje repozytorium z połączeniem do bazy.
         
         Args:
             db_connection: Instancja MSSQLConnection
+            task_repo: Repozytorium zadań aplikacji (wymagane przez get_followup_candidates -
+                       zadania nie są zapisywane w ERP, więc filtr nie może być częścią zapytania)
         """
         self.db = db_connection
+        self._task_repo = task_repo
     
     def get_samples_by_status(self, status: str) -> List[SampleModel]:
         """
@@ -183,13 +354,8 @@ class SampleRepository(ISampleRepository):
         Returns:
             Lista SampleModel
         """
-        query = """
-            SELECT Id, CustomerId, Status, DateSent, Notes
-            FROM ERP.dbo.Samples
-            WHERE Status = ?
-        """
         try:
-            results = self.db.execute_query(query, (status,))
+            results = self.db.execute_named("samples.by_status", (status,))
             samples = []
             for row in results:
                 samples.append(SampleModel(
@@ -203,4 +369,68 @@ class SampleRepository(ISampleRepository):
         except Exception as e:
             logger.error(f"Błąd pobierania próbek: {e}")
             return []
-
+    
+    def get_followup_candidates(
+        self,
+        date_from: datetime,
+        date_to: datetime,
+        status: str = "Sent"
+    ) -> Iterator[SampleFollowupCandidate]:
+        """
+        Zwraca próbki bez zadania z zadanego okna czasowego wraz z notatkami kandydującymi.
+        Okno dat i dopasowanie notatek wykonuje MSSQL; próbki z zadaniem (repozytorium zadań
+        aplikacji) są pomijane w trakcie czytania wyników.
+        Wyniki są czytane strumieniowo i grupowane po próbce - (Id, CustomerId, DateSent),
+        bo ID próbek z ERP nie zawsze są unikalne.
+        
+        Args:
+            date_from: Początek okna (data wysłania próbki)
+            date_to: Koniec okna (data wysłania próbki)
+            status: Status próbki (domyślnie 'Sent')
+        
+        Yields:
+            SampleFollowupCandidate dla każdej próbki
+        
+        Raises:
+            Exception: Błąd bazy w trakcie czytania - przerwany strumień nie może wyglądać na kompletny
+        """
+        if self._task_repo is None:
+            raise ValueError("Wyszukiwanie kandydatów follow-up wymaga repozytorium zadań")
+        existing_tasks = self._task_repo.get_sample_task_keys()
+        current: Optional[SampleFollowupCandidate] = None
+        current_key = None
+        skipped = False
+        try:
+            for row in self.db.iter_named("samples.followup_candidates", (status, date_from, date_to)):
+                key = (row[0], row[1], row[3])
+                if key != current_key:
+                    if current is not None:
+                        yield current
+                        current = None
+                    current_key = key
+                    skipped = (row[1], row[0]) in existing_tasks
+                    if skipped:
+                        continue
+                    current = SampleFollowupCandidate(sample=SampleModel(
+                        id=row[0],
+                        customer_id=row[1],
+                        status=row[2],
+                        date_sent=row[3],
+                        notes=row[4]
+                    ))
+                elif skipped:
+                    continue
+                # LEFT JOIN - próbka bez notatek ma NULL w kolumnach notatki
+                if row[5] is not None:
+                    current.notes.append(NoteModel(
+                        id=row[5],
+                        customer_id=row[1],
+                        content=row[6],
+                        created_at=row[7],
+                        is_processed=bool(row[8])
+                    ))
+            if current is not None:
+                yield current
+        except Exception as e:
+            logger.error(f"Błąd pobierania kandydatów do follow-upu: {e}")
+            raise
@@ -0,0 +1,113 @@
+"""
+Bezpieczny zapis plików: zapis do pliku tymczasowego w tym samym katalogu,
+opcjonalny fsync i atomowa podmiana (os.replace). Przerwanie w trakcie zapisu
+zostawia poprzednią, kompletną wersję pliku zamiast obciętej.
+"""
+import os
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Iterator, TextIO
+from company_lib.config import Config
+from company_lib.logger import setup_logger
+
+logger = setup_logger("AtomicFile")
+
+
+def _default_mode() -> int:
+    """Uprawnienia nowego pliku zgodne z umask (mkstemp tworzy pliki 0600)."""
+    umask = os.umask(0)
+    os.umask(umask)
+    return 0o666 & ~umask
+
+
+def _fsync_directory(directory: Path) -> None:
+    """Utrwala wpis katalogu po rename (bez tego podmiana może zniknąć po awarii zasilania)."""
+    if os.name != "posix":
+        return
+    fd = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+@contextmanager
+def atomic_write(
+    path: Path,
+    encoding: str = 'utf-8-sig',
+    newline: str = '',
+    fsync: bool = None
+) -> Iterator[TextIO]:
+    """
+    Otwiera plik tymczasowy do zapisu i po poprawnym zakończeniu bloku podmienia nim plik docelowy.
+    W razie wyjątku plik tymczasowy jest usuwany, a plik docelowy pozostaje nietknięty.
+    
+    Args:
+        path: Plik docelowy
+        encoding: Kodowanie (domyślnie utf-8-sig jak w plikach CSV z Excela)
+        newline: Parametr newline dla open() (domyślnie '' dla modułu csv)
+        fsync: Czy wymusić zapis na dysk przed podmianą (None = Config.CSV_FSYNC)
+    
+    Yields:
+        Otwarty plik tekstowy
+    """
+    path = Path(path)
+    fsync = Config.CSV_FSYNC if fsync is None else fsync
+    path.parent.mkdir(parents=True, exist_ok=True)
+    
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, mode='w', encoding=encoding, newline=newline) as f:
+            yield f
+            f.flush()
+            if fsync:
+                os.fsync(f.fileno())
+        os.chmod(tmp_name, path.stat().st_mode & 0o777 if path.exists() else _default_mode())
+        os.replace(tmp_name, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_name)
+        except OSError:
+            pass
+        raise
+    
+    if fsync:
+        _fsync_directory(path.parent)
+
+
+class GroupCommit:
+    """
+    Grupowanie wielu zmian w jeden zapis pliku.
+    Poza blokiem batch() każda zmiana zapisuje plik od razu (dotychczasowe zachowanie);
+    wewnątrz bloku zmiany tylko oznaczają plik jako brudny, a zapis następuje raz,
+    przy wyjściu z najbardziej zewnętrznego bloku (także po wyjątku - zmiany w pamięci już zaszły).
+    """
+    
+    def __init__(self, flush: Callable[[], None]):
+        """
+        Args:
+            flush: Funkcja zapisująca cały stan do pliku
+        """
+        self._flush = flush
+        self._depth = 0
+        self._dirty = False
+    
+    def changed(self) -> None:
+        """Zgłasza zmianę - zapis od razu albo przy końcu bloku batch()."""
+        if self._depth:
+            self._dirty = True
+        else:
+            self._flush()
+    
+    @contextmanager
+    def batch(self) -> Iterator[None]:
+        """Blok, w którym zmiany są zapisywane jednym przepisaniem pliku."""
+        self._depth += 1
+        try:
+            yield
+        finally:
+            self._depth -= 1
+            if self._depth == 0 and self._dirty:
+                self._dirty = False
+                self._flush()
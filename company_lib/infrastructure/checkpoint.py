@@ -0,0 +1,135 @@
+"""
+Punkty kontrolne uruchomień sample_followup: werdykt analizy każdej próbki (i ID utworzonego
+zadania) dopisywany na bieżąco do pliku JSON Lines <katalog>/<batch_id>.jsonl.
+Przerwane uruchomienie zostawia plik - kolejne wznawia ten sam batch_id, nie analizuje
+ponownie próbek z werdyktem i wysyła zadania, które nie trafiły jeszcze do wysłanego maila.
+Zakończone uruchomienie usuwa plik. Werdykty bez zadania starsze niż max_age są analizowane
+ponownie (klient mógł w tym czasie dodać notatki), a plik nieruszany dłużej niż max_age
+jest usuwany jako porzucony.
+
+Próbki identyfikuje para (customer_id, sample_id) - ID próbek z ERP nie są unikalne.
+
+Każdy wpis to jedno write() na pliku otwartym z O_APPEND, więc do jednego pliku mogą pisać
+procesy shardów. Zapis nie jest utrwalany fsync - przerwanie procesu nie gubi wpisów,
+utrata zasilania najwyżej wymusi ponowną analizę części próbek.
+"""
+import json
+import os
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+from company_lib.logger import setup_logger
+
+logger = setup_logger("Checkpoint")
+
+SUFFIX = ".jsonl"
+
+# Klucz próbki: (customer_id, sample_id)
+SampleKey = Tuple[str, int]
+
+
+class RunCheckpoint:
+    """Punkt kontrolny jednego uruchomienia (partii wysyłki batch_id)."""
+    
+    def __init__(self, directory: Path, batch_id: str):
+        """
+        Args:
+            directory: Katalog punktów kontrolnych
+            batch_id: ID partii wysyłki uruchomienia (nazwa pliku)
+        """
+        self.batch_id = batch_id
+        self.path = Path(directory) / f"{batch_id}{SUFFIX}"
+    
+    @classmethod
+    def find_unfinished(cls, directory: Path, max_age: timedelta) -> Optional["RunCheckpoint"]:
+        """
+        Zwraca najnowszy punkt kontrolny przerwanego (niezakończonego) uruchomienia.
+        Pliki nieruszane dłużej niż max_age są usuwane - takiego uruchomienia się nie wznawia.
+        
+        Args:
+            directory: Katalog punktów kontrolnych
+            max_age: Najdłuższy czas od ostatniego zapisu do pliku
+        
+        Returns:
+            RunCheckpoint lub None, jeśli wszystkie uruchomienia się zakończyły
+        """
+        directory = Path(directory)
+        if not directory.exists():
+            return None
+        oldest = (datetime.now() - max_age).timestamp()
+        fresh = []
+        for path in directory.glob(f"*{SUFFIX}"):
+            if path.stat().st_mtime >= oldest:
+                fresh.append(path)
+                continue
+            logger.warning("Usuwam porzucony punkt kontrolny %s (starszy niż %s)", path.name, max_age)
+            path.unlink(missing_ok=True)
+        if not fresh:
+            return None
+        newest = max(fresh, key=lambda path: path.stat().st_mtime)
+        return cls(directory, newest.name[:-len(SUFFIX)])
+    
+    def load(self, max_age: Optional[timedelta] = None) -> Dict[SampleKey, Dict[str, Any]]:
+        """
+        Wczytuje werdykty zapisane w punkcie kontrolnym.
+        Późniejszy wpis tej samej próbki (z ID zadania) zastępuje wcześniejszy;
+        niekompletny ostatni wiersz (przerwany zapis) jest pomijany i zamykany znakiem nowej
+        linii, żeby kolejny record() nie dokleił do niego swojego wpisu.
+        
+        Args:
+            max_age: Werdykty bez zadania przeanalizowane wcześniej (pole analyzed_at) są pomijane
+                - próbka zostanie przeanalizowana ponownie. Wpisy z zadaniem zostają zawsze
+                (zadanie jest już w repozytorium i czeka na mail). None = bez limitu.
+        
+        Returns:
+            Mapa (customer_id, sample_id) -> wpis (verdict, sample_date, analyzed_at i pola zadania)
+        """
+        entries: Dict[SampleKey, Dict[str, Any]] = {}
+        if not self.path.exists():
+            return entries
+        broken_tail = False
+        with open(self.path, mode='r', encoding='utf-8') as f:
+            for line_no, line in enumerate(f, start=1):
+                broken_tail = not line.endswith("\n")
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    logger.warning("Pomijam uszkodzony wpis %d w %s", line_no, self.path)
+                    continue
+                entries[(entry['customer_id'], entry['sample_id'])] = entry
+        if broken_tail:
+            self._append(b"\n")
+        if max_age is not None:
+            oldest = (datetime.now() - max_age).isoformat()
+            stale = [
+                key for key, entry in entries.items()
+                if entry['verdict'] != "task" and entry.get('analyzed_at', "") < oldest
+            ]
+            for key in stale:
+                del entries[key]
+            if stale:
+                logger.info("Pomijam %d werdyktów starszych niż %s - próbki zostaną przeanalizowane ponownie", len(stale), max_age)
+        return entries
+    
+    def record(self, entry: Dict[str, Any]) -> None:
+        """
+        Dopisuje wpis próbki (musi zawierać customer_id, sample_id i verdict).
+        
+        Args:
+            entry: Werdykt analizy, np. {"sample_id": 12, "customer_id": "CUST_001", "verdict": "received", ...}
+        """
+        self._append((json.dumps(entry, ensure_ascii=False) + "\n").encode('utf-8'))
+    
+    def _append(self, data: bytes) -> None:
+        """Dopisuje dane na końcu pliku jednym write() (O_APPEND)."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, data)
+        finally:
+            os.close(fd)
+    
+    def complete(self) -> None:
+        """Oznacza uruchomienie jako zakończone (usuwa plik punktu kontrolnego)."""
+        self.path.unlink(missing_ok=True)
+        logger.debug("Punkt kontrolny %s zamknięty", self.batch_id)
@@ -0,0 +1,327 @@
+"""
+Odczyt plików CSV do modeli dataclass z pozycyjnym mapowaniem kolumn.
+Duże pliki (np. wielogigabajtowe eksporty notatek) są mapowane do pamięci (mmap),
+dzielone na fragmenty na bezpiecznych granicach rekordów (z uwzględnieniem
+znaków nowej linii w polach w cudzysłowie) i parsowane równolegle w puli procesów.
+"""
+import csv
+import io
+import mmap
+import os
+from concurrent.futures import Executor
+from dataclasses import Field, fields
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Type
+from company_lib.logger import setup_logger
+
+logger = setup_logger("CSVReader")
+
+BOM = b'\xef\xbb\xbf'
+DATE_FORMATS = ['%Y-%m-%d', '%d.%m.%Y', '%Y-%m-%d %H:%M:%S', '%d.%m.%Y %H:%M:%S']
+QUOTE_COUNT_BLOCK = 64 * 1024 * 1024  # Blok zliczania cudzysłowów (ogranicza kopię z mmap)
+
+# Znacznik "pomiń pole" - dataclass użyje wartości domyślnej
+SKIP = object()
+
+RowPlan = List[Tuple[Field, Optional[int]]]
+
+
+def convert_value(field_info: Field, value: Optional[str]) -> Any:
+    """
+    Konwertuje string z CSV na typ pola dataclass.
+    
+    Args:
+        field_info: Definicja pola dataclass
+        value: Surowa wartość z CSV (None, jeśli kolumny brak w wierszu)
+    
+    Returns:
+        Przekonwertowana wartość lub SKIP, jeśli pole ma zostać pominięte
+    """
+    name = field_info.name
+    target_type = field_info.type
+    
+    if value is None or value == '':
+        # Sprawdź czy pole jest opcjonalne (Optional[...])
+        if hasattr(target_type, '__origin__') and target_type.__origin__ is type(None):
+            return None
+        # Pole z wartością domyślną albo wymagane bez wartości - pomijamy
+        # (brak wymaganego pola zgłosi konstruktor modelu)
+        return SKIP
+    
+    try:
+        if target_type == int:
+            return int(value)
+        if target_type == bool:
+            # Excel często zapisuje TRUE/FALSE albo 1/0
+            return value.lower() in ('true', '1', 'tak', 'yes', 't')
+        if target_type == datetime:
+            value_clean = value.strip()
+            # Szybka ścieżka dla formatów ISO (YYYY-MM-DD, YYYY-MM-DD HH:MM:SS) - strptime jest wielokrotnie wolniejsze
+            if len(value_clean) in (10, 19) and value_clean[4] == '-' and (len(value_clean) == 10 or value_clean[10] == ' '):
+                try:
+                    return datetime.fromisoformat(value_clean)
+                except ValueError:
+                    pass
+            # Próbuj różne formaty daty
+            for date_format in DATE_FORMATS:
+                try:
+                    return datetime.strptime(value_clean, date_format)
+                except ValueError:
+                    continue
+            logger.warning("Nie można sparsować daty '%s' dla pola %s", value, name)
+            return SKIP
+        if hasattr(target_type, '__origin__') and target_type.__origin__ is type(None):
+            # Optional[Type] - weź typ wewnętrzny
+            inner_type = target_type.__args__[0]
+            if inner_type == int:
+                return int(value) if value else None
+            return value
+        # String lub inny typ - zostaje jak jest
+        return value
+    except (ValueError, TypeError) as e:
+        logger.warning("Błąd konwersji wartości '%s' dla pola %s na typ %s: %s", value, name, target_type, e)
+        return SKIP
+
+
+def build_row_plan(model_cls: Type, header: List[str]) -> RowPlan:
+    """
+    Wyznacza raz na plik pozycję kolumny dla każdego pola modelu.
+    
+    Args:
+        model_cls: Klasa modelu (dataclass)
+        header: Nagłówek CSV
+    
+    Returns:
+        Lista (pole, indeks kolumny lub None, jeśli kolumny brak w pliku)
+    """
+    positions = {name: index for index, name in enumerate(header)}
+    return [(field_info, positions.get(field_info.name)) for field_info in fields(model_cls)]
+
+
+def map_values(values: List[str], plan: RowPlan) -> Dict[str, Any]:
+    """Mapuje wiersz (listę wartości) na słownik argumentów modelu według planu kolumn."""
+    data = {}
+    row_length = len(values)
+    for field_info, index in plan:
+        value = values[index] if index is not None and index < row_length else None
+        converted = convert_value(field_info, value)
+        if converted is not SKIP:
+            data[field_info.name] = converted
+    return data
+
+
+def parse_rows(
+    rows: Iterable[List[str]],
+    model_cls: Type,
+    plan: RowPlan,
+    file_name: str,
+    first_row: int = 2,
+    location: str = ""
+) -> List[Any]:
+    """
+    Tworzy obiekty modelu z wierszy CSV; błędne wiersze są logowane i pomijane.
+    
+    Args:
+        rows: Wiersze jako listy wartości (bez nagłówka)
+        model_cls: Klasa modelu
+        plan: Plan kolumn z build_row_plan
+        file_name: Nazwa pliku (do komunikatów)
+        first_row: Numer pierwszego wiersza (do komunikatów)
+        location: Dodatkowy opis położenia w pliku (do komunikatów)
+    """
+    results = []
+    for row_num, values in enumerate(rows, start=first_row):
+        if not values:
+            continue
+        typed_data = None
+        try:
+            typed_data = map_values(values, plan)
+            results.append(model_cls(**typed_data))
+        except TypeError as e:
+            # Błąd przy tworzeniu obiektu - brakuje wymaganych argumentów
+            logger.warning("Błąd tworzenia obiektu z wiersza %s%s w %s: %s", row_num, location, file_name, e)
+            logger.debug("Zawartość wiersza: %s, typed_data: %s", values, typed_data if typed_data is not None else 'brak')
+        except Exception as e:
+            logger.warning("Błąd parsowania wiersza %s%s w %s: %s", row_num, location, file_name, e)
+            logger.debug("Zawartość wiersza: %s", values)
+    return results
+
+
+def read_csv(file_path: Path, model_cls: Type, delimiter: str = ';') -> List[Any]:
+    """Sekwencyjny odczyt CSV (csv.reader + mapowanie pozycyjne zamiast DictReader)."""
+    # utf-8-sig usuwa BOM (krzaczki na początku pliku z Excela)
+    with open(file_path, mode='r', encoding='utf-8-sig', newline='') as f:
+        reader = csv.reader(f, delimiter=delimiter)
+        header = next(reader, None)
+        if header is None:
+            return []
+        plan = build_row_plan(model_cls, header)
+        return parse_rows(reader, model_cls, plan, Path(file_path).name)
+
+
+def _count_quotes(file_path: str, start: int, end: int) -> int:
+    """Zlicza cudzysłowy w zakresie bajtów pliku (uruchamiane w procesie roboczym)."""
+    count = 0
+    with open(file_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        for block_start in range(start, end, QUOTE_COUNT_BLOCK):
+            count += mm[block_start:min(block_start + QUOTE_COUNT_BLOCK, end)].count(b'"')
+    return count
+
+
+def _find_record_start(mm: mmap.mmap, position: int, in_quotes: bool, end: int) -> int:
+    """
+    Zwraca początek pierwszego rekordu od pozycji position: bajt po znaku nowej linii,
+    który nie leży wewnątrz pola w cudzysłowie. in_quotes to stan na pozycji startowej.
+    """
+    while position < end:
+        newline = mm.find(b'\n', position, end)
+        if newline == -1:
+            return end
+        quote = mm.find(b'"', position, newline)
+        if quote == -1:
+            if not in_quotes:
+                return newline + 1
+            position = newline + 1
+            continue
+        # Podwojony cudzysłów ("") przełącza stan dwa razy, więc parzystość pozostaje poprawna
+        in_quotes = not in_quotes
+        position = quote + 1
+    return end
+
+
+def split_records(
+    file_path: Path,
+    chunks: int,
+    executor: Executor,
+    delimiter: str = ';'
+) -> Tuple[List[str], List[Tuple[int, int]]]:
+    """
+    Dzieli plik na fragmenty zaczynające się na początku rekordu.
+    Stan "wewnątrz cudzysłowu" w punkcie podziału wynika z parzystości liczby cudzysłowów
+    przed tym punktem - zliczanie wykonują równolegle procesy robocze.
+    
+    Returns:
+        Krotka (nagłówek, lista zakresów bajtów (start, end) dla fragmentów danych)
+    """
+    with open(file_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        size = len(mm)
+        data_start = len(BOM) if mm[:len(BOM)] == BOM else 0
+        header_end = _find_record_start(mm, data_start, False, size)
+        header_line = mm[data_start:header_end].decode('utf-8')
+        
+        raw_bounds = [header_end + (size - header_end) * i // chunks for i in range(chunks)] + [size]
+        quote_counts = list(executor.map(
+            _count_quotes,
+            [str(file_path)] * chunks,
+            raw_bounds[:-1],
+            raw_bounds[1:]
+        ))
+        
+        bounds = [header_end]
+        quotes_before = 0
+        for i in range(1, chunks):
+            quotes_before += quote_counts[i - 1]
+            bounds.append(max(bounds[-1], _find_record_start(mm, raw_bounds[i], quotes_before % 2 == 1, size)))
+        bounds.append(size)
+    
+    header = next(csv.reader([header_line.rstrip('\r\n')], delimiter=delimiter), [])
+    ranges = [(start, end) for start, end in zip(bounds[:-1], bounds[1:]) if end > start]
+    return header, ranges
+
+
+def read_header(file_path: Path, delimiter: str = ';') -> List[str]:
+    """Czyta nagłówek pliku CSV (pierwszy rekord)."""
+    with open(file_path, mode='r', encoding='utf-8-sig', newline='') as f:
+        return next(csv.reader(f, delimiter=delimiter), [])
+
+
+def complete_records_end(data: bytes) -> int:
+    """
+    Zwraca długość prefiksu data złożonego z pełnych rekordów (do ostatniego znaku nowej linii
+    poza cudzysłowem). data musi zaczynać się na początku rekordu. Ostatni, niedokończony
+    rekord (np. w trakcie dopisywania przez inny program) zostaje na kolejny odczyt.
+    """
+    end = 0
+    position = 0
+    in_quotes = False
+    while True:
+        newline = data.find(b'\n', position)
+        if newline == -1:
+            return end
+        quotes = data.count(b'"', position, newline)
+        in_quotes = in_quotes != (quotes % 2 == 1)
+        if not in_quotes:
+            end = newline + 1
+        position = newline + 1
+
+
+def parse_bytes(
+    data: bytes,
+    model_cls: Type,
+    header: List[str],
+    delimiter: str,
+    file_name: str,
+    location: str = ""
+) -> List[Any]:
+    """Parsuje fragment pliku (pełne rekordy, bez nagłówka) do listy modeli."""
+    reader = csv.reader(io.StringIO(data.decode('utf-8'), newline=''), delimiter=delimiter)
+    plan = build_row_plan(model_cls, header)
+    return parse_rows(reader, model_cls, plan, file_name, first_row=1, location=location)
+
+
+def _parse_chunk(
+    file_path: str,
+    start: int,
+    end: int,
+    model_cls: Type,
+    delimiter: str,
+    header: List[str]
+) -> List[Any]:
+    """Parsuje fragment pliku [start, end) do listy modeli (uruchamiane w procesie roboczym)."""
+    with open(file_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        data = mm[start:end]
+    return parse_bytes(
+        data, model_cls, header, delimiter, Path(file_path).name,
+        location=f" (fragment od bajtu {start})"
+    )
+
+
+def read_csv_parallel(
+    file_path: Path,
+    model_cls: Type,
+    delimiter: str = ';',
+    workers: Optional[int] = None
+) -> List[Any]:
+    """
+    Równoległy odczyt dużego pliku CSV: mmap, podział na granicach rekordów,
+    parsowanie fragmentów w puli procesów i scalenie wyników w kolejności pliku.
+    
+    Args:
+        file_path: Ścieżka do pliku CSV
+        model_cls: Klasa modelu (dataclass, importowalna w procesach roboczych)
+        delimiter: Separator w CSV
+        workers: Liczba procesów (None = liczba rdzeni)
+    
+    Returns:
+        Lista obiektów modelu
+    """
+    workers = workers or os.cpu_count() or 1
+    if os.path.getsize(file_path) == 0:
+        return []
+    
+    # Import na żądanie - multiprocessing jest potrzebny tylko dla dużych plików
+    from concurrent.futures import ProcessPoolExecutor
+    
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        header, ranges = split_records(file_path, workers, executor, delimiter)
+        futures = [
+            executor.submit(_parse_chunk, str(file_path), start, end, model_cls, delimiter, header)
+            for start, end in ranges
+        ]
+        results = []
+        for future in futures:
+            results.extend(future.result())
+    
+    logger.info(f"Wczytano równolegle {len(results)} rekordów z {Path(file_path).name} ({len(ranges)} fragmentów)")
+    return results
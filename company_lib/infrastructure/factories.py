@@ -1,9 +1,12 @@
 """
-Fabryka repozytoriów - decyduje czy użyć SQL czy CSV na podstawie konfiguracji.
+Fabryka repozytoriów - decyduje czy użyć SQL, CSV czy SQLite na podstawie konfiguracji (Config.DATA_BACKEND).
 """
+import functools
+import os
 from pathlib import Path
 from company_lib.config import Config
 from company_lib.core.database import MSSQLConnection
+from company_lib.core.profiling import traced
 from company_lib.domain.repositories import (
     CustomerRepository,
     NoteRepository,
@@ -12,12 +15,65 @@ from company_lib.domain.repositories import (
 from company_lib.infrastructure.repo_csv import (
     CsvCustomerRepository,
     CsvNoteRepository,
-    CsvSampleRepository
+    CsvSampleRepository,
+    CsvTaskRepository,
+    CsvMailLogRepository
+)
+from company_lib.infrastructure.repo_sqlite import (
+    SQLiteDatabase,
+    SqliteCustomerRepository,
+    SqliteNoteRepository,
+    SqliteSampleRepository,
+    SqliteTaskRepository,
+    SqliteMailLogRepository
 )
 from company_lib.logger import setup_logger
 
 logger = setup_logger("RepositoryFactory")
 
+_sqlite_db = None
+
+def _reset_after_fork() -> None:
+    """Proces potomny otwiera własne połączenie SQLite - połączenia nie wolno używać w dwóch procesach."""
+    global _sqlite_db
+    _sqlite_db = None
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+def _traced_result(*prefixes: str):
+    """
+    Opakowuje repozytoria zwracane przez fabrykę pomiarem czasu wywołań
+    (tylko gdy Config.PROFILE zawiera "spans"; inaczej zwraca je bez zmian).
+    
+    Args:
+        *prefixes: Prefiks pomiarów dla zwracanego repozytorium (lub każdego elementu krotki)
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            result = func(*args, **kwargs)
+            if len(prefixes) == 1:
+                return traced(result, prefixes[0])
+            return tuple(traced(repo, prefix) for repo, prefix in zip(result, prefixes))
+        return wrapper
+    return decorator
+
+def get_sqlite_database() -> SQLiteDatabase:
+    """
+    Zwraca współdzielone połączenie z lokalną bazą SQLite (Config.SQLITE_PATH).
+    Wszystkie repozytoria SQLite korzystają z jednego połączenia, więc mogą dzielić transakcje.
+    
+    Returns:
+        SQLiteDatabase
+    """
+    global _sqlite_db
+    if _sqlite_db is None:
+        logger.info(f"Używam bazy SQLite: {Config.SQLITE_PATH}")
+        _sqlite_db = SQLiteDatabase(Config.SQLITE_PATH)
+    return _sqlite_db
+
+@_traced_result("repo.customers")
 def get_customer_repository(note_repo=None, sample_repo=None):
     """
     Tworzy repozytorium klientów (SQL lub CSV) na podstawie konfiguracji.
@@ -29,7 +85,9 @@ def get_customer_repository(note_repo=None, sample_repo=None):
     Returns:
         ICustomerRepository - implementacja repozytorium klientów
     """
-    if Config.USE_MOCK_DATA:
+    if Config.DATA_BACKEND == "sqlite":
+        return SqliteCustomerRepository(get_sqlite_database())
+    elif Config.DATA_BACKEND == "csv":
         if not Config.MOCK_DIR:
             raise ValueError("USE_MOCK_DATA=True, ale katalog data/mocks nie istnieje")
         csv_path = Config.MOCK_DIR / "customers.csv"
@@ -40,6 +98,7 @@ def get_customer_repository(note_repo=None, sample_repo=None):
         db = MSSQLConnection(Config.DB_STRING)
         return CustomerRepository(db)
 
+@_traced_result("repo.notes")
 def get_note_repository():
     """
     Tworzy repozytorium notatek (SQL lub CSV) na podstawie konfiguracji.
@@ -47,7 +106,9 @@ def get_note_repository():
     Returns:
         INoteRepository - implementacja repozytorium notatek
     """
-    if Config.USE_MOCK_DATA:
+    if Config.DATA_BACKEND == "sqlite":
+        return SqliteNoteRepository(get_sqlite_database())
+    elif Config.DATA_BACKEND == "csv":
         if not Config.MOCK_DIR:
             raise ValueError("USE_MOCK_DATA=True, ale katalog data/mocks nie istnieje")
         csv_path = Config.MOCK_DIR / "notes.csv"
@@ -58,40 +119,95 @@ def get_note_repository():
         db = MSSQLConnection(Config.DB_STRING)
         return NoteRepository(db)
 
+@_traced_result("repo.samples")
 def get_sample_repository():
     """
     Tworzy repozytorium próbek (SQL lub CSV) na podstawie konfiguracji.
+    Repozytorium dostaje repozytorium zadań (i w trybie CSV notatek) potrzebne do wyszukiwania
+    kandydatów follow-up.
     
     Returns:
         ISampleRepository - implementacja repozytorium próbek
     """
-    if Config.USE_MOCK_DATA:
+    if Config.DATA_BACKEND == "sqlite":
+        return SqliteSampleRepository(get_sqlite_database())
+    elif Config.DATA_BACKEND == "csv":
         if not Config.MOCK_DIR:
             raise ValueError("USE_MOCK_DATA=True, ale katalog data/mocks nie istnieje")
         csv_path = Config.MOCK_DIR / "samples.csv"
         logger.info(f"Używam CSV repozytorium: {csv_path}")
-        return CsvSampleRepository(csv_path)
+        return CsvSampleRepository(
+            csv_path,
+            note_repo=CsvNoteRepository(Config.MOCK_DIR / "notes.csv"),
+            task_repo=get_task_repository()
+        )
     else:
         logger.info("Używam SQL repozytorium")
         db = MSSQLConnection(Config.DB_STRING)
-        return SampleRepository(db)
+        return SampleRepository(db, task_repo=get_task_repository())
 
-def get_all_repositories():
+@_traced_result("repo.tasks")
+def get_task_repository():
+    """
+    Tworzy repozytorium zadań.
+    Zadania przechowywane są w SQLite (backend "sqlite") albo w CSV (pozostałe tryby).
+    
+    Returns:
+        ITaskRepository - implementacja repozytorium zadań
+    """
+    if Config.DATA_BACKEND == "sqlite":
+        return SqliteTaskRepository(get_sqlite_database())
+    if not Config.MOCK_DIR:
+        raise ValueError("MOCK_DIR nie jest skonfigurowany")
+    return CsvTaskRepository(Config.MOCK_DIR / "tasks.csv")
+
+@_traced_result("repo.mail_logs")
+def get_mail_log_repository():
+    """
+    Tworzy repozytorium logów maili.
+    Logi przechowywane są w SQLite (backend "sqlite") albo w CSV (pozostałe tryby).
+    
+    Returns:
+        IMailLogRepository - implementacja repozytorium logów maili
+    """
+    if Config.DATA_BACKEND == "sqlite":
+        return SqliteMailLogRepository(get_sqlite_database())
+    if not Config.MOCK_DIR:
+        raise ValueError("MOCK_DIR nie jest skonfigurowany")
+    return CsvMailLogRepository(Config.MOCK_DIR / "mail_logs.csv")
+
+@_traced_result("repo.customers", "repo.notes", "repo.samples")
+def get_all_repositories(task_repo=None):
     """
     Tworzy wszystkie repozytoria jednocześnie.
     W trybie SQL używa tego samego połączenia do bazy.
-    W trybie CSV, repozytoria są powiązane dla statystyk.
+    W trybie CSV, repozytoria są powiązane dla statystyk i wyszukiwania kandydatów follow-up.
+    
+    Args:
+        task_repo: Repozytorium zadań używane przez repozytorium próbek do pomijania próbek
+                   z zadaniem (None = nowe z get_task_repository)
     
     Returns:
         Tuple (CustomerRepository, NoteRepository, SampleRepository)
     """
-    if Config.USE_MOCK_DATA:
+    if Config.DATA_BACKEND == "sqlite":
+        db = get_sqlite_database()
+        return (
+            SqliteCustomerRepository(db),
+            SqliteNoteRepository(db),
+            SqliteSampleRepository(db)
+        )
+    elif Config.DATA_BACKEND == "csv":
         if not Config.MOCK_DIR:
             raise ValueError("USE_MOCK_DATA=True, ale katalog data/mocks nie istnieje")
         logger.info("Używam CSV repozytoriów")
         # Tworzymy najpierw note i sample, potem customer z referencjami
         note_repo = CsvNoteRepository(Config.MOCK_DIR / "notes.csv")
-        sample_repo = CsvSampleRepository(Config.MOCK_DIR / "samples.csv")
+        sample_repo = CsvSampleRepository(
+            Config.MOCK_DIR / "samples.csv",
+            note_repo=note_repo,
+            task_repo=task_repo if task_repo is not None else get_task_repository()
+        )
         customer_repo = CsvCustomerRepository(
             Config.MOCK_DIR / "customers.csv",
             note_repo=note_repo,
@@ -104,6 +220,6 @@ def get_all_repositories():
         return (
             CustomerRepository(db),
             NoteRepository(db),
-            SampleRepository(db)
+            SampleRepository(db, task_repo=task_repo if task_repo is not None else get_task_repository())
         )
 
@@ -0,0 +1,98 @@
+"""
+Doradcze blokady plików między procesami (fcntl.flock): współdzielona do odczytu,
+wyłączna do zapisu. Blokowany jest osobny plik <nazwa>.lock obok pliku danych,
+bo atomowy zapis (rename) podmienia i-węzeł samego pliku danych.
+Na systemach bez fcntl (Windows) blokady są pomijane.
+"""
+import os
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator, Optional, Tuple
+from company_lib.logger import setup_logger
+
+try:
+    import fcntl
+except ImportError:  # Windows - brak blokad doradczych
+    fcntl = None
+
+logger = setup_logger("FileLock")
+
+FileStamp = Optional[Tuple[int, int, int]]
+
+
+def file_stamp(path: Path) -> FileStamp:
+    """
+    Zwraca sygnaturę wersji pliku (i-węzeł, mtime w ns, rozmiar) lub None, jeśli plik nie istnieje.
+    Zmiana sygnatury oznacza, że plik został zapisany przez inny proces.
+    """
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+
+class FileLock:
+    """
+    Blokada pliku danych: shared() dla czytelników, exclusive() dla pisarza.
+    Zagnieżdżone wywołania w tym samym procesie używają już trzymanej blokady
+    (exclusive() wewnątrz shared() podnosi ją do wyłącznej na czas bloku).
+    """
+    
+    def __init__(self, path: Path):
+        """
+        Args:
+            path: Ścieżka do pliku danych (blokowany jest plik <path>.lock)
+        """
+        self.lock_path = Path(path).with_name(Path(path).name + ".lock")
+        self._guard = threading.RLock()
+        self._fd: Optional[int] = None
+        self._mode: Optional[int] = None
+        self._depth = 0
+    
+    @contextmanager
+    def shared(self) -> Iterator[None]:
+        """Blokada współdzielona - wielu czytelników naraz, bez pisarza."""
+        with self._hold(fcntl.LOCK_SH if fcntl else None):
+            yield
+    
+    @contextmanager
+    def exclusive(self) -> Iterator[None]:
+        """Blokada wyłączna - jeden pisarz, bez czytelników."""
+        with self._hold(fcntl.LOCK_EX if fcntl else None):
+            yield
+    
+    @contextmanager
+    def _hold(self, mode: Optional[int]) -> Iterator[None]:
+        if mode is None:
+            yield
+            return
+        
+        with self._guard:
+            previous_mode = self._mode
+            if self._depth == 0:
+                if not self.lock_path.parent.exists():
+                    if mode == fcntl.LOCK_SH:
+                        # Brak katalogu = brak pliku danych, nie ma czego chronić przy odczycie
+                        yield
+                        return
+                    self.lock_path.parent.mkdir(parents=True, exist_ok=True)
+                self._fd = os.open(self.lock_path, os.O_RDWR | os.O_CREAT, 0o666)
+            if previous_mode != fcntl.LOCK_EX and previous_mode != mode:
+                fcntl.flock(self._fd, mode)
+                self._mode = mode
+            self._depth += 1
+            try:
+                yield
+            finally:
+                self._depth -= 1
+                if self._depth == 0:
+                    fcntl.flock(self._fd, fcntl.LOCK_UN)
+                    os.close(self._fd)
+                    self._fd = None
+                    self._mode = None
+                elif self._mode != previous_mode:
+                    # Powrót z podniesionej blokady do współdzielonej
+                    fcntl.flock(self._fd, previous_mode)
+                    self._mode = previous_mode
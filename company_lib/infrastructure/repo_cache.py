@@ -0,0 +1,76 @@
+"""
+Warstwa cache (identity map) dla repozytoriów.
+Opakowuje dowolną implementację interfejsu i deduplikuje odczyty w ramach jednego uruchomienia.
+"""
+from typing import Dict, List, Optional
+from company_lib.domain.interfaces import ICustomerRepository
+from company_lib.domain.models import CustomerModel
+from company_lib.logger import setup_logger
+
+logger = setup_logger("RepositoryCache")
+
+class CachedCustomerRepository(ICustomerRepository):
+    """
+    Repozytorium klientów z mapą tożsamości (identity map).
+    Każdy klient pobierany jest z repozytorium źródłowego co najwyżej raz,
+    kolejne odczyty zwracają ten sam obiekt. Zapamiętywane są też braki (None),
+    żeby nie odpytywać ponownie o nieistniejących klientów.
+    Instancję należy tworzyć na czas jednego uruchomienia skryptu.
+    """
+    
+    def __init__(self, inner: ICustomerRepository):
+        """
+        Inicjalizuje cache.
+        
+        Args:
+            inner: Repozytorium źródłowe (SQL lub CSV)
+        """
+        self.inner = inner
+        self._identity_map: Dict[str, Optional[CustomerModel]] = {}
+        self.hits = 0
+        self.misses = 0
+    
+    def get_customer_by_id(self, customer_id: str) -> Optional[CustomerModel]:
+        """Pobiera klienta po ID (z cache lub z repozytorium źródłowego)."""
+        if customer_id in self._identity_map:
+            self.hits += 1
+            return self._identity_map[customer_id]
+        
+        self.misses += 1
+        customer = self.inner.get_customer_by_id(customer_id)
+        self._identity_map[customer_id] = customer
+        return customer
+    
+    def get_customers_by_ids(self, customer_ids: List[str]) -> Dict[str, CustomerModel]:
+        """
+        Pobiera wielu klientów naraz. Z repozytorium źródłowego pobierani są
+        tylko klienci, których jeszcze nie ma w cache - jednym wywołaniem.
+        """
+        unique_ids = [cid for cid in dict.fromkeys(customer_ids) if cid]
+        missing = [cid for cid in unique_ids if cid not in self._identity_map]
+        self.hits += len(unique_ids) - len(missing)
+        
+        if missing:
+            self.misses += len(missing)
+            fetched = self.inner.get_customers_by_ids(missing)
+            for cid in missing:
+                self._identity_map[cid] = fetched.get(cid)
+            logger.debug(f"Pobrano {len(fetched)} z {len(missing)} brakujących klientów")
+        
+        return {
+            cid: self._identity_map[cid]
+            for cid in unique_ids
+            if self._identity_map.get(cid) is not None
+        }
+    
+    def get_customer_stats(self, customer_id: str) -> dict:
+        """Pobiera statystyki klienta (bez cache - dane zmienne)."""
+        return self.inner.get_customer_stats(customer_id)
+    
+    def get_all_customer_stats(self) -> Dict[str, dict]:
+        """Pobiera statystyki wszystkich klientów (bez cache)."""
+        return self.inner.get_all_customer_stats()
+    
+    def clear_cache(self):
+        """Czyści mapę tożsamości."""
+        self._identity_map.clear()
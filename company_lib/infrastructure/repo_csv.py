@@ -3,10 +3,21 @@ Implementacje repozytoriów działające na plikach CSV.
 Używane w fazie prototypowania i testach jednostkowych.
 """
 import csv
-from typing import Type, List, TypeVar, Optional, Dict, Any
+import hashlib
+import os
+import threading
+import time
+from collections import Counter
+from typing import Type, List, TypeVar, Optional, Dict, Any, Iterator, Set, Tuple
 from dataclasses import fields
 from pathlib import Path
 from datetime import datetime
+from company_lib.config import Config
+from company_lib.infrastructure.atomic_file import atomic_write, GroupCommit
+from company_lib.infrastructure.file_lock import FileLock, FileStamp, file_stamp
+from company_lib.infrastructure.csv_reader import (
+    read_csv, read_csv_parallel, build_row_plan, map_values, read_header, parse_bytes, complete_records_end
+)
 from company_lib.domain.interfaces import (
     ICustomerRepository,
     INoteRepository,
@@ -14,12 +25,18 @@ from company_lib.domain.interfaces import (
     ITaskRepository,
     IMailLogRepository
 )
-from company_lib.domain.models import NoteModel, SampleModel, CustomerModel, TaskModel, MailLogModel
+from company_lib.domain.models import (
+    NoteModel, SampleModel, CustomerModel, TaskModel, MailLogModel, SampleFollowupCandidate
+)
 from company_lib.logger import setup_logger
 
 logger = setup_logger("CSVRepositories")
 T = TypeVar('T')
 
+# Liczba bajtów z początku i z końca wczytanej części pliku, z których liczony jest odcisk
+# (niezmieniony odcisk + większy rozmiar = do pliku tylko dopisano wiersze)
+FINGERPRINT_BYTES = 64 * 1024
+
 class CsvGenericRepository:
     """
     Generyczna klasa bazowa do czytania CSV i mapowania na modele.
@@ -39,6 +56,12 @@ class CsvGenericRepository:
         self.model_cls = model_cls
         self.delimiter = delimiter
         self._cache: Optional[List[T]] = None
+        # Blokada między procesami i sygnatura wczytanej wersji pliku (do unieważniania cache)
+        self._lock = FileLock(file_path)
+        self._stamp: FileStamp = None
+        # Koniec wczytanej części pliku i jej odcisk - do doczytywania dopisanych wierszy
+        self._tail_offset = 0
+        self._fingerprint: Optional[bytes] = None
     
     def load_all(self) -> List[T]:
         """
@@ -50,54 +73,16 @@ class CsvGenericRepository:
         if self._cache is not None:
             return self._cache
         
-        results = []
         try:
-            # utf-8-sig usuwa BOM (krzaczki na początku pliku z Excela)
-            with open(self.file_path, mode='r', encoding='utf-8-sig') as f:
-                reader = csv.DictReader(f, delimiter=self.delimiter)
-                
-                for row_num, row in enumerate(reader, start=2):  # Start od 2 (nagłówek to 1)
-                    try:
-                        # Konwertujemy surowy wiersz (strings) na typy z modelu
-                        typed_data = self._map_row_to_types(row)
-                        
-                        # Sprawdź czy wszystkie wymagane pola są obecne
-                        # Pole jest wymagane jeśli nie ma default i nie jest Optional
-                        required_fields = []
-                        for field_info in fields(self.model_cls):
-                            # Sprawdź czy pole ma wartość domyślną
-                            has_default = (
-                                field_info.default is not field_info.default_factory
-                                or (hasattr(field_info, 'default') and field_info.default is not None)
-                                or (hasattr(field_info, 'default_factory') and field_info.default_factory is not None)
-                            )
-                            # Sprawdź czy pole jest opcjonalne
-                            is_optional = (
-                                hasattr(field_info.type, '__origin__') 
-                                and field_info.type.__origin__ is type(None)
-                            )
-                            
-                            if not has_default and not is_optional:
-                                required_fields.append(field_info.name)
-                        
-                        missing_fields = [f for f in required_fields if f not in typed_data]
-                        if missing_fields:
-                            logger.warning(
-                                f"Wiersz {row_num} w {self.file_path.name}: brakuje wymaganych pól: {missing_fields}. "
-                                f"Pomijam wiersz."
-                            )
-                            continue
-                        
-                        results.append(self.model_cls(**typed_data))
-                    except TypeError as e:
-                        # Błąd przy tworzeniu obiektu - brakuje wymaganych argumentów
-                        logger.warning(f"Błąd tworzenia obiektu z wiersza {row_num} w {self.file_path.name}: {e}")
-                        logger.debug(f"Zawartość wiersza: {row}, typed_data: {typed_data if 'typed_data' in locals() else 'brak'}")
-                        continue
-                    except Exception as e:
-                        logger.warning(f"Błąd parsowania wiersza {row_num} w {self.file_path.name}: {e}")
-                        logger.debug(f"Zawartość wiersza: {row}")
-                        continue
+            # Blokada współdzielona - inny proces nie podmieni pliku w trakcie odczytu
+            with self._lock.shared():
+                stamp = file_stamp(self.file_path)
+                if self._use_parallel_reader():
+                    results = read_csv_parallel(
+                        self.file_path, self.model_cls, self.delimiter, workers=Config.CSV_WORKERS or None
+                    )
+                else:
+                    results = read_csv(self.file_path, self.model_cls, self.delimiter)
         except FileNotFoundError:
             logger.error(f"Nie znaleziono pliku: {self.file_path}")
             return []
@@ -106,8 +91,134 @@ class CsvGenericRepository:
             return []
         
         self._cache = results
+        self._remember_version(stamp)
         return results
     
+    def _remember_version(self, stamp: FileStamp) -> None:
+        """Zapamiętuje wersję pliku odpowiadającą zawartości cache."""
+        self._stamp = stamp
+        self._tail_offset = stamp[2] if stamp else 0
+        self._fingerprint = self._compute_fingerprint(self._tail_offset) if stamp else None
+    
+    def _compute_fingerprint(self, offset: int) -> bytes:
+        """Odcisk początku i końca pierwszych offset bajtów pliku (stały koszt niezależny od rozmiaru)."""
+        with open(self.file_path, 'rb') as f:
+            head = f.read(min(offset, FINGERPRINT_BYTES))
+            f.seek(max(0, offset - FINGERPRINT_BYTES))
+            tail = f.read(min(offset, FINGERPRINT_BYTES))
+        return hashlib.blake2b(head + tail, digest_size=16).digest()
+    
+    def refresh(self) -> bool:
+        """
+        Aktualizuje dane, jeśli plik zmienił się od ostatniego odczytu
+        (porównanie i-węzła, mtime i rozmiaru z wersją wczytaną do cache).
+        Dopisane wiersze są doczytywane z końca pliku, przepisany plik - wczytywany ponownie.
+        
+        Returns:
+            True jeśli dane zostały zaktualizowane
+        """
+        return self._sync() is not None
+    
+    def poll_new_records(self) -> List[T]:
+        """
+        Zwraca rekordy, które pojawiły się w pliku od ostatniego odczytu.
+        Gdy plik tylko urósł (odcisk wczytanej części bez zmian), parsowany jest sam dopisany fragment;
+        po przepisaniu pliku następuje pełne przeładowanie i zwracane są rekordy o nowych ID.
+        """
+        return self._sync() or []
+    
+    def watch(self, interval: float = 5.0, stop_event: Optional[threading.Event] = None) -> Iterator[List[T]]:
+        """
+        Obserwuje plik i zwraca kolejne porcje nowych rekordów (np. nowych notatek) w pętli.
+        Sprawdzenie niezmienionego pliku to jedno wywołanie stat().
+        
+        Args:
+            interval: Odstęp między sprawdzeniami w sekundach
+            stop_event: Opcjonalne zdarzenie kończące obserwację
+        
+        Yields:
+            Listy nowych rekordów (tylko niepuste)
+        """
+        while stop_event is None or not stop_event.is_set():
+            new_records = self.poll_new_records()
+            if new_records:
+                yield new_records
+            if stop_event is not None:
+                stop_event.wait(interval)
+            else:
+                time.sleep(interval)
+    
+    def _sync(self) -> Optional[List[T]]:
+        """
+        Synchronizuje cache z plikiem.
+        
+        Returns:
+            None jeśli plik się nie zmienił, w przeciwnym razie lista nowych rekordów
+        """
+        if self._cache is None or file_stamp(self.file_path) == self._stamp:
+            return None
+        
+        with self._lock.shared():
+            stamp = file_stamp(self.file_path)
+            if self._is_append(stamp):
+                new_records = self._read_tail()
+                self._stamp = stamp
+                if new_records:
+                    self._cache.extend(new_records)
+                    self._on_append(new_records)
+                    logger.info(f"Doczytano {len(new_records)} nowych rekordów z {self.file_path.name}")
+                return new_records
+            
+            logger.info(f"Plik {self.file_path.name} został przepisany przez inny proces - przeładowuję")
+            previous_ids = {getattr(obj, 'id', None) for obj in self._cache}
+            self._cache = None
+            objects = self.load_all()
+            self._on_reload(objects)
+            return [obj for obj in objects if getattr(obj, 'id', None) not in previous_ids]
+    
+    def _is_append(self, stamp: FileStamp) -> bool:
+        """Czy zmiana to tylko dopisanie na końcu (ten sam i-węzeł, większy rozmiar, ten sam odcisk)."""
+        if stamp is None or self._stamp is None or self._fingerprint is None:
+            return False
+        if stamp[0] != self._stamp[0] or stamp[2] < self._tail_offset:
+            return False
+        return self._compute_fingerprint(self._tail_offset) == self._fingerprint
+    
+    def _read_tail(self) -> List[T]:
+        """Parsuje pełne rekordy dopisane za ostatnio wczytaną częścią pliku."""
+        with open(self.file_path, 'rb') as f:
+            f.seek(self._tail_offset)
+            data = f.read()
+        end = complete_records_end(data)
+        if not end:
+            return []
+        
+        new_records = parse_bytes(
+            data[:end],
+            self.model_cls,
+            read_header(self.file_path, self.delimiter),
+            self.delimiter,
+            self.file_path.name,
+            location=f" (dopisane od bajtu {self._tail_offset})"
+        )
+        self._tail_offset += end
+        self._fingerprint = self._compute_fingerprint(self._tail_offset)
+        return new_records
+    
+    def _on_reload(self, objects: List[T]) -> None:
+        """Wywoływane po przeładowaniu pliku - podklasy odświeżają swoje listy i indeksy."""
+        pass
+    
+    def _on_append(self, new_objects: List[T]) -> None:
+        """Wywoływane po doczytaniu dopisanych rekordów (domyślnie jak po przeładowaniu)."""
+        self._on_reload(self._cache)
+    
+    def _use_parallel_reader(self) -> bool:
+        """Czy plik jest na tyle duży, że opłaca się równoległe parsowanie (mmap + pula procesów)."""
+        if Config.CSV_WORKERS == 1 or (os.cpu_count() or 1) == 1:
+            return False
+        return os.path.getsize(self.file_path) >= Config.CSV_PARALLEL_MIN_MB * 1024 * 1024
+    
     def _map_row_to_types(self, row: Dict[str, str]) -> Dict[str, Any]:
         """
         Konwertuje stringi z CSV na typy zdefiniowane w dataclass.
@@ -118,64 +229,7 @@ class CsvGenericRepository:
         Returns:
             Słownik z przekonwertowanymi wartościami
         """
-        data = {}
-        for field_info in fields(self.model_cls):
-            name = field_info.name
-            target_type = field_info.type
-            value = row.get(name)
-            
-            if value is None or value == '':
-                # Sprawdź czy pole jest opcjonalne (Optional[...])
-                if hasattr(target_type, '__origin__') and target_type.__origin__ is type(None):
-                    # Pole opcjonalne - ustaw None
-                    data[name] = None
-                    continue
-                # Sprawdź czy pole ma wartość domyślną
-                if hasattr(field_info, 'default') and field_info.default is not None:
-                    continue  # Użyj wartości domyślnej
-                elif hasattr(field_info, 'default_factory') and field_info.default_factory is not None:
-                    continue  # Użyj factory
-                else:
-                    # Pole wymagane, ale brak wartości - pomiń to pole (może być błąd w danych)
-                    continue
-            
-            # Konwersja typów
-            try:
-                if target_type == int:
-                    data[name] = int(value)
-                elif target_type == bool:
-                    # Excel często zapisuje TRUE/FALSE albo 1/0
-                    data[name] = value.lower() in ('true', '1', 'tak', 'yes', 't')
-                elif target_type == datetime:
-                    # Próbuj różne formaty daty
-                    value_clean = value.strip()
-                    for date_format in ['%Y-%m-%d', '%d.%m.%Y', '%Y-%m-%d %H:%M:%S', '%d.%m.%Y %H:%M:%S']:
-                        try:
-                            data[name] = datetime.strptime(value_clean, date_format)
-                            break
-                        except ValueError:
-                            continue
-                    else:
-                        # Jeśli żaden format nie pasuje
-                        logger.warning(f"Nie można sparsować daty '{value}' dla pola {name}")
-                        continue
-                elif hasattr(target_type, '__origin__') and target_type.__origin__ is type(None):
-                    # Optional[Type] - weź typ wewnętrzny
-                    inner_type = target_type.__args__[0]
-                    if inner_type == str:
-                        data[name] = value
-                    elif inner_type == int:
-                        data[name] = int(value) if value else None
-                    else:
-                        data[name] = value
-                else:
-                    # String lub inny typ - zostaje jak jest
-                    data[name] = value
-            except (ValueError, TypeError) as e:
-                logger.warning(f"Błąd konwersji wartości '{value}' dla pola {name} na typ {target_type}: {e}")
-                continue
-        
-        return data
+        return map_values(list(row.values()), build_row_plan(self.model_cls, list(row.keys())))
     
     def clear_cache(self):
         """Czyści cache, wymuszając ponowne odczytanie pliku."""
@@ -192,13 +246,16 @@ class CsvGenericRepository:
             True jeśli zapisano pomyślnie
         """
         try:
-            # Tworzenie katalogu jeśli nie istnieje
-            self.file_path.parent.mkdir(parents=True, exist_ok=True)
-            
             # Pobierz nazwy pól z dataclass
             field_names = [field.name for field in fields(self.model_cls)]
             
-            with open(self.file_path, mode='w', encoding='utf-8-sig', newline='') as f:
+            # Zapis atomowy: plik tymczasowy + rename (przerwany zapis nie obcina pliku)
+            with self._lock.exclusive(), atomic_write(self.file_path) as f:
+                if self._stamp is not None and file_stamp(self.file_path) != self._stamp:
+                    logger.warning(
+                        f"Plik {self.file_path.name} zmienił inny proces od ostatniego odczytu - "
+                        f"zapis pełnej listy nadpisze te zmiany"
+                    )
                 writer = csv.DictWriter(f, fieldnames=field_names, delimiter=self.delimiter)
                 writer.writeheader()
                 
@@ -223,10 +280,11 @@ class CsvGenericRepository:
             
             # Zaktualizuj cache
             self._cache = objects.copy()
+            self._remember_version(file_stamp(self.file_path))
             
             logger.info(f"Zapisano {len(objects)} obiektów do {self.file_path}")
             return True
-            
+        
         except Exception as e:
             logger.error(f"Błąd zapisywania do {self.file_path}: {e}")
             return False
@@ -251,10 +309,24 @@ class CsvCustomerRepository(CsvGenericRepository, ICustomerRepository):
         self._note_repo = note_repo
         self._sample_repo = sample_repo
     
+    def _on_reload(self, objects: List[CustomerModel]) -> None:
+        self.customers = objects
+        self._by_id = {c.id: c for c in self.customers}
+    
+    def _on_append(self, new_objects: List[CustomerModel]) -> None:
+        self.customers = self._cache
+        self._by_id.update((c.id, c) for c in new_objects)
+    
     def get_customer_by_id(self, customer_id: str) -> Optional[CustomerModel]:
         """Pobiera klienta po ID."""
+        self.refresh()
         return self._by_id.get(customer_id)
     
+    def get_customers_by_ids(self, customer_ids: List[str]) -> Dict[str, CustomerModel]:
+        """Pobiera wielu klientów naraz (wyszukiwanie w indeksie)."""
+        self.refresh()
+        return {cid: self._by_id[cid] for cid in customer_ids if cid in self._by_id}
+    
     def get_customer_stats(self, customer_id: str) -> dict:
         """Pobiera statystyki klienta."""
         customer = self.get_customer_by_id(customer_id)
@@ -277,6 +349,30 @@ class CsvCustomerRepository(CsvGenericRepository, ICustomerRepository):
             'notes_count': notes_count,
             'samples_count': samples_count
         }
+    
+    def get_all_customer_stats(self) -> Dict[str, dict]:
+        """
+        Pobiera statystyki wszystkich klientów w jednym przebiegu
+        (po jednym skanie notatek i próbek zamiast skanu na klienta).
+        """
+        self.refresh()
+        notes_counter: Counter = Counter()
+        samples_counter: Counter = Counter()
+        
+        if self._note_repo:
+            notes_counter = Counter(n.customer_id for n in self._note_repo.get_all_notes())
+        
+        if self._sample_repo:
+            all_samples = self._sample_repo.samples if hasattr(self._sample_repo, 'samples') else []
+            samples_counter = Counter(s.customer_id for s in all_samples)
+        
+        return {
+            customer_id: {
+                'notes_count': notes_counter[customer_id],
+                'samples_count': samples_counter[customer_id]
+            }
+            for customer_id in self._by_id
+        }
 
 
 class CsvNoteRepository(CsvGenericRepository, INoteRepository):
@@ -286,9 +382,20 @@ class CsvNoteRepository(CsvGenericRepository, INoteRepository):
         super().__init__(file_path, NoteModel)
         self.notes = self.load_all()
         self._processed_log: Dict[int, str] = {}  # note_id -> category
+        self._processed_ids: set = set()  # Oznaczenia w pamięci, zachowywane po przeładowaniu pliku
+    
+    def _on_reload(self, objects: List[NoteModel]) -> None:
+        self.notes = objects
+        for note in self.notes:
+            if note.id in self._processed_ids:
+                note.is_processed = True
+    
+    def _on_append(self, new_objects: List[NoteModel]) -> None:
+        self.notes = self._cache
     
     def get_all_notes(self, processed: Optional[bool] = None) -> List[NoteModel]:
         """Pobiera wszystkie notatki z opcjonalnym filtrem."""
+        self.refresh()
         if not self.notes:
             return []
         if processed is None:
@@ -296,34 +403,141 @@ class CsvNoteRepository(CsvGenericRepository, INoteRepository):
         else:
             return [n for n in self.notes if n.is_processed == processed]
     
+    def get_note_batch(self, processed: Optional[bool] = None) -> "NoteBatch":
+        """Zwraca notatki (z opcjonalnym filtrem) jako partię kolumnową."""
+        from company_lib.domain.batches import NoteBatch
+        return NoteBatch.from_models(self.get_all_notes(processed))
+    
     def mark_as_processed(self, note_id: int, category: Optional[str] = None) -> bool:
         """Oznacza notatkę jako przetworzoną (w pamięci)."""
         note = next((n for n in self.notes if n.id == note_id), None)
         if note:
             note.is_processed = True
+            self._processed_ids.add(note_id)
             if category:
                 self._processed_log[note_id] = category
-            logger.info(f"[MOCK] Notatka {note_id} oznaczona jako przetworzona (kategoria: {category})")
+            logger.info("[MOCK] Notatka %s oznaczona jako przetworzona (kategoria: %s)", note_id, category)
             return True
-        logger.warning(f"Nie znaleziono notatki o ID {note_id}")
+        logger.warning("Nie znaleziono notatki o ID %s", note_id)
         return False
+    
+    def mark_many_as_processed(
+        self,
+        note_ids: List[int],
+        categories: Optional[Dict[int, str]] = None
+    ) -> int:
+        """
+        Oznacza wiele notatek jako przetworzone (w pamięci) w jednym przebiegu.
+        Używa indeksu id -> notatka zamiast wyszukiwania liniowego dla każdego ID.
+        """
+        if not note_ids:
+            return 0
+        
+        by_id = {n.id: n for n in self.notes}
+        categories = categories or {}
+        count = 0
+        missing = []
+        for note_id in dict.fromkeys(note_ids):
+            note = by_id.get(note_id)
+            if note is None:
+                missing.append(note_id)
+                continue
+            note.is_processed = True
+            self._processed_ids.add(note_id)
+            if categories.get(note_id):
+                self._processed_log[note_id] = categories[note_id]
+            count += 1
+        
+        if missing:
+            logger.warning(f"Nie znaleziono notatek o ID: {missing}")
+        logger.info(f"[MOCK] Oznaczono {count} notatek jako przetworzone (wsadowo)")
+        return count
 
 
 class CsvSampleRepository(CsvGenericRepository, ISampleRepository):
     """Repozytorium próbek działające na CSV."""
     
-    def __init__(self, file_path: Path):
+    def __init__(self, file_path: Path, note_repo=None, task_repo=None):
+        """
+        Inicjalizuje repozytorium próbek.
+        
+        Args:
+            file_path: Ścieżka do pliku CSV z próbkami
+            note_repo: Repozytorium notatek (wymagane przez get_followup_candidates)
+            task_repo: Repozytorium zadań (wymagane przez get_followup_candidates - pomijanie próbek z zadaniem)
+        """
         super().__init__(file_path, SampleModel)
         self.samples = self.load_all()
+        self._note_repo = note_repo
+        self._task_repo = task_repo
+    
+    def _on_reload(self, objects: List[SampleModel]) -> None:
+        self.samples = objects
     
     def get_samples_by_status(self, status: str) -> List[SampleModel]:
         """Pobiera próbki po statusie."""
+        self.refresh()
         if not self.samples:
             return []
         if not status:
             return []
         return [s for s in self.samples if s and s.status == status]
     
+    def get_followup_candidates(
+        self,
+        date_from: datetime,
+        date_to: datetime,
+        status: str = "Sent"
+    ) -> Iterator[SampleFollowupCandidate]:
+        """
+        Zwraca próbki bez zadania z zadanego okna czasowego wraz z notatkami kandydującymi.
+        Istniejące zadania (z repozytorium zadań) trafiają do zbioru (customer_id, sample_id).
+        Okno czasowe i dobór notatek to operacje na partiach kolumnowych (NumPy):
+        maska daty/statusu na SampleBatch i jedno sortowanie notatek po (klient, data).
+        """
+        if self._note_repo is None or self._task_repo is None:
+            # Bez notatek i zadań wynik byłby błędny (każda próbka bez notatek i bez filtra zadań)
+            raise ValueError("Wyszukiwanie kandydatów follow-up wymaga repozytorium notatek i zadań")
+        
+        # NumPy ładowany na żądanie - skrypty bez wyszukiwania kandydatów go nie potrzebują
+        import numpy as np
+        from company_lib.domain.batches import NoteBatch, SampleBatch, datetimes_to_array
+        
+        self.refresh()
+        samples = self.samples or []
+        window = SampleBatch.from_models(samples).window(date_from, date_to, status=status)
+        positions = np.flatnonzero(window)
+        
+        existing_tasks = self._task_repo.get_sample_task_keys()
+        positions = [
+            i for i in positions.tolist()
+            if samples[i].customer_id and (samples[i].customer_id, samples[i].id) not in existing_tasks
+        ]
+        if not positions:
+            return
+        
+        notes = self._note_repo.get_all_notes()
+        usable = np.flatnonzero(np.fromiter(
+            (bool(n.content and n.content.strip() and n.created_at) for n in notes), dtype=bool, count=len(notes)
+        ))
+        note_batch = NoteBatch.from_models([notes[i] for i in usable.tolist()])
+        order, starts, ends = note_batch.ranges_after(
+            [samples[i].customer_id for i in positions],
+            datetimes_to_array([samples[i].date_sent for i in positions])
+        )
+        note_positions = usable[order].tolist()
+        
+        for i, start, end in zip(positions, starts.tolist(), ends.tolist()):
+            yield SampleFollowupCandidate(
+                sample=samples[i],
+                notes=[notes[j] for j in note_positions[start:end]]
+            )
+    
+    def get_sample_batch(self) -> "SampleBatch":
+        """Zwraca próbki jako partię kolumnową (wiersz i odpowiada self.samples[i])."""
+        from company_lib.domain.batches import SampleBatch
+        return SampleBatch.from_models(self.samples or [])
+    
     def save_samples(self, samples: List[SampleModel]) -> bool:
         """
         Zapisuje listę próbek do CSV.
@@ -352,8 +566,16 @@ class CsvTaskRepository(ITaskRepository):
         """
         self.file_path = file_path
         self.tasks: List[TaskModel] = []
+        self._lock = FileLock(file_path)
+        self._stamp: FileStamp = None
+        self._created: List[TaskModel] = []  # Zadania utworzone w tym procesie, jeszcze niezapisane
         self._load_tasks()
         self._next_id = max([t.id for t in self.tasks if t.id], default=0) + 1
+        self._writes = GroupCommit(self._flush)
+    
+    def batch(self):
+        """Grupuje tworzenie wielu zadań w jeden zapis pliku."""
+        return self._writes.batch()
     
     def _load_tasks(self):
         """Ładuje zadania z pliku CSV."""
@@ -362,6 +584,16 @@ class CsvTaskRepository(ITaskRepository):
             self.tasks = []
             return
         
+        with self._lock.shared():
+            self._stamp = file_stamp(self.file_path)
+            self.tasks = self._read_tasks()
+    
+    def _read_tasks(self) -> List[TaskModel]:
+        """Czyta zadania z pliku CSV (wywoływane pod blokadą)."""
+        tasks = []
+        if not self.file_path.exists():
+            return tasks
+        
         try:
             with open(self.file_path, mode='r', encoding='utf-8-sig') as f:
                 reader = csv.DictReader(f, delimiter=';')
@@ -377,21 +609,60 @@ class CsvTaskRepository(ITaskRepository):
                             created_at=datetime.strptime(row.get('created_at', ''), '%Y-%m-%d %H:%M:%S') if row.get('created_at') else datetime.now(),
                             assigned_to=row.get('assigned_to') if row.get('assigned_to') else None
                         )
-                        self.tasks.append(task)
+                        tasks.append(task)
                     except Exception as e:
-                        logger.warning(f"Błąd parsowania zadania: {e}, wiersz: {row}")
+                        logger.warning("Błąd parsowania zadania: %s, wiersz: %s", e, row)
                         continue
         except Exception as e:
             logger.error(f"Błąd czytania pliku zadań {self.file_path}: {e}")
-            self.tasks = []
+            return []
+        return tasks
+    
+    def _merge_from_disk(self):
+        """
+        Merge-on-write: bierze aktualny stan pliku (z zadaniami innych procesów)
+        i nakłada na niego tylko własne zmiany - zadania utworzone w tym procesie.
+        Zadaniom, których ID zajął w międzyczasie inny proces, nadawane jest nowe ID.
+        """
+        disk_tasks = self._read_tasks()
+        used_ids = {t.id for t in disk_tasks if t.id}
+        next_id = max(used_ids, default=0) + 1
+        for task in self._created:
+            if task.id in used_ids:
+                logger.warning(f"ID zadania {task.id} zajęte przez inny proces - nadaję nowe ID {next_id}")
+                task.id = next_id
+            used_ids.add(task.id)
+            next_id = max(next_id, task.id + 1)
+        self.tasks = disk_tasks + self._created
+        self._next_id = next_id
+    
+    def refresh(self) -> bool:
+        """
+        Przeładowuje zadania, jeśli plik zapisał inny proces (niezapisane własne zadania zostają).
+        
+        Returns:
+            True jeśli dane zostały przeładowane
+        """
+        if file_stamp(self.file_path) == self._stamp:
+            return False
+        with self._lock.shared():
+            self._stamp = file_stamp(self.file_path)
+            self._merge_from_disk()
+        return True
+    
+    def _flush(self):
+        """Zapisuje własne zmiany pod blokadą wyłączną, scalając je z bieżącą zawartością pliku."""
+        with self._lock.exclusive():
+            if file_stamp(self.file_path) != self._stamp:
+                self._merge_from_disk()
+            self._save_tasks()
+            self._stamp = file_stamp(self.file_path)
+            self._created = []
     
     def _save_tasks(self):
-        """Zapisuje zadania do pliku CSV."""
+        """Zapisuje zadania do pliku CSV (atomowo: plik tymczasowy + rename)."""
         try:
-            # Tworzenie katalogu jeśli nie istnieje
-            self.file_path.parent.mkdir(parents=True, exist_ok=True)
-            
-            with open(self.file_path, mode='w', encoding='utf-8-sig', newline='') as f:
+            with atomic_write(self.file_path) as f:
                 fieldnames = ['id', 'customer_id', 'sample_id', 'task_type', 'description', 
                              'status', 'created_at', 'assigned_to']
                 writer = csv.DictWriter(f, fieldnames=fieldnames, delimiter=';')
@@ -415,9 +686,15 @@ class CsvTaskRepository(ITaskRepository):
     
     def get_tasks_by_customer_and_sample(self, customer_id: str, sample_id: int) -> List[TaskModel]:
         """Pobiera zadania dla konkretnego klienta i próbki."""
+        self.refresh()
         return [t for t in self.tasks 
                 if t.customer_id == customer_id and t.sample_id == sample_id]
     
+    def get_sample_task_keys(self) -> Set[Tuple[str, int]]:
+        """Zwraca pary (customer_id, sample_id) próbek, które mają już zadanie."""
+        self.refresh()
+        return {(t.customer_id, t.sample_id) for t in self.tasks}
+    
     def create_task(self, task: TaskModel) -> TaskModel:
         """Tworzy nowe zadanie."""
         # Przypisz ID jeśli nie ma
@@ -430,12 +707,14 @@ class CsvTaskRepository(ITaskRepository):
             task.created_at = datetime.now()
         
         self.tasks.append(task)
-        self._save_tasks()
-        logger.info(f"Utworzono zadanie ID: {task.id} dla klienta {task.customer_id}, próbka {task.sample_id}")
+        self._created.append(task)
+        self._writes.changed()
+        logger.info("Utworzono zadanie ID: %s dla klienta %s, próbka %s", task.id, task.customer_id, task.sample_id)
         return task
     
     def get_pending_tasks_by_salesperson(self, salesperson_email: str) -> List[TaskModel]:
         """Pobiera wszystkie oczekujące zadania dla sprzedawcy."""
+        self.refresh()
         return [t for t in self.tasks 
                 if t.assigned_to == salesperson_email and t.status == 'PENDING']
 
@@ -452,8 +731,18 @@ class CsvMailLogRepository(IMailLogRepository):
         """
         self.file_path = file_path
         self.logs: List[MailLogModel] = []
+        self._lock = FileLock(file_path)
+        self._stamp: FileStamp = None
+        # Własne, jeszcze niezapisane zmiany (do scalenia z plikiem zmienionym przez inny proces)
+        self._created: List[MailLogModel] = []
+        self._updated: Dict[int, MailLogModel] = {}
         self._load_logs()
         self._next_id = max([l.id for l in self.logs if l.id], default=0) + 1
+        self._writes = GroupCommit(self._flush)
+    
+    def batch(self):
+        """Grupuje wiele zmian logów w jeden zapis pliku."""
+        return self._writes.batch()
     
     def _load_logs(self):
         """Ładuje logi z pliku CSV."""
@@ -462,6 +751,16 @@ class CsvMailLogRepository(IMailLogRepository):
             self.logs = []
             return
         
+        with self._lock.shared():
+            self._stamp = file_stamp(self.file_path)
+            self.logs = self._read_logs()
+    
+    def _read_logs(self) -> List[MailLogModel]:
+        """Czyta logi z pliku CSV (wywoływane pod blokadą)."""
+        logs = []
+        if not self.file_path.exists():
+            return logs
+        
         try:
             with open(self.file_path, mode='r', encoding='utf-8-sig') as f:
                 reader = csv.DictReader(f, delimiter=';')
@@ -482,21 +781,61 @@ class CsvMailLogRepository(IMailLogRepository):
                             batch_id=row.get('batch_id') if row.get('batch_id') else None,
                             task_ids=row.get('task_ids') if row.get('task_ids') else None
                         )
-                        self.logs.append(log)
+                        logs.append(log)
                     except Exception as e:
-                        logger.warning(f"Błąd parsowania logu maila: {e}, wiersz: {row}")
+                        logger.warning("Błąd parsowania logu maila: %s, wiersz: %s", e, row)
                         continue
         except Exception as e:
             logger.error(f"Błąd czytania pliku z logami {self.file_path}: {e}")
-            self.logs = []
+            return []
+        return logs
+    
+    def _merge_from_disk(self):
+        """
+        Merge-on-write: bierze aktualny stan pliku i nakłada tylko własne zmiany -
+        nowe logi oraz zmienione statusy (rekordy innych procesów pozostają nietknięte).
+        """
+        disk_logs = self._read_logs()
+        merged = [self._updated.get(log.id, log) for log in disk_logs]
+        used_ids = {log.id for log in merged if log.id}
+        next_id = max(used_ids, default=0) + 1
+        for log in self._created:
+            if log.id in used_ids:
+                logger.warning(f"ID logu maila {log.id} zajęte przez inny proces - nadaję nowe ID {next_id}")
+                log.id = next_id
+            used_ids.add(log.id)
+            next_id = max(next_id, log.id + 1)
+        self.logs = merged + self._created
+        self._next_id = next_id
+    
+    def refresh(self) -> bool:
+        """
+        Przeładowuje logi, jeśli plik zapisał inny proces (niezapisane własne zmiany zostają).
+        
+        Returns:
+            True jeśli dane zostały przeładowane
+        """
+        if file_stamp(self.file_path) == self._stamp:
+            return False
+        with self._lock.shared():
+            self._stamp = file_stamp(self.file_path)
+            self._merge_from_disk()
+        return True
+    
+    def _flush(self):
+        """Zapisuje własne zmiany pod blokadą wyłączną, scalając je z bieżącą zawartością pliku."""
+        with self._lock.exclusive():
+            if file_stamp(self.file_path) != self._stamp:
+                self._merge_from_disk()
+            self._save_logs()
+            self._stamp = file_stamp(self.file_path)
+            self._created = []
+            self._updated = {}
     
     def _save_logs(self):
-        """Zapisuje logi do pliku CSV."""
+        """Zapisuje logi do pliku CSV (atomowo: plik tymczasowy + rename)."""
         try:
-            # Tworzenie katalogu jeśli nie istnieje
-            self.file_path.parent.mkdir(parents=True, exist_ok=True)
-            
-            with open(self.file_path, mode='w', encoding='utf-8-sig', newline='') as f:
+            with atomic_write(self.file_path) as f:
                 fieldnames = ['id', 'to_email', 'subject', 'status', 'error_message', 
                              'sent_at', 'created_at', 'batch_id', 'task_ids']
                 writer = csv.DictWriter(f, fieldnames=fieldnames, delimiter=';')
@@ -531,22 +870,39 @@ class CsvMailLogRepository(IMailLogRepository):
             mail_log.created_at = datetime.now()
         
         self.logs.append(mail_log)
-        self._save_logs()
-        logger.info(f"Utworzono log maila ID: {mail_log.id} dla {mail_log.to_email}, status: {mail_log.status}")
+        self._created.append(mail_log)
+        self._writes.changed()
+        logger.info("Utworzono log maila ID: %s dla %s, status: %s", mail_log.id, mail_log.to_email, mail_log.status)
         return mail_log
     
-    def update_log_status(self, log_id: int, status: str, error_message: Optional[str] = None) -> bool:
-        """Aktualizuje status logu."""
+    def get_log_by_id(self, log_id: int) -> Optional[MailLogModel]:
+        """Pobiera log po ID."""
+        self.refresh()
+        return next((l for l in self.logs if l.id == log_id), None)
+    
+    def update_log_status(
+        self,
+        log_id: int,
+        status: str,
+        error_message: Optional[str] = None,
+        task_ids: Optional[str] = None
+    ) -> bool:
+        """Aktualizuje status logu (i listę ID zadań, jeśli podana)."""
+        self.refresh()
         log = next((l for l in self.logs if l.id == log_id), None)
         if log:
             log.status = status
+            if task_ids is not None:
+                log.task_ids = task_ids
             if status == "SENT":
                 log.sent_at = datetime.now()
                 log.error_message = None
             elif status == "FAILED":
                 log.error_message = error_message
-            self._save_logs()
-            logger.info(f"Zaktualizowano log maila ID: {log_id}, status: {status}")
+            if not any(log is created for created in self._created):
+                self._updated[log.id] = log
+            self._writes.changed()
+            logger.info("Zaktualizowano log maila ID: %s, status: %s", log_id, status)
             return True
         logger.warning(f"Nie znaleziono logu maila o ID {log_id}")
         return False
@@ -561,6 +917,7 @@ class CsvMailLogRepository(IMailLogRepository):
         Returns:
             Ostatni log z statusem FAILED lub PENDING, None jeśli nie znaleziono
         """
+        self.refresh()
         filtered_logs = self.logs
         if batch_id:
             filtered_logs = [l for l in self.logs if l.batch_id == batch_id]
@@ -581,5 +938,6 @@ class CsvMailLogRepository(IMailLogRepository):
     
     def get_logs_by_batch(self, batch_id: str) -> List[MailLogModel]:
         """Pobiera wszystkie logi dla danej partii wysyłki."""
+        self.refresh()
         return [l for l in self.logs if l.batch_id == batch_id]
 
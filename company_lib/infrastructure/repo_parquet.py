@@ -0,0 +1,333 @@
+"""
+Kolumnowe repozytoria analityczne (Apache Arrow / Parquet) dla notatek i próbek.
+Przeznaczone do raportów skanujących lata danych po kliencie i dacie:
+filtry (status, customer_id, zakres dat) są przekazywane do skanera Parquet,
+który pomija całe grupy wierszy na podstawie statystyk min/max,
+a obiekty modeli tworzone są leniwie tylko dla pasujących wierszy.
+
+Wymaga pakietu pyarrow (pip install -e .[analytics]).
+"""
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+from company_lib.domain.batches import (
+    CategoricalColumn, StringColumn, NoteBatch, SampleBatch, DATETIME_DTYPE
+)
+from company_lib.domain.models import NoteModel, SampleModel
+from company_lib.logger import setup_logger
+
+logger = setup_logger("ParquetRepositories")
+
+NOTE_SCHEMA = pa.schema([
+    ("id", pa.int64()),
+    ("customer_id", pa.string()),
+    ("content", pa.string()),
+    ("created_at", pa.timestamp("s")),
+    ("is_processed", pa.bool_()),
+])
+
+SAMPLE_SCHEMA = pa.schema([
+    ("id", pa.int64()),
+    ("customer_id", pa.string()),
+    ("status", pa.string()),
+    ("date_sent", pa.timestamp("s")),
+    ("notes", pa.string()),
+])
+
+DEFAULT_ROW_GROUP_SIZE = 128 * 1024
+
+
+def _column(table: pa.Table, name: str) -> pa.Array:
+    """Zwraca kolumnę tabeli jako pojedynczą tablicę Arrow (bez kopii, jeśli ma jeden fragment)."""
+    chunked = table.column(name)
+    if chunked.num_chunks == 1:
+        return chunked.chunk(0)
+    return chunked.combine_chunks() if chunked.num_chunks else pa.array([], type=chunked.type)
+
+
+def _categorical_column(array: pa.Array) -> CategoricalColumn:
+    """Kodowanie słownikowe w Arrow -> kody int32 + lista kategorii."""
+    encoded = pc.dictionary_encode(array)
+    return CategoricalColumn(
+        encoded.indices.to_numpy(zero_copy_only=False).astype(np.int32, copy=False),
+        encoded.dictionary.to_pylist()
+    )
+
+
+def _string_column(array: pa.Array) -> StringColumn:
+    """
+    Tablica stringów Arrow -> StringColumn bez kopiowania danych:
+    bufory offsetów i bajtów UTF-8 są widokami NumPy na pamięć Arrow.
+    """
+    _, offsets_buffer, data_buffer = array.buffers()
+    offset_type = np.int64 if pa.types.is_large_string(array.type) else np.int32
+    offsets = np.frombuffer(offsets_buffer, dtype=offset_type)[array.offset:array.offset + len(array) + 1]
+    data = np.frombuffer(data_buffer, dtype=np.uint8) if data_buffer is not None else np.empty(0, dtype=np.uint8)
+    nulls = array.is_null().to_numpy(zero_copy_only=False) if array.null_count else None
+    return StringColumn(offsets, data, nulls)
+
+
+def _datetime_column(array: pa.Array) -> np.ndarray:
+    """Znacznik czasu Arrow -> datetime64[s] (widok bez kopii, gdy jednostka to już sekundy)."""
+    return array.cast(pa.timestamp("s")).to_numpy(zero_copy_only=False).astype(DATETIME_DTYPE, copy=False)
+
+
+class ParquetGenericRepository:
+    """
+    Bazowa klasa repozytorium Parquet - skan z filtrem i leniwe mapowanie na modele.
+    Pojedynczy plik lub katalog plików .parquet jest traktowany jako jeden zbiór danych.
+    """
+    
+    # Nazwy filtrów w API -> nazwy kolumn w pliku
+    FILTER_ALIASES: Dict[str, str] = {}
+    
+    def __init__(self, path: Path, date_column: str):
+        """
+        Inicjalizuje repozytorium.
+        
+        Args:
+            path: Plik .parquet lub katalog z plikami .parquet
+            date_column: Nazwa kolumny z datą używanej w filtrach zakresu
+        """
+        self.path = Path(path)
+        self.date_column = date_column
+        self._dataset: Optional[ds.Dataset] = None
+    
+    @property
+    def dataset(self) -> ds.Dataset:
+        """Zbiór danych Arrow (otwierany przy pierwszym użyciu, czyta tylko metadane)."""
+        if self._dataset is None:
+            self._dataset = ds.dataset(str(self.path), format="parquet")
+        return self._dataset
+    
+    def _build_filter(
+        self,
+        customer_ids: Optional[Iterable[str]] = None,
+        date_from: Optional[datetime] = None,
+        date_to: Optional[datetime] = None,
+        extra: Optional[Dict[str, Any]] = None
+    ) -> Optional[ds.Expression]:
+        """Buduje wyrażenie filtra przekazywane do skanera (predicate pushdown)."""
+        conditions = []
+        if customer_ids is not None:
+            ids = list(customer_ids)
+            if len(ids) == 1:
+                conditions.append(ds.field("customer_id") == ids[0])
+            else:
+                conditions.append(ds.field("customer_id").isin(ids))
+        if date_from is not None:
+            conditions.append(ds.field(self.date_column) >= date_from)
+        if date_to is not None:
+            conditions.append(ds.field(self.date_column) <= date_to)
+        for column, value in (extra or {}).items():
+            if value is not None:
+                conditions.append(ds.field(column) == value)
+        
+        expression = None
+        for condition in conditions:
+            expression = condition if expression is None else expression & condition
+        return expression
+    
+    def scan_table(self, columns: Optional[List[str]] = None, **filters) -> pa.Table:
+        """
+        Zwraca przefiltrowane dane jako tabelę Arrow (bez tworzenia obiektów modeli).
+        Najszybsza ścieżka dla agregacji w raportach.
+        
+        Args:
+            columns: Lista kolumn do odczytu (None = wszystkie)
+            **filters: customer_ids, date_from, date_to oraz filtry równościowe podklasy
+        """
+        return self.dataset.to_table(columns=columns, filter=self._filter_from_kwargs(**filters))
+    
+    def _iter_rows(self, **filters) -> Iterator[Dict[str, Any]]:
+        """Iteruje po pasujących wierszach, partia po partii (pamięć ~ jedna partia)."""
+        for batch in self.dataset.to_batches(filter=self._filter_from_kwargs(**filters)):
+            if batch.num_rows:
+                yield from batch.to_pylist()
+    
+    def _filter_from_kwargs(self, **filters) -> Optional[ds.Expression]:
+        """Rozdziela argumenty na filtry wspólne i równościowe."""
+        customer_ids = filters.pop("customer_ids", None)
+        date_from = filters.pop("date_from", None)
+        date_to = filters.pop("date_to", None)
+        extra = {self.FILTER_ALIASES.get(name, name): value for name, value in filters.items()}
+        return self._build_filter(customer_ids, date_from, date_to, extra=extra)
+    
+    def count(self, **filters) -> int:
+        """Liczy pasujące wiersze bez ich materializacji."""
+        return self.dataset.count_rows(filter=self._filter_from_kwargs(**filters))
+    
+    def row_group_stats(self) -> List[Dict[str, Any]]:
+        """
+        Zwraca statystyki grup wierszy (liczba wierszy, min/max kolumn) ze wszystkich plików.
+        Pozwala ocenić, jak skutecznie filtry pomijają dane (im węższe zakresy, tym lepiej).
+        """
+        stats = []
+        for fragment in self.dataset.get_fragments():
+            metadata = pq.ParquetFile(fragment.path).metadata
+            for group_index in range(metadata.num_row_groups):
+                group = metadata.row_group(group_index)
+                columns = {}
+                for column_index in range(group.num_columns):
+                    column = group.column(column_index)
+                    if column.statistics is not None and column.statistics.has_min_max:
+                        columns[column.path_in_schema] = (column.statistics.min, column.statistics.max)
+                stats.append({
+                    "file": fragment.path,
+                    "row_group": group_index,
+                    "num_rows": group.num_rows,
+                    "min_max": columns
+                })
+        return stats
+
+
+class ParquetNoteRepository(ParquetGenericRepository):
+    """Analityczne repozytorium notatek (tylko odczyt)."""
+    
+    FILTER_ALIASES = {"processed": "is_processed"}
+    
+    def __init__(self, path: Path):
+        super().__init__(path, date_column="created_at")
+    
+    def scan_notes(
+        self,
+        customer_ids: Optional[Iterable[str]] = None,
+        date_from: Optional[datetime] = None,
+        date_to: Optional[datetime] = None,
+        processed: Optional[bool] = None
+    ) -> Iterator[NoteModel]:
+        """
+        Zwraca (leniwie) notatki spełniające filtry.
+        
+        Args:
+            customer_ids: Lista ID klientów (None = wszyscy)
+            date_from: Najwcześniejsza data utworzenia
+            date_to: Najpóźniejsza data utworzenia
+            processed: Filtr po statusie przetworzenia (None = wszystkie)
+        
+        Yields:
+            NoteModel dla każdego pasującego wiersza
+        """
+        for row in self._iter_rows(
+            customer_ids=customer_ids, date_from=date_from, date_to=date_to, processed=processed
+        ):
+            yield NoteModel(**row)
+    
+    def scan_note_batch(self, **filters) -> NoteBatch:
+        """
+        Zwraca przefiltrowane notatki jako partię kolumnową NumPy.
+        Kolumny liczbowe i tekstowe są widokami na bufory Arrow (bez kopiowania ani obiektów modeli).
+        """
+        table = self.scan_table(columns=NOTE_SCHEMA.names, **filters)
+        return NoteBatch(
+            ids=_column(table, "id").to_numpy(zero_copy_only=False),
+            customer_id=_categorical_column(_column(table, "customer_id")),
+            content=_string_column(_column(table, "content")),
+            created_at=_datetime_column(_column(table, "created_at")),
+            is_processed=_column(table, "is_processed").to_numpy(zero_copy_only=False)
+        )
+    
+    def count_notes_by_customer(self, **filters) -> Dict[str, int]:
+        """Liczy notatki per klient (agregacja w Arrow, bez obiektów modeli)."""
+        table = self.scan_table(columns=["customer_id"], **filters)
+        counts = pc.value_counts(table.column("customer_id").combine_chunks())
+        return {item["values"].as_py(): item["counts"].as_py() for item in counts}
+
+
+class ParquetSampleRepository(ParquetGenericRepository):
+    """Analityczne repozytorium próbek (tylko odczyt)."""
+    
+    def __init__(self, path: Path):
+        super().__init__(path, date_column="date_sent")
+    
+    def scan_samples(
+        self,
+        status: Optional[str] = None,
+        customer_ids: Optional[Iterable[str]] = None,
+        date_from: Optional[datetime] = None,
+        date_to: Optional[datetime] = None
+    ) -> Iterator[SampleModel]:
+        """
+        Zwraca (leniwie) próbki spełniające filtry.
+        
+        Args:
+            status: Status próbki (None = wszystkie)
+            customer_ids: Lista ID klientów (None = wszyscy)
+            date_from: Najwcześniejsza data wysłania
+            date_to: Najpóźniejsza data wysłania
+        
+        Yields:
+            SampleModel dla każdego pasującego wiersza
+        """
+        for row in self._iter_rows(
+            customer_ids=customer_ids, date_from=date_from, date_to=date_to, status=status
+        ):
+            yield SampleModel(**row)
+    
+    def scan_sample_batch(self, **filters) -> SampleBatch:
+        """Zwraca przefiltrowane próbki jako partię kolumnową NumPy (bez obiektów modeli)."""
+        table = self.scan_table(columns=SAMPLE_SCHEMA.names, **filters)
+        return SampleBatch(
+            ids=_column(table, "id").to_numpy(zero_copy_only=False),
+            customer_id=_categorical_column(_column(table, "customer_id")),
+            status=_categorical_column(_column(table, "status")),
+            date_sent=_datetime_column(_column(table, "date_sent")),
+            notes=_string_column(_column(table, "notes"))
+        )
+    
+    def get_samples_by_status(self, status: str) -> List[SampleModel]:
+        """Pobiera próbki po statusie (zgodnie z ISampleRepository)."""
+        return list(self.scan_samples(status=status))
+
+
+def _write_models(models: list, schema: pa.Schema, sort_keys: List[str], target: Path, row_group_size: int) -> int:
+    """Zapisuje modele do Parquet, sortując po kluczach (wąskie zakresy min/max w grupach wierszy)."""
+    columns = {name: [getattr(model, name) for model in models] for name in schema.names}
+    table = pa.table(columns, schema=schema)
+    if table.num_rows:
+        table = table.sort_by([(key, "ascending") for key in sort_keys])
+    
+    target.parent.mkdir(parents=True, exist_ok=True)
+    pq.write_table(table, str(target), row_group_size=row_group_size, compression="zstd")
+    return table.num_rows
+
+
+def convert_csv_to_parquet(
+    csv_dir: Path,
+    parquet_dir: Path,
+    row_group_size: int = DEFAULT_ROW_GROUP_SIZE
+) -> Dict[str, int]:
+    """
+    Konwertuje notes.csv i samples.csv (układ jak data/mocks) do plików Parquet.
+    Parsowanie wykonują repozytoria CSV, więc obowiązują te same reguły konwersji typów.
+    Dane są sortowane po (customer_id, data), co zawęża statystyki grup wierszy.
+    
+    Args:
+        csv_dir: Katalog z plikami CSV
+        parquet_dir: Katalog docelowy (notes.parquet, samples.parquet)
+        row_group_size: Liczba wierszy w grupie (mniejsze grupy = dokładniejsze pomijanie)
+    
+    Returns:
+        Słownik plik -> liczba zapisanych wierszy
+    """
+    from company_lib.infrastructure.repo_csv import CsvNoteRepository, CsvSampleRepository
+    
+    csv_dir, parquet_dir = Path(csv_dir), Path(parquet_dir)
+    notes = CsvNoteRepository(csv_dir / "notes.csv").notes
+    samples = CsvSampleRepository(csv_dir / "samples.csv").samples
+    
+    counts = {
+        "notes.parquet": _write_models(
+            notes, NOTE_SCHEMA, ["customer_id", "created_at"], parquet_dir / "notes.parquet", row_group_size
+        ),
+        "samples.parquet": _write_models(
+            samples, SAMPLE_SCHEMA, ["customer_id", "date_sent"], parquet_dir / "samples.parquet", row_group_size
+        ),
+    }
+    logger.info(f"Skonwertowano CSV z {csv_dir} do Parquet w {parquet_dir}: {counts}")
+    return counts
@@ -0,0 +1,578 @@
+"""
+Implementacje repozytoriów działające na lokalnej bazie SQLite.
+Trzecia opcja obok CSV (prototyp) i MSSQL (produkcja): indeksowane, transakcyjne
+i odporne na awarie przechowywanie danych lokalnie (tryb WAL).
+"""
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import List, Optional, Dict, Iterator, Any, Set, Tuple
+from company_lib.domain.interfaces import (
+    ICustomerRepository,
+    INoteRepository,
+    ISampleRepository,
+    ITaskRepository,
+    IMailLogRepository
+)
+from company_lib.domain.models import (
+    NoteModel, SampleModel, CustomerModel, TaskModel, MailLogModel, SampleFollowupCandidate
+)
+from company_lib.config import Config
+from company_lib.logger import setup_logger
+
+logger = setup_logger("SQLiteRepositories")
+
+DATE_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS customers (
+    id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    email TEXT,
+    phone TEXT,
+    salesperson_email TEXT,
+    created_at TEXT
+);
+
+CREATE TABLE IF NOT EXISTS notes (
+    id INTEGER PRIMARY KEY,
+    customer_id TEXT NOT NULL,
+    content TEXT NOT NULL,
+    created_at TEXT,
+    is_processed INTEGER NOT NULL DEFAULT 0,
+    category TEXT
+);
+CREATE INDEX IF NOT EXISTS ix_notes_customer_created ON notes (customer_id, created_at);
+CREATE INDEX IF NOT EXISTS ix_notes_processed ON notes (is_processed);
+
+-- Próbki mają zastępczy klucz (row_id) - ID próbek z ERP nie zawsze są unikalne
+CREATE TABLE IF NOT EXISTS samples (
+    row_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    id INTEGER NOT NULL,
+    customer_id TEXT NOT NULL,
+    status TEXT NOT NULL,
+    date_sent TEXT NOT NULL,
+    notes TEXT
+);
+CREATE INDEX IF NOT EXISTS ix_samples_status_date ON samples (status, date_sent);
+CREATE INDEX IF NOT EXISTS ix_samples_customer ON samples (customer_id);
+
+CREATE TABLE IF NOT EXISTS tasks (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    customer_id TEXT NOT NULL,
+    sample_id INTEGER NOT NULL,
+    task_type TEXT NOT NULL,
+    description TEXT,
+    status TEXT NOT NULL,
+    created_at TEXT,
+    assigned_to TEXT
+);
+CREATE INDEX IF NOT EXISTS ix_tasks_customer_sample ON tasks (customer_id, sample_id);
+CREATE INDEX IF NOT EXISTS ix_tasks_assigned_status ON tasks (assigned_to, status);
+
+CREATE TABLE IF NOT EXISTS mail_logs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    to_email TEXT NOT NULL,
+    subject TEXT,
+    status TEXT NOT NULL,
+    error_message TEXT,
+    sent_at TEXT,
+    created_at TEXT,
+    batch_id TEXT,
+    task_ids TEXT
+);
+CREATE INDEX IF NOT EXISTS ix_mail_logs_batch ON mail_logs (batch_id);
+CREATE INDEX IF NOT EXISTS ix_mail_logs_status_created ON mail_logs (status, created_at);
+"""
+
+def _to_db(value: Optional[datetime]) -> Optional[str]:
+    """Konwertuje datetime na tekst ISO (sortowalny leksykograficznie)."""
+    return value.strftime(DATE_FORMAT) if value else None
+
+def _from_db(value: Optional[str]) -> Optional[datetime]:
+    """Konwertuje tekst ISO z bazy na datetime."""
+    return datetime.fromisoformat(value) if value else None
+
+
+class SQLiteDatabase:
+    """
+    Połączenie z lokalną bazą SQLite współdzielone przez repozytoria.
+    Włącza tryb WAL (czytelnicy nie blokują zapisu), tworzy schemat z indeksami
+    i udostępnia zagnieżdżalne transakcje do zapisów wsadowych.
+    """
+    
+    def __init__(self, db_path: Path, busy_timeout: Optional[float] = None):
+        """
+        Otwiera (lub tworzy) bazę SQLite.
+        
+        Args:
+            db_path: Ścieżka do pliku bazy (':memory:' dla bazy w pamięci)
+            busy_timeout: Sekundy oczekiwania na blokadę zapisu innego procesu
+                          (None = Config.SQLITE_BUSY_TIMEOUT)
+        """
+        self.db_path = db_path
+        if str(db_path) != ':memory:':
+            Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        
+        # isolation_level=None - transakcjami zarządzamy sami (BEGIN/COMMIT)
+        timeout = Config.SQLITE_BUSY_TIMEOUT if busy_timeout is None else busy_timeout
+        self.connection = sqlite3.connect(
+            str(db_path), isolation_level=None, check_same_thread=False, timeout=timeout
+        )
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.executescript(SCHEMA)
+        self._lock = threading.RLock()
+        self._depth = 0
+        logger.debug(f"Otwarto bazę SQLite: {db_path}")
+    
+    @contextmanager
+    def transaction(self):
+        """
+        Transakcja zapisu. Zagnieżdżone wywołania łączą się w jedną transakcję,
+        więc wiele operacji (np. utworzenie wielu zadań) kończy się jednym commitem.
+        """
+        with self._lock:
+            if self._depth == 0:
+                self.connection.execute("BEGIN IMMEDIATE")
+            self._depth += 1
+            try:
+                yield self.connection
+            except Exception:
+                self._depth -= 1
+                if self._depth == 0:
+                    self.connection.execute("ROLLBACK")
+                raise
+            else:
+                self._depth -= 1
+                if self._depth == 0:
+                    self.connection.execute("COMMIT")
+    
+    def query(self, sql: str, params: tuple = ()) -> List[tuple]:
+        """Wykonuje zapytanie SELECT i zwraca wszystkie wiersze."""
+        with self._lock:
+            return self.connection.execute(sql, params).fetchall()
+    
+    def close(self):
+        """Zamyka połączenie."""
+        self.connection.close()
+    
+    def import_csv(self, csv_dir: Path, replace: bool = True) -> Dict[str, int]:
+        """
+        Importuje dane z katalogu z plikami CSV (układ jak data/mocks) w jednej transakcji.
+        Parsowanie wykonują istniejące repozytoria CSV, więc obowiązują te same reguły konwersji.
+        
+        Args:
+            csv_dir: Katalog z plikami customers.csv, notes.csv, samples.csv, tasks.csv, mail_logs.csv
+            replace: Czy wyczyścić tabele przed importem
+        
+        Returns:
+            Słownik tabela -> liczba zaimportowanych wierszy
+        """
+        # Import lokalny - repozytoria CSV nie są potrzebne przy zwykłej pracy na SQLite
+        from company_lib.infrastructure.repo_csv import (
+            CsvCustomerRepository,
+            CsvNoteRepository,
+            CsvSampleRepository,
+            CsvTaskRepository,
+            CsvMailLogRepository
+        )
+        
+        csv_dir = Path(csv_dir)
+        customers = CsvCustomerRepository(csv_dir / "customers.csv").customers
+        notes = CsvNoteRepository(csv_dir / "notes.csv").notes
+        samples = CsvSampleRepository(csv_dir / "samples.csv").samples
+        tasks = CsvTaskRepository(csv_dir / "tasks.csv").tasks
+        logs = CsvMailLogRepository(csv_dir / "mail_logs.csv").logs
+        
+        with self.transaction() as conn:
+            if replace:
+                for table in ("customers", "notes", "samples", "tasks", "mail_logs"):
+                    conn.execute(f"DELETE FROM {table}")
+            conn.executemany(
+                "INSERT OR REPLACE INTO customers VALUES (?, ?, ?, ?, ?, ?)",
+                [(c.id, c.name, c.email, c.phone, c.salesperson_email, _to_db(c.created_at))
+                 for c in customers]
+            )
+            conn.executemany(
+                "INSERT OR REPLACE INTO notes (id, customer_id, content, created_at, is_processed) "
+                "VALUES (?, ?, ?, ?, ?)",
+                [(n.id, n.customer_id, n.content, _to_db(n.created_at), int(n.is_processed))
+                 for n in notes]
+            )
+            conn.executemany(
+                "INSERT INTO samples (id, customer_id, status, date_sent, notes) VALUES (?, ?, ?, ?, ?)",
+                [(s.id, s.customer_id, s.status, _to_db(s.date_sent), s.notes) for s in samples]
+            )
+            conn.executemany(
+                "INSERT OR REPLACE INTO tasks VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                [(t.id, t.customer_id, t.sample_id, t.task_type, t.description, t.status,
+                  _to_db(t.created_at), t.assigned_to) for t in tasks]
+            )
+            conn.executemany(
+                "INSERT OR REPLACE INTO mail_logs VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [(l.id, l.to_email, l.subject, l.status, l.error_message, _to_db(l.sent_at),
+                  _to_db(l.created_at), l.batch_id, l.task_ids) for l in logs]
+            )
+        
+        counts = {
+            'customers': len(customers),
+            'notes': len(notes),
+            'samples': len(samples),
+            'tasks': len(tasks),
+            'mail_logs': len(logs)
+        }
+        logger.info(f"Zaimportowano dane z {csv_dir} do {self.db_path}: {counts}")
+        return counts
+
+
+class SqliteCustomerRepository(ICustomerRepository):
+    """Repozytorium klientów działające na SQLite."""
+    
+    COLUMNS = "id, name, email, phone, salesperson_email, created_at"
+    
+    def __init__(self, db: SQLiteDatabase):
+        self.db = db
+    
+    @staticmethod
+    def _to_model(row: tuple) -> CustomerModel:
+        """Mapuje wiersz z bazy na model."""
+        return CustomerModel(
+            id=row[0],
+            name=row[1],
+            email=row[2],
+            phone=row[3],
+            salesperson_email=row[4],
+            created_at=_from_db(row[5])
+        )
+    
+    def get_customer_by_id(self, customer_id: str) -> Optional[CustomerModel]:
+        """Pobiera klienta po ID."""
+        rows = self.db.query(f"SELECT {self.COLUMNS} FROM customers WHERE id = ?", (customer_id,))
+        return self._to_model(rows[0]) if rows else None
+    
+    def get_customers_by_ids(self, customer_ids: List[str], chunk_size: int = 500) -> Dict[str, CustomerModel]:
+        """Pobiera wielu klientów naraz (zapytania IN w paczkach)."""
+        unique_ids = [cid for cid in dict.fromkeys(customer_ids) if cid]
+        customers: Dict[str, CustomerModel] = {}
+        for start in range(0, len(unique_ids), chunk_size):
+            chunk = unique_ids[start:start + chunk_size]
+            placeholders = ", ".join("?" for _ in chunk)
+            for row in self.db.query(
+                f"SELECT {self.COLUMNS} FROM customers WHERE id IN ({placeholders})", tuple(chunk)
+            ):
+                customers[row[0]] = self._to_model(row)
+        return customers
+    
+    def get_customer_stats(self, customer_id: str) -> dict:
+        """Pobiera statystyki klienta."""
+        rows = self.db.query("""
+            SELECT
+                (SELECT COUNT(*) FROM notes WHERE customer_id = c.id),
+                (SELECT COUNT(*) FROM samples WHERE customer_id = c.id)
+            FROM customers c
+            WHERE c.id = ?
+        """, (customer_id,))
+        if not rows:
+            return {'notes_count': 0, 'samples_count': 0}
+        return {'notes_count': rows[0][0], 'samples_count': rows[0][1]}
+    
+    def get_all_customer_stats(self) -> Dict[str, dict]:
+        """Pobiera statystyki wszystkich klientów jednym zapytaniem."""
+        rows = self.db.query("""
+            SELECT c.id, IFNULL(n.cnt, 0), IFNULL(s.cnt, 0)
+            FROM customers c
+            LEFT JOIN (SELECT customer_id, COUNT(*) AS cnt FROM notes GROUP BY customer_id) n
+                ON n.customer_id = c.id
+            LEFT JOIN (SELECT customer_id, COUNT(*) AS cnt FROM samples GROUP BY customer_id) s
+                ON s.customer_id = c.id
+        """)
+        return {row[0]: {'notes_count': row[1], 'samples_count': row[2]} for row in rows}
+
+
+class SqliteNoteRepository(INoteRepository):
+    """Repozytorium notatek działające na SQLite."""
+    
+    def __init__(self, db: SQLiteDatabase):
+        self.db = db
+    
+    @staticmethod
+    def _to_model(row: tuple) -> NoteModel:
+        """Mapuje wiersz z bazy na model."""
+        return NoteModel(
+            id=row[0],
+            customer_id=row[1],
+            content=row[2],
+            created_at=_from_db(row[3]),
+            is_processed=bool(row[4])
+        )
+    
+    def get_all_notes(self, processed: Optional[bool] = None) -> List[NoteModel]:
+        """Pobiera wszystkie notatki z opcjonalnym filtrem."""
+        sql = "SELECT id, customer_id, content, created_at, is_processed FROM notes"
+        if processed is None:
+            rows = self.db.query(sql)
+        else:
+            rows = self.db.query(sql + " WHERE is_processed = ?", (int(processed),))
+        return [self._to_model(row) for row in rows]
+    
+    def mark_as_processed(self, note_id: int, category: Optional[str] = None) -> bool:
+        """Oznacza notatkę jako przetworzoną."""
+        with self.db.transaction() as conn:
+            cursor = conn.execute(
+                "UPDATE notes SET is_processed = 1, category = COALESCE(?, category) WHERE id = ?",
+                (category, note_id)
+            )
+        if cursor.rowcount:
+            logger.info("Notatka %s oznaczona jako przetworzona", note_id)
+            return True
+        logger.warning("Nie znaleziono notatki o ID %s", note_id)
+        return False
+    
+    def mark_many_as_processed(
+        self,
+        note_ids: List[int],
+        categories: Optional[Dict[int, str]] = None
+    ) -> int:
+        """Oznacza wiele notatek jako przetworzone w jednej transakcji."""
+        unique_ids = list(dict.fromkeys(note_ids))
+        if not unique_ids:
+            return 0
+        categories = categories or {}
+        with self.db.transaction() as conn:
+            cursor = conn.executemany(
+                "UPDATE notes SET is_processed = 1, category = COALESCE(?, category) WHERE id = ?",
+                [(categories.get(note_id), note_id) for note_id in unique_ids]
+            )
+        logger.info(f"Oznaczono {cursor.rowcount} notatek jako przetworzone (wsadowo)")
+        return cursor.rowcount
+
+
+class SqliteSampleRepository(ISampleRepository):
+    """Repozytorium próbek działające na SQLite."""
+    
+    def __init__(self, db: SQLiteDatabase):
+        self.db = db
+    
+    def get_samples_by_status(self, status: str) -> List[SampleModel]:
+        """Pobiera próbki po statusie."""
+        if not status:
+            return []
+        rows = self.db.query(
+            "SELECT id, customer_id, status, date_sent, notes FROM samples WHERE status = ? ORDER BY row_id",
+            (status,)
+        )
+        return [
+            SampleModel(id=row[0], customer_id=row[1], status=row[2], date_sent=_from_db(row[3]), notes=row[4])
+            for row in rows
+        ]
+    
+    def get_followup_candidates(
+        self,
+        date_from: datetime,
+        date_to: datetime,
+        status: str = "Sent"
+    ) -> Iterator[SampleFollowupCandidate]:
+        """
+        Zwraca próbki bez zadania z zadanego okna czasowego wraz z notatkami kandydującymi
+        (jedno zapytanie z NOT EXISTS, korzysta z indeksów na datach i kluczach).
+        """
+        rows = self.db.query("""
+            SELECT s.row_id, s.id, s.customer_id, s.status, s.date_sent, s.notes,
+                   n.id, n.content, n.created_at, n.is_processed
+            FROM samples s
+            LEFT JOIN notes n
+                ON n.customer_id = s.customer_id
+                AND n.created_at >= s.date_sent
+                AND LENGTH(TRIM(n.content)) > 0
+            WHERE s.status = ?
+                AND s.date_sent >= ?
+                AND s.date_sent <= ?
+                AND NOT EXISTS (
+                    SELECT 1 FROM tasks t
+                    WHERE t.customer_id = s.customer_id AND t.sample_id = s.id
+                )
+            ORDER BY s.row_id, n.created_at
+        """, (status, _to_db(date_from), _to_db(date_to)))
+        
+        current: Optional[SampleFollowupCandidate] = None
+        current_row_id = None
+        for row in rows:
+            if row[0] != current_row_id:
+                if current is not None:
+                    yield current
+                current_row_id = row[0]
+                current = SampleFollowupCandidate(sample=SampleModel(
+                    id=row[1],
+                    customer_id=row[2],
+                    status=row[3],
+                    date_sent=_from_db(row[4]),
+                    notes=row[5]
+                ))
+            if row[6] is not None:
+                current.notes.append(NoteModel(
+                    id=row[6],
+                    customer_id=row[2],
+                    content=row[7],
+                    created_at=_from_db(row[8]),
+                    is_processed=bool(row[9])
+                ))
+        if current is not None:
+            yield current
+
+
+class SqliteTaskRepository(ITaskRepository):
+    """Repozytorium zadań działające na SQLite."""
+    
+    COLUMNS = "id, customer_id, sample_id, task_type, description, status, created_at, assigned_to"
+    
+    def __init__(self, db: SQLiteDatabase):
+        self.db = db
+    
+    def batch(self):
+        """Grupuje zmiany w jedną transakcję (jeden commit)."""
+        return self.db.transaction()
+    
+    @staticmethod
+    def _to_model(row: tuple) -> TaskModel:
+        """Mapuje wiersz z bazy na model."""
+        return TaskModel(
+            id=row[0],
+            customer_id=row[1],
+            sample_id=row[2],
+            task_type=row[3],
+            description=row[4] or '',
+            status=row[5],
+            created_at=_from_db(row[6]),
+            assigned_to=row[7]
+        )
+    
+    def get_tasks_by_customer_and_sample(self, customer_id: str, sample_id: int) -> List[TaskModel]:
+        """Pobiera zadania dla konkretnego klienta i próbki."""
+        rows = self.db.query(
+            f"SELECT {self.COLUMNS} FROM tasks WHERE customer_id = ? AND sample_id = ?",
+            (customer_id, sample_id)
+        )
+        return [self._to_model(row) for row in rows]
+    
+    def get_sample_task_keys(self) -> Set[Tuple[str, int]]:
+        """Zwraca pary (customer_id, sample_id) próbek, które mają już zadanie."""
+        return {(row[0], row[1]) for row in self.db.query("SELECT DISTINCT customer_id, sample_id FROM tasks")}
+    
+    def create_task(self, task: TaskModel) -> TaskModel:
+        """Tworzy nowe zadanie (ID nadaje baza, jeśli nie podano)."""
+        if not task.created_at:
+            task.created_at = datetime.now()
+        with self.db.transaction() as conn:
+            cursor = conn.execute(
+                f"INSERT INTO tasks ({self.COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (task.id, task.customer_id, task.sample_id, task.task_type, task.description,
+                 task.status, _to_db(task.created_at), task.assigned_to)
+            )
+            task.id = cursor.lastrowid
+        logger.info("Utworzono zadanie ID: %s dla klienta %s, próbka %s", task.id, task.customer_id, task.sample_id)
+        return task
+    
+    def get_pending_tasks_by_salesperson(self, salesperson_email: str) -> List[TaskModel]:
+        """Pobiera wszystkie oczekujące zadania dla sprzedawcy."""
+        rows = self.db.query(
+            f"SELECT {self.COLUMNS} FROM tasks WHERE assigned_to = ? AND status = 'PENDING' ORDER BY id",
+            (salesperson_email,)
+        )
+        return [self._to_model(row) for row in rows]
+
+
+class SqliteMailLogRepository(IMailLogRepository):
+    """Repozytorium logów maili działające na SQLite."""
+    
+    COLUMNS = "id, to_email, subject, status, error_message, sent_at, created_at, batch_id, task_ids"
+    
+    def __init__(self, db: SQLiteDatabase):
+        self.db = db
+    
+    def batch(self):
+        """Grupuje zmiany w jedną transakcję (jeden commit)."""
+        return self.db.transaction()
+    
+    @staticmethod
+    def _to_model(row: tuple) -> MailLogModel:
+        """Mapuje wiersz z bazy na model."""
+        return MailLogModel(
+            id=row[0],
+            to_email=row[1],
+            subject=row[2] or '',
+            status=row[3],
+            error_message=row[4],
+            sent_at=_from_db(row[5]),
+            created_at=_from_db(row[6]),
+            batch_id=row[7],
+            task_ids=row[8]
+        )
+    
+    def create_log(self, mail_log: MailLogModel) -> MailLogModel:
+        """Tworzy nowy log wysyłki maila."""
+        if not mail_log.created_at:
+            mail_log.created_at = datetime.now()
+        with self.db.transaction() as conn:
+            cursor = conn.execute(
+                f"INSERT INTO mail_logs ({self.COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (mail_log.id, mail_log.to_email, mail_log.subject, mail_log.status, mail_log.error_message,
+                 _to_db(mail_log.sent_at), _to_db(mail_log.created_at), mail_log.batch_id, mail_log.task_ids)
+            )
+            mail_log.id = cursor.lastrowid
+        logger.info("Utworzono log maila ID: %s dla %s, status: %s", mail_log.id, mail_log.to_email, mail_log.status)
+        return mail_log
+    
+    def get_log_by_id(self, log_id: int) -> Optional[MailLogModel]:
+        """Pobiera log po ID."""
+        rows = self.db.query(f"SELECT {self.COLUMNS} FROM mail_logs WHERE id = ?", (log_id,))
+        return self._to_model(rows[0]) if rows else None
+    
+    def update_log_status(
+        self,
+        log_id: int,
+        status: str,
+        error_message: Optional[str] = None,
+        task_ids: Optional[str] = None
+    ) -> bool:
+        """Aktualizuje status logu (i listę ID zadań, jeśli podana)."""
+        with self.db.transaction() as conn:
+            if task_ids is not None:
+                conn.execute("UPDATE mail_logs SET task_ids = ? WHERE id = ?", (task_ids, log_id))
+            if status == "SENT":
+                cursor = conn.execute(
+                    "UPDATE mail_logs SET status = ?, sent_at = ?, error_message = NULL WHERE id = ?",
+                    (status, _to_db(datetime.now()), log_id)
+                )
+            elif status == "FAILED":
+                cursor = conn.execute(
+                    "UPDATE mail_logs SET status = ?, error_message = ? WHERE id = ?",
+                    (status, error_message, log_id)
+                )
+            else:
+                cursor = conn.execute("UPDATE mail_logs SET status = ? WHERE id = ?", (status, log_id))
+        if cursor.rowcount:
+            logger.info("Zaktualizowano log maila ID: %s, status: %s", log_id, status)
+            return True
+        logger.warning(f"Nie znaleziono logu maila o ID {log_id}")
+        return False
+    
+    def get_last_failed_or_pending(self, batch_id: Optional[str] = None) -> Optional[MailLogModel]:
+        """Pobiera ostatni nieudany (a jeśli brak - oczekujący) log."""
+        for status in ("FAILED", "PENDING"):
+            sql = f"SELECT {self.COLUMNS} FROM mail_logs WHERE status = ?"
+            params: tuple = (status,)
+            if batch_id:
+                sql += " AND batch_id = ?"
+                params += (batch_id,)
+            rows = self.db.query(sql + " ORDER BY created_at DESC, id DESC LIMIT 1", params)
+            if rows:
+                return self._to_model(rows[0])
+        return None
+    
+    def get_logs_by_batch(self, batch_id: str) -> List[MailLogModel]:
+        """Pobiera wszystkie logi dla danej partii wysyłki."""
+        rows = self.db.query(f"SELECT {self.COLUMNS} FROM mail_logs WHERE batch_id = ? ORDER BY id", (batch_id,))
+        return [self._to_model(row) for row in rows]
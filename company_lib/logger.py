@@ -1,14 +1,235 @@
 """
 Konfiguracja loggera z obsługą UTF-8 dla polskich znaków.
+Wszystkie loggery piszą przez kolejkę (QueueHandler) do jednego wątku zapisującego
+(QueueListener) z rotacją pliku po rozmiarze - wywołanie logger.info() w pętli nie czeka na dysk.
+Procesy robocze (shardy sample_followup) nie piszą do pliku same - przekazują wpisy kolejką
+multiprocessing do wątku zapisującego rodzica, więc plik rotuje tylko jeden proces.
 """
+import atexit
 import logging
+import os
+import queue
 import sys
+import threading
+import weakref
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 from pathlib import Path
+from typing import Any, Dict, Optional
 from company_lib.config import Config
 
+
+class _Listener(QueueListener):
+    """QueueListener z blokadą obsługi wpisu - fork() nie może trafić w połowę zapisu do pliku/konsoli."""
+    
+    def __init__(self, log_queue: queue.SimpleQueue, *handlers: logging.Handler):
+        super().__init__(log_queue, *handlers, respect_handler_level=True)
+        self.handle_lock = threading.Lock()
+    
+    def handle(self, record: logging.LogRecord) -> None:
+        with self.handle_lock:
+            super().handle(record)
+
+
+# Plik logów -> wątek zapisujący; jeden zapisujący na plik niezależnie od liczby loggerów
+_listeners: Dict[Path, _Listener] = {}
+_queues: Dict[Path, queue.SimpleQueue] = {}
+_queue_handlers: "weakref.WeakSet[_ListenerQueueHandler]" = weakref.WeakSet()
+_listeners_lock = threading.Lock()
+
+# Proces roboczy: kolejka multiprocessing do rodzica (init_worker_logging)
+_forward_queue: Optional[Any] = None
+# Proces nadrzędny: wątek przekazujący wpisy procesów roboczych do kolejek plików (start_worker_logging)
+_worker_listener: Optional["_WorkerListener"] = None
+
+
+def _build_handlers(log_file: Path) -> tuple:
+    """Tworzy właściwe handlery (plik z rotacją i konsola) obsługiwane przez wątek zapisujący."""
+    # Format logowania
+    formatter = logging.Formatter(
+        '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+        datefmt='%Y-%m-%d %H:%M:%S'
+    )
+    
+    # Handler plikowy - KLUCZOWE: encoding='utf-8'; rotacja po Config.LOG_MAX_BYTES
+    file_handler = RotatingFileHandler(
+        log_file,
+        maxBytes=Config.LOG_MAX_BYTES,
+        backupCount=Config.LOG_BACKUP_COUNT,
+        encoding='utf-8'
+    )
+    file_handler.setFormatter(formatter)
+    file_handler.setLevel(logging.DEBUG)
+    
+    # Handler konsolowy (żebyś widział w VSC)
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(formatter)
+    stream_handler.setLevel(logging.INFO)
+    
+    return file_handler, stream_handler
+
+
+def _ensure_listener(log_file: Path) -> queue.SimpleQueue:
+    """Zwraca kolejkę pliku logów i uruchamia dla niej wątek zapisujący, jeśli nie działa."""
+    with _listeners_lock:
+        log_queue = _queues.setdefault(log_file, queue.SimpleQueue())
+        if log_file not in _listeners:
+            listener = _Listener(log_queue, *_build_handlers(log_file))
+            listener.start()
+            _listeners[log_file] = listener
+        return log_queue
+
+
+def flush_logs() -> None:
+    """
+    Opróżnia kolejki i zatrzymuje wątki zapisujące (wywoływane automatycznie przy wyjściu).
+    Kolejny wpis do loggera uruchamia zapisującego ponownie.
+    """
+    with _listeners_lock:
+        listeners = list(_listeners.values())
+        _listeners.clear()
+    for listener in listeners:
+        listener.stop()
+        for handler in listener.handlers:
+            handler.close()
+
+
+class _WorkerListener(QueueListener):
+    """
+    Odbiór wpisów procesów roboczych zatrzymywany zdarzeniem, a nie wpisem do kolejki - proces
+    roboczy przerwany w trakcie put() zostawia zajętą blokadę zapisu kolejki i put() rodzica
+    (znacznik końca) czekałby na nią bez końca.
+    """
+    
+    POLL_SECONDS = 0.1
+    
+    def __init__(self, worker_queue: Any, *handlers: logging.Handler):
+        super().__init__(worker_queue, *handlers)
+        self._stopping = threading.Event()
+    
+    def dequeue(self, block: bool) -> logging.LogRecord:
+        # Po stop() odbiera pozostałe wpisy, a queue.Empty kończy pętlę wątku
+        while True:
+            try:
+                return self.queue.get(timeout=self.POLL_SECONDS)
+            except queue.Empty:
+                if self._stopping.is_set():
+                    raise
+    
+    def stop(self) -> None:
+        if self._thread is not None:
+            self._stopping.set()
+            self._thread.join()
+            self._thread = None
+
+
+class _WorkerRecordHandler(logging.Handler):
+    """Handler wątku przekazującego rodzica - kieruje wpis procesu roboczego do kolejki jego pliku logów."""
+    
+    def emit(self, record: logging.LogRecord) -> None:
+        _ensure_listener(Path(record._log_file)).put_nowait(record)
+
+
+def start_worker_logging(context: Any) -> Any:
+    """
+    Uruchamia w procesie nadrzędnym odbiór wpisów procesów roboczych (przed utworzeniem puli).
+    
+    Args:
+        context: Kontekst multiprocessing puli (fork/spawn)
+    
+    Returns:
+        Kolejka do przekazania procesom roboczym (init_worker_logging)
+    """
+    global _worker_listener
+    stop_worker_logging()
+    worker_queue = context.Queue()
+    _worker_listener = _WorkerListener(worker_queue, _WorkerRecordHandler())
+    _worker_listener.start()
+    return worker_queue
+
+
+def stop_worker_logging() -> None:
+    """Odbiera pozostałe wpisy procesów roboczych i zatrzymuje wątek przekazujący (po zamknięciu puli)."""
+    global _worker_listener
+    if _worker_listener is not None:
+        _worker_listener.stop()
+        _worker_listener = None
+
+
+def init_worker_logging(worker_queue: Any) -> None:
+    """
+    Przełącza proces roboczy na przekazywanie wpisów do rodzica - bez własnego wątku zapisującego
+    i RotatingFileHandler (rotacja z kilku procesów gubiłaby lub nadpisywała wpisy).
+    
+    Args:
+        worker_queue: Kolejka z start_worker_logging()
+    """
+    global _forward_queue
+    _forward_queue = worker_queue
+
+
+class _ListenerQueueHandler(QueueHandler):
+    """QueueHandler wznawiający wątek zapisujący po flush_logs() lub w procesie potomnym po fork()."""
+    
+    def __init__(self, log_file: Path):
+        self.log_file = log_file
+        super().__init__(_ensure_listener(log_file))
+        _queue_handlers.add(self)
+    
+    def enqueue(self, record: logging.LogRecord) -> None:
+        if _forward_queue is not None:
+            # Wpis jest już sformatowany przez prepare() - da się go zserializować do kolejki rodzica
+            record._log_file = str(self.log_file)
+            _forward_queue.put_nowait(record)
+            return
+        if self.log_file not in _listeners:
+            _ensure_listener(self.log_file)
+        super().enqueue(record)
+
+
+def _before_fork() -> None:
+    """Wstrzymuje zapisujących, żeby fork() nie skopiował blokad pliku/konsoli trzymanych w trakcie zapisu."""
+    _listeners_lock.acquire()
+    for listener in _listeners.values():
+        listener.handle_lock.acquire()
+
+
+def _after_fork_in_parent() -> None:
+    for listener in _listeners.values():
+        listener.handle_lock.release()
+    _listeners_lock.release()
+
+
+def _after_fork_in_child() -> None:
+    """
+    Proces potomny nie dziedziczy wątków - zapisujący uruchomi się przy pierwszym wpisie.
+    Kolejki są wymieniane na puste, żeby potomek nie zapisał ponownie wpisów rodzica.
+    """
+    global _listeners_lock, _worker_listener
+    _listeners_lock = threading.Lock()
+    _listeners.clear()
+    # Wątek przekazujący należy do rodzica - potomek nie może go zatrzymywać
+    _worker_listener = None
+    for log_file in _queues:
+        _queues[log_file] = queue.SimpleQueue()
+    for handler in _queue_handlers:
+        handler.queue = _queues[handler.log_file]
+
+
+atexit.register(flush_logs)
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(
+        before=_before_fork,
+        after_in_parent=_after_fork_in_parent,
+        after_in_child=_after_fork_in_child
+    )
+
+
 def setup_logger(name: str = "AppLogger", log_file: Path = None) -> logging.Logger:
     """
     Konfiguruje i zwraca logger z obsługą UTF-8.
+    Wpisy trafiają do kolejki, a zapis do pliku (z rotacją) i na konsolę wykonuje jeden wątek w tle.
+    W pętlach używaj formatowania %-style (logger.debug("... %s", x)) - wiadomość jest składana
+    tylko dla wpisów, które przejdą filtr poziomu.
     
     Args:
         name: Nazwa loggera
@@ -24,27 +245,9 @@ def setup_logger(name: str = "AppLogger", log_file: Path = None) -> logging.Logg
     if logger.handlers:
         return logger
     
-    # Format logowania
-    formatter = logging.Formatter(
-        '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        datefmt='%Y-%m-%d %H:%M:%S'
-    )
-    
-    # Handler plikowy - KLUCZOWE: encoding='utf-8'
     if log_file is None:
         log_file = Config.LOG_FILE
     
-    file_handler = logging.FileHandler(log_file, encoding='utf-8')
-    file_handler.setFormatter(formatter)
-    file_handler.setLevel(logging.DEBUG)
-    
-    # Handler konsolowy (żebyś widział w VSC)
-    stream_handler = logging.StreamHandler(sys.stdout)
-    stream_handler.setFormatter(formatter)
-    stream_handler.setLevel(logging.INFO)
-    
-    logger.addHandler(file_handler)
-    logger.addHandler(stream_handler)
+    logger.addHandler(_ListenerQueueHandler(Path(log_file).resolve()))
     
     return logger
-
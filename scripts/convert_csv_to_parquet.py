@@ -0,0 +1,30 @@
+"""
+Skrypt konwertujący notes.csv i samples.csv do plików Parquet dla raportów analitycznych.
+Wymaga pakietu pyarrow (pip install -e .[analytics]).
+
+Uruchomienie:
+    python scripts/convert_csv_to_parquet.py [katalog_csv] [katalog_parquet]
+"""
+import sys
+from pathlib import Path
+from company_lib.config import Config
+from company_lib.infrastructure.repo_parquet import convert_csv_to_parquet
+from company_lib.logger import setup_logger
+
+def main():
+    """Główna funkcja skryptu."""
+    logger = setup_logger("CsvToParquet")
+    
+    csv_dir = Path(sys.argv[1]) if len(sys.argv) > 1 else Config.MOCK_DIR
+    parquet_dir = Path(sys.argv[2]) if len(sys.argv) > 2 else Config.PARQUET_DIR
+    if not csv_dir:
+        raise ValueError("Nie podano katalogu CSV, a MOCK_DIR nie jest skonfigurowany")
+    
+    logger.info(f">>> Konwersja CSV z {csv_dir} do Parquet w {parquet_dir}")
+    counts = convert_csv_to_parquet(csv_dir, parquet_dir)
+    for file_name, count in counts.items():
+        logger.info(f"  {file_name}: {count} wierszy")
+    logger.info(">>> Konwersja zakończona pomyślnie")
+
+if __name__ == "__main__":
+    main()
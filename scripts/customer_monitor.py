@@ -1,12 +1,17 @@
 """
 Skrypt do monitoringu danych klienta.
-Pobiera informacje o kliencie wraz ze statystykami.
+Pobiera informacje o klientach wraz ze statystykami.
 Używa fabryki repozytoriów - automatycznie wybiera CSV lub SQL na podstawie konfiguracji.
 """
-from company_lib.core.logger import setup_logger
+from collections import defaultdict
+from company_lib.logger import setup_logger
+from company_lib.config import Config
+from company_lib.core.database import query_registry
+from company_lib.core.profiling import profiled
 from company_lib.infrastructure.factories import get_all_repositories
 from company_lib.domain.erp_service import ERPService
 
+@profiled("customer_monitor")
 def main():
     """Główna funkcja skryptu."""
     logger = setup_logger("CustomerMonitor")
@@ -22,54 +27,43 @@ def main():
             customer_repo=customer_repo,
             note_repo=note_repo
         )
-            
-            # TODO: Tutaj można dodać logikę pobierania listy klientów do monitorowania
-            # Na przykład z pliku konfiguracyjnego lub z bazy danych
-            # customer_ids = get_customers_to_monitor()
-            
-            # Przykładowe użycie - monitoring konkretnego klienta
-            # W rzeczywistości można iterować po liście klientów
-            example_customer_id = "CUST_001"  # Przykładowe ID
-            
-            logger.info(f"Monitorowanie klienta: {example_customer_id}")
-            
-            customer_data = erp_service.get_customer_with_stats(example_customer_id)
-            
-            if customer_data:
-                customer = customer_data['customer']
-                stats = customer_data['stats']
-                
-                logger.info(f"Klient: {customer.name} (ID: {customer.id})")
-                logger.info(f"Email: {customer.email or 'Brak'}")
-                logger.info(f"Telefon: {customer.phone or 'Brak'}")
-                logger.info(f"Statystyki:")
-                logger.info(f"  - Liczba notatek: {stats['notes_count']}")
-                logger.info(f"  - Liczba próbek: {stats['samples_count']}")
-            else:
-                logger.warning(f"Nie znaleziono klienta o ID: {example_customer_id}")
-            
-            # Pobranie nieprzetworzonych notatek dla wszystkich klientów
-            pending_notes = erp_service.get_pending_notes()
-            logger.info(f"Znaleziono {len(pending_notes)} nieprzetworzonych notatek")
-            
-            # Grupowanie notatek po kliencie
-            notes_by_customer = {}
-            for note in pending_notes:
-                if note.customer_id not in notes_by_customer:
-                    notes_by_customer[note.customer_id] = []
-                notes_by_customer[note.customer_id].append(note)
-            
-            # Raportowanie
-            logger.info("Raport nieprzetworzonych notatek:")
-            for customer_id, notes in notes_by_customer.items():
-                logger.info(f"  Klient {customer_id}: {len(notes)} notatek")
         
-        logger.info(">>> Monitoring zakończony pomyślnie")
+        # Statystyki wszystkich klientów w jednym przebiegu
+        # (jedno zapytanie GROUP BY w SQL / jeden skan w CSV zamiast zapytania na klienta)
+        all_stats = erp_service.get_all_customer_stats()
+        customers = customer_repo.get_customers_by_ids(list(all_stats.keys()))
+        logger.info(f"Monitorowanie {len(all_stats)} klientów")
+        
+        for customer_id, stats in all_stats.items():
+            customer = customers.get(customer_id)
+            name = customer.name if customer else customer_id
+            logger.info(
+                f"Klient: {name} (ID: {customer_id}) - "
+                f"notatki: {stats['notes_count']}, próbki: {stats['samples_count']}"
+            )
+        
+        # Pobranie nieprzetworzonych notatek dla wszystkich klientów
+        pending_notes = erp_service.get_pending_notes()
+        logger.info(f"Znaleziono {len(pending_notes)} nieprzetworzonych notatek")
+        
+        # Grupowanie notatek po kliencie
+        notes_by_customer = defaultdict(list)
+        for note in pending_notes:
+            notes_by_customer[note.customer_id].append(note)
         
+        # Raportowanie
+        logger.info("Raport nieprzetworzonych notatek:")
+        for customer_id, notes in notes_by_customer.items():
+            logger.info("  Klient %s: %d notatek", customer_id, len(notes))
+        
+        logger.info(">>> Monitoring zakończony pomyślnie")
+    
     except Exception as e:
         logger.error(f"Błąd podczas monitoringu: {e}", exc_info=True)
         raise
+    finally:
+        # Liczniki zapytań SQL (puste w trybie CSV)
+        query_registry.export_stats(Config.DB_QUERY_STATS_FILE)
 
 if __name__ == "__main__":
     main()
-
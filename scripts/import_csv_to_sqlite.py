@@ -0,0 +1,34 @@
+"""
+Skrypt importujący dane z plików CSV (domyślnie data/mocks) do lokalnej bazy SQLite.
+Po imporcie można przełączyć repozytoria na SQLite ustawiając DATA_BACKEND=sqlite.
+
+Uruchomienie:
+    python scripts/import_csv_to_sqlite.py [katalog_csv] [plik_bazy]
+"""
+import sys
+from pathlib import Path
+from company_lib.config import Config
+from company_lib.infrastructure.repo_sqlite import SQLiteDatabase
+from company_lib.logger import setup_logger
+
+def main():
+    """Główna funkcja skryptu."""
+    logger = setup_logger("CsvToSqliteImport")
+    
+    csv_dir = Path(sys.argv[1]) if len(sys.argv) > 1 else Config.MOCK_DIR
+    db_path = Path(sys.argv[2]) if len(sys.argv) > 2 else Config.SQLITE_PATH
+    if not csv_dir:
+        raise ValueError("Nie podano katalogu CSV, a MOCK_DIR nie jest skonfigurowany")
+    
+    logger.info(f">>> Import CSV z {csv_dir} do {db_path}")
+    db = SQLiteDatabase(db_path)
+    try:
+        counts = db.import_csv(csv_dir)
+        for table, count in counts.items():
+            logger.info(f"  {table}: {count} wierszy")
+        logger.info(">>> Import zakończony pomyślnie")
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
@@ -2,10 +2,15 @@
 Skrypt do kategoryzacji notatek używający logiki biznesowej z company_lib.
 Używa fabryki repozytoriów - automatycznie wybiera CSV lub SQL na podstawie konfiguracji.
 """
-from company_lib.core.logger import setup_logger
+import logging
+from company_lib.logger import setup_logger
+from company_lib.config import Config
+from company_lib.core.database import query_registry
+from company_lib.core.profiling import profiled
 from company_lib.infrastructure.factories import get_note_repository
 from company_lib.domain.erp_service import ERPService
 
+@profiled("note_categorizer")
 def main():
     """Główna funkcja skryptu."""
     logger = setup_logger("NoteCategorizer")
@@ -20,29 +25,39 @@ def main():
             customer_repo=None,  # Można dodać jeśli potrzebne
             note_repo=note_repo
         )
+        
+        # Pobranie nieprzetworzonych notatek
+        pending_notes = erp_service.get_pending_notes()
+        logger.info(f"Znaleziono {len(pending_notes)} nieprzetworzonych notatek")
+        
+        # Przetwarzanie notatek - zbieramy ID i kategorie, zapis robimy jednym wsadem
+        processed_ids = []
+        categories = {}
+        for note in pending_notes:
+            logger.info("Przetwarzanie notatki ID: %s, Klient: %s", note.id, note.customer_id)
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Treść: %s", note.safe_content())
             
-            # Pobranie nieprzetworzonych notatek
-            pending_notes = erp_service.get_pending_notes()
-            logger.info(f"Znaleziono {len(pending_notes)} nieprzetworzonych notatek")
+            # TODO: Tutaj dodać logikę kategoryzacji (np. z użyciem LLM)
+            # category = categorize_note(note.content)
+            category = None
             
-            # Przetwarzanie notatek
-            for note in pending_notes:
-                logger.info(f"Przetwarzanie notatki ID: {note.id}, Klient: {note.customer_id}")
-                logger.debug(f"Treść: {note.safe_content()}")
-                
-                # TODO: Tutaj dodać logikę kategoryzacji (np. z użyciem LLM)
-                # category = categorize_note(note.content)
-                
-                # Oznaczenie jako przetworzonej
-                erp_service.process_note(note.id, category=None)
-                logger.info(f"Notatka {note.id} oznaczona jako przetworzona")
+            processed_ids.append(note.id)
+            if category:
+                categories[note.id] = category
         
-        logger.info(">>> Kategoryzacja zakończona pomyślnie")
+        # Oznaczenie jako przetworzonych (jeden wsad zamiast UPDATE per notatka)
+        marked = erp_service.process_notes(processed_ids, categories)
+        logger.info(f"Oznaczono {marked} z {len(processed_ids)} notatek jako przetworzone")
         
+        logger.info(">>> Kategoryzacja zakończona pomyślnie")
+    
     except Exception as e:
         logger.error(f"Błąd podczas kategoryzacji: {e}", exc_info=True)
         raise
+    finally:
+        # Liczniki zapytań SQL (puste w trybie CSV)
+        query_registry.export_stats(Config.DB_QUERY_STATS_FILE)
 
 if __name__ == "__main__":
     main()
-
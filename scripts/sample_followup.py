@@ -5,22 +5,44 @@ Sprawdza próbki z ostatnich 14 dni i weryfikuje czy:
 2. Czy w notatkach jest potwierdzenie otrzymania próbki
 Jeśli nie ma ani zadania ani potwierdzenia, tworzy zadanie i wysyła email.
 """
+import os
+import sys
+import time
+import zlib
+from dataclasses import dataclass, field
 from datetime import datetime, timedelta
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional
 from collections import defaultdict
 
-from company_lib.logger import setup_logger
-from company_lib.infrastructure.factories import get_all_repositories
-from company_lib.infrastructure.repo_csv import CsvTaskRepository, CsvMailLogRepository
-from company_lib.domain.models import TaskModel
+from company_lib.logger import init_worker_logging, setup_logger, start_worker_logging, stop_worker_logging
+from company_lib.infrastructure.factories import (
+    get_all_repositories,
+    get_task_repository,
+    get_mail_log_repository
+)
+from company_lib.infrastructure.checkpoint import RunCheckpoint, SampleKey
+from company_lib.infrastructure.repo_cache import CachedCustomerRepository
+from company_lib.domain.models import CustomerModel, SampleModel, TaskModel
 from company_lib.core.mailer import Mailer
-from company_lib.core.llm_service import LLMService
+from company_lib.core.database import query_registry
+from company_lib.core.llm_service import CoalescingLLMClient, ILLMClient, LLMService
+from company_lib.core.llm_budget import flush_all as flush_llm_budgets, prepare_worker, spend_snapshot
+from company_lib.core.metrics import RunMetrics
+from company_lib.core.profiling import SpanStats, merge_span_stats, profiled, reset_span_stats, take_span_stats
+from company_lib.core.service import ServiceLoop
 from company_lib.config import Config
 import uuid
 
 logger = setup_logger("SampleFollowup")
 
-def analyze_notes_with_llm(notes: List, customer_id: str, sample_date: datetime, llm_provider: str = None) -> Dict[str, Any]:
+def analyze_notes_with_llm(
+    notes: List,
+    customer_id: str,
+    sample_date: datetime,
+    llm_provider: str = None,
+    llm_client: Optional[ILLMClient] = None,
+    metrics: Optional[RunMetrics] = None
+) -> Dict[str, Any]:
     """
     Analizuje notatki używając LLM (Gemini, OpenAI lub Qwen) do sprawdzenia statusu próbki.
     
@@ -28,7 +50,9 @@ def analyze_notes_with_llm(notes: List, customer_id: str, sample_date: datetime,
         notes: Lista notatek (może być pusta lub None)
         customer_id: ID klienta (nie może być None ani pusty)
         sample_date: Data wysłania próbki (nie może być None)
-        llm_provider: Nazwa dostawcy LLM ("gemini", "openai", "qwen") lub None dla domyślnego z Config
+        llm_provider: Nazwa dostawcy LLM ("gemini", "openai", "qwen", "ollama") lub None dla domyślnego z Config
+        llm_client: Gotowy klient LLM (np. współdzielony w trybie usługi); None = nowy klient dostawcy
+        metrics: Metryki uruchomienia (etapy 'note_filtering' i 'llm', liczniki notatek)
     
     Returns:
         Słownik z wynikami analizy
@@ -66,6 +90,8 @@ def analyze_notes_with_llm(notes: List, customer_id: str, sample_date: datetime,
             "best_note_analysis": None,
             "all_analyses": []
         }
+    if metrics is None:
+        metrics = RunMetrics("sample_followup")
     """
     Analizuje notatki używając LLM (Gemini, OpenAI lub Qwen) do sprawdzenia statusu próbki.
     
@@ -73,7 +99,7 @@ def analyze_notes_with_llm(notes: List, customer_id: str, sample_date: datetime,
         notes: Lista notatek
         customer_id: ID klienta
         sample_date: Data wysłania próbki
-        llm_provider: Nazwa dostawcy LLM ("gemini", "openai", "qwen") lub None dla domyślnego z Config
+        llm_provider: Nazwa dostawcy LLM ("gemini", "openai", "qwen", "ollama") lub None dla domyślnego z Config
     
     Returns:
         Słownik z wynikami analizy:
@@ -87,9 +113,10 @@ def analyze_notes_with_llm(notes: List, customer_id: str, sample_date: datetime,
         }
     """
     try:
-        llm_client = LLMService.get_client(llm_provider)
+        if llm_client is None:
+            llm_client = LLMService.get_client(llm_provider)
         provider_name = llm_provider or Config.LLM_PROVIDER
-        logger.info(f"Używam {provider_name} do analizy notatek")
+        logger.info("Używam %s do analizy notatek", provider_name)
     except Exception as e:
         logger.error(f"Nie można zainicjalizować klienta LLM: {e}")
         # Fallback do prostej weryfikacji
@@ -103,13 +130,14 @@ def analyze_notes_with_llm(notes: List, customer_id: str, sample_date: datetime,
         }
     
     # Filtruj notatki dla tego klienta po dacie wysłania próbki
-    relevant_notes = [
-        note for note in notes
-        if note.customer_id == customer_id and note.created_at >= sample_date
-    ]
+    with metrics.stage("note_filtering"):
+        relevant_notes = [
+            note for note in notes
+            if note.customer_id == customer_id and note.created_at >= sample_date
+        ]
     
     if not relevant_notes:
-        logger.debug(f"Brak notatek dla klienta {customer_id} po dacie {sample_date.date()}")
+        logger.debug("Brak notatek dla klienta %s po dacie %s", customer_id, sample_date.date())
         return {
             "has_confirmation": False,
             "sample_received": False,
@@ -120,7 +148,7 @@ def analyze_notes_with_llm(notes: List, customer_id: str, sample_date: datetime,
         }
     
     provider_name = llm_provider or Config.LLM_PROVIDER
-    logger.info(f"Analizuję {len(relevant_notes)} notatek dla klienta {customer_id} używając {provider_name}")
+    logger.info("Analizuję %d notatek dla klienta %s używając %s", len(relevant_notes), customer_id, provider_name)
     
     # Analizuj każdą notatkę
     all_analyses = []
@@ -129,21 +157,24 @@ def analyze_notes_with_llm(notes: List, customer_id: str, sample_date: datetime,
     for note in relevant_notes:
         # Walidacja notatki
         if not note or not hasattr(note, 'content'):
-            logger.warning(f"Nieprawidłowa notatka w liście, pomijam")
+            logger.warning("Nieprawidłowa notatka w liście, pomijam")
             continue
         
         if not note.content or not note.content.strip():
-            logger.debug(f"Notatka ID {note.id} ma pustą treść, pomijam")
+            logger.debug("Notatka ID %s ma pustą treść, pomijam", note.id)
             continue
         
         try:
-            logger.debug(f"Analizuję notatkę ID {note.id}: {note.content[:50]}...")
-            analysis = llm_client.analyze_note_for_sample(note.content, sample_date_str)
+            logger.debug("Analizuję notatkę ID %s: %.50s...", note.id, note.content)
+            with metrics.stage("llm", observe=True):
+                analysis = llm_client.analyze_note_for_sample(note.content, sample_date_str)
+            metrics.incr("notes_analyzed")
             analysis['note_id'] = note.id
             analysis['note_content'] = note.content[:100]  # Krótki fragment dla logowania
             all_analyses.append(analysis)
         except Exception as e:
-            logger.error(f"Błąd analizy notatki ID {note.id}: {e}")
+            logger.error("Błąd analizy notatki ID %s: %s", note.id, e)
+            metrics.incr("llm_errors")
             continue
     
     # Znajdź najlepszą notatkę (najwyższa pewność + mentions_sample=True)
@@ -190,29 +221,136 @@ def analyze_notes_with_llm(notes: List, customer_id: str, sample_date: datetime,
         "all_analyses": all_analyses
     }
 
-def main():
-    """Główna funkcja skryptu."""
-    logger.info(">>> Rozpoczynam monitorowanie próbek i tworzenie zadań...")
+class SampleFollowupJob:
+    """
+    Monitorowanie próbek na trwałym stanie: repozytoria, klient LLM i mailer tworzone są raz.
+    W trybie jednorazowym (main) wykonywany jest jeden cykl; w trybie usługi (serve) obiekt żyje
+    między cyklami, więc indeksy repozytoriów, wyniki analiz LLM i połączenie SMTP pozostają ciepłe,
+    a cykl bez zmian w danych kończy się po kilku wywołaniach stat().
+    """
     
-    try:
-        # Pobranie repozytoriów
-        customer_repo, note_repo, sample_repo = get_all_repositories()
-        
-        # Inicjalizacja repozytoriów
-        if not Config.MOCK_DIR:
-            raise ValueError("MOCK_DIR nie jest skonfigurowany")
-        task_repo = CsvTaskRepository(Config.MOCK_DIR / "tasks.csv")
-        mail_log_repo = CsvMailLogRepository(Config.MOCK_DIR / "mail_logs.csv")
+    def __init__(self, keep_alive: bool = False):
+        """
+        Args:
+            keep_alive: Tryb usługi - współdzielony klient LLM z pamięcią wyników
+                        i jedno utrzymywane połączenie SMTP
+        """
+        # Pobranie repozytoriów (repozytorium próbek dostaje zadania, żeby pomijać próbki z zadaniem)
+        self.task_repo = get_task_repository()
+        self.mail_log_repo = get_mail_log_repository()
+        self.customer_repo, self.note_repo, self.sample_repo = get_all_repositories(task_repo=self.task_repo)
         
         # Inicjalizacja mailera z repozytorium logów
-        mailer = Mailer(mail_log_repo=mail_log_repo)
+        self.mailer = Mailer(mail_log_repo=self.mail_log_repo, keep_alive=keep_alive)
+        
+        # Klient LLM współdzielony między cyklami (None = nowy klient dla każdej próbki)
+        self.llm_client: Optional[ILLMClient] = None
+        if keep_alive:
+            try:
+                self.llm_client = LLMService.get_cached_client()
+            except Exception as e:
+                logger.error(f"Nie można zainicjalizować klienta LLM: {e}")
+        
+        self._last_run: Optional[float] = None
+    
+    def has_changes(self) -> bool:
+        """
+        Sprawdza, czy dane wejściowe (próbki, notatki, zadania, klienci) zmieniły się od ostatniego cyklu.
+        Repozytoria CSV porównują sygnatury plików i doczytują zmiany; dla backendów bez
+        taniego wykrywania zmian (SQL, SQLite) zwraca zawsze True.
+        """
+        changed = False
+        for repo in (self.sample_repo, self.note_repo, self.task_repo, self.customer_repo):
+            refresh = getattr(repo, "refresh", None)
+            if refresh is None:
+                return True
+            # Bez skracania - każde repozytorium musi zapamiętać bieżącą wersję pliku
+            changed = refresh() or changed
+        return changed
+    
+    def run_if_changed(self) -> Dict[str, Any]:
+        """
+        Cykl usługi: pełne przetwarzanie tylko po zmianie danych albo gdy minęło
+        Config.DAEMON_FULL_CYCLE_SECONDS od ostatniego (okno 14 dni przesuwa się z czasem,
+        a nieudane maile czekają na ponowienie).
+        
+        Returns:
+            Podsumowanie cyklu ({"skipped": True} gdy nie było nic do zrobienia)
+        """
+        changed = self.has_changes()
+        full_cycle_due = (
+            self._last_run is None
+            or time.monotonic() - self._last_run >= Config.DAEMON_FULL_CYCLE_SECONDS
+        )
+        if not changed and not full_cycle_due:
+            return {"skipped": True}
+        return self.run_cycle()
+    
+    def run_cycle(self) -> Dict[str, Any]:
+        """
+        Jeden pełny przebieg: wyszukanie próbek bez zadania, analiza notatek, utworzenie zadań
+        i wysłanie zbiorczych maili do sprzedawców.
+        Metryki przebiegu (czasy etapów, liczniki, histogramy opóźnień LLM i SMTP) są logowane
+        jako jeden rekord JSON i zapisywane do Config.RUN_METRICS_FILE / RUN_METRICS_PROM_FILE.
+        
+        Returns:
+            Podsumowanie cyklu (liczba kandydatów, zadań i sprzedawców oraz rekord metryk)
+        """
+        self._last_run = time.monotonic()
+        metrics = RunMetrics("sample_followup")
+        self.mailer.metrics = metrics
+        cache_hits = getattr(self.llm_client, "hits", 0)
+        cache_misses = getattr(self.llm_client, "misses", 0)
+        spend = spend_snapshot()
         
+        status = "error"
+        try:
+            summary = self._process(metrics)
+            status = "ok"
+        finally:
+            if hasattr(self.llm_client, "hits"):
+                metrics.incr("llm_cache_hits", self.llm_client.hits - cache_hits)
+                metrics.incr("llm_cache_misses", self.llm_client.misses - cache_misses)
+            _record_llm_spend(metrics, spend)
+            flush_llm_budgets()
+            if metrics.counters.get("llm_tokens") or metrics.counters.get("llm_local_analyses"):
+                logger.info(
+                    f"Zużycie LLM: {metrics.counters.get('llm_api_requests', 0)} zapytań, "
+                    f"~{metrics.counters.get('llm_tokens', 0)} tokenów, "
+                    f"~{metrics.counters.get('llm_cost_usd', 0):.4f} USD, "
+                    f"{metrics.counters.get('llm_local_analyses', 0)} analiz lokalnych"
+                )
+            record = metrics.export(Config.RUN_METRICS_FILE, Config.RUN_METRICS_PROM_FILE, status=status)
+        summary["metrics"] = record
+        return summary
+    
+    def _process(self, metrics: RunMetrics) -> Dict[str, Any]:
+        """Właściwy przebieg run_cycle() z pomiarem etapów w metrics."""
         # Generuj unikalny batch_id dla tej sesji wysyłki
         batch_id = f"batch_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:8]}"
+        
+        # Data graniczna (14 dni temu)
+        now = datetime.now()
+        window = timedelta(days=14)
+        threshold_date = now - window
+        
+        # Wznowienie przerwanego uruchomienia: ten sam batch_id i werdykty zapisanych próbek
+        # (werdykty bez zadania tylko świeże - nowe notatki klienta mogą zmienić wynik analizy)
+        checkpoint = None
+        resumed: Dict[SampleKey, Dict[str, Any]] = {}
+        max_age = min(timedelta(hours=Config.CHECKPOINT_MAX_AGE_HOURS), window)
+        if Config.CHECKPOINT_DIR:
+            checkpoint = RunCheckpoint.find_unfinished(Config.CHECKPOINT_DIR, max_age)
+        if checkpoint:
+            resumed = checkpoint.load(max_age)
+            batch_id = checkpoint.batch_id
+            metrics.info["resumed"] = True
+            logger.warning(f"Wznawiam przerwane uruchomienie {batch_id}: {len(resumed)} próbek z werdyktem analizy")
         logger.info(f"Batch ID dla tej sesji: {batch_id}")
         
-        # Sprawdź czy są nieudane lub oczekujące maile z poprzednich sesji
-        last_failed_log = mail_log_repo.get_last_failed_or_pending()
+        # Sprawdź czy są nieudane lub oczekujące maile z poprzednich sesji (przy wznowieniu - z tej partii)
+        with metrics.stage("repo_load"):
+            last_failed_log = self.mail_log_repo.get_last_failed_or_pending(batch_id if checkpoint else None)
         retry_emails = {}  # Mapa: email -> log do ponowienia
         
         if last_failed_log:
@@ -223,7 +361,8 @@ def main():
             )
             if last_failed_log.batch_id:
                 # Pobierz wszystkie logi z tego batcha
-                batch_logs = mail_log_repo.get_logs_by_batch(last_failed_log.batch_id)
+                with metrics.stage("repo_load"):
+                    batch_logs = self.mail_log_repo.get_logs_by_batch(last_failed_log.batch_id)
                 logger.info(f"Znaleziono {len(batch_logs)} logów w batchu {last_failed_log.batch_id}")
                 
                 # Stwórz mapę: email -> ostatni log (FAILED lub PENDING)
@@ -235,149 +374,54 @@ def main():
                 logger.info(f"Znaleziono {len(retry_emails)} emaili do ponownej próby wysyłki")
                 # Użyj batch_id z poprzedniej sesji dla ponowienia
                 batch_id = last_failed_log.batch_id
+        metrics.info["batch_id"] = batch_id
         
-        # Data graniczna (14 dni temu)
-        threshold_date = datetime.now() - timedelta(days=14)
-        logger.info(f"Sprawdzam próbki wysłane po {threshold_date.date()}")
-        
-        # Pobranie wysłanych próbek z ostatnich 14 dni
-        sent_samples = sample_repo.get_samples_by_status('Sent')
-        recent_samples = [
-            s for s in sent_samples 
-            if s.date_sent >= threshold_date and s.date_sent <= datetime.now()
-        ]
-        
-        logger.info(f"Znaleziono {len(recent_samples)} próbek wysłanych w ostatnich 14 dniach")
+        # Zadania z tej partii, które trafiły już do wysłanego maila (nie są wysyłane ponownie)
+        mailed_task_ids = set()
+        if resumed:
+            with metrics.stage("repo_load"):
+                for log in self.mail_log_repo.get_logs_by_batch(batch_id):
+                    if log.status == "SENT" and log.task_ids:
+                        mailed_task_ids.update(int(task_id) for task_id in log.task_ids.split(",") if task_id)
+        if Config.CHECKPOINT_DIR and not checkpoint:
+            checkpoint = RunCheckpoint(Config.CHECKPOINT_DIR, batch_id)
         
-        # Sprawdź czy są próbki do przetworzenia
-        if not recent_samples:
-            logger.info("Brak próbek do przetworzenia. Zakończono.")
-            return
+        logger.info(f"Sprawdzam próbki wysłane po {threshold_date.date()}")
         
-        # Pobranie wszystkich notatek (do sprawdzania potwierdzeń)
-        all_notes = note_repo.get_all_notes()
-        if all_notes is None:
-            logger.warning("Nie udało się pobrać notatek, używam pustej listy")
-            all_notes = []
+        # Kandydaci, analiza LLM i tworzenie zadań - w jednym procesie albo w shardach (po kliencie)
+        shards = max(1, Config.FOLLOWUP_SHARDS)
+        if shards == 1:
+            shard_results = [self._process_shard(0, 1, threshold_date, now, metrics, checkpoint, resumed)]
+        else:
+            shard_results = self._run_shards(shards, threshold_date, now, metrics, checkpoint, resumed)
         
-        # Słownik do grupowania zadań po sprzedawcy
+        # Scalenie wyników shardów: zadania grupowane po sprzedawcy w kolejności shardów
+        candidates = sum(result.candidates for result in shard_results)
         tasks_by_salesperson: Dict[str, List[TaskModel]] = defaultdict(list)
+        customers: Dict[str, CustomerModel] = {}
+        samples_by_key: Dict[SampleKey, SampleModel] = {}
+        for result in shard_results:
+            for salesperson_email, tasks in result.tasks_by_salesperson.items():
+                tasks_by_salesperson[salesperson_email].extend(tasks)
+            customers.update(result.customers)
+            samples_by_key.update(result.samples_by_key)
+        recovered = self._recover_tasks(resumed, mailed_task_ids, samples_by_key, metrics)
+        for task in recovered:
+            tasks_by_salesperson[task.assigned_to].append(task)
+        missing_customers = [task.customer_id for task in recovered if task.customer_id not in customers]
+        if missing_customers:
+            with metrics.stage("repo_load"):
+                customers.update(self.customer_repo.get_customers_by_ids(missing_customers))
         
-        # Przetwarzanie każdej próbki
-        for sample in recent_samples:
-            # Walidacja próbki
-            if not sample:
-                logger.warning("Napotkano pustą próbkę w liście, pomijam")
-                continue
-            
-            if not sample.customer_id:
-                logger.warning(f"Próbka ID {sample.id if hasattr(sample, 'id') else 'unknown'} nie ma customer_id, pomijam")
-                continue
-            
-            if not sample.date_sent:
-                logger.warning(f"Próbka ID {sample.id if hasattr(sample, 'id') else 'unknown'} nie ma date_sent, pomijam")
-                continue
-            logger.debug(f"Sprawdzam próbkę ID: {sample.id}, Klient: {sample.customer_id}, Data: {sample.date_sent.date()}")
-            
-            # 1. Sprawdź czy istnieje zadanie dla tej próbki
-            existing_tasks = task_repo.get_tasks_by_customer_and_sample(
-                sample.customer_id, 
-                sample.id
-            )
-            
-            if existing_tasks:
-                logger.debug(f"Zadanie już istnieje dla próbki {sample.id}")
-                continue
-            
-            # 2. Analizuj notatki używając LLM (Gemini, OpenAI lub Qwen)
-            # Możesz zmienić dostawcę przekazując parametr: llm_provider="openai" lub "qwen"
-            analysis_result = analyze_notes_with_llm(
-                all_notes,
-                sample.customer_id,
-                sample.date_sent,
-                llm_provider=None  # None = używa Config.LLM_PROVIDER
-            )
-            
-            # Jeśli próbka dotarła (potwierdzenie otrzymania), pomijamy
-            if analysis_result['sample_received']:
-                best_analysis = analysis_result.get('best_note_analysis')
-                status = best_analysis.get('sample_status') if best_analysis else 'unknown'
-                logger.info(
-                    f"LLM potwierdził otrzymanie próbki {sample.id} przez klienta {sample.customer_id}. "
-                    f"Status: {status}, "
-                    f"Zadowolenie: {analysis_result['customer_satisfied']}"
-                )
-                continue
-            
-            # Jeśli jest opóźnienie, również tworzymy zadanie (ale z innym opisem)
-            if analysis_result['has_delay']:
-                logger.info(
-                    f"Gemini wykrył opóźnienie w dostawie próbki {sample.id} dla klienta {sample.customer_id}"
-                )
-                # Kontynuujemy do utworzenia zadania, ale z informacją o opóźnieniu
-            
-            # 3. Pobierz dane klienta (dla emaila sprzedawcy)
-            customer = customer_repo.get_customer_by_id(sample.customer_id)
-            if not customer:
-                logger.warning(f"Nie znaleziono klienta {sample.customer_id} dla próbki {sample.id}")
-                continue
-            
-            if not customer.salesperson_email:
-                logger.warning(f"Klient {sample.customer_id} nie ma przypisanego sprzedawcy")
-                continue
-            
-            # 4. Utwórz zadanie z informacjami z analizy LLM
-            # Przygotuj opis zadania na podstawie analizy
-            customer_name = customer.name if customer and customer.name else sample.customer_id
-            
-            if analysis_result['has_delay']:
-                description = (
-                    f"OPÓŹNIENIE: Klient {customer_name} ({sample.customer_id}) nie otrzymał jeszcze próbki "
-                    f"wysłanej {sample.date_sent.date()}. Próbka ID: {sample.id}. "
-                    f"Sprawdź status dostawy i skontaktuj się z klientem."
-                )
-                task_type = "SAMPLE_DELAY"
-            elif analysis_result['has_confirmation'] and not analysis_result['sample_received']:
-                # Jest mowa o próbce, ale nie ma potwierdzenia otrzymania
-                description = (
-                    f"Klient {customer_name} ({sample.customer_id}) wspomniał o próbce, "
-                    f"ale brak potwierdzenia otrzymania. Próbka wysłana {sample.date_sent.date()}. "
-                    f"Próbka ID: {sample.id}. Zweryfikuj status."
-                )
-                task_type = "SAMPLE_VERIFICATION"
-            else:
-                # Brak informacji o próbce w notatkach
-                description = (
-                    f"Sprawdź czy klient {customer_name} ({sample.customer_id}) otrzymał próbkę "
-                    f"wysłaną {sample.date_sent.date()}. Próbka ID: {sample.id}. "
-                    f"Brak informacji w notatkach."
-                )
-                task_type = "SAMPLE_FOLLOWUP"
-            
-            # Dodaj informacje o zadowoleniu klienta jeśli dostępne
-            if analysis_result['customer_satisfied'] is not None:
-                satisfaction_text = "zadowolony" if analysis_result['customer_satisfied'] else "niezadowolony"
-                description += f" Klient jest {satisfaction_text}."
-            
-            task = TaskModel(
-                id=None,  # Zostanie przypisane automatycznie
-                customer_id=sample.customer_id,
-                sample_id=sample.id,
-                task_type=task_type,
-                description=description,
-                status="PENDING",
-                assigned_to=customer.salesperson_email
-            )
-            
-            created_task = task_repo.create_task(task)
-            tasks_by_salesperson[customer.salesperson_email].append(created_task)
-            
-            logger.info(
-                f"Utworzono zadanie ID: {created_task.id} dla sprzedawcy {customer.salesperson_email}, "
-                f"klient: {customer.name}, próbka: {sample.id}"
-            )
+        if not candidates and not recovered:
+            logger.info("Brak próbek do przetworzenia. Zakończono.")
+            if checkpoint:
+                checkpoint.complete()
+            return self._summary(candidates=0, tasks=0, salespersons=0)
         
         # 5. Wysyłanie emaili do sprzedawców (jeden email z wszystkimi zadaniami)
+        # Dane zadań z map scalonych z shardów (bez przeszukiwania listy próbek dla każdego zadania)
+        notifications = []
         for salesperson_email, tasks in tasks_by_salesperson.items():
             if not tasks:
                 continue
@@ -398,8 +442,8 @@ def main():
                     logger.warning("Napotkano puste zadanie w liście, pomijam")
                     continue
                 
-                customer = customer_repo.get_customer_by_id(task.customer_id) if task.customer_id else None
-                sample = next((s for s in recent_samples if s.id == task.sample_id), None) if recent_samples else None
+                customer = customers.get(task.customer_id) if task.customer_id else None
+                sample = samples_by_key.get((task.customer_id, task.sample_id))
                 
                 tasks_data.append({
                     'task_id': task.id if task.id else 0,
@@ -411,41 +455,558 @@ def main():
                 })
                 task_ids_list.append(str(task.id) if task.id else '0')
             
-            # Wysyłanie emaila
-            context = {
-                'salesperson_email': salesperson_email,
-                'tasks': tasks_data,
-                'tasks_count': len(tasks_data)
-            }
-            
-            subject = f"Nowe zadania do wykonania - {len(tasks_data)} próbek wymaga weryfikacji"
-            
             # Użyj batch_id z istniejącego logu lub nowego
-            current_batch_id = existing_log.batch_id if existing_log else batch_id
-            task_ids_str = ",".join(task_ids_list)
-            
-            success, log_id = mailer.send_notification(
-                to_email=salesperson_email,
-                subject=subject,
-                template_name="email/tasks_notification.html",
-                context=context,
-                batch_id=current_batch_id,
-                task_ids=task_ids_str,
-                log_id=existing_log.id if existing_log else None
-            )
-            
+            notifications.append({
+                'to_email': salesperson_email,
+                'subject': f"Nowe zadania do wykonania - {len(tasks_data)} próbek wymaga weryfikacji",
+                'template_name': "email/tasks_notification.html",
+                'context': {
+                    'salesperson_email': salesperson_email,
+                    'tasks': tasks_data,
+                    'tasks_count': len(tasks_data)
+                },
+                'batch_id': existing_log.batch_id if existing_log else batch_id,
+                'task_ids': ",".join(task_ids_list),
+                'log_id': existing_log.id if existing_log else None
+            })
+        
+        # Renderowanie i wysyłka równolegle (Config.MAIL_WORKERS), wyniki w kolejności sprzedawców
+        results = self.mailer.send_notifications(notifications, workers=Config.MAIL_WORKERS)
+        for notification, (success, log_id) in zip(notifications, results):
+            salesperson_email = notification['to_email']
             if success:
+                metrics.incr("emails_sent")
                 logger.info(f"Email wysłany pomyślnie do {salesperson_email} (log ID: {log_id})")
             else:
+                metrics.incr("emails_failed")
                 logger.error(f"Błąd wysyłania emaila do {salesperson_email} (log ID: {log_id})")
         
+        # Punkt kontrolny zostaje do czasu wysłania wszystkich maili - następne uruchomienie je ponowi
+        if checkpoint:
+            if all(success for success, _ in results):
+                checkpoint.complete()
+            else:
+                logger.warning(f"Nie wszystkie maile wysłane - punkt kontrolny {batch_id} zostaje do wznowienia")
+        
         total_tasks = sum(len(tasks) for tasks in tasks_by_salesperson.values())
         logger.info(f">>> Zakończono. Utworzono {total_tasks} zadań dla {len(tasks_by_salesperson)} sprzedawców")
+        return self._summary(candidates=candidates, tasks=total_tasks, salespersons=len(tasks_by_salesperson))
+    
+    def _process_shard(
+        self,
+        shard: int,
+        shards: int,
+        date_from: datetime,
+        date_to: datetime,
+        metrics: RunMetrics,
+        checkpoint: Optional[RunCheckpoint] = None,
+        resumed: Optional[Dict[SampleKey, Dict[str, Any]]] = None
+    ) -> "ShardResult":
+        """
+        Przetwarza próbki klientów jednego shardu: wyszukanie kandydatów, analiza notatek
+        i utworzenie zadań (jednym wsadem repozytorium). Maile wysyła proces scalający wyniki.
+        
+        Args:
+            shard: Numer shardu (0..shards-1)
+            shards: Liczba shardów (1 = wszyscy klienci)
+            date_from: Początek okna (data wysłania próbki)
+            date_to: Koniec okna
+            metrics: Metryki uruchomienia (w procesie roboczym - własne, scalane przez rodzica)
+            checkpoint: Punkt kontrolny uruchomienia (None = bez zapisu werdyktów)
+            resumed: Werdykty z przerwanego uruchomienia ((customer_id, sample_id) -> wpis)
         
+        Returns:
+            ShardResult z utworzonymi zadaniami oraz klientami i próbkami potrzebnymi do treści maili
+        """
+        result = ShardResult(shard=shard)
+        resumed = resumed or {}
+        
+        # Pobranie wysłanych próbek z okna, które nie mają jeszcze zadania,
+        # razem z notatkami klienta utworzonymi po wysłaniu próbki (filtrowanie po stronie repozytorium)
+        with metrics.stage("repo_load"):
+            candidates = [
+                candidate
+                for candidate in self.sample_repo.get_followup_candidates(date_from, date_to, status='Sent')
+                if shards == 1 or shard_of(candidate.sample.customer_id if candidate.sample else "", shards) == shard
+            ]
+        if LLMService.get_budget().limited:
+            # Przy limicie tokenów najpierw najnowsze próbki - po wyczerpaniu budżetu
+            # lokalna klasyfikacja trafia na najstarsze
+            candidates.sort(
+                key=lambda c: c.sample.date_sent if c.sample and c.sample.date_sent else datetime.min,
+                reverse=True
+            )
+        recent_samples = [c.sample for c in candidates]
+        metrics.incr("samples_scanned", len(candidates))
+        result.candidates = len(candidates)
+        
+        if shards == 1:
+            logger.info(f"Znaleziono {len(recent_samples)} próbek bez zadania wysłanych w ostatnich 14 dniach")
+        else:
+            logger.info(f"Shard {shard + 1}/{shards}: {len(recent_samples)} próbek bez zadania wysłanych w ostatnich 14 dniach")
+        
+        # Sprawdź czy są próbki do przetworzenia
+        if not recent_samples:
+            return result
+        
+        # Mapa tożsamości - każdy klient pobierany co najwyżej raz w trakcie cyklu
+        customer_repo = CachedCustomerRepository(self.customer_repo)
+        
+        # Pobranie wszystkich potrzebnych klientów jednym zapytaniem (kolejne odczyty idą z cache)
+        with metrics.stage("repo_load"):
+            customers = customer_repo.get_customers_by_ids([s.customer_id for s in recent_samples])
+        logger.info(f"Pobrano dane {len(customers)} klientów")
+        
+        # Słownik do grupowania zadań po sprzedawcy
+        tasks_by_salesperson: Dict[str, List[TaskModel]] = defaultdict(list)
+        samples_by_key = {(sample.customer_id, sample.id): sample for sample in recent_samples if sample}
+        verdicts: Dict[SampleKey, Dict[str, Any]] = {}  # (customer_id, sample_id) -> wpis punktu kontrolnego z zadaniem
+        llm_client = self._coalescing_client(
+            [c for c in candidates if c.sample and (c.sample.customer_id, c.sample.id) not in resumed]
+        )
+        
+        # Przetwarzanie każdej próbki: werdykt analizy (punkt kontrolny) i zadanie do utworzenia
+        pending_tasks: List[TaskModel] = []
+        for candidate in candidates:
+            sample = candidate.sample
+            # Walidacja próbki
+            if not sample:
+                logger.warning("Napotkano pustą próbkę w liście, pomijam")
+                continue
+            
+            if not sample.customer_id:
+                logger.warning(f"Próbka ID {sample.id if hasattr(sample, 'id') else 'unknown'} nie ma customer_id, pomijam")
+                continue
+            
+            if not sample.date_sent:
+                logger.warning(f"Próbka ID {sample.id if hasattr(sample, 'id') else 'unknown'} nie ma date_sent, pomijam")
+                continue
+            logger.debug("Sprawdzam próbkę ID: %s, Klient: %s, Data: %s", sample.id, sample.customer_id, sample.date_sent.date())
+            
+            # 1. Próbki z istniejącym zadaniem (w self.task_repo) odfiltrowało get_followup_candidates
+            
+            # 2-4. Werdykt analizy LLM - z punktu kontrolnego przerwanego uruchomienia albo nowa analiza
+            key = (sample.customer_id, sample.id)
+            entry = resumed.get(key)
+            if entry is not None:
+                metrics.incr("samples_resumed")
+            else:
+                entry = {
+                    'sample_id': sample.id,
+                    'customer_id': sample.customer_id,
+                    'sample_date': sample.date_sent.date().isoformat(),
+                    'analyzed_at': datetime.now().isoformat(timespec='seconds'),
+                    **self._analyze_sample(sample, candidate.notes, customer_repo, metrics, llm_client)
+                }
+                if checkpoint:
+                    checkpoint.record(entry)
+            if entry['verdict'] != "task":
+                continue
+            verdicts[key] = entry
+            
+            pending_tasks.append(TaskModel(
+                id=None,  # Zostanie przypisane automatycznie
+                customer_id=sample.customer_id,
+                sample_id=sample.id,
+                task_type=entry['task_type'],
+                description=entry['description'],
+                status="PENDING",
+                assigned_to=entry['assigned_to']
+            ))
+        if isinstance(llm_client, CoalescingLLMClient):
+            metrics.incr("llm_requests", llm_client.requests)
+            metrics.incr("llm_coalesced", llm_client.coalesced)
+        
+        # Wszystkie nowe zadania zapisywane jednym wsadem (CSV: jedno atomowe przepisanie pliku,
+        # SQLite: jedna transakcja) - dopiero po analizie, żeby wsad nie blokował bazy innym
+        # shardom na czas zapytań do LLM
+        with metrics.stage("task_creation"):
+            with self.task_repo.batch():
+                for task in pending_tasks:
+                    created_task = self.task_repo.create_task(task)
+                    metrics.incr("tasks_created")
+                    tasks_by_salesperson[created_task.assigned_to].append(created_task)
+                    
+                    logger.info(
+                        f"Utworzono zadanie ID: {created_task.id} dla sprzedawcy {created_task.assigned_to}, "
+                        f"klient: {verdicts[(task.customer_id, task.sample_id)].get('customer_name')}, próbka: {task.sample_id}"
+                    )
+        
+        if checkpoint:
+            # Zadania mają już ostateczne ID - wznowienie po przerwaniu w trakcie wysyłki nie utworzy ich ponownie
+            for tasks in tasks_by_salesperson.values():
+                for task in tasks:
+                    checkpoint.record({**verdicts[(task.customer_id, task.sample_id)], 'task_id': task.id})
+        
+        # Do procesu scalającego trafiają tylko dane potrzebne w treści maili
+        for tasks in tasks_by_salesperson.values():
+            for task in tasks:
+                if task.customer_id in customers:
+                    result.customers[task.customer_id] = customers[task.customer_id]
+                key = (task.customer_id, task.sample_id)
+                if key in samples_by_key:
+                    result.samples_by_key[key] = samples_by_key[key]
+        result.tasks_by_salesperson = dict(tasks_by_salesperson)
+        return result
+    
+    def _recover_tasks(
+        self,
+        resumed: Dict[SampleKey, Dict[str, Any]],
+        mailed_task_ids: set,
+        samples_by_key: Dict[SampleKey, SampleModel],
+        metrics: RunMetrics
+    ) -> List[TaskModel]:
+        """
+        Zwraca zadania przerwanego uruchomienia, które zostały zapisane, ale nie trafiły do wysłanego maila
+        (ich próbki mają już zadanie, więc nie są kandydatami). Uzupełnia samples_by_key o daty tych próbek.
+        
+        Args:
+            resumed: Werdykty z punktu kontrolnego ((customer_id, sample_id) -> wpis)
+            mailed_task_ids: ID zadań z wysłanych maili tej partii
+            samples_by_key: Próbki z zadaniami utworzonymi w tym uruchomieniu (uzupełniane)
+            metrics: Metryki uruchomienia (licznik tasks_recovered)
+        """
+        recovered = []
+        for key, entry in resumed.items():
+            if entry['verdict'] != "task" or key in samples_by_key:
+                continue
+            customer_id, sample_id = key
+            if entry.get('task_id') is not None:
+                task = TaskModel(
+                    id=entry['task_id'],
+                    customer_id=customer_id,
+                    sample_id=sample_id,
+                    task_type=entry['task_type'],
+                    description=entry['description'],
+                    status="PENDING",
+                    assigned_to=entry['assigned_to']
+                )
+            else:
+                # Przerwanie między zapisem wsadu zadań a zapisem ich ID w punkcie kontrolnym
+                tasks = self.task_repo.get_tasks_by_customer_and_sample(customer_id, sample_id)
+                task = max(tasks, key=lambda t: t.id or 0) if tasks else None
+            if task is None or task.id in mailed_task_ids:
+                continue
+            recovered.append(task)
+            samples_by_key[key] = SampleModel(
+                id=sample_id,
+                customer_id=customer_id,
+                status="Sent",
+                date_sent=datetime.fromisoformat(entry['sample_date'])
+            )
+        if recovered:
+            metrics.incr("tasks_recovered", len(recovered))
+            logger.info(f"Wznowienie: {len(recovered)} zapisanych zadań czeka na wysłanie maila")
+        return recovered
+    
+    def _coalescing_client(self, candidates: List) -> Optional[ILLMClient]:
+        """
+        Zwraca klienta LLM uruchomienia łączącego analizy tej samej notatki dla kolejnych
+        próbek klienta (jedno zapytanie na notatkę zamiast jednego na parę notatka-próbka).
+        
+        Args:
+            candidates: Kandydaci, których notatki zostaną przeanalizowane w tym uruchomieniu
+        
+        Returns:
+            CoalescingLLMClient albo self.llm_client, gdy łączenie jest wyłączone lub klient niedostępny
+        """
+        if not Config.LLM_COALESCE_NOTES:
+            return self.llm_client
+        try:
+            # Bez "or" - pusty CachedLLMClient ma len() == 0
+            client = self.llm_client if self.llm_client is not None else LLMService.get_client()
+        except Exception as e:
+            logger.error(f"Nie można zainicjalizować klienta LLM: {e}")
+            return self.llm_client
+        # Te same warunki co w analyze_notes_with_llm: notatki klienta od daty wysłania, z treścią
+        planned = CoalescingLLMClient.plan(
+            (note.content, candidate.sample.date_sent.strftime('%Y-%m-%d'))
+            for candidate in candidates
+            if candidate.sample.customer_id and candidate.sample.date_sent
+            for note in candidate.notes or ()
+            if note.customer_id == candidate.sample.customer_id
+            and note.created_at >= candidate.sample.date_sent
+            and note.content and note.content.strip()
+        )
+        return CoalescingLLMClient(client, planned)
+    
+    def _analyze_sample(
+        self,
+        sample: SampleModel,
+        notes: List,
+        customer_repo: CachedCustomerRepository,
+        metrics: RunMetrics,
+        llm_client: Optional[ILLMClient] = None
+    ) -> Dict[str, Any]:
+        """
+        Analizuje notatki do próbki i ustala werdykt: próbka dotarła ("received"),
+        brak klienta/sprzedawcy ("skipped") albo zadanie do utworzenia ("task" z typem i opisem).
+        Werdykt trafia do punktu kontrolnego, więc wznowione uruchomienie nie powtarza analizy LLM.
+        
+        Args:
+            llm_client: Klient LLM uruchomienia (None = self.llm_client)
+        
+        Returns:
+            Słownik werdyktu (klucz 'verdict' i dla "task" pola zadania)
+        """
+        # 2. Analizuj notatki używając LLM (Gemini, OpenAI lub Qwen)
+        # Możesz zmienić dostawcę przekazując parametr: llm_provider="openai" lub "qwen"
+        analysis_result = analyze_notes_with_llm(
+            notes,
+            sample.customer_id,
+            sample.date_sent,
+            llm_provider=None,  # None = używa Config.LLM_PROVIDER
+            llm_client=self.llm_client if llm_client is None else llm_client,
+            metrics=metrics
+        )
+        
+        # Jeśli próbka dotarła (potwierdzenie otrzymania), pomijamy
+        if analysis_result['sample_received']:
+            best_analysis = analysis_result.get('best_note_analysis')
+            status = best_analysis.get('sample_status') if best_analysis else 'unknown'
+            logger.info(
+                f"LLM potwierdził otrzymanie próbki {sample.id} przez klienta {sample.customer_id}. "
+                f"Status: {status}, "
+                f"Zadowolenie: {analysis_result['customer_satisfied']}"
+            )
+            metrics.incr("samples_confirmed")
+            return {'verdict': "received"}
+        
+        # Jeśli jest opóźnienie, również tworzymy zadanie (ale z innym opisem)
+        if analysis_result['has_delay']:
+            logger.info(
+                f"Gemini wykrył opóźnienie w dostawie próbki {sample.id} dla klienta {sample.customer_id}"
+            )
+            # Kontynuujemy do utworzenia zadania, ale z informacją o opóźnieniu
+        
+        # 3. Pobierz dane klienta (dla emaila sprzedawcy)
+        customer = customer_repo.get_customer_by_id(sample.customer_id)
+        if not customer:
+            logger.warning("Nie znaleziono klienta %s dla próbki %s", sample.customer_id, sample.id)
+            return {'verdict': "skipped"}
+        
+        if not customer.salesperson_email:
+            logger.warning("Klient %s nie ma przypisanego sprzedawcy", sample.customer_id)
+            return {'verdict': "skipped"}
+        
+        # 4. Utwórz zadanie z informacjami z analizy LLM
+        # Przygotuj opis zadania na podstawie analizy
+        customer_name = customer.name if customer and customer.name else sample.customer_id
+        
+        if analysis_result['has_delay']:
+            description = (
+                f"OPÓŹNIENIE: Klient {customer_name} ({sample.customer_id}) nie otrzymał jeszcze próbki "
+                f"wysłanej {sample.date_sent.date()}. Próbka ID: {sample.id}. "
+                f"Sprawdź status dostawy i skontaktuj się z klientem."
+            )
+            task_type = "SAMPLE_DELAY"
+        elif analysis_result['has_confirmation'] and not analysis_result['sample_received']:
+            # Jest mowa o próbce, ale nie ma potwierdzenia otrzymania
+            description = (
+                f"Klient {customer_name} ({sample.customer_id}) wspomniał o próbce, "
+                f"ale brak potwierdzenia otrzymania. Próbka wysłana {sample.date_sent.date()}. "
+                f"Próbka ID: {sample.id}. Zweryfikuj status."
+            )
+            task_type = "SAMPLE_VERIFICATION"
+        else:
+            # Brak informacji o próbce w notatkach
+            description = (
+                f"Sprawdź czy klient {customer_name} ({sample.customer_id}) otrzymał próbkę "
+                f"wysłaną {sample.date_sent.date()}. Próbka ID: {sample.id}. "
+                f"Brak informacji w notatkach."
+            )
+            task_type = "SAMPLE_FOLLOWUP"
+        
+        # Dodaj informacje o zadowoleniu klienta jeśli dostępne
+        if analysis_result['customer_satisfied'] is not None:
+            satisfaction_text = "zadowolony" if analysis_result['customer_satisfied'] else "niezadowolony"
+            description += f" Klient jest {satisfaction_text}."
+        
+        return {
+            'verdict': "task",
+            'task_type': task_type,
+            'description': description,
+            'assigned_to': customer.salesperson_email,
+            'customer_name': customer.name
+        }
+    
+    def _run_shards(
+        self,
+        shards: int,
+        date_from: datetime,
+        date_to: datetime,
+        metrics: RunMetrics,
+        checkpoint: Optional[RunCheckpoint] = None,
+        resumed: Optional[Dict[SampleKey, Dict[str, Any]]] = None
+    ) -> List["ShardResult"]:
+        """
+        Przetwarza shardy w puli procesów (Config.FOLLOWUP_WORKERS). Każdy proces roboczy ma
+        własne repozytoria i połączenia; zadania zapisuje sam (scalanie przy zapisie CSV, transakcje SQLite).
+        
+        Returns:
+            Wyniki shardów w kolejności numerów shardów
+        """
+        # Import na żądanie - multiprocessing jest potrzebny tylko w trybie shardów
+        import multiprocessing
+        from concurrent.futures import ProcessPoolExecutor
+        
+        workers = min(shards, Config.FOLLOWUP_WORKERS or os.cpu_count() or 1)
+        # fork: procesy dziedziczą klienta LLM bez serializacji (np. współdzielony z pamięcią wyników)
+        fork = "fork" in multiprocessing.get_all_start_methods()
+        context = multiprocessing.get_context("fork" if fork else "spawn")
+        logger.info(f"Przetwarzanie w {shards} shardach, {workers} procesów roboczych")
+        # Procesy robocze logują przez rodzica - do pliku (i jego rotacji) pisze tylko ten proces
+        log_queue = start_worker_logging(context)
+        
+        with metrics.stage("shards"):
+            try:
+                with ProcessPoolExecutor(
+                    max_workers=workers,
+                    mp_context=context,
+                    initializer=_init_shard_worker,
+                    initargs=(self.llm_client if fork else None, workers, log_queue)
+                ) as executor:
+                    # Każdy shard dostaje tylko werdykty swoich klientów
+                    shard_resumed = [{} for _ in range(shards)]
+                    for key, entry in (resumed or {}).items():
+                        shard_resumed[shard_of(key[0], shards)][key] = entry
+                    results = list(executor.map(
+                        _run_shard, range(shards), [shards] * shards, [date_from] * shards, [date_to] * shards,
+                        [checkpoint] * shards, shard_resumed
+                    ))
+            finally:
+                stop_worker_logging()
+        
+        for result in results:
+            if result.metrics is not None:
+                metrics.merge(result.metrics)
+                result.metrics = None
+            if result.span_stats:
+                merge_span_stats(result.span_stats)
+            result.span_stats = None
+        metrics.incr("shards", shards)
+        return results
+    
+    def _summary(self, **counts: int) -> Dict[str, Any]:
+        summary: Dict[str, Any] = dict(counts)
+        if hasattr(self.llm_client, "hits"):
+            summary["llm_cache_hits"] = self.llm_client.hits
+            summary["llm_cache_misses"] = self.llm_client.misses
+        return summary
+    
+    def close(self) -> None:
+        """Zwalnia zasoby utrzymywane między cyklami (połączenie SMTP)."""
+        self.mailer.close()
+
+@dataclass
+class ShardResult:
+    """Wynik przetworzenia jednego shardu - zadania do zbiorczych maili i dane do ich treści."""
+    shard: int
+    candidates: int = 0
+    tasks_by_salesperson: Dict[str, List[TaskModel]] = field(default_factory=dict)
+    customers: Dict[str, CustomerModel] = field(default_factory=dict)
+    samples_by_key: Dict[SampleKey, SampleModel] = field(default_factory=dict)
+    metrics: Optional[RunMetrics] = None
+    span_stats: Optional[Dict[str, SpanStats]] = None
+
+def shard_of(customer_id: str, shards: int) -> int:
+    """
+    Numer shardu klienta. CRC32 zamiast hash() - wynik musi być taki sam w każdym procesie
+    (hash() napisów zależy od PYTHONHASHSEED).
+    """
+    return zlib.crc32(customer_id.encode('utf-8')) % shards
+
+def _record_llm_spend(metrics: RunMetrics, before: Dict[str, float]) -> None:
+    """Dolicza do metryk zużycie budżetów LLM od migawki spend_snapshot() (zapytania, tokeny, koszt)."""
+    after = spend_snapshot()
+    if after['requests'] == before['requests'] and after['local'] == before['local']:
+        return
+    metrics.incr("llm_api_requests", int(after['requests'] - before['requests']))
+    metrics.incr("llm_tokens", int(after['tokens'] - before['tokens']))
+    metrics.incr("llm_local_analyses", int(after['local'] - before['local']))
+    metrics.incr("llm_budget_wait_ms", round((after['wait_seconds'] - before['wait_seconds']) * 1000))
+    metrics.incr("llm_cost_usd", round(after['cost_usd'] - before['cost_usd'], 6))
+
+# Zadanie procesu roboczego shardów (tworzone raz na proces w _init_shard_worker)
+_shard_job: Optional[SampleFollowupJob] = None
+
+def _init_shard_worker(llm_client: Optional[ILLMClient], workers: int, log_queue: Any) -> None:
+    """
+    Inicjalizacja procesu roboczego: logi przez kolejkę rodzica, własne repozytoria (połączeń
+    nie dzieli się między procesami) i część limitu minutowego tokenów LLM.
+    """
+    global _shard_job
+    init_worker_logging(log_queue)
+    # Po fork() proces ma kopię liczników pomiarów rodzica - zwraca tylko własne (_run_shard)
+    reset_span_stats()
+    prepare_worker(workers)
+    _shard_job = SampleFollowupJob()
+    _shard_job.llm_client = llm_client
+
+def _run_shard(
+    shard: int,
+    shards: int,
+    date_from: datetime,
+    date_to: datetime,
+    checkpoint: Optional[RunCheckpoint],
+    resumed: Dict[SampleKey, Dict[str, Any]]
+) -> ShardResult:
+    """Przetwarza jeden shard w procesie roboczym i zwraca wynik razem z metrykami i pomiarami (spans) shardu."""
+    metrics = RunMetrics("sample_followup")
+    llm_client = _shard_job.llm_client
+    cache_hits = getattr(llm_client, "hits", 0)
+    cache_misses = getattr(llm_client, "misses", 0)
+    spend = spend_snapshot()
+    try:
+        result = _shard_job._process_shard(shard, shards, date_from, date_to, metrics, checkpoint, resumed)
+        if hasattr(llm_client, "hits"):
+            metrics.incr("llm_cache_hits", llm_client.hits - cache_hits)
+            metrics.incr("llm_cache_misses", llm_client.misses - cache_misses)
+        _record_llm_spend(metrics, spend)
+        result.metrics = metrics
+        result.span_stats = take_span_stats()
+        return result
+    finally:
+        flush_llm_budgets()
+
+@profiled("sample_followup")
+def main():
+    """Główna funkcja skryptu (jeden cykl)."""
+    logger.info(">>> Rozpoczynam monitorowanie próbek i tworzenie zadań...")
+    
+    try:
+        SampleFollowupJob().run_cycle()
     except Exception as e:
         logger.error(f"Błąd podczas monitorowania próbek: {e}", exc_info=True)
         raise
+    finally:
+        # Liczniki zapytań SQL (puste w trybie CSV)
+        query_registry.export_stats(Config.DB_QUERY_STATS_FILE)
+
+def serve():
+    """
+    Tryb usługi (--daemon): cykl co Config.DAEMON_INTERVAL_SECONDS na ciepłym stanie,
+    z endpointem /health i /metrics na Config.DAEMON_HEALTH_PORT. Kończy się po SIGTERM/SIGINT.
+    """
+    logger.info(">>> Uruchamiam monitorowanie próbek w trybie usługi...")
+    job = SampleFollowupJob(keep_alive=True)
+    loop = ServiceLoop(
+        "sample_followup",
+        job.run_if_changed,
+        interval=Config.DAEMON_INTERVAL_SECONDS,
+        health_host=Config.DAEMON_HEALTH_HOST,
+        health_port=Config.DAEMON_HEALTH_PORT,
+        max_cycle_seconds=Config.DAEMON_MAX_CYCLE_SECONDS
+    )
+    try:
+        loop.run()
+    finally:
+        job.close()
+        query_registry.export_stats(Config.DB_QUERY_STATS_FILE)
 
 if __name__ == "__main__":
-    main()
+    if "--daemon" in sys.argv[1:]:
+        serve()
+    else:
+        main()
 
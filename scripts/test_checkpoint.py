@@ -0,0 +1,190 @@
+"""
+Skrypt testowy do weryfikacji punktów kontrolnych sample_followup.
+Testuje odczyt pliku przerwanego w połowie zapisu, próbki o tym samym ID u różnych klientów,
+limit wieku werdyktów i odtwarzanie zadań przerwanego uruchomienia.
+Pracuje na plikach tymczasowych - nie zmienia danych mock.
+"""
+import sys
+import io
+import json
+import os
+import tempfile
+from datetime import datetime, timedelta
+from pathlib import Path
+from company_lib.infrastructure.checkpoint import RunCheckpoint
+from company_lib.infrastructure.repo_csv import CsvTaskRepository
+from company_lib.core.metrics import RunMetrics
+from company_lib.domain.models import TaskModel
+from scripts.sample_followup import SampleFollowupJob
+
+# Napraw kodowanie dla Windows
+if sys.platform == 'win32':
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+
+MAX_AGE = timedelta(hours=24)
+
+def _now() -> str:
+    return datetime.now().isoformat(timespec='seconds')
+
+def _task_entry(sample_id: int, customer_id: str, task_id=None) -> dict:
+    entry = {
+        'sample_id': sample_id,
+        'verdict': "task",
+        'customer_id': customer_id,
+        'sample_date': "2025-11-20",
+        'analyzed_at': _now(),
+        'task_type': "SAMPLE_FOLLOWUP",
+        'description': f"Follow-up próbki {sample_id}",
+        'assigned_to': "handlowiec@firma.pl"
+    }
+    if task_id is not None:
+        entry['task_id'] = task_id
+    return entry
+
+def test_truncated_last_line():
+    """Test: Ostatni wiersz przerwany w połowie zapisu jest pomijany"""
+    print("=" * 60)
+    print("TEST 1: Punkt kontrolny z niekompletnym ostatnim wierszem")
+    print("=" * 60)
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        checkpoint = RunCheckpoint(Path(tmp), "batch_test")
+        checkpoint.record({'sample_id': 1, 'verdict': "received", 'customer_id': "CUST_001"})
+        checkpoint.record(_task_entry(2, "CUST_002"))
+        # Późniejszy wpis tej samej próbki (z ID zadania) zastępuje wcześniejszy
+        checkpoint.record(_task_entry(2, "CUST_002", task_id=7))
+        # Przerwany zapis - wiersz bez końca i bez znaku nowej linii
+        with open(checkpoint.path, mode='a', encoding='utf-8') as f:
+            f.write(json.dumps(_task_entry(3, "CUST_003"))[:40])
+        
+        entries = RunCheckpoint.find_unfinished(Path(tmp), MAX_AGE).load()
+        print(f"Wynik: próbki {sorted(entries)} (oczekiwane: CUST_001/1, CUST_002/2)")
+        assert sorted(entries) == [("CUST_001", 1), ("CUST_002", 2)], "Niekompletny wiersz powinien zostać pominięty"
+        assert entries[("CUST_001", 1)]['verdict'] == "received"
+        assert entries[("CUST_002", 2)]['task_id'] == 7, "Późniejszy wpis próbki powinien zastąpić wcześniejszy"
+        
+        # Wznowione uruchomienie dopisuje dalej - nowy wpis nie może skleić się z resztką wiersza
+        checkpoint.record(_task_entry(3, "CUST_003", task_id=8))
+        entries = checkpoint.load()
+        assert len(entries) == 3, "Wpis dopisany po uszkodzonym wierszu zginął"
+        assert entries[("CUST_003", 3)]['task_id'] == 8
+        
+        checkpoint.complete()
+        assert RunCheckpoint.find_unfinished(Path(tmp), MAX_AGE) is None, "Zakończone uruchomienie powinno usunąć plik"
+    
+    print("✅ Test przeszedł - uszkodzony wpis pominięty\n")
+
+def test_same_sample_id_two_customers():
+    """Test: Próbki o tym samym ID u różnych klientów mają osobne wpisy"""
+    print("=" * 60)
+    print("TEST 2: Ten sam sample_id u dwóch klientów")
+    print("=" * 60)
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        checkpoint = RunCheckpoint(Path(tmp), "batch_test")
+        checkpoint.record({'sample_id': 3, 'verdict': "received", 'customer_id': "CUST_001", 'analyzed_at': _now()})
+        checkpoint.record(_task_entry(3, "CUST_003", task_id=9))
+        
+        entries = checkpoint.load(MAX_AGE)
+        print(f"Wynik: {len(entries)} wpisy (oczekiwane: 2)")
+        assert entries[("CUST_001", 3)]['verdict'] == "received", "Werdykt jednego klienta nadpisał drugiego"
+        assert entries[("CUST_003", 3)]['task_id'] == 9
+    
+    print("✅ Test przeszedł - wpisy rozdzielone po kliencie\n")
+
+def test_max_age():
+    """Test: Stare werdykty bez zadania i porzucone pliki nie są wznawiane"""
+    print("=" * 60)
+    print("TEST 3: Limit wieku punktu kontrolnego")
+    print("=" * 60)
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        stale = (datetime.now() - timedelta(days=2)).isoformat(timespec='seconds')
+        checkpoint = RunCheckpoint(Path(tmp), "batch_fresh")
+        checkpoint.record({'sample_id': 1, 'verdict': "skipped", 'customer_id': "CUST_001", 'analyzed_at': stale})
+        checkpoint.record({'sample_id': 2, 'verdict': "received", 'customer_id': "CUST_002", 'analyzed_at': _now()})
+        checkpoint.record({**_task_entry(3, "CUST_003", task_id=5), 'analyzed_at': stale})
+        
+        entries = checkpoint.load(MAX_AGE)
+        print(f"Wynik: próbki {sorted(entries)} (oczekiwane: CUST_002/2, CUST_003/3)")
+        # Stary werdykt bez zadania - do ponownej analizy; zadanie czeka na mail niezależnie od wieku
+        assert sorted(entries) == [("CUST_002", 2), ("CUST_003", 3)], "Stary werdykt bez zadania nie został pominięty"
+        assert len(checkpoint.load()) == 3, "Bez max_age wszystkie wpisy powinny zostać"
+        
+        # Plik nieruszany dłużej niż limit jest usuwany, nawet jeśli jest najnowszy z pozostałych
+        abandoned = RunCheckpoint(Path(tmp), "batch_abandoned")
+        abandoned.record(_task_entry(4, "CUST_004"))
+        old = (datetime.now() - timedelta(days=3)).timestamp()
+        os.utime(abandoned.path, (old, old))
+        
+        found = RunCheckpoint.find_unfinished(Path(tmp), MAX_AGE)
+        assert found is not None and found.batch_id == "batch_fresh"
+        assert not abandoned.path.exists(), "Porzucony punkt kontrolny powinien zostać usunięty"
+        
+        os.utime(checkpoint.path, (old, old))
+        assert RunCheckpoint.find_unfinished(Path(tmp), MAX_AGE) is None, "Stare uruchomienie nie powinno być wznawiane"
+    
+    print("✅ Test przeszedł - wznawiane tylko świeże werdykty\n")
+
+def test_recover_tasks():
+    """Test: Odtwarzanie zapisanych, a niewysłanych zadań przerwanego uruchomienia"""
+    print("=" * 60)
+    print("TEST 4: Odtwarzanie zadań z punktu kontrolnego")
+    print("=" * 60)
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        task_repo = CsvTaskRepository(Path(tmp) / "tasks.csv")
+        # Zadanie zapisane w repozytorium, ale przerwanie nastąpiło przed zapisem jego ID w punkcie kontrolnym
+        saved = task_repo.create_task(TaskModel(
+            customer_id="CUST_004",
+            sample_id=4,
+            description="Follow-up próbki 4",
+            assigned_to="handlowiec@firma.pl"
+        ))
+        
+        entries = [
+            {'sample_id': 1, 'verdict': "received", 'customer_id': "CUST_001"},
+            _task_entry(2, "CUST_002", task_id=21),   # ID zadania w punkcie kontrolnym
+            _task_entry(3, "CUST_003", task_id=22),   # zadanie już wysłane mailem
+            _task_entry(4, "CUST_004"),               # ID tylko w repozytorium zadań
+            _task_entry(5, "CUST_005"),               # zadanie nie zostało zapisane
+            _task_entry(6, "CUST_006", task_id=23),   # zadanie utworzone ponownie w tym uruchomieniu
+            _task_entry(6, "CUST_007", task_id=24)    # ta sama próbka nr 6 innego klienta
+        ]
+        resumed = {(entry['customer_id'], entry['sample_id']): entry for entry in entries}
+        samples_by_key = {("CUST_006", 6): None}
+        
+        job = SampleFollowupJob.__new__(SampleFollowupJob)
+        job.task_repo = task_repo
+        metrics = RunMetrics("sample_followup")
+        recovered = job._recover_tasks(resumed, {22}, samples_by_key, metrics)
+        
+        recovered_ids = sorted(task.id for task in recovered)
+        print(f"Wynik: zadania {recovered_ids} (oczekiwane: [{saved.id}, 21, 24])")
+        assert recovered_ids == sorted([21, 24, saved.id]), "Odtworzone zadania się nie zgadzają"
+        assert metrics.counters["tasks_recovered"] == 3
+        for task in recovered:
+            assert task.assigned_to == "handlowiec@firma.pl"
+            sample = samples_by_key[(task.customer_id, task.sample_id)]
+            assert sample.customer_id == task.customer_id, "Brak próbki odtworzonego zadania"
+            assert sample.date_sent.strftime('%Y-%m-%d') == "2025-11-20"
+        assert ("CUST_005", 5) not in samples_by_key and ("CUST_003", 3) not in samples_by_key
+    
+    print("✅ Test przeszedł - odtworzono tylko zapisane i niewysłane zadania\n")
+
+if __name__ == "__main__":
+    print("Rozpoczynam testy punktów kontrolnych...\n")
+    
+    try:
+        test_truncated_last_line()
+        test_same_sample_id_two_customers()
+        test_max_age()
+        test_recover_tasks()
+        
+        print("=" * 60)
+        print("✅ WSZYSTKIE TESTY PRZESZŁY POMYŚLNIE")
+        print("=" * 60)
+    except Exception as e:
+        print(f"\n❌ BŁĄD W TESTACH: {e}")
+        import traceback
+        traceback.print_exc()
@@ -0,0 +1,167 @@
+"""
+Skrypt testowy do weryfikacji współbieżnych zapisów CSV.
+Testuje merge-on-write CsvTaskRepository (dwie instancje / dwa procesy na jednym pliku)
+i grupowanie zapisów GroupCommit. Pracuje na plikach tymczasowych - nie zmienia danych mock.
+"""
+import sys
+import io
+import csv
+import multiprocessing
+import tempfile
+from pathlib import Path
+from company_lib.infrastructure import file_lock
+from company_lib.infrastructure.atomic_file import GroupCommit
+from company_lib.infrastructure.repo_csv import CsvTaskRepository
+from company_lib.domain.models import TaskModel
+
+# Napraw kodowanie dla Windows
+if sys.platform == 'win32':
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+
+TASKS_PER_WRITER = 40
+
+def _task(customer_id: str, sample_id: int) -> TaskModel:
+    return TaskModel(
+        id=None,
+        customer_id=customer_id,
+        sample_id=sample_id,
+        task_type="SAMPLE_FOLLOWUP",
+        description=f"Zadanie testowe {customer_id}/{sample_id}"
+    )
+
+def _read_rows(file_path: Path) -> list:
+    with open(file_path, mode='r', encoding='utf-8-sig') as f:
+        return list(csv.DictReader(f, delimiter=';'))
+
+def _writer_process(file_path: str, customer_id: str, barrier) -> None:
+    """Proces piszący: wczytuje plik, czeka na drugi proces i tworzy zadania (pojedynczo i wsadem)."""
+    repo = CsvTaskRepository(Path(file_path))
+    barrier.wait()
+    for sample_id in range(TASKS_PER_WRITER // 2):
+        repo.create_task(_task(customer_id, sample_id))
+    with repo.batch():
+        for sample_id in range(TASKS_PER_WRITER // 2, TASKS_PER_WRITER):
+            repo.create_task(_task(customer_id, sample_id))
+
+def test_two_instances_merge():
+    """Test: Dwie instancje repozytorium wczytane przed zapisem - żadne zadanie nie ginie"""
+    print("=" * 60)
+    print("TEST 1: Dwie instancje CsvTaskRepository na jednym pliku")
+    print("=" * 60)
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        file_path = Path(tmp) / "tasks.csv"
+        repo_a = CsvTaskRepository(file_path)
+        repo_b = CsvTaskRepository(file_path)
+        
+        task_a = repo_a.create_task(_task("CUST_A", 1))
+        task_b = repo_b.create_task(_task("CUST_B", 2))
+        
+        rows = _read_rows(file_path)
+        ids = [int(row['id']) for row in rows]
+        print(f"Wynik: {len(rows)} zadań, ID {ids} (oczekiwane: 2 zadania, różne ID)")
+        assert len(rows) == 2, "Zadanie pierwszej instancji zostało nadpisane"
+        assert len(set(ids)) == 2, "Zadania dostały to samo ID"
+        assert task_a.id != task_b.id, "Druga instancja nie nadała nowego ID"
+        assert {row['customer_id'] for row in rows} == {"CUST_A", "CUST_B"}
+        
+        # Pierwsza instancja widzi zadanie drugiej po odświeżeniu
+        assert repo_a.get_sample_task_keys() == {("CUST_A", 1), ("CUST_B", 2)}
+    
+    print("✅ Test przeszedł - oba zadania zapisane z unikalnymi ID\n")
+
+def test_concurrent_processes():
+    """Test: Dwa procesy zapisujące równocześnie - unikalne ID i komplet wierszy"""
+    print("=" * 60)
+    print("TEST 2: Dwa procesy zapisujące zadania równocześnie")
+    print("=" * 60)
+    
+    if file_lock.fcntl is None:
+        print("POMINIĘTO: brak blokad plików (fcntl) na tym systemie\n")
+        return
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        file_path = Path(tmp) / "tasks.csv"
+        context = multiprocessing.get_context()
+        barrier = context.Barrier(2)
+        writers = [
+            context.Process(target=_writer_process, args=(str(file_path), customer_id, barrier))
+            for customer_id in ("CUST_A", "CUST_B")
+        ]
+        for writer in writers:
+            writer.start()
+        for writer in writers:
+            writer.join(timeout=60)
+            assert writer.exitcode == 0, f"Proces piszący zakończył się kodem {writer.exitcode}"
+        
+        rows = _read_rows(file_path)
+        ids = [int(row['id']) for row in rows]
+        keys = {(row['customer_id'], int(row['sample_id'])) for row in rows}
+        print(f"Wynik: {len(rows)} zadań, {len(set(ids))} unikalnych ID (oczekiwane: {2 * TASKS_PER_WRITER})")
+        assert len(rows) == 2 * TASKS_PER_WRITER, "Część zadań zginęła przy równoległym zapisie"
+        assert len(set(ids)) == len(ids), "Powtórzone ID zadań"
+        assert keys == {
+            (customer_id, sample_id)
+            for customer_id in ("CUST_A", "CUST_B")
+            for sample_id in range(TASKS_PER_WRITER)
+        }, "Brakuje zadań jednego z procesów"
+    
+    print("✅ Test przeszedł - wszystkie zadania obu procesów zapisane\n")
+
+def test_group_commit():
+    """Test: GroupCommit - zapis od razu poza blokiem, jeden zapis na zagnieżdżony blok, zapis po wyjątku"""
+    print("=" * 60)
+    print("TEST 3: Grupowanie zapisów GroupCommit")
+    print("=" * 60)
+    
+    flushes = []
+    writes = GroupCommit(lambda: flushes.append(1))
+    
+    writes.changed()
+    assert len(flushes) == 1, "Zmiana poza blokiem powinna zapisać od razu"
+    
+    with writes.batch():
+        writes.changed()
+        with writes.batch():
+            writes.changed()
+            writes.changed()
+        assert len(flushes) == 1, "Wewnętrzny blok nie powinien zapisywać"
+        writes.changed()
+    print(f"Zagnieżdżony blok: {len(flushes) - 1} zapis (oczekiwane: 1)")
+    assert len(flushes) == 2, "Zewnętrzny blok powinien zapisać dokładnie raz"
+    
+    with writes.batch():
+        pass
+    assert len(flushes) == 2, "Blok bez zmian nie powinien zapisywać"
+    
+    try:
+        with writes.batch():
+            writes.changed()
+            raise RuntimeError("przerwanie w trakcie bloku")
+    except RuntimeError:
+        pass
+    else:
+        raise AssertionError("Wyjątek z bloku powinien zostać przekazany dalej")
+    print(f"Blok przerwany wyjątkiem: {len(flushes) - 2} zapis (oczekiwane: 1)")
+    assert len(flushes) == 3, "Zmiany sprzed wyjątku powinny zostać zapisane"
+    
+    writes.changed()
+    assert len(flushes) == 4, "Po wyjątku zmiany powinny znów zapisywać się od razu"
+    
+    print("✅ Test przeszedł - zapisy grupowane poprawnie\n")
+
+if __name__ == "__main__":
+    print("Rozpoczynam testy współbieżnych zapisów...\n")
+    
+    try:
+        test_two_instances_merge()
+        test_concurrent_processes()
+        test_group_commit()
+        
+        print("=" * 60)
+        print("✅ WSZYSTKIE TESTY PRZESZŁY POMYŚLNIE")
+        print("=" * 60)
+    except Exception as e:
+        print(f"\n❌ BŁĄD W TESTACH: {e}")
+        import traceback
+        traceback.print_exc()
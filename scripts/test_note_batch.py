@@ -0,0 +1,123 @@
+"""
+Skrypt testowy do weryfikacji NoteBatch.ranges_after (notatki klienta od daty próbki).
+Porównuje wynik z prostym filtrem w Pythonie: notatki klienta posortowane po dacie
+i obcięte bisect od daty wysłania próbki.
+"""
+import sys
+import io
+import random
+from bisect import bisect_left
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Dict, List, Tuple
+from company_lib.domain.batches import NoteBatch, datetimes_to_array
+from company_lib.domain.models import NoteModel
+
+# Napraw kodowanie dla Windows
+if sys.platform == 'win32':
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+
+def _reference(notes: List[NoteModel], queries: List[Tuple[str, datetime]]) -> List[List[int]]:
+    """Filtr w Pythonie: ID notatek klienta utworzonych w dacie zapytania lub później, rosnąco po dacie."""
+    notes_by_customer: Dict[str, List[NoteModel]] = defaultdict(list)
+    for note in notes:
+        notes_by_customer[note.customer_id].append(note)
+    for customer_notes in notes_by_customer.values():
+        customer_notes.sort(key=lambda n: n.created_at)
+    result = []
+    for customer_id, date in queries:
+        customer_notes = notes_by_customer.get(customer_id, [])
+        start = bisect_left([n.created_at for n in customer_notes], date)
+        result.append([n.id for n in customer_notes[start:]])
+    return result
+
+def _ranges(notes: List[NoteModel], queries: List[Tuple[str, datetime]]) -> List[List[int]]:
+    """ID notatek z NoteBatch.ranges_after dla każdego zapytania."""
+    batch = NoteBatch.from_models(notes)
+    order, starts, ends = batch.ranges_after(
+        [customer_id for customer_id, _ in queries],
+        datetimes_to_array([date for _, date in queries])
+    )
+    ids = batch.ids[order].tolist()
+    return [ids[start:end] for start, end in zip(starts.tolist(), ends.tolist())]
+
+def _note(note_id: int, customer_id: str, created_at: datetime) -> NoteModel:
+    return NoteModel(id=note_id, customer_id=customer_id, content=f"Notatka {note_id}", created_at=created_at)
+
+def test_known_cases():
+    """Test: Przypadki brzegowe - brak notatek klienta, kilka próbek klienta, równe daty"""
+    print("=" * 60)
+    print("TEST 1: Przypadki brzegowe ranges_after")
+    print("=" * 60)
+    
+    day = datetime(2025, 11, 20)
+    notes = [
+        _note(1, "CUST_001", day + timedelta(days=2)),
+        _note(2, "CUST_002", day),
+        _note(3, "CUST_001", day),
+        _note(4, "CUST_001", day),                       # ta sama data co notatka 3
+        _note(5, "CUST_002", day - timedelta(days=1)),
+        _note(6, "CUST_001", day - timedelta(days=30))
+    ]
+    queries = [
+        ("CUST_001", day),                               # data równa datom notatek 3 i 4 - włącznie
+        ("CUST_001", day + timedelta(seconds=1)),
+        ("CUST_001", day + timedelta(days=3)),           # po ostatniej notatce
+        ("CUST_002", day - timedelta(days=365)),
+        ("CUST_404", day),                               # klient bez notatek
+        ("CUST_001", datetime(1900, 1, 1)),              # odległe daty - klucz z rang, nie sekund
+        ("CUST_002", datetime(2100, 1, 1))
+    ]
+    expected = [[3, 4, 1], [1], [], [5, 2], [], [6, 3, 4, 1], []]
+    
+    result = _ranges(notes, queries)
+    for query, ids in zip(queries, result):
+        print(f"  {query[0]} od {query[1]}: {ids}")
+    assert result == expected, f"Niezgodne zakresy: {result}"
+    assert result == _reference(notes, queries), "Wynik różni się od filtra w Pythonie"
+    
+    # Partia bez notatek - każde zapytanie dostaje pusty zakres
+    assert _ranges([], queries[:2]) == [[], []]
+    
+    print("✅ Test przeszedł - przypadki brzegowe poprawne\n")
+
+def test_matches_python_filter():
+    """Test: Losowe dane - wynik identyczny z filtrem w Pythonie (także kolejność równych dat)"""
+    print("=" * 60)
+    print("TEST 2: Zgodność z filtrem w Pythonie na losowych danych")
+    print("=" * 60)
+    
+    rng = random.Random(34)
+    start = datetime(2025, 1, 1)
+    for round_no in range(50):
+        customers = [f"CUST_{i:03d}" for i in range(rng.randint(1, 12))]
+        # Mało różnych dat - dużo notatek z tą samą datą
+        dates = [start + timedelta(hours=rng.randint(0, 40) * 6) for _ in range(rng.randint(1, 15))]
+        noted = customers[:max(1, len(customers) - 2)]   # ostatni klienci nie mają notatek
+        notes = [
+            _note(i, rng.choice(noted), rng.choice(dates))
+            for i in range(rng.randint(0, 200))
+        ]
+        queries = [
+            (rng.choice(customers + ["CUST_404"]), rng.choice(dates) + timedelta(hours=rng.choice((-3, 0, 0, 3))))
+            for _ in range(rng.randint(1, 60))
+        ]
+        assert _ranges(notes, queries) == _reference(notes, queries), f"Różnica w losowaniu {round_no}"
+    
+    print("Wynik: 50 losowych zestawów zgodnych z filtrem w Pythonie")
+    print("✅ Test przeszedł - ranges_after zgodne z filtrem w Pythonie\n")
+
+if __name__ == "__main__":
+    print("Rozpoczynam testy NoteBatch.ranges_after...\n")
+    
+    try:
+        test_known_cases()
+        test_matches_python_filter()
+        
+        print("=" * 60)
+        print("✅ WSZYSTKIE TESTY PRZESZŁY POMYŚLNIE")
+        print("=" * 60)
+    except Exception as e:
+        print(f"\n❌ BŁĄD W TESTACH: {e}")
+        import traceback
+        traceback.print_exc()
@@ -0,0 +1,202 @@
+"""
+Skrypt testowy do weryfikacji backendu SQLite.
+Testuje import danych z CSV, zagnieżdżone transakcje, wyszukiwanie kandydatów follow-up
+(próbki o tym samym ID u różnych klientów) i aktualizację logów maili.
+Pracuje na bazie w pamięci zasilonej kopią data/mocks - nie zmienia danych mock.
+"""
+import sys
+import io
+import shutil
+import tempfile
+from pathlib import Path
+from datetime import datetime
+from company_lib.infrastructure.repo_sqlite import (
+    SQLiteDatabase,
+    SqliteSampleRepository,
+    SqliteTaskRepository,
+    SqliteMailLogRepository
+)
+from company_lib.domain.models import TaskModel, MailLogModel
+from company_lib.config import Config
+
+# Napraw kodowanie dla Windows
+if sys.platform == 'win32':
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+
+MOCK_FILES = ("customers.csv", "notes.csv", "samples.csv", "tasks.csv", "mail_logs.csv")
+
+def _copy_mocks(directory: Path) -> Path:
+    """Kopiuje pliki mock do katalogu tymczasowego (repozytoria CSV tworzą obok pliki .lock)."""
+    for name in MOCK_FILES:
+        shutil.copy(Config.MOCK_DIR / name, directory / name)
+    return directory
+
+def _mock_database() -> SQLiteDatabase:
+    """Baza w pamięci z danymi z kopii data/mocks."""
+    db = SQLiteDatabase(':memory:')
+    with tempfile.TemporaryDirectory() as tmp:
+        db.import_csv(_copy_mocks(Path(tmp)))
+    return db
+
+def _csv_rows(name: str) -> int:
+    with open(Config.MOCK_DIR / name, mode='r', encoding='utf-8-sig') as f:
+        return sum(1 for line in f.readlines()[1:] if line.strip())
+
+def _task(sample_id: int) -> TaskModel:
+    return TaskModel(customer_id="CUST_003", sample_id=sample_id, description="Zadanie testowe")
+
+def test_import_csv():
+    """Test: Import z CSV - komplet wierszy, także próbki o powtórzonym ID"""
+    print("=" * 60)
+    print("TEST 1: Import danych z CSV")
+    print("=" * 60)
+    
+    db = _mock_database()
+    for name in MOCK_FILES:
+        table = name[:-len(".csv")]
+        count = db.query(f"SELECT COUNT(*) FROM {table}")[0][0]
+        print(f"  {table}: {count} wierszy (oczekiwane: {_csv_rows(name)})")
+        assert count == _csv_rows(name), f"Tabela {table} ma inną liczbę wierszy niż CSV"
+    
+    # ID próbek z ERP nie są unikalne - każda próbka to osobny wiersz
+    duplicated = db.query("SELECT customer_id FROM samples WHERE id = 3 ORDER BY row_id")
+    assert len(duplicated) == 3, "Próbki o tym samym ID zostały nadpisane"
+    
+    # Ponowny import z replace=True nie dubluje danych
+    with tempfile.TemporaryDirectory() as tmp:
+        counts = db.import_csv(_copy_mocks(Path(tmp)))
+    assert db.query("SELECT COUNT(*) FROM samples")[0][0] == counts['samples']
+    db.close()
+    
+    print("✅ Test przeszedł - zaimportowano wszystkie wiersze\n")
+
+def test_nested_transaction_rollback():
+    """Test: Zagnieżdżone transakcje - jeden commit, wyjątek wycofuje całość"""
+    print("=" * 60)
+    print("TEST 2: Zagnieżdżone transakcje")
+    print("=" * 60)
+    
+    db = SQLiteDatabase(':memory:')
+    task_repo = SqliteTaskRepository(db)
+    
+    with task_repo.batch():
+        task_repo.create_task(_task(1))
+        with task_repo.batch():
+            task_repo.create_task(_task(2))
+    assert len(db.query("SELECT id FROM tasks")) == 2, "Zadania z zagnieżdżonego bloku nie zostały zapisane"
+    
+    try:
+        with task_repo.batch():
+            task_repo.create_task(_task(3))
+            with task_repo.batch():
+                task_repo.create_task(_task(4))
+                raise RuntimeError("przerwanie w wewnętrznym bloku")
+    except RuntimeError:
+        pass
+    else:
+        raise AssertionError("Wyjątek z transakcji powinien zostać przekazany dalej")
+    
+    sample_ids = sorted(row[0] for row in db.query("SELECT sample_id FROM tasks"))
+    print(f"Wynik: zadania dla próbek {sample_ids} (oczekiwane: [1, 2])")
+    assert sample_ids == [1, 2], "Wyjątek powinien wycofać całą zewnętrzną transakcję"
+    
+    # Po wycofaniu kolejna transakcja działa normalnie
+    task_repo.create_task(_task(5))
+    assert task_repo.get_sample_task_keys() == {("CUST_003", 1), ("CUST_003", 2), ("CUST_003", 5)}
+    db.close()
+    
+    print("✅ Test przeszedł - transakcje zagnieżdżone poprawnie\n")
+
+def test_followup_candidates_duplicate_ids():
+    """Test: Kandydaci follow-up - próbki o tym samym ID u różnych klientów nie są łączone"""
+    print("=" * 60)
+    print("TEST 3: Kandydaci follow-up przy powtórzonych ID próbek")
+    print("=" * 60)
+    
+    db = _mock_database()
+    # Druga wysłana próbka nr 3 - tym razem dla CUST_001 (w mockach jest dla CUST_003, z zadaniem)
+    # i próbka nr 7 dla dwóch klientów, obie bez zadania
+    with db.transaction() as conn:
+        conn.executemany(
+            "INSERT INTO samples (id, customer_id, status, date_sent, notes) VALUES (?, ?, ?, ?, ?)",
+            [
+                (3, "CUST_001", "Sent", "2025-11-20 00:00:00", "Próbka testowa"),
+                (7, "CUST_003", "Sent", "2025-11-10 00:00:00", "Próbka testowa"),
+                (7, "CUST_002", "Sent", "2025-11-10 00:00:00", "Próbka testowa")
+            ]
+        )
+    
+    repo = SqliteSampleRepository(db)
+    candidates = list(repo.get_followup_candidates(datetime(2025, 11, 1), datetime(2025, 11, 30)))
+    found = {
+        (c.sample.customer_id, c.sample.id): [note.id for note in c.notes]
+        for c in candidates
+    }
+    for key, note_ids in sorted(found.items()):
+        print(f"  {key}: notatki {note_ids}")
+    
+    assert len(candidates) == len(found), "Ta sama próbka zwrócona kilka razy"
+    # Zadanie próbki nr 3 klienta CUST_003 nie może ukryć próbki nr 3 klienta CUST_001
+    assert set(found) == {("CUST_001", 1), ("CUST_001", 3), ("CUST_002", 7), ("CUST_003", 7)}, \
+        "Próbki z zadaniem lub o statusie innym niż Sent nie powinny być kandydatami"
+    # Tylko notatki właściwego klienta, utworzone od daty wysłania próbki
+    assert found[("CUST_001", 1)] == [1, 2, 5]
+    assert found[("CUST_001", 3)] == [2, 5]
+    assert found[("CUST_003", 7)] == [4], "Próbka CUST_003 dostała notatki innego klienta"
+    assert found[("CUST_002", 7)] == [3], "Próbka CUST_002 dostała notatki innego klienta"
+    for candidate in candidates:
+        assert all(note.customer_id == candidate.sample.customer_id for note in candidate.notes)
+    db.close()
+    
+    print("✅ Test przeszedł - każda próbka z własnymi notatkami\n")
+
+def test_update_log_status():
+    """Test: Aktualizacja statusu logu maila"""
+    print("=" * 60)
+    print("TEST 4: Aktualizacja statusu logu maila")
+    print("=" * 60)
+    
+    db = SQLiteDatabase(':memory:')
+    repo = SqliteMailLogRepository(db)
+    log = repo.create_log(MailLogModel(
+        to_email="sprzedawca1@firma.pl",
+        subject="Zadania follow-up",
+        status="PENDING",
+        batch_id="batch_test"
+    ))
+    
+    assert repo.update_log_status(log.id, "FAILED", error_message="SMTP timeout", task_ids="1,2")
+    failed = repo.get_log_by_id(log.id)
+    assert failed.status == "FAILED" and failed.error_message == "SMTP timeout"
+    assert failed.task_ids == "1,2" and failed.sent_at is None
+    assert repo.get_last_failed_or_pending("batch_test").id == log.id
+    
+    assert repo.update_log_status(log.id, "SENT")
+    sent = repo.get_log_by_id(log.id)
+    print(f"Wynik: status {sent.status}, błąd {sent.error_message}, wysłano {sent.sent_at}")
+    assert sent.status == "SENT" and sent.sent_at is not None
+    assert sent.error_message is None, "Wysłanie powinno wyczyścić komunikat błędu"
+    assert sent.task_ids == "1,2", "Status bez task_ids nie powinien zmieniać listy zadań"
+    assert repo.get_last_failed_or_pending("batch_test") is None
+    
+    assert not repo.update_log_status(log.id + 100, "SENT"), "Nieistniejący log powinien zwrócić False"
+    db.close()
+    
+    print("✅ Test przeszedł - statusy logów aktualizowane poprawnie\n")
+
+if __name__ == "__main__":
+    print("Rozpoczynam testy backendu SQLite...\n")
+    
+    try:
+        test_import_csv()
+        test_nested_transaction_rollback()
+        test_followup_candidates_duplicate_ids()
+        test_update_log_status()
+        
+        print("=" * 60)
+        print("✅ WSZYSTKIE TESTY PRZESZŁY POMYŚLNIE")
+        print("=" * 60)
+    except Exception as e:
+        print(f"\n❌ BŁĄD W TESTACH: {e}")
+        import traceback
+        traceback.print_exc()